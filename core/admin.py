@@ -20,6 +20,7 @@ from core.models import (
     LibraryFile, DailyVisitor, VisitSession, AttendanceSheetConfig, AttendanceDayState,
     SavedCollection, SavedCollectionItem, ContentReport, EntryBook, EntryBookItem
 )
+from core.unread_counters import forget_unread_counts
 
 # =============================================================================
 # 1) Standart Admin Kaydı (Invitation, UserProfile, SavedItem, Vote, PinnedEntry, Entry, RandomSentence)
@@ -443,12 +444,16 @@ class NotificationAdmin(admin.ModelAdmin):
     actions = ['mark_as_read', 'mark_as_unread']
 
     def mark_as_read(self, request, queryset):
+        recipient_ids = set(queryset.values_list('recipient_id', flat=True))
         updated = queryset.update(is_read=True)
+        forget_unread_counts(recipient_ids)
         self.message_user(request, f"{updated} bildirim okundu olarak işaretlendi.")
     mark_as_read.short_description = "Seçili bildirimleri okundu olarak işaretle"
 
     def mark_as_unread(self, request, queryset):
+        recipient_ids = set(queryset.values_list('recipient_id', flat=True))
         updated = queryset.update(is_read=False)
+        forget_unread_counts(recipient_ids)
         self.message_user(request, f"{updated} bildirim okunmadı olarak işaretlendi.")
     mark_as_unread.short_description = "Seçili bildirimleri okunmadı olarak işaretle"
 
@@ -0,0 +1,101 @@
+"""
+Stored diffs between texts of an answer (AnswerDiff).
+
+Revisions and suggestions never change once written, so their diff against
+the base revision is computed once. It is computed when they are created,
+or on the first view for older rows. Later views read the stored HTML and
+word counts.
+"""
+
+from django.utils.safestring import mark_safe
+
+from .answer_render_store import answer_source_digest
+from .models import AnswerDiff
+
+
+# Bump when the inline diff HTML or the diff engine output changes.
+DIFF_ENGINE_VERSION = '1'
+
+
+def _as_result(row):
+    return {
+        'before_html': mark_safe(row.before_html),
+        'after_html': mark_safe(row.after_html),
+        'degraded': row.degraded,
+        'stats': {
+            'added': row.added,
+            'removed': row.removed,
+            'changed': row.added + row.removed,
+        },
+    }
+
+
+def _compute(answer_id, old_text, new_text):
+    from .answer_git import build_answer_inline_diff_html, get_answer_diff_stats
+
+    inline = build_answer_inline_diff_html(old_text, new_text)
+    stats = get_answer_diff_stats(old_text, new_text)
+    return AnswerDiff(
+        answer_id=answer_id,
+        old_digest=answer_source_digest(old_text),
+        new_digest=answer_source_digest(new_text),
+        engine_version=DIFF_ENGINE_VERSION,
+        before_html=str(inline['before_html']),
+        after_html=str(inline['after_html']),
+        added=stats['added'],
+        removed=stats['removed'],
+        degraded=inline['degraded'],
+    )
+
+
+def load_answer_diffs(pairs):
+    """
+    Diffs for `(answer_id, old_text, new_text)` pairs, in the same order.
+
+    Each result holds `before_html`, `after_html`, `degraded` and `stats`.
+    Pairs that were never stored are computed and saved.
+    """
+    pairs = list(pairs)
+    keys = [
+        (answer_id, answer_source_digest(old_text), answer_source_digest(new_text))
+        for answer_id, old_text, new_text in pairs
+    ]
+    stored = {}
+    if keys:
+        rows = AnswerDiff.objects.filter(
+            answer_id__in={key[0] for key in keys},
+            new_digest__in={key[2] for key in keys},
+            engine_version=DIFF_ENGINE_VERSION,
+        )
+        stored = {(row.answer_id, row.old_digest, row.new_digest): row for row in rows}
+
+    missing = []
+    for key, (answer_id, old_text, new_text) in zip(keys, pairs):
+        if key not in stored:
+            stored[key] = _compute(answer_id, old_text, new_text)
+            missing.append(stored[key])
+    if missing:
+        # A concurrent request may have stored the same pair first.
+        AnswerDiff.objects.bulk_create(missing, batch_size=100, ignore_conflicts=True)
+    return [_as_result(stored[key]) for key in keys]
+
+
+def load_answer_diff(answer_id, old_text, new_text):
+    return load_answer_diffs([(answer_id, old_text, new_text)])[0]
+
+
+def store_answer_diff(answer_id, old_text, new_text):
+    """Compute and save the diff of a newly written revision or suggestion."""
+    return load_answer_diff(answer_id, old_text, new_text)
+
+
+def attach_suggestion_diffs(suggestions):
+    """Set `answer_diff` on each suggestion: its base revision against the proposed text."""
+    suggestions = [suggestion for suggestion in suggestions if not hasattr(suggestion, 'answer_diff')]
+    results = load_answer_diffs(
+        (suggestion.answer_id, suggestion.base_revision.content, suggestion.proposed_text)
+        for suggestion in suggestions
+    )
+    for suggestion, result in zip(suggestions, results):
+        suggestion.answer_diff = result
+    return suggestions
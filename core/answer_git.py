@@ -1,17 +1,18 @@
 from collections import defaultdict
 from difflib import HtmlDiff
-from difflib import SequenceMatcher
 from html import escape
 import re
 import textwrap
 
-from django.db.models import Count, IntegerField, OuterRef, Prefetch, Subquery, Value
+from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models.functions import Coalesce
 from django.utils import timezone
 from django.utils.safestring import mark_safe
 
+from .answer_diff_store import store_answer_diff
 from .models import AnswerRevision, AnswerRevisionApproval, AnswerSuggestion, Notification
+from .revision_summary import refresh_revision_summaries
+from .text_diff import diff_opcodes
 
 
 def ensure_initial_revision(answer):
@@ -33,26 +34,9 @@ def ensure_initial_revision(answer):
 
 
 def render_answer_content_html(raw_text):
-    from .templatetags.custom_tags import (
-        safe_markdownify,
-        spoiler_link,
-        bkz_link,
-        tanim_link,
-        reference_link,
-        ref_link,
-        mention_link,
-        collapsible_images,
-    )
+    from .templatetags.custom_tags import content_links, safe_markdownify
 
-    rendered = safe_markdownify(raw_text or '', "default")
-    rendered = spoiler_link(rendered)
-    rendered = bkz_link(rendered)
-    rendered = tanim_link(rendered)
-    rendered = reference_link(rendered)
-    rendered = ref_link(rendered)
-    rendered = mention_link(rendered)
-    rendered = collapsible_images(rendered)
-    return str(rendered)
+    return str(content_links(safe_markdownify(raw_text or '', "default")))
 
 
 def build_answer_render_preview(raw_text, max_chars=700):
@@ -93,22 +77,22 @@ def _ensure_revision_approval_snapshot(revision):
     _ensure_revision_approval_snapshots([revision])
 
 
-def _ensure_revision_approval_snapshots(revisions):
+def _snapshot_approvals(revisions, existing_revision_ids=None):
+    """Unsaved approvals standing in for revisions published before the approval system."""
     revisions = [revision for revision in revisions if revision is not None]
     if not revisions:
-        return
+        return []
 
-    revision_ids = [revision.id for revision in revisions]
-    existing_revision_ids = set(
-        AnswerRevisionApproval.objects.filter(revision_id__in=revision_ids)
-        .values_list('revision_id', flat=True)
-        .distinct()
-    )
-    missing_revisions = [revision for revision in revisions if revision.id not in existing_revision_ids]
-    if not missing_revisions:
-        return
+    if existing_revision_ids is None:
+        existing_revision_ids = set(
+            AnswerRevisionApproval.objects.filter(revision_id__in=[revision.id for revision in revisions])
+            .values_list('revision_id', flat=True)
+            .distinct()
+        )
     approvals = []
-    for revision in missing_revisions:
+    for revision in revisions:
+        if revision.id in existing_revision_ids:
+            continue
         contributor_ids = _collect_contributor_ids(revision.answer, upto_revision=revision)
         if not contributor_ids:
             contributor_ids = {revision.answer.user_id}
@@ -123,8 +107,14 @@ def _ensure_revision_approval_snapshots(revisions):
             )
             for user_id in contributor_ids
         )
+    return approvals
+
+
+def _ensure_revision_approval_snapshots(revisions):
+    approvals = _snapshot_approvals(revisions)
     if approvals:
         AnswerRevisionApproval.objects.bulk_create(approvals, batch_size=100)
+        refresh_revision_summaries({approval.revision.answer_id for approval in approvals})
 
 
 def _create_revision_review_requests(revision):
@@ -160,6 +150,7 @@ def _create_revision_review_requests(revision):
 
     if approvals:
         AnswerRevisionApproval.objects.bulk_create(approvals, batch_size=100)
+        refresh_revision_summaries([revision.answer_id])
 
     user_model = revision.answer.user.__class__
     recipient_map = user_model.objects.in_bulk(
@@ -188,13 +179,18 @@ def get_revision_approval_summaries(revisions, *, current_user=None):
     if not revisions:
         return {}
 
-    _ensure_revision_approval_snapshots(revisions)
-
     approvals = list(
         AnswerRevisionApproval.objects.filter(revision__in=revisions)
         .select_related('user', 'revision', 'revision__answer')
         .order_by('revision_id', 'user__username')
     )
+    snapshots = _snapshot_approvals(revisions, {approval.revision_id for approval in approvals})
+    if snapshots:
+        # Shown as approved without being written; the backfill command stores them.
+        users = get_user_model().objects.in_bulk({approval.user_id for approval in snapshots})
+        for approval in snapshots:
+            approval.user = users.get(approval.user_id)
+        approvals.extend(approval for approval in snapshots if approval.user is not None)
     grouped = defaultdict(list)
     for approval in approvals:
         grouped[approval.revision_id].append(approval)
@@ -246,124 +242,68 @@ def get_revision_approval_summary(revision, *, current_user=None):
 
 
 def attach_answer_revision_metadata(answers, current_user=None):
+    """
+    Set the revision attributes list templates use on each answer, read from
+    the stored AnswerRevisionSummary rows (see core/revision_summary.py).
+    The current user's own approval is loaded only when they are listed as a
+    contributor of one of the answers.
+    """
+    from .revision_summary import ContributorRef, RevisionRef, summaries_for
+
     answers = list(answers)
     if not answers:
         return answers
 
-    answer_ids = [answer.id for answer in answers]
+    summaries = summaries_for(answer.id for answer in answers)
+    current_user_id = current_user.id if getattr(current_user, 'is_authenticated', False) else None
 
-    revision_counts = (
-        AnswerRevision.objects.filter(answer_id=OuterRef('answer_id'))
-        .order_by()
-        .values('answer_id')
-        .annotate(total=Count('id'))
-        .values('total')[:1]
-    )
-    open_suggestion_counts = (
-        AnswerSuggestion.objects.filter(
-            answer_id=OuterRef('answer_id'),
-            status='open',
-        )
-        .order_by()
-        .values('answer_id')
-        .annotate(total=Count('id'))
-        .values('total')[:1]
-    )
-    current_revisions = list(
-        AnswerRevision.objects.filter(
-            answer_id__in=answer_ids,
-            is_current=True,
-        )
-        .select_related('created_by')
-        .annotate(
-            answer_revision_count=Coalesce(
-                Subquery(revision_counts, output_field=IntegerField()),
-                Value(0),
-            ),
-            answer_open_suggestion_count=Coalesce(
-                Subquery(open_suggestion_counts, output_field=IntegerField()),
-                Value(0),
-            ),
-        )
-        .prefetch_related(
-            Prefetch(
-                'approvals',
-                queryset=AnswerRevisionApproval.objects.select_related('user'),
-                to_attr='_metadata_approvals',
-            )
-        )
-    )
-    current_revision_map = {
-        revision.answer_id: revision
-        for revision in current_revisions
-    }
-    revision_count_map = {
-        revision.answer_id: revision.answer_revision_count
-        for revision in current_revisions
-    }
-    open_suggestion_map = {
-        revision.answer_id: revision.answer_open_suggestion_count
-        for revision in current_revisions
-    }
-
-    current_revisions = []
-    for answer in answers:
-        current_revision = current_revision_map.get(answer.id)
-        if current_revision is None:
-            current_revision = ensure_initial_revision(answer)
-            current_revision._metadata_approvals = []
-            current_revision_map[answer.id] = current_revision
-            revision_count_map[answer.id] = 1
-            open_suggestion_map[answer.id] = 0
-        current_revisions.append(current_revision)
-
-    approval_rows = [
-        approval
-        for revision in current_revisions
-        for approval in getattr(revision, '_metadata_approvals', [])
-    ]
-    approved_map = defaultdict(list)
-    pending_map = defaultdict(list)
-    rejected_map = defaultdict(list)
+    review_revision_ids = set()
+    for summary in summaries.values():
+        listed_ids = {
+            user_id
+            for status_rows in summary.contributors.values()
+            for user_id, _ in status_rows
+        }
+        if summary.current_revision_id and current_user_id in listed_ids:
+            review_revision_ids.add(summary.current_revision_id)
     current_user_approval_map = {}
-    approval_revision_ids = set()
-
-    for approval in approval_rows:
-        approval_revision_ids.add(approval.revision_id)
-        if current_user is not None and getattr(current_user, 'is_authenticated', False) and approval.user_id == current_user.id:
-            current_user_approval_map[approval.revision_id] = approval
-        if approval.status == 'approved':
-            approved_map[approval.revision_id].append(approval.user)
-        elif approval.status == 'rejected':
-            rejected_map[approval.revision_id].append(approval.user)
-        else:
-            pending_map[approval.revision_id].append(approval.user)
+    if review_revision_ids:
+        current_user_approval_map = {
+            approval.revision_id: approval
+            for approval in AnswerRevisionApproval.objects.filter(
+                user_id=current_user_id,
+                revision_id__in=review_revision_ids,
+            )
+        }
 
     for answer in answers:
-        current_revision = current_revision_map[answer.id]
-        approved_users = _sort_users_for_answer(approved_map.get(current_revision.id, []), answer.user_id)
-        pending_users = _sort_users_for_answer(pending_map.get(current_revision.id, []), answer.user_id)
-        rejected_users = _sort_users_for_answer(rejected_map.get(current_revision.id, []), answer.user_id)
-        if current_revision.id not in approval_revision_ids:
-            approved_users = [answer.user]
-        contributor_usernames = [user.username for user in approved_users]
+        summary = summaries.get(answer.id)
+        contributors = summary.contributors if summary else {}
+        approved_users = [ContributorRef(*row) for row in contributors.get('approved', [])]
+        pending_users = [ContributorRef(*row) for row in contributors.get('pending', [])]
+        rejected_users = [ContributorRef(*row) for row in contributors.get('rejected', [])]
+        current_revision = (
+            RevisionRef(summary.current_revision_id, summary.current_revision_no, True)
+            if summary and summary.current_revision_id else None
+        )
 
         answer.current_revision = current_revision
-        answer.revision_count = revision_count_map.get(answer.id, 1)
-        answer.open_suggestion_count = open_suggestion_map.get(answer.id, 0)
+        answer.revision_count = summary.revision_count if summary else 0
+        answer.open_suggestion_count = summary.open_suggestion_count if summary else 0
         answer.approved_contributors = approved_users
         answer.pending_contributors = pending_users
         answer.rejected_contributors = rejected_users
-        answer.contributor_usernames = contributor_usernames
+        answer.contributor_usernames = [user.username for user in approved_users]
         answer.additional_contributors = [user.username for user in approved_users if user.id != answer.user_id]
         answer.pending_contributor_usernames = [user.username for user in pending_users]
         answer.rejected_contributor_usernames = [user.username for user in rejected_users]
-        answer.last_revision_actor = current_revision.created_by.username if current_revision else answer.user.username
-        answer.current_user_revision_approval = current_user_approval_map.get(current_revision.id)
+        answer.last_revision_actor = summary.last_revision_actor if summary else ''
+        answer.current_user_revision_approval = (
+            current_user_approval_map.get(current_revision.id) if current_revision else None
+        )
         answer.current_user_can_review_revision = bool(
             answer.current_user_revision_approval
             and answer.current_user_revision_approval.status == 'pending'
-            and current_revision.is_current
         )
 
     return answers
@@ -557,6 +497,7 @@ def create_answer_revision(answer, *, content, created_by, source='author_edit',
     answer.answer_text = content
     answer.save(update_fields=['answer_text', 'updated_at'])
     _create_revision_review_requests(revision)
+    store_answer_diff(answer.id, current.content, content)
     return revision, True
 
 
@@ -569,6 +510,7 @@ def create_answer_suggestion(answer, *, proposed_by, proposed_text, change_summa
         proposed_text=proposed_text,
         change_summary=change_summary or '',
     )
+    store_answer_diff(answer.id, base_revision.content, proposed_text)
     if answer.user_id != proposed_by.id:
         Notification.create_answer_suggestion_notification(
             recipient=answer.user,
@@ -707,11 +649,20 @@ def _prepare_diff_lines(text):
     return prepared
 
 
+# HtmlDiff runs ndiff line by line; past this it takes seconds.
+DIFF_TABLE_MAX_LINES = 1500
+
+
 def build_answer_diff_html(old_text, new_text):
+    old_lines = _prepare_diff_lines(old_text)
+    new_lines = _prepare_diff_lines(new_text)
+    if len(old_lines) + len(new_lines) > DIFF_TABLE_MAX_LINES:
+        return mark_safe('<p class="text-muted small">Metin satır satır karşılaştırma için çok uzun.</p>')
+
     diff = HtmlDiff(tabsize=2, wrapcolumn=80)
     table = diff.make_table(
-        _prepare_diff_lines(old_text),
-        _prepare_diff_lines(new_text),
+        old_lines,
+        new_lines,
         fromdesc='Önceki',
         todesc='Yeni',
         context=True,
@@ -738,12 +689,12 @@ def _render_inline_diff_tokens(tokens, token_class):
 def build_answer_inline_diff_html(old_text, new_text):
     old_tokens = _tokenize_for_inline_diff(old_text)
     new_tokens = _tokenize_for_inline_diff(new_text)
-    matcher = SequenceMatcher(None, old_tokens, new_tokens)
+    opcodes, degraded = diff_opcodes(old_tokens, new_tokens)
 
     before_parts = []
     after_parts = []
 
-    for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
+    for opcode, i1, i2, j1, j2 in opcodes:
         old_chunk = old_tokens[i1:i2]
         new_chunk = new_tokens[j1:j2]
         if opcode == 'equal':
@@ -760,17 +711,18 @@ def build_answer_inline_diff_html(old_text, new_text):
     return {
         'before_html': mark_safe(''.join(before_parts) or '<span class="inline-diff-context"></span>'),
         'after_html': mark_safe(''.join(after_parts) or '<span class="inline-diff-context"></span>'),
+        'degraded': degraded,
     }
 
 
 def get_answer_diff_stats(old_text, new_text):
     old_words = re.findall(r'\S+', old_text or '', flags=re.UNICODE)
     new_words = re.findall(r'\S+', new_text or '', flags=re.UNICODE)
-    matcher = SequenceMatcher(None, old_words, new_words)
+    opcodes, _ = diff_opcodes(old_words, new_words)
     added = 0
     removed = 0
 
-    for opcode, i1, i2, j1, j2 in matcher.get_opcodes():
+    for opcode, i1, i2, j1, j2 in opcodes:
         if opcode in {'insert', 'replace'}:
             added += j2 - j1
         if opcode in {'delete', 'replace'}:
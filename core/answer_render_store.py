@@ -0,0 +1,195 @@
+"""Persistent store for rendered answer HTML, keyed by answer revision."""
+
+from __future__ import annotations
+
+import hashlib
+
+from django.db import IntegrityError, transaction
+from django.utils.safestring import mark_safe
+
+from .content_link_preload import extract_content_link_keys, preload_content_links
+from .models import AnswerRenderedContent, AnswerRenderedLink, AnswerRevision
+
+
+# Bump when render_answer_content_html output changes so stored rows are
+# ignored and rebuilt on the next read.
+ANSWER_RENDER_VERSION = '2'
+ANSWER_SUMMARY_CHARS = 1000
+LINK_KEY_MAX_LENGTH = 255
+
+
+def answer_source_digest(text):
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def _link_key(value):
+    return str(value).strip().casefold()
+
+
+def _collect_link_rows(text):
+    definition_ids, reference_ids, question_labels, username_candidates = extract_content_link_keys([text])
+    rows = set()
+    rows.update(('definition', str(definition_id)) for definition_id in definition_ids)
+    rows.update(('reference', str(reference_id)) for reference_id in reference_ids)
+    rows.update(('question', _link_key(label)) for label in question_labels)
+    rows.update(('user', _link_key(username)) for username in username_candidates)
+    # Longer labels cannot match a stored question title or username anyway.
+    return sorted(
+        (kind, key)
+        for kind, key in rows
+        if key and len(key) <= LINK_KEY_MAX_LENGTH
+    )
+
+
+def _render(text):
+    from .answer_git import render_answer_content_html
+    from .templatetags.custom_tags import truncate_math_safe
+
+    text = text or ''
+    full_html = render_answer_content_html(text)
+    summary_html = ''
+    if len(text) > ANSWER_SUMMARY_CHARS:
+        summary_html = render_answer_content_html(truncate_math_safe(text, ANSWER_SUMMARY_CHARS))
+    return full_html, summary_html
+
+
+def _save_render(*, answer_id, revision_id, digest, full_html, summary_html, link_rows):
+    try:
+        with transaction.atomic():
+            AnswerRenderedContent.objects.filter(revision_id=revision_id).delete()
+            rendered = AnswerRenderedContent.objects.create(
+                revision_id=revision_id,
+                answer_id=answer_id,
+                source_digest=digest,
+                renderer_version=ANSWER_RENDER_VERSION,
+                full_html=full_html,
+                summary_html=summary_html,
+            )
+            AnswerRenderedLink.objects.bulk_create(
+                [AnswerRenderedLink(rendered=rendered, kind=kind, key=key) for kind, key in link_rows],
+                batch_size=200,
+            )
+    except IntegrityError:
+        # A concurrent request stored the same revision first.
+        return None
+    return rendered
+
+
+def store_answer_render(answer):
+    """Render the answer's current text and store it on its current revision."""
+    revision_id = (
+        AnswerRevision.objects.filter(answer_id=answer.id, is_current=True)
+        .values_list('id', flat=True)
+        .first()
+    )
+    if revision_id is None:
+        return None
+
+    digest = answer_source_digest(answer.answer_text)
+    already_stored = AnswerRenderedContent.objects.filter(
+        revision_id=revision_id,
+        source_digest=digest,
+        renderer_version=ANSWER_RENDER_VERSION,
+    ).exists()
+    if already_stored:
+        return None
+
+    # Stored HTML outlives any cache entry, so read the links fresh.
+    with preload_content_links([answer.answer_text], use_cache=False):
+        full_html, summary_html = _render(answer.answer_text)
+    return _save_render(
+        answer_id=answer.id,
+        revision_id=revision_id,
+        digest=digest,
+        full_html=full_html,
+        summary_html=summary_html,
+        link_rows=_collect_link_rows(answer.answer_text),
+    )
+
+
+def _render_missing(answers, digests):
+    revision_ids = {
+        answer.id: answer.current_revision.id
+        for answer in answers
+        if getattr(answer, 'current_revision', None) is not None
+    }
+    unresolved_ids = [answer.id for answer in answers if answer.id not in revision_ids]
+    if unresolved_ids:
+        revision_ids.update(
+            AnswerRevision.objects.filter(answer_id__in=unresolved_ids, is_current=True)
+            .values_list('answer_id', 'id')
+        )
+
+    rendered_map = {}
+    with preload_content_links((answer.answer_text for answer in answers), use_cache=False):
+        for answer in answers:
+            if answer.id in rendered_map:
+                continue
+            full_html, summary_html = _render(answer.answer_text)
+            rendered_map[answer.id] = AnswerRenderedContent(
+                answer_id=answer.id,
+                revision_id=revision_ids.get(answer.id),
+                source_digest=digests[answer.id],
+                renderer_version=ANSWER_RENDER_VERSION,
+                full_html=full_html,
+                summary_html=summary_html,
+            )
+
+    for answer in answers:
+        rendered = rendered_map[answer.id]
+        if rendered.revision_id is None or rendered.pk is not None:
+            continue
+        stored = _save_render(
+            answer_id=answer.id,
+            revision_id=rendered.revision_id,
+            digest=rendered.source_digest,
+            full_html=rendered.full_html,
+            summary_html=rendered.summary_html,
+            link_rows=_collect_link_rows(answer.answer_text),
+        )
+        if stored is not None:
+            rendered_map[answer.id] = stored
+    return rendered_map
+
+
+def attach_rendered_answer_html(answers):
+    """
+    Attach `rendered_html`, `rendered_summary_html` and `rendered_is_truncated`
+    to each answer, rendering and storing only the answers without a usable row.
+    """
+    answers = [answer for answer in answers if answer is not None]
+    if not answers:
+        return answers
+
+    digests = {answer.id: answer_source_digest(answer.answer_text) for answer in answers}
+    rendered_map = {}
+    stored_rows = AnswerRenderedContent.objects.filter(
+        answer_id__in=digests,
+        source_digest__in=set(digests.values()),
+        renderer_version=ANSWER_RENDER_VERSION,
+    ).only('answer_id', 'source_digest', 'full_html', 'summary_html')
+    for rendered in stored_rows:
+        if digests.get(rendered.answer_id) == rendered.source_digest:
+            rendered_map[rendered.answer_id] = rendered
+
+    missing = [answer for answer in answers if answer.id not in rendered_map]
+    if missing:
+        rendered_map.update(_render_missing(missing, digests))
+
+    for answer in answers:
+        rendered = rendered_map[answer.id]
+        answer.rendered_html = mark_safe(rendered.full_html)
+        answer.rendered_is_truncated = bool(rendered.summary_html)
+        answer.rendered_summary_html = mark_safe(rendered.summary_html or rendered.full_html)
+    return answers
+
+
+def invalidate_answer_renders(kind, keys):
+    """Drop stored renders that link to any of `keys` of the given kind."""
+    keys = {_link_key(key) for key in keys if key is not None}
+    keys = {key for key in keys if key and len(key) <= LINK_KEY_MAX_LENGTH}
+    if not keys:
+        return 0
+    rendered_ids = AnswerRenderedLink.objects.filter(kind=kind, key__in=keys).values('rendered_id')
+    deleted, _ = AnswerRenderedContent.objects.filter(id__in=rendered_ids).delete()
+    return deleted
@@ -17,3 +17,11 @@ class CoreConfig(AppConfig):
         # Varsayılan username alanındaki tüm doğrulayıcıları bu doğrulayıcı ile değiştiriyoruz.
         User._meta.get_field('username').validators = [custom_validator]
         import core.signals
+
+        from django.conf import settings
+        if settings.VISIT_TRACKING_BUFFERED:
+            from core.visit_buffer import visit_buffer
+            visit_buffer.start_background_flush()
+        if settings.COURSE_DATA_WARMUP:
+            from core.course_store import warm_course_data
+            warm_course_data()
@@ -0,0 +1,182 @@
+"""
+Cache-backed fan-out of online chat and radio chat messages.
+
+Every chat is a channel: `online` for the site-wide chat and
+`radio:<program id>` for a radio program. Message ids are the channel's
+sequence numbers. They only grow, and a client's cursor keeps working
+against the database when the cache has been cleared.
+
+`publish` runs after a message is committed. It moves the channel head
+(the last id) and drops the cached tail of recent messages. Streams wait on
+the head with cheap cache reads. When it moves, one of them rebuilds the
+tail with a single SELECT and the rest read it from the cache.
+
+With more than one server process the cache must be shared (REDIS_URL,
+see SHARED_CACHE); LocMemCache only fans out within a process. Without it
+the head and tail are kept for a few seconds only, so a stream in another
+worker re-reads the head from the database and still sees new messages.
+
+`prune_online_chat` (run by `run_chat_housekeeping`) drops online chat
+messages older than ONLINE_CHAT_RETENTION.
+"""
+
+import json
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.templatetags.static import static
+from django.utils import timezone
+
+from .models import OnlineChatMessage, RadioChatMessage
+
+
+ONLINE_CHAT_RETENTION = timedelta(days=7)
+TAIL_SIZE = 100
+CHANNEL_TIMEOUT = 60 * 60 * 24
+LOCAL_CHANNEL_TIMEOUT = 3
+WAIT_STEP_SECONDS = 1.0
+HEARTBEAT_SECONDS = 15
+
+
+def channel_timeout():
+    return CHANNEL_TIMEOUT if getattr(settings, 'SHARED_CACHE', False) else LOCAL_CHANNEL_TIMEOUT
+
+
+def online_channel():
+    return 'online'
+
+
+def radio_channel(program_id):
+    return f'radio:{program_id}'
+
+
+def _head_key(channel):
+    return f'chat:{channel}:head'
+
+
+def _tail_key(channel):
+    return f'chat:{channel}:tail'
+
+
+def _channel_queryset(channel):
+    if channel == online_channel():
+        queryset = OnlineChatMessage.objects.all()
+    else:
+        queryset = RadioChatMessage.objects.filter(program_id=int(channel.split(':', 1)[1]))
+    return queryset.select_related('user', 'user__userprofile')
+
+
+def serialize_chat_message(message):
+    profile = getattr(message.user, 'userprofile', None)
+    return {
+        'id': message.id,
+        'body': message.body,
+        'username': message.user.username,
+        'user_id': message.user_id,
+        'avatar_url': profile.photo.url if profile and profile.photo else static('imgs/default_profile.jpg'),
+        'created_at': timezone.localtime(message.created_at).strftime('%H:%M'),
+    }
+
+
+def for_viewer(payload, user):
+    """Copy of a serialized message with `is_own` set for `user`."""
+    message = {key: value for key, value in payload.items() if key != 'user_id'}
+    message['is_own'] = bool(user.is_authenticated and payload['user_id'] == user.id)
+    return message
+
+
+def publish(channel, message_id):
+    """Announce a new message on `channel` once the transaction commits."""
+    def apply():
+        if message_id > (cache.get(_head_key(channel)) or 0):
+            cache.set(_head_key(channel), message_id, channel_timeout())
+        cache.delete(_tail_key(channel))
+
+    transaction.on_commit(apply)
+
+
+def forget_channel(channel):
+    cache.delete_many([_head_key(channel), _tail_key(channel)])
+
+
+def prune_online_chat(now=None):
+    """Delete online chat messages past ONLINE_CHAT_RETENTION; returns how many."""
+    cutoff = (now or timezone.now()) - ONLINE_CHAT_RETENTION
+    deleted, _ = OnlineChatMessage.objects.filter(created_at__lt=cutoff).delete()
+    return deleted
+
+
+def channel_head(channel):
+    head = cache.get(_head_key(channel))
+    if head is None:
+        head = _channel_queryset(channel).order_by('-id').values_list('id', flat=True).first() or 0
+        cache.set(_head_key(channel), head, channel_timeout())
+    return head
+
+
+def _tail(channel, head):
+    tail = cache.get(_tail_key(channel))
+    if tail is None or (tail and tail[-1]['id'] < head):
+        messages = list(_channel_queryset(channel).order_by('-id')[:TAIL_SIZE])
+        tail = [serialize_chat_message(message) for message in reversed(messages)]
+        cache.set(_tail_key(channel), tail, channel_timeout())
+    return tail
+
+
+def messages_after(channel, after):
+    """Serialized messages of `channel` with an id above `after`, oldest first."""
+    head = channel_head(channel)
+    if after >= head:
+        return []
+    tail = _tail(channel, head)
+    if len(tail) == TAIL_SIZE and tail[0]['id'] > after + 1:
+        # The client is further behind than the cached tail reaches.
+        return [
+            serialize_chat_message(message)
+            for message in _channel_queryset(channel).filter(id__gt=after).order_by('id')
+        ]
+    return [payload for payload in tail if payload['id'] > after]
+
+
+def recent_messages(channel, limit):
+    """The last `limit` serialized messages of `channel` (at most TAIL_SIZE)."""
+    return _tail(channel, channel_head(channel))[-limit:]
+
+
+def stream_seconds():
+    return max(getattr(settings, 'CHAT_STREAM_SECONDS', 0), 0)
+
+
+def _event(message):
+    return f"id: {message['id']}\nevent: message\ndata: {json.dumps(message)}\n\n"
+
+
+def iter_chat_events(channel, after, user, seconds=None, retry_ms=4000):
+    """
+    Server-Sent Events for `channel`, starting after message `after`.
+
+    Yields every new message as it is published, with a comment line every
+    HEARTBEAT_SECONDS, and ends after `seconds`; EventSource reconnects on
+    its own and resumes from the last id it saw.
+    """
+    seconds = stream_seconds() if seconds is None else seconds
+    deadline = time.monotonic() + seconds
+    last_beat = time.monotonic()
+    yield f'retry: {retry_ms}\n\n'
+    while True:
+        head = channel_head(channel)
+        if head > after:
+            for payload in messages_after(channel, after):
+                yield _event(for_viewer(payload, user))
+                after = payload['id']
+            after = max(after, head)
+        now = time.monotonic()
+        if now >= deadline:
+            return
+        if now - last_beat >= HEARTBEAT_SECONDS:
+            yield ': keep-alive\n\n'
+            last_beat = now
+        time.sleep(min(WAIT_STEP_SECONDS, deadline - now))
@@ -1,16 +1,34 @@
-"""Request-scoped bulk loading for links embedded in answer content."""
+"""
+Request-scoped bulk loading for links embedded in answer content.
+
+`preload_content_links` reads through a shared cache (definitions and
+references by ID, questions and users by casefolded label) so popular links
+are not queried again on every request. Signals drop entries when the
+underlying rows change, but only in the process that changed them, so
+without a shared cache (SHARED_CACHE) hits are kept briefly. Misses are
+always kept for a few seconds: a question or user created elsewhere starts
+linking almost at once.
+
+Renders that are stored in the database (answer_render_store) pass
+`use_cache=False` and read every link fresh.
+"""
 
 from __future__ import annotations
 
 from contextlib import contextmanager
 from contextvars import ContextVar
+import hashlib
 import re
 import unicodedata
 
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.models import Q
+from django.core.cache import cache
+from django.db.models import Value
+from django.db.models.functions import Lower
 
 from .models import Definition, Question, Reference
+from .utils import is_storable_id
 
 
 DEFINITION_RE = re.compile(r"\((?:tanim|t):[^:]+:(\d+)\)", re.IGNORECASE)
@@ -23,6 +41,19 @@ _references = ContextVar("content_link_references", default=None)
 _questions = ContextVar("content_link_questions", default=None)
 _users = ContextVar("content_link_users", default=None)
 
+CONTENT_LINK_CACHE_PREFIX = "content-link"
+CONTENT_LINK_CACHE_TTL = 60 * 60
+LOCAL_CONTENT_LINK_CACHE_TTL = 30
+CONTENT_LINK_MISS_TTL = 5
+# Cached for labels and IDs that matched nothing.
+_MISSING = "missing"
+
+
+def content_link_cache_ttl():
+    if getattr(settings, "SHARED_CACHE", False):
+        return CONTENT_LINK_CACHE_TTL
+    return LOCAL_CONTENT_LINK_CACHE_TTL
+
 
 def _normalize_mention(value):
     candidate = unicodedata.normalize("NFKC", value or "").replace("\u00A0", " ")
@@ -31,25 +62,105 @@ def _normalize_mention(value):
     return " ".join(candidate.split())
 
 
-def _build_case_insensitive_filter(field_name, values):
-    query = Q()
-    for value in values:
-        query |= Q(**{f"{field_name}__iexact": value})
-    return query
+def content_link_cache_key(kind, key):
+    if kind in ("question", "user"):
+        key = hashlib.sha1(str(key).casefold().encode("utf-8")).hexdigest()
+    return f"{CONTENT_LINK_CACHE_PREFIX}:{kind}:{key}"
 
 
-@contextmanager
-def preload_content_links(texts):
+def invalidate_content_link_cache(kind, keys):
+    """Forget cached lookups for definition/reference IDs or question/user labels."""
+    cache_keys = [content_link_cache_key(kind, key) for key in keys if key not in (None, "")]
+    if cache_keys:
+        cache.delete_many(cache_keys)
+
+
+def _cached_lookup(kind, keys, fetch, use_cache=True):
+    """
+    Return `{key: object}` for `keys`, reading the shared cache first and
+    calling `fetch(missing_keys)` for the rest. Unknown keys are left out.
+    With `use_cache=False` everything is fetched and the cache is not touched.
+    """
+    cache_keys = {content_link_cache_key(kind, key): key for key in keys}
+    if not cache_keys:
+        return {}
+    if not use_cache:
+        return dict(fetch(list(cache_keys.values())))
+
+    found = {
+        cache_keys[cache_key]: value
+        for cache_key, value in cache.get_many(list(cache_keys)).items()
+    }
+    missing = [key for key in cache_keys.values() if key not in found]
+    if missing:
+        fetched = fetch(missing)
+        loaded = {key: fetched.get(key, _MISSING) for key in missing}
+        hits = {content_link_cache_key(kind, key): value for key, value in loaded.items() if value != _MISSING}
+        misses = {content_link_cache_key(kind, key): value for key, value in loaded.items() if value == _MISSING}
+        if hits:
+            cache.set_many(hits, content_link_cache_ttl())
+        if misses:
+            cache.set_many(misses, CONTENT_LINK_MISS_TTL)
+        found.update(loaded)
+    return {key: value for key, value in found.items() if value != _MISSING}
+
+
+def _fetch_definitions(definition_ids):
+    return {
+        item.id: item
+        for item in Definition.objects.filter(id__in=definition_ids)
+        .select_related("user")
+        .only("id", "definition_text", "user__username")
+    }
+
+
+def _fetch_references(reference_ids):
+    return Reference.objects.only(
+        "id",
+        "author_surname",
+        "author_name",
+        "year",
+        "metin_ismi",
+        "rest",
+        "abbreviation",
+    ).in_bulk(reference_ids)
+
+
+def _fetch_by_lowered_label(queryset, field_name, labels):
+    """
+    Match `labels` case-insensitively through LOWER(field) so the functional
+    index is used. Both sides are lowered by the database, like `iexact`.
+    """
+    matches = {}
+    if not labels:
+        return matches
+    rows = (
+        queryset.annotate(lowered_label=Lower(field_name))
+        .filter(lowered_label__in=[Lower(Value(label)) for label in labels])
+        .order_by("id")
+    )
+    wanted = {label.casefold() for label in labels}
+    for item in rows:
+        key = getattr(item, field_name).casefold()
+        if key in wanted:
+            matches.setdefault(key, item)
+    return matches
+
+
+def extract_content_link_keys(texts):
+    """Return the definition, reference, question and user keys linked by texts."""
     texts = [str(text or "") for text in texts]
     definition_ids = {
         int(match.group(1))
         for text in texts
         for match in DEFINITION_RE.finditer(text)
+        if is_storable_id(int(match.group(1)))
     }
     reference_ids = {
         int(match.group(1))
         for text in texts
         for match in REFERENCE_RE.finditer(text)
+        if is_storable_id(int(match.group(1)))
     }
     question_labels = {
         match.group(1).strip()
@@ -67,35 +178,62 @@ def preload_content_links(texts):
                 for index in range(1, len(words) + 1)
             )
 
-    definition_map = {
-        item.id: item
-        for item in Definition.objects.filter(id__in=definition_ids)
-        .select_related("user")
-        .only("id", "definition_text", "user__username")
-    } if definition_ids else {}
-    reference_map = Reference.objects.only(
-        "id",
-        "author_surname",
-        "author_name",
-        "year",
-        "metin_ismi",
-        "rest",
-        "abbreviation",
-    ).in_bulk(reference_ids) if reference_ids else {}
-
-    question_map = {}
-    if question_labels:
-        questions = Question.objects.only("question_text", "slug").filter(
-            _build_case_insensitive_filter("question_text", question_labels)
-        )
-        question_map = {item.question_text.casefold(): item for item in questions}
-
-    user_map = {}
-    if username_candidates:
-        users = User.objects.only("username").filter(
-            _build_case_insensitive_filter("username", username_candidates)
-        )
-        user_map = {item.username.casefold(): item for item in users}
+    return definition_ids, reference_ids, question_labels, username_candidates
+
+
+def load_definitions(definition_ids, use_cache=True):
+    definition_ids = {int(item) for item in definition_ids}
+    return _cached_lookup("definition", set(filter(is_storable_id, definition_ids)), _fetch_definitions, use_cache)
+
+
+def load_references(reference_ids, use_cache=True):
+    reference_ids = {int(item) for item in reference_ids}
+    return _cached_lookup("reference", set(filter(is_storable_id, reference_ids)), _fetch_references, use_cache)
+
+
+def load_questions_by_label(labels, use_cache=True):
+    """`{casefolded label: Question}` for the question titles in `labels`."""
+    spellings = {label.casefold(): label for label in labels}
+    return _cached_lookup(
+        "question",
+        spellings,
+        lambda keys: _fetch_by_lowered_label(
+            Question.objects.only("question_text", "slug"),
+            "question_text",
+            [spellings[key] for key in keys],
+        ),
+        use_cache,
+    )
+
+
+def load_users_by_username(usernames, use_cache=True):
+    """`{casefolded username: User}` for the usernames in `usernames`."""
+    spellings = {username.casefold(): username for username in usernames}
+    return _cached_lookup(
+        "user",
+        spellings,
+        lambda keys: _fetch_by_lowered_label(
+            User.objects.only("username"),
+            "username",
+            [spellings[key] for key in keys],
+        ),
+        use_cache,
+    )
+
+
+@contextmanager
+def preload_content_links(texts, use_cache=True):
+    (
+        definition_ids,
+        reference_ids,
+        question_labels,
+        username_candidates,
+    ) = extract_content_link_keys(texts)
+
+    definition_map = load_definitions(definition_ids, use_cache)
+    reference_map = load_references(reference_ids, use_cache)
+    question_map = load_questions_by_label(question_labels, use_cache)
+    user_map = load_users_by_username(username_candidates, use_cache)
 
     tokens = (
         (_definitions, _definitions.set(definition_map)),
@@ -2,8 +2,7 @@
 
 from django.conf import settings
 from django.core.cache import cache
-from .models import RadioProgram
-from .radio_utils import expire_live_programs
+from .radio_utils import live_programs
 
 RADIO_LIVE_CACHE_KEY = 'navbar_radio_is_live'
 RADIO_LIVE_CACHE_SECONDS = 30
@@ -31,7 +30,6 @@ def radio_live_indicator(request):
 
     is_live = cache.get(RADIO_LIVE_CACHE_KEY)
     if is_live is None:
-        expire_live_programs()
-        is_live = RadioProgram.objects.filter(is_live=True, is_finished=False).exists()
+        is_live = live_programs().exists()
         cache.set(RADIO_LIVE_CACHE_KEY, is_live, RADIO_LIVE_CACHE_SECONDS)
     return {'radio_is_live': is_live}
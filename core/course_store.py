@@ -0,0 +1,434 @@
+"""
+Compiled course content: German lessons and level tests, the logic course.
+
+The Python data modules (german_course_data, german_a2_data,
+german_level_test_bank, logic_course_data, logic_level_test_bank) remain
+the source. Importing them runs thousands of helper calls and the lesson
+post-processing. `compile_course_data` (the management command of the same
+name) writes what the pages read as JSON under COURSE_DATA_DIR:
+
+    manifest.json                   version and digest of the source modules
+    german/index.json               levels, lesson titles, scope matrices
+    german/lessons/<level>/<slug>.json
+    german/level_tests/<level>.json
+    logic/course.json
+    logic/level_test.json
+
+Pages load one file at a time, on first use, and keep it for the life of the
+process. Loaded content is shared between requests and must not be mutated.
+The per-request parts (shuffling, drawing options, sampling a level test)
+are done here on shallow copies.
+
+Without a compile, or when the manifest does not match the source modules,
+everything is built from the modules as before, so development needs no
+extra step.
+"""
+
+import hashlib
+import json
+import logging
+import shutil
+from functools import lru_cache
+from importlib import import_module
+from pathlib import Path
+from random import Random, SystemRandom
+
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout or the shape of the compiled files changes.
+COURSE_DATA_VERSION = '1'
+SOURCE_MODULES = (
+    'german_course_data',
+    'german_a2_data',
+    'german_level_test_bank',
+    'logic_course_data',
+    'logic_level_test_bank',
+)
+GENERATED_OPTION_COUNT = 3
+
+
+def _module(name):
+    return import_module(f'core.{name}')
+
+
+@lru_cache(maxsize=1)
+def source_digest():
+    digest = hashlib.sha1()
+    for name in SOURCE_MODULES:
+        digest.update((Path(__file__).parent / f'{name}.py').read_bytes())
+    return digest.hexdigest()
+
+
+# ========== SOURCE BUILDERS ==========
+# Each returns exactly what is written to (and read back from) one file.
+
+def _german_index_from_source():
+    course_data = _module('german_course_data')
+    test_bank = _module('german_level_test_bank')
+    return {
+        'levels': course_data.GERMAN_COURSE_LEVELS,
+        'lessons': {
+            level_slug: [
+                {'index': lesson['index'], 'title': lesson['title'], 'slug': lesson['slug']}
+                for lesson in lessons
+            ]
+            for level_slug, lessons in course_data.GERMAN_LESSONS.items()
+        },
+        'scope_matrices': {
+            'a1': course_data.A1_SCOPE_MATRIX,
+            'a2': course_data.A2_SCOPE_MATRIX,
+        },
+        'level_test_sizes': {
+            level_slug: len(bank) for level_slug, bank in test_bank.LEVEL_TEST_BANKS.items()
+        },
+    }
+
+
+def _german_lesson_from_source(level_slug, lesson_slug):
+    return _module('german_course_data').get_german_lesson_artifact(level_slug, lesson_slug)
+
+
+def _german_level_test_from_source(level_slug):
+    test_bank = _module('german_level_test_bank')
+    return {
+        'config': test_bank.LEVEL_TEST_CONFIGS.get(level_slug),
+        'bank': test_bank.LEVEL_TEST_BANKS.get(level_slug, []),
+    }
+
+
+def _logic_course_from_source():
+    course_data = _module('logic_course_data')
+    return {
+        'course': course_data._course_artifact(),
+        'redirects': course_data.LOGIC_REDIRECTS,
+    }
+
+
+def _logic_level_test_from_source():
+    test_bank = _module('logic_level_test_bank')
+    return {
+        'config': test_bank.LOGIC_LEVEL_TEST_CONFIG,
+        'bank': test_bank.LOGIC_LEVEL_TEST_BANK,
+    }
+
+
+# ========== LOADING ==========
+
+@lru_cache(maxsize=None)
+def _manifest_is_current(directory):
+    manifest_path = Path(directory) / 'manifest.json'
+    try:
+        manifest = json.loads(manifest_path.read_text(encoding='utf-8'))
+    except FileNotFoundError:
+        return False
+    except (OSError, ValueError):
+        logger.warning("Unreadable course data manifest at %s; using the source modules.", manifest_path)
+        return False
+    if manifest.get('version') != COURSE_DATA_VERSION or manifest.get('sources') != source_digest():
+        logger.warning("Course data in %s is out of date; run compile_course_data.", directory)
+        return False
+    return True
+
+
+def _compiled_directory():
+    directory = getattr(settings, 'COURSE_DATA_DIR', None)
+    if directory and _manifest_is_current(str(directory)):
+        return str(directory)
+    return None
+
+
+@lru_cache(maxsize=None)
+def _load_file(directory, relative_path):
+    with open(Path(directory) / relative_path, encoding='utf-8') as handle:
+        return json.load(handle)
+
+
+@lru_cache(maxsize=None)
+def _load_from_source(key):
+    builder, args = key[0], key[1:]
+    return builder(*args)
+
+
+def _load(relative_path, builder, *args):
+    directory = _compiled_directory()
+    if directory is not None:
+        return _load_file(directory, relative_path)
+    return _load_from_source((builder, *args))
+
+
+def clear_course_caches():
+    _manifest_is_current.cache_clear()
+    _load_file.cache_clear()
+    _logic_lesson_payloads.cache_clear()
+
+
+@receiver(setting_changed)
+def _reset_on_setting_change(setting, **kwargs):
+    if setting == 'COURSE_DATA_DIR':
+        clear_course_caches()
+
+
+# ========== GERMAN ==========
+
+def german_course_index():
+    return _load('german/index.json', _german_index_from_source)
+
+
+def get_german_course_overview():
+    index = german_course_index()
+    levels = []
+    for level in index['levels']:
+        lessons = index['lessons'].get(level['slug'], [])
+        enriched = dict(level)
+        enriched['available_lessons'] = len(lessons)
+        enriched['next_open_lesson'] = lessons[0] if lessons else None
+        levels.append(enriched)
+    return levels
+
+
+def get_german_level(level_slug):
+    return next((level for level in german_course_index()['levels'] if level['slug'] == level_slug), None)
+
+
+def get_german_level_lessons(level_slug):
+    """Index, title and slug of the lessons of a level, in course order."""
+    return german_course_index()['lessons'].get(level_slug, [])
+
+
+def get_german_lesson_artifact(level_slug, lesson_slug):
+    if not any(lesson['slug'] == lesson_slug for lesson in get_german_level_lessons(level_slug)):
+        return None
+    return _load(
+        f'german/lessons/{level_slug}/{lesson_slug}.json',
+        _german_lesson_from_source, level_slug, lesson_slug,
+    )
+
+
+def _shuffled_options(options, correct_option, rng):
+    original_options = list(options)
+    options = list(options)
+    rng.shuffle(options)
+    if options == original_options:
+        options.append(options.pop(0))
+    return options, options.index(correct_option)
+
+
+def _realize_question(question, rng):
+    realized = dict(question)
+    if 'distractors' in realized:
+        correct_option = realized.pop('correct_option')
+        drawn = [correct_option] + rng.sample(realized.pop('distractors'), GENERATED_OPTION_COUNT - 1)
+        rng.shuffle(drawn)
+    else:
+        drawn = realized.get('options', [])
+        if len(drawn) < 2:
+            return realized
+        correct_option = drawn[realized['correct_index']]
+    realized['options'], realized['correct_index'] = _shuffled_options(drawn, correct_option, rng)
+    return realized
+
+
+def shuffle_lesson_exercises(lesson, rng):
+    """
+    A copy of the lesson with its questions and options shuffled and the
+    options of generated questions drawn. Only the lesson, exercise and
+    question dicts are copied.
+    """
+    exercises = []
+    for exercise in lesson.get('exercises', []):
+        exercise = dict(exercise)
+        if 'questions' in exercise:
+            questions = [_realize_question(question, rng) for question in exercise['questions']]
+            if len(questions) > 1:
+                original_prompts = [question.get('prompt') for question in questions]
+                rng.shuffle(questions)
+                if [question.get('prompt') for question in questions] == original_prompts:
+                    questions.append(questions.pop(0))
+            exercise['questions'] = questions
+        exercises.append(exercise)
+
+    lesson = dict(lesson)
+    lesson['exercises'] = exercises
+    return lesson
+
+
+def request_rng():
+    # One urandom read per request; a draw per option would dominate the cost.
+    return Random(SystemRandom().getrandbits(128))
+
+
+def get_german_lesson(level_slug, lesson_slug):
+    artifact = get_german_lesson_artifact(level_slug, lesson_slug)
+    if artifact is None:
+        return None
+    return shuffle_lesson_exercises(artifact, request_rng())
+
+
+def get_german_level_test_bank_size(level_slug):
+    return german_course_index()['level_test_sizes'].get(level_slug, 0)
+
+
+def _assessment_question(item, rng):
+    prepared = dict(item)
+    options = list(prepared['options'])
+    rng.shuffle(options)
+    prepared['options'] = options
+    prepared['correct_index'] = options.index(prepared['correct'])
+    return prepared
+
+
+def build_level_test(config, bank, slug, exercise_prefix, rng=None):
+    """Sample each module of a level test from its bank and shuffle the options."""
+    if not bank or not config:
+        return None
+    rng = rng or SystemRandom()
+
+    exercises = []
+    total_questions = 0
+    for module in config['modules']:
+        pool = [item for item in bank if item['module_id'] == module['id']]
+        sample_size = min(module['sample_size'], len(pool))
+        selected = rng.sample(pool, sample_size)
+        questions = [_assessment_question(item, rng) for item in selected]
+        rng.shuffle(questions)
+        total_questions += len(questions)
+        exercises.append(
+            {
+                'id': f'{exercise_prefix}{module["id"]}',
+                'type': 'single_choice',
+                'title': module['title'],
+                'description': module['description'],
+                'questions': questions,
+            }
+        )
+
+    return {
+        'slug': slug,
+        'title': config['title'],
+        'subtitle': config['subtitle'],
+        'duration': config['duration'],
+        'question_bank_size': len(bank),
+        'sample_size': total_questions,
+        'pass_score': config['pass_score'],
+        'pass_correct': config['pass_correct'],
+        'module_count': len(exercises),
+        'instructions': config['instructions'],
+        'focus_points': config['focus_points'],
+        'exercises': exercises,
+    }
+
+
+def _german_level_test(level_slug):
+    if level_slug not in german_course_index()['level_test_sizes']:
+        return None
+    return _load(f'german/level_tests/{level_slug}.json', _german_level_test_from_source, level_slug)
+
+
+def build_german_level_test(level_slug):
+    level_test = _german_level_test(level_slug)
+    if level_test is None:
+        return None
+    return build_level_test(
+        level_test['config'], level_test['bank'], f'{level_slug}-seviye-bitirme-testi', 'level-test-',
+    )
+
+
+# ========== LOGIC ==========
+
+def _logic_course_file():
+    return _load('logic/course.json', _logic_course_from_source)
+
+
+@lru_cache(maxsize=None)
+def _logic_lesson_payloads(directory):
+    # `directory` only keys the cache: None when built from the source modules.
+    visible_lessons = _logic_course_file()['course']['lessons']
+    payloads = {}
+    for index, lesson in enumerate(visible_lessons):
+        payload = dict(lesson)
+        payload['active_lesson_count'] = len(visible_lessons)
+        payload['previous_lesson'] = visible_lessons[index - 1] if index > 0 else None
+        payload['next_lesson'] = visible_lessons[index + 1] if index < len(visible_lessons) - 1 else None
+        payloads[lesson['slug']] = payload
+    return payloads
+
+
+def get_logic_course():
+    course = dict(_logic_course_file()['course'])
+    course['lessons'] = list(course['lessons'])
+    return course
+
+
+def resolve_logic_lesson(lesson_slug):
+    redirect_slug = _logic_course_file()['redirects'].get(lesson_slug)
+    if redirect_slug:
+        return None, redirect_slug
+    payload = _logic_lesson_payloads(_compiled_directory()).get(lesson_slug)
+    return (dict(payload) if payload else None), None
+
+
+def get_logic_level_test_bank_size():
+    return len(_load('logic/level_test.json', _logic_level_test_from_source)['bank'])
+
+
+def build_logic_level_test():
+    level_test = _load('logic/level_test.json', _logic_level_test_from_source)
+    return build_level_test(
+        level_test['config'], level_test['bank'], 'mantik-bitirme-testi', 'logic-level-test-',
+    )
+
+
+# ========== COMPILE / WARM-UP ==========
+
+def compile_course_data(directory):
+    """Build every course file from the source modules into `directory`; returns the file count."""
+    directory = Path(directory)
+    manifest_path = directory / 'manifest.json'
+    # Until the new manifest is written the directory is ignored, so a failed
+    # compile falls back to the source modules instead of serving half a tree.
+    manifest_path.unlink(missing_ok=True)
+    for section in ('german', 'logic'):
+        shutil.rmtree(directory / section, ignore_errors=True)
+
+    index = _german_index_from_source()
+    files = {'german/index.json': index}
+    for level_slug, lessons in index['lessons'].items():
+        for lesson in lessons:
+            files[f'german/lessons/{level_slug}/{lesson["slug"]}.json'] = _german_lesson_from_source(
+                level_slug, lesson['slug'],
+            )
+    for level_slug in index['level_test_sizes']:
+        files[f'german/level_tests/{level_slug}.json'] = _german_level_test_from_source(level_slug)
+    files['logic/course.json'] = _logic_course_from_source()
+    files['logic/level_test.json'] = _logic_level_test_from_source()
+
+    for relative_path, data in files.items():
+        path = directory / relative_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(data, ensure_ascii=False, separators=(',', ':')), encoding='utf-8')
+    manifest_path.write_text(
+        json.dumps({'version': COURSE_DATA_VERSION, 'sources': source_digest()}),
+        encoding='utf-8',
+    )
+    clear_course_caches()
+    return len(files) + 1
+
+
+def warm_course_data():
+    """
+    Load all course content now instead of on first use. Called from
+    CoreConfig.ready when COURSE_DATA_WARMUP is on, so servers that load the
+    app before forking share it between workers.
+    """
+    index = german_course_index()
+    for level_slug, lessons in index['lessons'].items():
+        for lesson in lessons:
+            get_german_lesson_artifact(level_slug, lesson['slug'])
+        _german_level_test(level_slug)
+    _logic_lesson_payloads(_compiled_directory())
+    get_logic_level_test_bank_size()
@@ -0,0 +1,148 @@
+"""
+Keyset (cursor) pagination.
+
+Pages are read with `WHERE (ordering columns) after <cursor values>` instead
+of OFFSET, and no COUNT(*) is run. Cursors are opaque urlsafe-base64 JSON
+tokens holding the direction and the ordering values of the edge row.
+
+The ordering must be total: end it with a unique column such as `-id`, and
+keep the ordering columns non-null (use Coalesce annotations for dates).
+"""
+
+import base64
+import datetime
+import json
+from functools import reduce
+from operator import and_, or_
+
+from django.core.exceptions import ValidationError
+from django.db.models import F, Q
+
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+def encode_cursor(direction, values):
+    values = [value.isoformat() if isinstance(value, (datetime.date, datetime.time)) else value for value in values]
+    raw = json.dumps([direction, values], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(value, field_count):
+    """Return `(direction, values)` or None for a missing/garbled cursor."""
+    if not value:
+        return None
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    if direction not in (NEXT, PREVIOUS) or not isinstance(values, list) or len(values) != field_count:
+        return None
+    if not all(isinstance(item, (int, float, str)) and not isinstance(item, bool) for item in values):
+        return None
+    return direction, values
+
+
+class CursorPage:
+    """
+    Quacks enough like a Paginator page for the list templates: iterable,
+    has_next/has_previous, plus `next_cursor`/`previous_cursor` and the GET
+    parameter (`cursor_param`) they belong in.
+    """
+
+    is_cursor_page = True
+
+    def __init__(self, object_list, *, next_cursor, previous_cursor, cursor_param):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.cursor_param = cursor_param
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def __bool__(self):
+        return bool(self.object_list)
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """
+    `ordering` lists the order_by names, e.g. `('-created_at', '-id')` or
+    `querysets.TODAY_QUESTIONS_ORDERING`. They may be model fields or
+    annotations already present on the queryset.
+    """
+
+    def __init__(self, queryset, ordering, per_page, *, cursor_param='cursor'):
+        self.queryset = queryset
+        self.ordering = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        self.per_page = per_page
+        self.cursor_param = cursor_param
+
+    def _order_by(self, backwards):
+        return [
+            F(name).asc() if descending == backwards else F(name).desc()
+            for name, descending in self.ordering
+        ]
+
+    def _after(self, values, backwards):
+        """Rows that come after `values` in the ordering (before them when backwards)."""
+        branches = []
+        for index, (name, descending) in enumerate(self.ordering):
+            lookup = 'lt' if descending != backwards else 'gt'
+            equal = [Q(**{prefix_name: value}) for (prefix_name, _), value in zip(self.ordering[:index], values)]
+            branches.append(reduce(and_, equal + [Q(**{f'{name}__{lookup}': values[index]})]))
+        return reduce(or_, branches)
+
+    def _values(self, row):
+        values = []
+        for name, _ in self.ordering:
+            value = row
+            for part in name.split('__'):
+                value = getattr(value, part)
+            values.append(value)
+        return values
+
+    def page(self, cursor=None):
+        decoded = decode_cursor(cursor, len(self.ordering))
+        direction, values = decoded or (NEXT, None)
+        backwards = direction == PREVIOUS
+
+        queryset = self.queryset
+        if values is not None:
+            try:
+                queryset = queryset.filter(self._after(values, backwards))
+            except (ValidationError, ValueError, TypeError):
+                # A cursor that does not fit the ordering's types: start over.
+                queryset, values, backwards = self.queryset, None, False
+
+        rows = list(queryset.order_by(*self._order_by(backwards))[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+
+        has_next = has_more if not backwards else True
+        has_previous = has_more if backwards else values is not None
+        return CursorPage(
+            rows,
+            next_cursor=encode_cursor(NEXT, self._values(rows[-1])) if rows and has_next else None,
+            previous_cursor=encode_cursor(PREVIOUS, self._values(rows[0])) if rows and has_previous else None,
+            cursor_param=self.cursor_param,
+        )
@@ -7,6 +7,7 @@ from functools import lru_cache
 from textwrap import wrap
 from urllib.parse import urlsplit
 
+from django.core.cache import cache
 from django.utils.html import escape
 
 
@@ -27,6 +28,9 @@ MAX_EDGES = 200
 MAX_FREE_ARROWS = 100
 MAX_GROUPS = 32
 MAX_REGIONS = 40
+# Bump when the rendered markup changes so cached diagrams are rebuilt.
+DIAGRAM_RENDER_VERSION = "1"
+DIAGRAM_CACHE_TIMEOUT = 60 * 60 * 24 * 30
 ALLOWED_SHAPES = {
     "process",
     "decision",
@@ -558,16 +562,38 @@ def _node_boundary(node, target, reverse=False):
     return node["x"] + (dx * scale), node["y"] + (dy * scale)
 
 
-def _line_crosses_node(start, end, node):
-    half_width = (node["width"] / 2) + 18
-    half_height = (node["height"] / 2) + 18
-    for step in range(1, 20):
-        ratio = step / 20
-        x = start[0] + ((end[0] - start[0]) * ratio)
-        y = start[1] + ((end[1] - start[1]) * ratio)
-        if abs(x - node["x"]) <= half_width and abs(y - node["y"]) <= half_height:
-            return True
-    return False
+def _node_boxes(nodes):
+    """(id, x, y, half width, half height) of every node, padded for edge routing."""
+    return [
+        (node["id"], node["x"], node["y"], (node["width"] / 2) + 18, (node["height"] / 2) + 18)
+        for node in nodes
+    ]
+
+
+def _line_blockers(start, end, boxes, skip_ids):
+    """Ids of the boxes that one of 19 evenly spaced points of the line falls into."""
+    samples = [
+        (start[0] + ((end[0] - start[0]) * (step / 20)), start[1] + ((end[1] - start[1]) * (step / 20)))
+        for step in range(1, 20)
+    ]
+    low_x = min(start[0], end[0])
+    high_x = max(start[0], end[0])
+    low_y = min(start[1], end[1])
+    high_y = max(start[1], end[1])
+    blockers = []
+    for node_id, x, y, half_width, half_height in boxes:
+        # Boxes clear of the line's bounding box cannot hold a sample point.
+        if (
+            node_id in skip_ids
+            or x + half_width < low_x - 1
+            or x - half_width > high_x + 1
+            or y + half_height < low_y - 1
+            or y - half_height > high_y + 1
+        ):
+            continue
+        if any(abs(px - x) <= half_width and abs(py - y) <= half_height for px, py in samples):
+            blockers.append(node_id)
+    return blockers
 
 
 def _connector_geometry(start, end, route="straight", bend=0, reverse_bend=False, explicit_curve=False):
@@ -626,6 +652,7 @@ def _edge_geometry(
     bend=0,
     has_reverse=False,
     reverse_bend=False,
+    node_boxes=None,
 ):
     if source["id"] == target["id"]:
         x = source["x"]
@@ -647,12 +674,9 @@ def _edge_geometry(
     end = _node_boundary(target, (source["x"], source["y"]))
     resolved_route = route
     if route == "auto":
-        blockers = [
-            node
-            for node in (all_nodes or [])
-            if node["id"] not in {source["id"], target["id"]}
-            and _line_crosses_node(start, end, node)
-        ]
+        if node_boxes is None:
+            node_boxes = _node_boxes(all_nodes or [])
+        blockers = _line_blockers(start, end, node_boxes, {source["id"], target["id"]})
         resolved_route = "orthogonal" if blockers else "straight"
     if has_reverse and resolved_route == "straight":
         resolved_route = "curve"
@@ -693,8 +717,13 @@ def _region_anchor_point(region, members, bounds, target=None):
     )
 
 
-def _resolve_arrow_anchor(anchor, nodes_by_id, regions_by_id):
+def _resolve_arrow_anchor(anchor, nodes_by_id, regions_by_id, anchor_cache=None):
     anchor = str(anchor or "")
+    if anchor_cache is not None:
+        # Region anchors sample a grid of points; resolve each one once per render.
+        if anchor not in anchor_cache:
+            anchor_cache[anchor] = _resolve_arrow_anchor(anchor, nodes_by_id, regions_by_id)
+        return anchor_cache[anchor]
     if anchor.startswith("n:"):
         node = nodes_by_id.get(anchor[2:])
         if node:
@@ -722,20 +751,20 @@ def _resolve_arrow_anchor(anchor, nodes_by_id, regions_by_id):
     return None
 
 
-def _resolved_free_arrow_endpoints(arrow, nodes_by_id=None, regions_by_id=None):
+def _resolved_free_arrow_endpoints(arrow, nodes_by_id=None, regions_by_id=None, anchor_cache=None):
     nodes_by_id = nodes_by_id or {}
     regions_by_id = regions_by_id or {}
     raw_start = (arrow["start_x"], arrow["start_y"])
     raw_end = (arrow["end_x"], arrow["end_y"])
-    start_anchor = _resolve_arrow_anchor(arrow.get("start_anchor"), nodes_by_id, regions_by_id)
-    end_anchor = _resolve_arrow_anchor(arrow.get("end_anchor"), nodes_by_id, regions_by_id)
+    start_anchor = _resolve_arrow_anchor(arrow.get("start_anchor"), nodes_by_id, regions_by_id, anchor_cache)
+    end_anchor = _resolve_arrow_anchor(arrow.get("end_anchor"), nodes_by_id, regions_by_id, anchor_cache)
     start = start_anchor["center"] if start_anchor else raw_start
     end = end_anchor["center"] if end_anchor else raw_end
     return start, end
 
 
-def _free_arrow_geometry(arrow, nodes_by_id=None, regions_by_id=None):
-    start, end = _resolved_free_arrow_endpoints(arrow, nodes_by_id, regions_by_id)
+def _free_arrow_geometry(arrow, nodes_by_id=None, regions_by_id=None, endpoints=None):
+    start, end = endpoints or _resolved_free_arrow_endpoints(arrow, nodes_by_id, regions_by_id)
     return _connector_geometry(
         start,
         end,
@@ -1081,17 +1110,17 @@ def _render_regions(regions, nodes_by_id, digest):
     return "".join(definitions), "".join(rendered)
 
 
-def _diagram_viewbox(nodes, arrows=None, nodes_by_id=None, regions_by_id=None):
+def _diagram_viewbox(nodes, arrows=None, nodes_by_id=None, regions_by_id=None, arrow_endpoints=None):
     x_values = []
     y_values = []
     for node in nodes:
         x_values.extend((node["x"] - (node["width"] / 2), node["x"] + (node["width"] / 2)))
         y_values.extend((node["y"] - (node["height"] / 2), node["y"] + (node["height"] / 2)))
-    for arrow in arrows or []:
-        (start_x, start_y), (end_x, end_y) = _resolved_free_arrow_endpoints(
-            arrow,
-            nodes_by_id,
-            regions_by_id,
+    for index, arrow in enumerate(arrows or []):
+        (start_x, start_y), (end_x, end_y) = (
+            arrow_endpoints[index]
+            if arrow_endpoints is not None
+            else _resolved_free_arrow_endpoints(arrow, nodes_by_id, regions_by_id)
         )
         x_values.extend((start_x, end_x))
         y_values.extend((start_y, end_y))
@@ -1139,16 +1168,39 @@ def _diagram_viewbox(nodes, arrows=None, nodes_by_id=None, regions_by_id=None):
     return round(left, 1), round(top, 1), round(right - left, 1), round(bottom - top, 1)
 
 
-def render_diagram_html(payload, encoded_payload):
+def render_diagram_html(payload, encoded_payload, use_cache=True):
+    """
+    Figure markup for a decoded diagram. The markup depends only on the
+    encoded payload, so it is kept in the shared cache under the payload's
+    digest and rendered once across processes.
+    """
+    payload_digest = hashlib.sha1(encoded_payload.encode("ascii")).hexdigest()
+    cache_key = f"diagram-svg:{DIAGRAM_RENDER_VERSION}:{payload_digest}"
+    if use_cache:
+        rendered = cache.get(cache_key)
+        if rendered is not None:
+            return rendered
+    rendered = _render_diagram(payload, encoded_payload, payload_digest[:10])
+    if use_cache:
+        cache.set(cache_key, rendered, DIAGRAM_CACHE_TIMEOUT)
+    return rendered
+
+
+def _render_diagram(payload, encoded_payload, digest):
     normalized = normalize_diagram_payload(payload)
     if not normalized:
         return ""
 
-    digest = hashlib.sha1(encoded_payload.encode("ascii")).hexdigest()[:10]
     arrow_id = f"diagram-arrow-{digest}"
     nodes_by_id = {node["id"]: node for node in normalized["nodes"]}
     regions_by_id = {region["id"]: region for region in normalized["regions"]}
     edge_pairs = {(edge["from"], edge["to"]) for edge in normalized["edges"]}
+    node_boxes = _node_boxes(normalized["nodes"])
+    anchor_cache = {}
+    arrow_endpoints = [
+        _resolved_free_arrow_endpoints(arrow, nodes_by_id, regions_by_id, anchor_cache)
+        for arrow in normalized["arrows"]
+    ]
 
     edge_html = []
     for edge_index, edge in enumerate(normalized["edges"]):
@@ -1164,6 +1216,7 @@ def render_diagram_html(payload, encoded_payload):
             bend=edge["bend"],
             has_reverse=has_reverse,
             reverse_bend=has_reverse and edge["from"] > edge["to"],
+            node_boxes=node_boxes,
         )
         edge_class = "answer-diagram-edge"
         if edge["style"] == "dashed":
@@ -1203,7 +1256,7 @@ def render_diagram_html(payload, encoded_payload):
 
     edge_offset = len(normalized["edges"])
     for arrow_index, arrow in enumerate(normalized["arrows"]):
-        geometry = _free_arrow_geometry(arrow, nodes_by_id, regions_by_id)
+        geometry = _free_arrow_geometry(arrow, endpoints=arrow_endpoints[arrow_index])
         edge_class = "answer-diagram-edge"
         if arrow["style"] == "dashed":
             edge_class += " answer-diagram-edge-dashed"
@@ -1253,6 +1306,7 @@ def render_diagram_html(payload, encoded_payload):
         normalized["arrows"],
         nodes_by_id,
         regions_by_id,
+        arrow_endpoints,
     )
     title = escape(normalized["title"])
     summary = escape(
@@ -0,0 +1,512 @@
+"""
+Building the entry exports of a user profile.
+
+The download views stream JSON/XLSX straight from these helpers; DOCX, PDF
+and paper files are written into a file handle so they can be built either
+in the request or by the export worker (see core/export_jobs.py).
+"""
+
+import logging
+import os
+import re
+from itertools import groupby
+
+from django.conf import settings
+from django.db.models import F, Max, Min, QuerySet, Window
+
+from .models import Answer, QuestionRelationship, Reference
+from .question_tree import descendant_ids
+from .utils import REFERENCE_CITATION_PATTERN
+
+
+logger = logging.getLogger(__name__)
+
+# Answers are read from the database in batches of this size while exporting.
+EXPORT_CHUNK_SIZE = 200
+
+
+def format_reference_authors(reference):
+    surnames = [s.strip() for s in (reference.author_surname or '').split(';') if s.strip()]
+    names = [n.strip() for n in (reference.author_name or '').split(';') if n.strip()]
+
+    authors = []
+    for i in range(max(len(surnames), len(names))):
+        surname = surnames[i] if i < len(surnames) else ''
+        name = names[i] if i < len(names) else ''
+        if surname or name:
+            authors.append(f"{surname}, {name}".strip(', '))
+    return '; '.join(authors)
+
+
+class BibliographyCollector:
+    """Collect (kaynak: N, sayfa: ...) citations from answer texts fed one by one."""
+
+    def __init__(self):
+        self.reference_pages = {}
+
+    def feed(self, text):
+        for match in REFERENCE_CITATION_PATTERN.finditer(text or ''):
+            pages = self.reference_pages.setdefault(int(match.group('reference_id')), set())
+            if match.group('page'):
+                pages.add(match.group('page').strip())
+
+    def bibliography(self):
+        references = Reference.objects.in_bulk(list(self.reference_pages))
+        bibliography = []
+        for ref_id in sorted(self.reference_pages):
+            ref_obj = references.get(ref_id)
+            if ref_obj is None:
+                bibliography.append({
+                    'number': ref_id,
+                    'reference': None,
+                    'ref_id': ref_id,
+                    'pages': [],
+                })
+                continue
+            bibliography.append({
+                'number': ref_id,
+                'reference': ref_obj,
+                'formatted_authors': format_reference_authors(ref_obj),
+                'pages': sorted(self.reference_pages[ref_id]),
+            })
+        return bibliography
+
+
+def collect_user_bibliography(target_user, specific_answers=None):
+    """Collect bibliography for a user's selected answers."""
+    if specific_answers is None:
+        specific_answers = Answer.objects.filter(user=target_user)
+
+    if isinstance(specific_answers, QuerySet):
+        texts = specific_answers.values_list('answer_text', flat=True).iterator(chunk_size=EXPORT_CHUNK_SIZE)
+    else:
+        texts = (answer.answer_text for answer in specific_answers)
+
+    collector = BibliographyCollector()
+    for text in texts:
+        collector.feed(text)
+    return collector.bibliography()
+
+
+class ExportOptions:
+    """Entry selection made in the profile download form."""
+
+    ORDERS = ('oldest', 'newest', 'custom')
+
+    def __init__(self, entry_ids=None, order='oldest', root_question_id=None):
+        self.entry_ids = list(entry_ids) if entry_ids else None
+        self.order = order or 'oldest'
+        self.root_question_id = root_question_id
+
+    @classmethod
+    def from_request(cls, request):
+        if request.method != 'POST':
+            return cls()
+        entry_ids_str = request.POST.get('entry_ids', '')
+        entry_ids = [int(id.strip()) for id in entry_ids_str.split(',') if id.strip()]
+        try:
+            root_question_id = int(request.POST.get('root_question_id') or 0) or None
+        except (TypeError, ValueError):
+            root_question_id = None
+        return cls(entry_ids, request.POST.get('order', 'oldest'), root_question_id)
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data.get('entry_ids'), data.get('order'), data.get('root_question_id'))
+
+    def as_dict(self):
+        return {
+            'entry_ids': self.entry_ids,
+            'order': self.order,
+            'root_question_id': self.root_question_id,
+        }
+
+    @property
+    def custom_order(self):
+        return self.order == 'custom' and bool(self.entry_ids)
+
+
+def filtered_user_answers_queryset(options, target_user):
+    """Unordered queryset of the answers selected in `options`."""
+    user_answers = Answer.objects.filter(user=target_user).select_related('question')
+    if options.root_question_id:
+        question_ids = descendant_ids(options.root_question_id, target_user)
+        user_answers = user_answers.filter(question_id__in=question_ids)
+    if options.entry_ids:
+        user_answers = user_answers.filter(id__in=options.entry_ids)
+    return user_answers
+
+
+def filtered_user_answers(options, target_user):
+    """Selected answers in export order, as a queryset (or a list for custom order)."""
+    user_answers = filtered_user_answers_queryset(options, target_user)
+
+    if options.order == 'newest':
+        return user_answers.order_by('-created_at')
+    if options.custom_order:
+        answers_dict = {ans.id: ans for ans in user_answers}
+        return [answers_dict[id] for id in options.entry_ids if id in answers_dict]
+    return user_answers.order_by('created_at')
+
+
+def iter_export_answers(options, target_user, grouped=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yield the selected answers in export order, `chunk_size` rows at a time.
+
+    With `grouped=True` the answers of a question come together, questions in
+    the order of their first answer (the layout of the per-question exports).
+    """
+    user_answers = filtered_user_answers_queryset(options, target_user)
+
+    if options.custom_order:
+        question_by_answer = dict(user_answers.values_list('id', 'question_id'))
+        answer_ids = [id for id in options.entry_ids if id in question_by_answer]
+        if grouped:
+            by_question = {}
+            for answer_id in answer_ids:
+                by_question.setdefault(question_by_answer[answer_id], []).append(answer_id)
+            answer_ids = [answer_id for ids in by_question.values() for answer_id in ids]
+        for start in range(0, len(answer_ids), chunk_size):
+            chunk = answer_ids[start:start + chunk_size]
+            answers = user_answers.in_bulk(chunk)
+            for answer_id in chunk:
+                yield answers[answer_id]
+        return
+
+    newest = options.order == 'newest'
+    ordering = ['-created_at', '-id'] if newest else ['created_at', 'id']
+    if grouped:
+        group_expression = Max('created_at') if newest else Min('created_at')
+        user_answers = user_answers.annotate(
+            question_started_at=Window(group_expression, partition_by=[F('question_id')]),
+        )
+        ordering = ['-question_started_at' if newest else 'question_started_at', 'question_id'] + ordering
+    yield from user_answers.order_by(*ordering).iterator(chunk_size=chunk_size)
+
+
+def iter_export_questions(answers):
+    """Group consecutive answers into `(question, [answers])` pairs."""
+    for _, question_answers in groupby(answers, key=lambda answer: answer.question_id):
+        question_answers = list(question_answers)
+        yield question_answers[0].question, question_answers
+
+
+def insert_toc(paragraph):
+    from docx.oxml import OxmlElement
+    from docx.oxml.ns import qn
+
+    run = paragraph.add_run()
+    fldChar1 = OxmlElement('w:fldChar')
+    fldChar1.set(qn('w:fldCharType'), 'begin')
+    instrText = OxmlElement('w:instrText')
+    instrText.text = 'TOC \\o "1-3" \\h \\z \\u'
+    fldChar2 = OxmlElement('w:fldChar')
+    fldChar2.set(qn('w:fldCharType'), 'separate')
+    fldChar3 = OxmlElement('w:fldChar')
+    fldChar3.set(qn('w:fldCharType'), 'end')
+    run._r.append(fldChar1)
+    run._r.append(instrText)
+    run._r.append(fldChar2)
+    run._r.append(fldChar3)
+
+
+def add_answer_text_to_docx(document, answer_text):
+    if not answer_text:
+        return
+
+    normalized = str(answer_text).replace('\r\n', '\n').replace('\r', '\n').strip()
+    if not normalized:
+        return
+
+    blocks = re.split(r'\n{2,}', normalized)
+    for block in blocks:
+        block = (block or '').strip('\n')
+        if not block.strip():
+            continue
+
+        paragraph = document.add_paragraph()
+        lines = block.split('\n')
+        for idx, line in enumerate(lines):
+            run = paragraph.add_run(line)
+            if idx < len(lines) - 1:
+                run.add_break()
+
+
+def add_question_tree_to_docx(doc, question, target_user, level=1, visited=None):
+    from docx.shared import Pt, RGBColor
+
+    if visited is None:
+        visited = set()
+    if question.id in visited:
+        return
+    visited.add(question.id)
+
+    doc.add_heading(question.question_text, level=level)
+
+    user_answers = question.answers.filter(user=target_user).order_by('created_at')
+    for answer in user_answers:
+        date_str = answer.created_at.strftime('%Y-%m-%d %H:%M')
+        p = doc.add_paragraph()
+        run = p.add_run(date_str + '  ')
+        run.font.size = Pt(9)
+        run.font.color.rgb = RGBColor(140, 140, 140)
+        run.italic = True
+        add_answer_text_to_docx(doc, answer.answer_text)
+        doc.add_paragraph('')
+
+    subquestions_rels = QuestionRelationship.objects.filter(parent=question, user=target_user).select_related('child').order_by('created_at')
+    for rel in subquestions_rels:
+        add_question_tree_to_docx(doc, rel.child, target_user, level=min(level + 1, 9), visited=visited)
+
+
+def write_entries_docx(handle, target_user, options):
+    """Write the plain DOCX export of the selected answers into `handle`."""
+    from docx import Document
+    from docx.shared import Pt, RGBColor
+
+    custom_order = options.custom_order
+    collector = BibliographyCollector()
+
+    document = Document()
+    document.add_heading(f'{target_user.username} Entries', 0)
+
+    if custom_order:
+        last_question_id = None
+        for ans in iter_export_answers(options, target_user):
+            collector.feed(ans.answer_text)
+            if ans.question_id != last_question_id:
+                document.add_heading(ans.question.question_text, level=1)
+                last_question_id = ans.question_id
+
+            date_str = ans.created_at.strftime('%Y-%m-%d %H:%M')
+            p = document.add_paragraph()
+            run = p.add_run(date_str + '  ')
+            run.font.size = Pt(9)
+            run.font.color.rgb = RGBColor(140, 140, 140)
+            run.italic = True
+            add_answer_text_to_docx(document, ans.answer_text)
+            document.add_paragraph('')
+    else:
+        toc_paragraph = document.add_paragraph()
+        insert_toc(toc_paragraph)
+
+        instruction_text = (
+            "Belgeyi açtıktan sonra içindekiler bölümünü görmek için, Word içerisinde "
+            "alanı (veya tüm belgeyi) güncellemeniz gerekir (sağ tıklayıp 'Update Field' veya Ctrl+A ardından F9'a basabilirsiniz)."
+        )
+        document.add_paragraph(instruction_text)
+        document.add_page_break()
+
+        answers = iter_export_answers(options, target_user, grouped=True)
+        for question, q_answers in iter_export_questions(answers):
+            document.add_heading(question.question_text, level=1)
+
+            for answer in q_answers:
+                collector.feed(answer.answer_text)
+                date_str = answer.created_at.strftime('%Y-%m-%d %H:%M')
+                p = document.add_paragraph()
+                run = p.add_run(date_str + '  ')
+                run.font.size = Pt(9)
+                run.font.color.rgb = RGBColor(140, 140, 140)
+                run.italic = True
+                add_answer_text_to_docx(document, answer.answer_text)
+                document.add_paragraph('')
+
+    bibliography = collector.bibliography()
+    if bibliography:
+        document.add_page_break()
+        document.add_heading('Kaynakça', level=1)
+
+        for bib_item in bibliography:
+            if bib_item.get('reference'):
+                ref = bib_item['reference']
+                ref_text = f"[{bib_item['number']}] {bib_item['formatted_authors']} ({ref.year})"
+                if ref.metin_ismi:
+                    ref_text += f", {ref.metin_ismi}"
+                ref_text += f", {ref.rest}"
+
+                if bib_item['pages']:
+                    ref_text += f" (Kullanılan sayfalar: {', '.join(bib_item['pages'])})"
+
+                p = document.add_paragraph(ref_text)
+                p.paragraph_format.left_indent = Pt(18)
+                p.paragraph_format.space_after = Pt(6)
+            else:
+                ref_text = f"[{bib_item['number']}] Kaynak bulunamadı (ID: {bib_item.get('ref_id')})"
+                p = document.add_paragraph(ref_text)
+                p.paragraph_format.left_indent = Pt(18)
+
+    document.save(handle)
+
+
+_pdf_fonts = None
+
+
+def register_pdf_fonts():
+    """Register the Turkish-capable PDF fonts once per process; returns `(regular, bold)`."""
+    global _pdf_fonts
+    if _pdf_fonts is not None:
+        return _pdf_fonts
+
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    try:
+        font_dir = os.path.join(settings.BASE_DIR, 'static', 'fonts')
+        dejavu_regular = os.path.join(font_dir, 'DejaVuSans.ttf')
+        dejavu_bold = os.path.join(font_dir, 'DejaVuSans-Bold.ttf')
+
+        if os.path.exists(dejavu_regular) and os.path.exists(dejavu_bold):
+            pdfmetrics.registerFont(TTFont('TurkishFont', dejavu_regular))
+            pdfmetrics.registerFont(TTFont('TurkishFont-Bold', dejavu_bold))
+            _pdf_fonts = ('TurkishFont', 'TurkishFont-Bold')
+        else:
+            logger.warning('DejaVu fonts not found! Falling back to Helvetica (no Turkish support)')
+            _pdf_fonts = ('Helvetica', 'Helvetica-Bold')
+    except Exception as e:
+        logger.error(f'Font registration failed: {e}')
+        return 'Helvetica', 'Helvetica-Bold'
+    return _pdf_fonts
+
+
+def write_entries_pdf(handle, target_user, options):
+    """Write the PDF export of the selected answers into `handle`."""
+    from reportlab.lib.pagesizes import A4
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+    from reportlab.lib.units import inch
+    from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+    from reportlab.lib.enums import TA_CENTER
+
+    custom_order = options.custom_order
+    collector = BibliographyCollector()
+
+    doc = SimpleDocTemplate(handle, pagesize=A4, rightMargin=72, leftMargin=72, topMargin=72, bottomMargin=18)
+    elements = []
+
+    font_name, font_name_bold = register_pdf_fonts()
+
+    styles = getSampleStyleSheet()
+
+    title_style = ParagraphStyle(
+        'CustomTitle', parent=styles['Heading1'], fontName=font_name, fontSize=24,
+        textColor='#2c3e50', spaceAfter=30, alignment=TA_CENTER
+    )
+    h1_style = ParagraphStyle(
+        'CustomH1', parent=styles['Heading1'], fontName=font_name, fontSize=16,
+        textColor='#2c3e50', spaceAfter=12, spaceBefore=12
+    )
+    answer_style = ParagraphStyle(
+        'AnswerText', parent=styles['BodyText'], fontName=font_name, fontSize=10,
+        textColor='#2c3e50', spaceAfter=12, leftIndent=20
+    )
+    date_style = ParagraphStyle(
+        'DateStyle', parent=styles['Normal'], fontName=font_name, fontSize=8,
+        textColor='#95a5a6', spaceAfter=6, leftIndent=20
+    )
+
+    title = Paragraph(f"{target_user.username} - Entry'ler", title_style)
+    elements.append(title)
+    elements.append(Spacer(1, 0.3 * inch))
+
+    def clean_text(text):
+        if not text:
+            return ''
+        text = text.replace('&', '&amp;')
+        text = text.replace('<', '&lt;')
+        text = text.replace('>', '&gt;')
+        text = text.replace('\n', '<br/>')
+        return text
+
+    if custom_order:
+        last_question_id = None
+        for answer in iter_export_answers(options, target_user):
+            collector.feed(answer.answer_text)
+            if answer.question_id != last_question_id:
+                elements.append(Paragraph(clean_text(answer.question.question_text), h1_style))
+                elements.append(Spacer(1, 0.1 * inch))
+                last_question_id = answer.question_id
+
+            date_str = answer.created_at.strftime('%Y-%m-%d %H:%M')
+            elements.append(Paragraph(f'<i>{date_str}</i>', date_style))
+            elements.append(Paragraph(clean_text(answer.answer_text), answer_style))
+            elements.append(Spacer(1, 0.15 * inch))
+    else:
+        toc_style = ParagraphStyle(
+            'TOCHeading', parent=styles['Heading1'], fontName=font_name_bold, fontSize=18,
+            textColor='#2c3e50', spaceAfter=12
+        )
+        toc_item_style = ParagraphStyle(
+            'TOCItem', parent=styles['Normal'], fontName=font_name, fontSize=11,
+            textColor='#34495e', spaceAfter=6, leftIndent=20
+        )
+
+        elements.append(Paragraph('İçindekiler', toc_style))
+        elements.append(Spacer(1, 0.2 * inch))
+
+        # The table of contents comes first but is filled in the same pass.
+        body = []
+        answers = iter_export_answers(options, target_user, grouped=True)
+        for idx, (question, q_answers) in enumerate(iter_export_questions(answers), 1):
+            toc_text = f"{idx}. {clean_text(question.question_text[:100])}"
+            if len(question.question_text) > 100:
+                toc_text += '...'
+            elements.append(Paragraph(toc_text, toc_item_style))
+
+            body.append(Paragraph(clean_text(question.question_text), h1_style))
+            body.append(Spacer(1, 0.1 * inch))
+
+            for answer in q_answers:
+                collector.feed(answer.answer_text)
+                date_str = answer.created_at.strftime('%Y-%m-%d %H:%M')
+                body.append(Paragraph(f'<i>{date_str}</i>', date_style))
+                body.append(Paragraph(clean_text(answer.answer_text), answer_style))
+                body.append(Spacer(1, 0.15 * inch))
+
+            body.append(PageBreak())
+
+        elements.append(PageBreak())
+        elements.extend(body)
+
+    bibliography = collector.bibliography()
+    if bibliography:
+        elements.append(PageBreak())
+
+        bib_heading_style = ParagraphStyle(
+            'BibliographyHeading', parent=styles['Heading1'], fontName=font_name_bold,
+            fontSize=18, textColor='#2c3e50', spaceAfter=20, spaceBefore=12
+        )
+        bib_item_style = ParagraphStyle(
+            'BibliographyItem', parent=styles['BodyText'], fontName=font_name, fontSize=10,
+            textColor='#2c3e50', spaceAfter=10, leftIndent=20, firstLineIndent=-20
+        )
+
+        elements.append(Paragraph('Kaynakça', bib_heading_style))
+        elements.append(Spacer(1, 0.2 * inch))
+
+        for bib_item in bibliography:
+            if bib_item.get('reference'):
+                ref = bib_item['reference']
+                ref_text = f"[{bib_item['number']}] {clean_text(bib_item['formatted_authors'])} ({ref.year})"
+                if ref.metin_ismi:
+                    ref_text += f", {clean_text(ref.metin_ismi)}"
+                ref_text += f", {clean_text(ref.rest)}"
+                if bib_item['pages']:
+                    pages_str = ', '.join(bib_item['pages'])
+                    ref_text += f" (Kullanılan sayfalar: {pages_str})"
+                elements.append(Paragraph(ref_text, bib_item_style))
+            else:
+                ref_text = f"[{bib_item['number']}] Kaynak bulunamadı (ID: {bib_item.get('ref_id')})"
+                elements.append(Paragraph(ref_text, bib_item_style))
+
+    doc.build(elements)
+
+
+def write_entries_paper(handle, target_user, options):
+    """Write the academic paper DOCX of the selected answers into `handle`."""
+    from .paper_export import build_paper_docx
+
+    handle.write(build_paper_docx(
+        filtered_user_answers(options, target_user),
+        target_user,
+        root_question_id=options.root_question_id,
+    ))
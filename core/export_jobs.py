@@ -0,0 +1,193 @@
+"""
+Background builds of the DOCX, PDF and paper entry exports.
+
+With EXPORT_IN_BACKGROUND on, the download form asks for a job
+(`request_export`) and polls its status; `run_export_worker` claims pending
+jobs and builds them in a process pool, off the request. Every finished file is stored under MEDIA_ROOT/exports and
+keyed by `export_cache_key` (target user, format, selected entries, order,
+root question and the latest answer, question and cited reference edit
+times), so an identical export that was already built is served straight
+away. `prune_export_jobs` (run by the worker) deletes jobs and files that a
+newer build of the same export replaced, and any finished job older than
+EXPORT_RETENTION.
+"""
+
+import hashlib
+import json
+import logging
+import tempfile
+from datetime import timedelta
+
+from django.core.files import File
+from django.db.models import Count, Max
+from django.http import FileResponse
+from django.urls import reverse
+from django.utils import timezone
+
+from .entry_export import (
+    filtered_user_answers_queryset,
+    write_entries_docx,
+    write_entries_paper,
+    write_entries_pdf,
+    ExportOptions,
+)
+from .models import ExportJob, Reference
+
+
+logger = logging.getLogger(__name__)
+
+# Bump when the layout of the built files changes so old artifacts are not reused.
+EXPORT_LAYOUT_VERSION = 1
+# A job still "running" after this long is assumed to have lost its worker.
+STALE_JOB_AFTER = timedelta(minutes=30)
+# Finished jobs (and their files) are deleted after this long.
+EXPORT_RETENTION = timedelta(days=7)
+
+DOCX_CONTENT_TYPE = 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+EXPORT_FORMATS = {
+    'docx': (write_entries_docx, '{username}_entries.docx', DOCX_CONTENT_TYPE),
+    'pdf': (write_entries_pdf, '{username}_entries.pdf', 'application/pdf'),
+    'paper': (write_entries_paper, '{username}_paper.docx', DOCX_CONTENT_TYPE),
+}
+
+
+def export_cache_key(target_user, export_format, options):
+    """Hash identifying the export built from the current state of the selection."""
+    answers = filtered_user_answers_queryset(options, target_user)
+    state = answers.aggregate(
+        answer_count=Count('id'),
+        answers_updated_at=Max('updated_at'),
+        questions_updated_at=Max('question__updated_at'),
+    )
+    # Bibliographies print the cited references, so their edits count too.
+    state.update(Reference.objects.filter(citations__answer__in=answers.values('id')).aggregate(
+        reference_count=Count('id', distinct=True),
+        references_updated_at=Max('updated_at'),
+    ))
+    payload = {
+        'version': EXPORT_LAYOUT_VERSION,
+        'user': target_user.id,
+        'format': export_format,
+        'options': options.as_dict(),
+        'state': {key: str(value) for key, value in state.items()},
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def find_artifact(cache_key):
+    """Latest finished job for `cache_key` whose file still exists, or None."""
+    for job in ExportJob.objects.filter(cache_key=cache_key, status='done').exclude(file='').order_by('-id')[:3]:
+        if job.file.storage.exists(job.file.name):
+            return job
+    return None
+
+
+def request_export(requested_by, target_user, export_format, options):
+    """Return a finished, queued or new job for this export."""
+    cache_key = export_cache_key(target_user, export_format, options)
+    job = find_artifact(cache_key) or ExportJob.objects.filter(
+        cache_key=cache_key,
+        status__in=('pending', 'running'),
+    ).order_by('-id').first()
+    if job is None:
+        job = ExportJob.objects.create(
+            requested_by=requested_by,
+            target_user=target_user,
+            export_format=export_format,
+            options=options.as_dict(),
+            cache_key=cache_key,
+        )
+    return job
+
+
+def claim_next_job():
+    """Mark the oldest pending job as running and return its id (None when idle)."""
+    ExportJob.objects.filter(
+        status='running',
+        started_at__lt=timezone.now() - STALE_JOB_AFTER,
+    ).update(status='pending')
+
+    for job_id in ExportJob.objects.filter(status='pending').order_by('id').values_list('id', flat=True)[:10]:
+        claimed = ExportJob.objects.filter(id=job_id, status='pending').update(
+            status='running',
+            started_at=timezone.now(),
+        )
+        if claimed:
+            return job_id
+    return None
+
+
+def build_export_job(job_id):
+    """Build the file of a claimed job and store it; returns the final status."""
+    job = ExportJob.objects.select_related('target_user').get(id=job_id)
+    writer, _, _ = EXPORT_FORMATS[job.export_format]
+    extension = '.pdf' if job.export_format == 'pdf' else '.docx'
+    try:
+        with tempfile.TemporaryFile() as handle:
+            writer(handle, job.target_user, ExportOptions.from_dict(job.options))
+            handle.seek(0)
+            job.file.save(f'{job.cache_key}{extension}', File(handle), save=False)
+        job.status = 'done'
+        job.error = ''
+    except Exception as exc:
+        logger.exception('Export job %s failed', job_id)
+        job.status = 'failed'
+        job.error = str(exc)[:1000]
+    job.finished_at = timezone.now()
+    job.save(update_fields=['file', 'status', 'error', 'finished_at'])
+    return job.status
+
+
+def prune_export_jobs(now=None):
+    """
+    Delete finished jobs replaced by a newer build of the same export, and
+    finished jobs older than EXPORT_RETENTION, with their files. Returns the
+    number of jobs deleted.
+    """
+    cutoff = (now or timezone.now()) - EXPORT_RETENTION
+    finished = ExportJob.objects.filter(status__in=('done', 'failed')).order_by('-id')
+    latest_done = set()
+    doomed = []
+    for job in finished.only('id', 'target_user_id', 'export_format', 'options', 'status', 'file', 'finished_at'):
+        if job.finished_at is not None and job.finished_at < cutoff:
+            doomed.append(job)
+            continue
+        if job.status != 'done':
+            continue
+        export = (job.target_user_id, job.export_format, json.dumps(job.options, sort_keys=True))
+        if export in latest_done:
+            doomed.append(job)
+        else:
+            latest_done.add(export)
+
+    for job in doomed:
+        if job.file:
+            try:
+                job.file.storage.delete(job.file.name)
+            except OSError:
+                logger.warning('Could not delete export file %s', job.file.name, exc_info=True)
+    ExportJob.objects.filter(id__in=[job.id for job in doomed]).delete()
+    return len(doomed)
+
+
+def export_job_payload(job):
+    payload = {
+        'job_id': job.id,
+        'status': job.status,
+        'status_url': reverse('export_job_status', args=[job.id]),
+    }
+    if job.status == 'done':
+        payload['download_url'] = reverse('export_job_download', args=[job.id])
+    elif job.status == 'failed':
+        payload['error'] = job.error
+    return payload
+
+
+def artifact_response(job):
+    _, filename, content_type = EXPORT_FORMATS[job.export_format]
+    return FileResponse(
+        job.file.open('rb'),
+        as_attachment=True,
+        filename=filename.format(username=job.target_user.username),
+        content_type=content_type,
+    )
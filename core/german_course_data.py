@@ -1,7 +1,8 @@
 from copy import deepcopy
-from random import SystemRandom
+from functools import lru_cache
 import re
 
+from .course_store import GENERATED_OPTION_COUNT, request_rng, shuffle_lesson_exercises
 from .german_a2_data import A2_LESSONS, A2_SCOPE_MATRIX
 
 
@@ -6659,14 +6660,11 @@ def _unique_pool(values):
     return unique
 
 
-def _build_options(correct, pool, rng, option_count=3):
-    distractors = [value for value in _unique_pool(pool) if value != correct]
-    rng.shuffle(distractors)
-    options = [correct] + distractors[: option_count - 1]
-    if len(options) < option_count:
+def _build_distractors(correct, pool, option_count=GENERATED_OPTION_COUNT):
+    distractors = tuple(value for value in _unique_pool(pool) if value != correct)
+    if len(distractors) < option_count - 1:
         return None
-    rng.shuffle(options)
-    return options
+    return distractors
 
 
 def _question(prompt, options, correct, explanation):
@@ -6678,6 +6676,16 @@ def _question(prompt, options, correct, explanation):
     }
 
 
+def _generated_question(prompt, correct, distractors, explanation):
+    # Options are drawn from `distractors` per request, see course_store.shuffle_lesson_exercises.
+    return {
+        "prompt": prompt,
+        "correct_option": correct,
+        "distractors": distractors,
+        "explanation": explanation,
+    }
+
+
 def _generate_article_module(nouns):
     questions = []
     for item in nouns:
@@ -6701,20 +6709,20 @@ def _generate_article_module(nouns):
     }
 
 
-def _generate_plural_module(nouns, rng):
+def _generate_plural_module(nouns):
     pool = [item["plural"] for item in nouns]
     questions = []
 
     for item in nouns:
         correct = item["plural"]
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 f"{_word_label(item)} kelimesinin çoğulu hangisi?",
-                options,
                 correct,
+                distractors,
                 f"{_word_label(item)} için doğru çoğul {correct} şeklindedir.",
             )
         )
@@ -6728,20 +6736,20 @@ def _generate_plural_module(nouns, rng):
     }
 
 
-def _generate_meaning_module(vocabulary, rng):
+def _generate_meaning_module(vocabulary):
     pool = [_meaning_label(item) for item in vocabulary]
     questions = []
 
     for item in vocabulary:
         correct = _meaning_label(item)
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 _word_label(item),
-                options,
                 correct,
+                distractors,
                 f"{_word_label(item)} ifadesi en çok '{correct}' anlam grubuna yakındır.",
             )
         )
@@ -6755,21 +6763,21 @@ def _generate_meaning_module(vocabulary, rng):
     }
 
 
-def _generate_reverse_meaning_module(vocabulary, rng):
+def _generate_reverse_meaning_module(vocabulary):
     pool = [_word_label(item) for item in vocabulary]
     questions = []
 
     for item in vocabulary:
         correct = _word_label(item)
         prompt = f"'{_meaning_label(item)}' anlamına en uygun Almanca hangisi?"
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 prompt,
-                options,
                 correct,
+                distractors,
                 f"Bu anlam grubu için doğru seçenek {correct} olur.",
             )
         )
@@ -6783,7 +6791,7 @@ def _generate_reverse_meaning_module(vocabulary, rng):
     }
 
 
-def _generate_example_gap_module(vocabulary, rng):
+def _generate_example_gap_module(vocabulary):
     pool = [item["word"] for item in vocabulary]
     questions = []
 
@@ -6795,14 +6803,14 @@ def _generate_example_gap_module(vocabulary, rng):
         blanked = example.replace(item["word"], "_____", 1)
         prompt = f"{blanked} ({item['example_tr']})"
         correct = item["word"]
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 prompt,
-                options,
                 correct,
+                distractors,
                 f"Bu örnekte boşluğa gelen kelime {correct} olur.",
             )
         )
@@ -6816,20 +6824,20 @@ def _generate_example_gap_module(vocabulary, rng):
     }
 
 
-def _generate_phrase_to_german_module(phrase_bank, rng):
+def _generate_phrase_to_german_module(phrase_bank):
     pool = [item["de"] for item in phrase_bank]
     questions = []
 
     for item in phrase_bank:
         correct = item["de"]
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 f'Türkçesi "{item["tr"]}" olan ifade hangisi?',
-                options,
                 correct,
+                distractors,
                 item.get("note", "") or f"Doğru ifade {correct}.",
             )
         )
@@ -6843,20 +6851,20 @@ def _generate_phrase_to_german_module(phrase_bank, rng):
     }
 
 
-def _generate_phrase_to_turkish_module(phrase_bank, rng):
+def _generate_phrase_to_turkish_module(phrase_bank):
     pool = [item["tr"] for item in phrase_bank]
     questions = []
 
     for item in phrase_bank:
         correct = item["tr"]
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 f'"{item["de"]}" ifadesinin Türkçesi hangisi?',
-                options,
                 correct,
+                distractors,
                 item.get("note", "") or f"Bu ifadenin en uygun karşılığı {correct}.",
             )
         )
@@ -6870,20 +6878,20 @@ def _generate_phrase_to_turkish_module(phrase_bank, rng):
     }
 
 
-def _generate_pronoun_translation_module(rng):
+def _generate_pronoun_translation_module():
     pool = [item["pronoun"] for item in SEIN_PRONOUN_DRILLS]
     questions = []
 
     for item in SEIN_PRONOUN_DRILLS:
         correct = item["pronoun"]
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 f'"{item["pronoun_tr"]}" anlamına gelen zamir hangisi?',
-                options,
                 correct,
+                distractors,
                 f"Bu anlam grubu için doğru zamir {correct}.",
             )
         )
@@ -6897,20 +6905,20 @@ def _generate_pronoun_translation_module(rng):
     }
 
 
-def _generate_sein_conjugation_module(rng):
+def _generate_sein_conjugation_module():
     pool = ["bin", "bist", "ist", "sind", "seid"]
     questions = []
 
     for item in SEIN_PRONOUN_DRILLS:
         correct = item["verb"]
-        options = _build_options(correct, pool, rng)
-        if not options:
+        distractors = _build_distractors(correct, pool)
+        if not distractors:
             continue
         questions.append(
-            _question(
+            _generated_question(
                 f"{item['pronoun']} ile sein fiilinin doğru çekimi hangisi?",
-                options,
                 correct,
+                distractors,
                 f"{item['pronoun']} ile {correct} kullanılır.",
             )
         )
@@ -6924,7 +6932,7 @@ def _generate_sein_conjugation_module(rng):
     }
 
 
-def _build_generated_exercises(lesson, rng):
+def _build_generated_exercises(lesson):
     generated = []
     vocabulary = [item for item in lesson.get("vocabulary", []) if item.get("entry_type") != "phrase"]
     nouns = [
@@ -6935,20 +6943,20 @@ def _build_generated_exercises(lesson, rng):
 
     if nouns:
         generated.append(_generate_article_module(nouns))
-        generated.append(_generate_plural_module(nouns, rng))
+        generated.append(_generate_plural_module(nouns))
 
     if vocabulary:
-        generated.append(_generate_meaning_module(vocabulary, rng))
-        generated.append(_generate_reverse_meaning_module(vocabulary, rng))
-        generated.append(_generate_example_gap_module(vocabulary, rng))
+        generated.append(_generate_meaning_module(vocabulary))
+        generated.append(_generate_reverse_meaning_module(vocabulary))
+        generated.append(_generate_example_gap_module(vocabulary))
 
     if phrase_bank:
-        generated.append(_generate_phrase_to_german_module(phrase_bank, rng))
-        generated.append(_generate_phrase_to_turkish_module(phrase_bank, rng))
+        generated.append(_generate_phrase_to_german_module(phrase_bank))
+        generated.append(_generate_phrase_to_turkish_module(phrase_bank))
 
     if lesson["slug"] == "ders-2-kisi-zamirleri-ve-sein-fiili":
-        generated.append(_generate_pronoun_translation_module(rng))
-        generated.append(_generate_sein_conjugation_module(rng))
+        generated.append(_generate_pronoun_translation_module())
+        generated.append(_generate_sein_conjugation_module())
 
     return [exercise for exercise in generated if exercise.get("questions")]
 
@@ -6987,41 +6995,34 @@ def get_german_course_overview():
     return levels
 
 
-def _shuffle_lesson_exercises(lesson, rng):
-    for exercise in lesson.get("exercises", []):
-        questions = exercise.get("questions", [])
-        if len(questions) > 1:
-            original_prompts = [question.get("prompt") for question in questions]
-            rng.shuffle(questions)
-            if [question.get("prompt") for question in questions] == original_prompts:
-                questions.append(questions.pop(0))
-
-        for question in questions:
-            options = list(question.get("options", []))
-            if len(options) < 2:
-                continue
-
-            original_options = list(options)
-            correct_option = options[question["correct_index"]]
-            rng.shuffle(options)
-            if options == original_options:
-                options.append(options.pop(0))
-            question["options"] = options
-            question["correct_index"] = options.index(correct_option)
-
-    return lesson
-
-
-def get_german_lesson(level_slug, lesson_slug):
+@lru_cache(maxsize=None)
+def get_german_lesson_artifact(level_slug, lesson_slug):
+    """
+    The lesson with everything that does not depend on the request: glossed
+    passages, grammar notes, the filled-up vocabulary and the generated
+    exercises. Built once per process and shared, so callers must not mutate
+    it. Generated questions keep their correct option and distractor pool
+    instead of fixed options.
+    """
     lessons = GERMAN_LESSONS.get(level_slug, [])
     for lesson in lessons:
         if lesson["slug"] == lesson_slug:
-            rng = SystemRandom()
             prepared_lesson = deepcopy(lesson)
             prepared_lesson = _prepare_reading_passages(prepared_lesson)
             prepared_lesson = _prepare_grammar_sections(prepared_lesson)
             prepared_lesson = _ensure_minimum_vocabulary(level_slug, prepared_lesson)
-            prepared_lesson["exercises"] = prepared_lesson.get("exercises", []) + _build_generated_exercises(prepared_lesson, rng)
-            prepared_lesson = _enrich_lesson_meta(prepared_lesson)
-            return _shuffle_lesson_exercises(prepared_lesson, rng)
+            prepared_lesson["exercises"] = prepared_lesson.get("exercises", []) + _build_generated_exercises(prepared_lesson)
+            return _enrich_lesson_meta(prepared_lesson)
     return None
+
+
+def get_german_lesson(level_slug, lesson_slug):
+    """
+    The lesson for one request: the shared artifact with its questions and
+    options shuffled and the generated options drawn. Only the lesson,
+    exercise and question dicts are copied.
+    """
+    artifact = get_german_lesson_artifact(level_slug, lesson_slug)
+    if artifact is None:
+        return None
+    return shuffle_lesson_exercises(artifact, request_rng())
@@ -1,7 +1,5 @@
-from copy import deepcopy
-from random import SystemRandom
-
-from .german_course_data import GERMAN_LESSONS, get_german_lesson
+from .course_store import build_level_test
+from .german_course_data import GERMAN_LESSONS, get_german_lesson_artifact
 
 
 A1_LEVEL_TEST_MODULES = [
@@ -3886,7 +3884,7 @@ def _lesson_pool(level_slug, lesson_indexes):
     selected = []
     for item in GERMAN_LESSONS.get(level_slug, []):
         if item["index"] in index_set:
-            selected.append(get_german_lesson(level_slug, item["slug"]))
+            selected.append(get_german_lesson_artifact(level_slug, item["slug"]))
     return selected
 
 
@@ -4205,58 +4203,14 @@ LEVEL_TEST_CONFIGS = {
 }
 
 
-def _build_assessment_question(question, rng):
-    prepared = deepcopy(question)
-    options = list(prepared["options"])
-    correct = prepared["correct"]
-    rng.shuffle(options)
-    prepared["options"] = options
-    prepared["correct_index"] = options.index(correct)
-    return prepared
-
-
 def get_level_test_bank_size(level_slug):
     return len(LEVEL_TEST_BANKS.get(level_slug, []))
 
 
 def build_german_level_test(level_slug):
-    config = LEVEL_TEST_CONFIGS.get(level_slug)
-    rng = SystemRandom()
-    bank = LEVEL_TEST_BANKS.get(level_slug, [])
-    if not bank or not config:
-        return None
-
-    exercises = []
-    total_questions = 0
-
-    for module in config["modules"]:
-        pool = [item for item in bank if item["module_id"] == module["id"]]
-        sample_size = min(module["sample_size"], len(pool))
-        selected = rng.sample(pool, sample_size)
-        questions = [_build_assessment_question(item, rng) for item in selected]
-        rng.shuffle(questions)
-        total_questions += len(questions)
-        exercises.append(
-            {
-                "id": f'level-test-{module["id"]}',
-                "type": "single_choice",
-                "title": module["title"],
-                "description": module["description"],
-                "questions": questions,
-            }
-        )
-
-    return {
-        "slug": f"{level_slug}-seviye-bitirme-testi",
-        "title": config["title"],
-        "subtitle": config["subtitle"],
-        "duration": config["duration"],
-        "question_bank_size": len(bank),
-        "sample_size": total_questions,
-        "pass_score": config["pass_score"],
-        "pass_correct": config["pass_correct"],
-        "module_count": len(exercises),
-        "instructions": config["instructions"],
-        "focus_points": config["focus_points"],
-        "exercises": exercises,
-    }
+    return build_level_test(
+        LEVEL_TEST_CONFIGS.get(level_slug),
+        LEVEL_TEST_BANKS.get(level_slug, []),
+        f"{level_slug}-seviye-bitirme-testi",
+        "level-test-",
+    )
@@ -1,4 +1,5 @@
 from copy import deepcopy
+from functools import lru_cache
 
 
 LOGIC_LEGACY_SLUG_REDIRECTS = {
@@ -3895,15 +3896,36 @@ def _append_advanced_production_tasks():
 _append_advanced_production_tasks()
 
 
-def _clone_lesson(lesson):
-    return deepcopy(lesson)
+@lru_cache(maxsize=1)
+def _visible_lessons():
+    # Built once per process and shared by every request; callers must not
+    # mutate the returned lessons.
+    return tuple(
+        dict(deepcopy(lesson), display_order=index)
+        for index, lesson in enumerate(VISIBLE_LOGIC_LESSONS, start=1)
+    )
 
 
-def _clone_visible_lessons():
-    cloned = [_clone_lesson(lesson) for lesson in VISIBLE_LOGIC_LESSONS]
-    for index, lesson in enumerate(cloned, start=1):
-        lesson["display_order"] = index
-    return cloned
+@lru_cache(maxsize=1)
+def _course_artifact():
+    course = deepcopy(LOGIC_COURSE)
+    course["lessons"] = _visible_lessons()
+    course["active_lesson_count"] = len(VISIBLE_LOGIC_LESSONS)
+    course["lesson_count"] = len(VISIBLE_LOGIC_LESSONS)
+    return course
+
+
+@lru_cache(maxsize=1)
+def _lesson_payloads():
+    visible_lessons = _visible_lessons()
+    payloads = {}
+    for index, lesson in enumerate(visible_lessons):
+        payload = dict(lesson)
+        payload["active_lesson_count"] = len(VISIBLE_LOGIC_LESSONS)
+        payload["previous_lesson"] = visible_lessons[index - 1] if index > 0 else None
+        payload["next_lesson"] = visible_lessons[index + 1] if index < len(visible_lessons) - 1 else None
+        payloads[lesson["slug"]] = payload
+    return payloads
 
 
 def get_logic_redirect_slug(lesson_slug):
@@ -3911,10 +3933,8 @@ def get_logic_redirect_slug(lesson_slug):
 
 
 def get_logic_course():
-    course = deepcopy(LOGIC_COURSE)
-    course["lessons"] = _clone_visible_lessons()
-    course["active_lesson_count"] = len(VISIBLE_LOGIC_LESSONS)
-    course["lesson_count"] = len(VISIBLE_LOGIC_LESSONS)
+    course = dict(_course_artifact())
+    course["lessons"] = list(course["lessons"])
     return course
 
 
@@ -3927,14 +3947,7 @@ def resolve_logic_lesson(lesson_slug):
     if not lesson or lesson.get("hidden"):
         return None, None
 
-    visible_lessons = _clone_visible_lessons()
-    visible_slugs = [item["slug"] for item in visible_lessons]
-    index = visible_slugs.index(lesson_slug)
-    payload = visible_lessons[index]
-    payload["active_lesson_count"] = len(VISIBLE_LOGIC_LESSONS)
-    payload["previous_lesson"] = visible_lessons[index - 1] if index > 0 else None
-    payload["next_lesson"] = visible_lessons[index + 1] if index < len(visible_lessons) - 1 else None
-    return payload, None
+    return dict(_lesson_payloads()[lesson_slug]), None
 
 
 def get_logic_lesson(lesson_slug):
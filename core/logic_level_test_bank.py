@@ -1,5 +1,4 @@
-from copy import deepcopy
-from random import SystemRandom
+from .course_store import build_level_test
 
 
 def _question(qid, module_id, prompt, options, correct, explanation):
@@ -133,56 +132,14 @@ LOGIC_LEVEL_TEST_BANK = [
 ]
 
 
-def _build_assessment_question(item, rng):
-    prepared = deepcopy(item)
-    options = list(prepared["options"])
-    correct = prepared["correct"]
-    rng.shuffle(options)
-    prepared["options"] = options
-    prepared["correct_index"] = options.index(correct)
-    return prepared
-
-
 def get_logic_level_test_bank_size():
     return len(LOGIC_LEVEL_TEST_BANK)
 
 
 def build_logic_level_test():
-    rng = SystemRandom()
-    bank = LOGIC_LEVEL_TEST_BANK
-    if not bank:
-        return None
-
-    exercises = []
-    total_questions = 0
-    for module in LOGIC_LEVEL_TEST_CONFIG["modules"]:
-        pool = [item for item in bank if item["module_id"] == module["id"]]
-        sample_size = min(module["sample_size"], len(pool))
-        selected = rng.sample(pool, sample_size)
-        questions = [_build_assessment_question(item, rng) for item in selected]
-        rng.shuffle(questions)
-        total_questions += len(questions)
-        exercises.append(
-            {
-                "id": f'logic-level-test-{module["id"]}',
-                "type": "single_choice",
-                "title": module["title"],
-                "description": module["description"],
-                "questions": questions,
-            }
-        )
-
-    return {
-        "slug": "mantik-bitirme-testi",
-        "title": LOGIC_LEVEL_TEST_CONFIG["title"],
-        "subtitle": LOGIC_LEVEL_TEST_CONFIG["subtitle"],
-        "duration": LOGIC_LEVEL_TEST_CONFIG["duration"],
-        "question_bank_size": len(bank),
-        "sample_size": total_questions,
-        "pass_score": LOGIC_LEVEL_TEST_CONFIG["pass_score"],
-        "pass_correct": LOGIC_LEVEL_TEST_CONFIG["pass_correct"],
-        "module_count": len(exercises),
-        "instructions": LOGIC_LEVEL_TEST_CONFIG["instructions"],
-        "focus_points": LOGIC_LEVEL_TEST_CONFIG["focus_points"],
-        "exercises": exercises,
-    }
+    return build_level_test(
+        LOGIC_LEVEL_TEST_CONFIG,
+        LOGIC_LEVEL_TEST_BANK,
+        "mantik-bitirme-testi",
+        "logic-level-test-",
+    )
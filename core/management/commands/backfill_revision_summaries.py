@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.revision_summary import backfill_revision_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Create missing initial revisions and approval snapshots, then store the revision summary "
+        "of every answer."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, **options):
+        written = backfill_revision_summaries(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f"Stored revision summaries for {written} answers."))
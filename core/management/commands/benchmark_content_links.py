@@ -0,0 +1,83 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db.models.functions import Length
+
+from core.content_link_preload import preload_content_links
+from core.models import Answer
+from core.templatetags.custom_tags import (
+    bkz_link,
+    collapsible_images,
+    content_links,
+    mention_link,
+    ref_link,
+    reference_link,
+    safe_markdownify,
+    spoiler_link,
+    tanim_link,
+)
+
+
+def render_with_filter_chain(html):
+    for content_filter in (
+        spoiler_link,
+        bkz_link,
+        tanim_link,
+        reference_link,
+        ref_link,
+        mention_link,
+        collapsible_images,
+    ):
+        html = content_filter(html)
+    return str(html)
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the single-pass content_links filter against the old "
+        "spoiler|bkz|tanim|reference|ref|mention|images filter chain on the longest answers."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--answers', type=int, default=50, help='How many of the longest answers to use.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed rounds per renderer (best one is reported).')
+
+    def handle(self, *args, **options):
+        texts = list(
+            Answer.objects.annotate(text_length=Length('answer_text'))
+            .order_by('-text_length')
+            .values_list('answer_text', flat=True)[:options['answers']]
+        )
+        if not texts:
+            self.stdout.write("No answers to benchmark.")
+            return
+
+        markdown = [str(safe_markdownify(text, "default")) for text in texts]
+        mismatches = 0
+        results = {}
+        # Lookups come from the preload so both sides measure string work only.
+        with preload_content_links(texts):
+            for html in markdown:
+                if render_with_filter_chain(html) != str(content_links(html)):
+                    mismatches += 1
+
+            for name, renderer in (('filter chain', render_with_filter_chain), ('content_links', content_links)):
+                best = None
+                for _ in range(max(1, options['repeat'])):
+                    started = time.perf_counter()
+                    for html in markdown:
+                        renderer(html)
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+                results[name] = best
+
+        total_chars = sum(len(html) for html in markdown)
+        self.stdout.write(f"{len(markdown)} answers, {total_chars} characters of rendered markdown")
+        for name, elapsed in results.items():
+            self.stdout.write(f"{name:>14}: {elapsed * 1000:9.2f} ms")
+        if results['content_links']:
+            self.stdout.write(f"{'speedup':>14}: {results['filter chain'] / results['content_links']:9.2f}x")
+        self.stdout.write(
+            f"{mismatches} answers render differently "
+            "(expected where markers sat inside HTML attributes or image paragraphs)."
+        )
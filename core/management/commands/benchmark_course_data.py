@@ -0,0 +1,97 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core import course_store
+
+
+# Runs in a fresh interpreter so import time and memory start from zero.
+PROBE = """
+import json, os, resource, time
+import django
+django.setup()
+
+def rss_mb():
+    try:
+        with open('/proc/self/statm') as handle:
+            return int(handle.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2 ** 20
+
+from core import course_store
+result = {}
+rss = rss_mb()
+started = time.perf_counter()
+course_store.get_german_lesson('a1', course_store.get_german_level_lessons('a1')[0]['slug'])
+result['first_lesson'] = (time.perf_counter() - started, rss_mb() - rss)
+started = time.perf_counter()
+course_store.get_logic_course()
+result['logic_home'] = (time.perf_counter() - started, rss_mb() - rss)
+started = time.perf_counter()
+course_store.warm_course_data()
+result['everything'] = (time.perf_counter() - started, rss_mb() - rss)
+print(json.dumps(result))
+"""
+STEPS = (
+    ('first_lesson', 'first German lesson'),
+    ('logic_home', '+ logic course'),
+    ('everything', '+ all course content'),
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure, in fresh processes, the time and memory the first course page requests cost "
+        "when built from the Python modules against loading the compiled course data."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=3, help='Processes per mode (best time is reported).')
+
+    def _probe(self, directory):
+        env = dict(os.environ, COURSE_DATA_DIR=directory, COURSE_DATA_WARMUP='')
+        env.setdefault('DJANGO_SETTINGS_MODULE', os.environ.get('DJANGO_SETTINGS_MODULE', 'hafifayaklar.settings'))
+        output = subprocess.run(
+            [sys.executable, '-c', PROBE],
+            cwd=settings.BASE_DIR,
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout
+        return json.loads(output.strip().splitlines()[-1])
+
+    def handle(self, *args, **options):
+        with tempfile.TemporaryDirectory() as scratch:
+            directory = course_store._compiled_directory()
+            if directory is None:
+                directory = scratch
+                course_store.compile_course_data(directory)
+                self.stdout.write(f"No current compile in COURSE_DATA_DIR; compiled into {directory}.")
+
+            results = {}
+            for mode, mode_directory in (('modules', ''), ('compiled', directory)):
+                runs = [self._probe(mode_directory) for _ in range(max(1, options['repeat']))]
+                results[mode] = {
+                    step: (min(run[step][0] for run in runs), min(run[step][1] for run in runs))
+                    for step, _ in STEPS
+                }
+
+        self.stdout.write(f"{'':>22}  {'modules':>20}  {'compiled':>20}")
+        for step, label in STEPS:
+            cells = [
+                f"{results[mode][step][0] * 1000:8.1f} ms {results[mode][step][1]:+6.1f} MB"
+                for mode in ('modules', 'compiled')
+            ]
+            self.stdout.write(f"{label:>22}  {cells[0]:>20}  {cells[1]:>20}")
+        totals = [
+            sum(results[mode][step][0] for step, _ in STEPS) * 1000
+            for mode in ('modules', 'compiled')
+        ]
+        self.stdout.write(f"{'total':>22}  {totals[0]:8.1f} ms{'':>10}  {totals[1]:8.1f} ms")
+        self.stdout.write("Times are per step; memory is the resident size growth so far.")
@@ -0,0 +1,116 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.diagram_markup import (
+    MAX_EDGES,
+    MAX_FREE_ARROWS,
+    MAX_GROUPS,
+    MAX_NODES,
+    MAX_REGIONS,
+    decode_diagram_payload,
+    encode_diagram_payload,
+    render_diagram_html,
+)
+
+
+def build_max_diagram_payload(seed=0):
+    """A diagram at every size limit: boxes on a grid, overlapping sets, regions and anchored arrows."""
+    rng = random.Random(seed)
+    set_pairs = 10
+    grid_count = MAX_NODES - (set_pairs * 2)
+    nodes = []
+    for index in range(grid_count):
+        column, row = index % 10, index // 10
+        nodes.append({
+            "id": f"n{index}",
+            "label": f"Adım {index} " + "uzun etiket " * rng.randrange(4),
+            "shape": rng.choice(["process", "decision", "terminal", "document", "data"]),
+            "x": 300 + column * 740 + rng.randrange(-60, 60),
+            "y": 260 + row * 560 + rng.randrange(-60, 60),
+        })
+    for pair in range(set_pairs):
+        x = 700 + pair * 680
+        nodes.append({"id": f"s{pair}a", "label": f"A{pair}", "shape": "set", "x": x, "y": 4300, "width": 420, "height": 320})
+        nodes.append({"id": f"s{pair}b", "label": f"B{pair}", "shape": "set", "x": x + 200, "y": 4420, "width": 420, "height": 320})
+
+    edges = []
+    pairs = set()
+    while len(edges) < MAX_EDGES:
+        source, target = rng.randrange(grid_count), rng.randrange(grid_count)
+        if source == target or (source, target) in pairs:
+            continue
+        pairs.add((source, target))
+        edges.append({
+            "from": f"n{source}",
+            "to": f"n{target}",
+            "label": f"e{len(edges)}" if len(edges) % 3 == 0 else "",
+            "route": "auto" if len(edges) % 5 else "curve",
+        })
+
+    groups = [
+        {"id": f"g{index}", "label": f"Grup {index}", "node_ids": [f"n{index}", f"n{index + 32}"]}
+        for index in range(MAX_GROUPS)
+        if index + 32 < grid_count
+    ]
+    operations = ["intersection", "union", "difference", "intersection"]
+    regions = [
+        {
+            "id": f"r{index}",
+            "label": f"Bölge {index}",
+            "operation": operations[index // set_pairs],
+            "node_ids": [f"s{index % set_pairs}a", f"s{index % set_pairs}b"],
+        }
+        for index in range(MAX_REGIONS)
+    ]
+    arrows = [
+        {
+            "id": f"a{index}",
+            "start_x": 100,
+            "start_y": 100,
+            "end_x": 900,
+            "end_y": 500,
+            "start_anchor": f"r:r{index % MAX_REGIONS}",
+            "end_anchor": f"n:n{rng.randrange(grid_count)}",
+            "route": rng.choice(["straight", "curve", "orthogonal"]),
+        }
+        for index in range(MAX_FREE_ARROWS)
+    ]
+    return {
+        "uid": f"benchmark-{seed}",
+        "title": "Sınır diyagramı",
+        "nodes": nodes,
+        "edges": edges,
+        "groups": groups,
+        "regions": regions,
+        "arrows": arrows,
+    }
+
+
+class Command(BaseCommand):
+    help = "Time rendering diagrams at the MAX_NODES/MAX_EDGES/MAX_REGIONS/MAX_FREE_ARROWS limits, cold and cached."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--diagrams', type=int, default=5, help='How many random max-size diagrams to render.')
+        parser.add_argument('--repeat', type=int, default=3, help='Timed rounds per mode (best one is reported).')
+
+    def handle(self, *args, **options):
+        encoded = [encode_diagram_payload(build_max_diagram_payload(seed)) for seed in range(options['diagrams'])]
+        payloads = [decode_diagram_payload(value) for value in encoded]
+
+        results = {}
+        for name, use_cache in (('cold', False), ('cached', True)):
+            best = None
+            for _ in range(max(1, options['repeat'])):
+                started = time.perf_counter()
+                for payload, encoded_payload in zip(payloads, encoded):
+                    render_diagram_html(payload, encoded_payload, use_cache=use_cache)
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            results[name] = best
+
+        total_chars = sum(len(render_diagram_html(payload, value)) for payload, value in zip(payloads, encoded))
+        self.stdout.write(f"{len(encoded)} diagrams, {total_chars} characters of SVG")
+        for name, elapsed in results.items():
+            self.stdout.write(f"{name:>8}: {elapsed * 1000 / len(encoded):9.2f} ms per diagram")
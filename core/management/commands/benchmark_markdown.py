@@ -0,0 +1,71 @@
+import time
+from unittest import mock
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from django.db.models.functions import Length
+from markdownify.templatetags.markdownify import markdownify
+
+from core.models import Answer
+from core.templatetags import custom_tags
+
+
+class PerCallMarkdownify:
+    """Stands in for the engine the way safe_markdownify used to render: a fresh setup per call."""
+
+    def __init__(self, settings_name):
+        self.settings_name = settings_name
+
+    def convert(self, text):
+        return str(markdownify(text, self.settings_name))
+
+
+class Command(BaseCommand):
+    help = (
+        "Time safe_markdownify on the longest answers with math or hashtags, rendering through "
+        "the long-lived Markdown engine against a fresh django-markdownify setup per call."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--answers', type=int, default=50, help='How many of the longest matching answers to use.')
+        parser.add_argument('--repeat', type=int, default=5, help='Timed rounds per renderer (best one is reported).')
+
+    def handle(self, *args, **options):
+        texts = list(
+            Answer.objects.filter(Q(answer_text__contains='$') | Q(answer_text__contains='#'))
+            .annotate(text_length=Length('answer_text'))
+            .order_by('-text_length')
+            .values_list('answer_text', flat=True)[:options['answers']]
+        )
+        if not texts:
+            self.stdout.write("No answers with math or hashtags to benchmark.")
+            return
+
+        def render_all():
+            return [str(custom_tags.safe_markdownify(text, "default")) for text in texts]
+
+        renderers = (
+            ('per call', mock.patch.object(custom_tags, 'get_markdown_engine', PerCallMarkdownify)),
+            ('engine', mock.patch.object(custom_tags, 'get_markdown_engine', custom_tags.get_markdown_engine)),
+        )
+        results = {}
+        outputs = {}
+        for name, patch in renderers:
+            with patch:
+                outputs[name] = render_all()
+                best = None
+                for _ in range(max(1, options['repeat'])):
+                    started = time.perf_counter()
+                    render_all()
+                    elapsed = time.perf_counter() - started
+                    best = elapsed if best is None else min(best, elapsed)
+            results[name] = best
+
+        mismatches = sum(old != new for old, new in zip(outputs['per call'], outputs['engine']))
+        total_chars = sum(len(text) for text in texts)
+        self.stdout.write(f"{len(texts)} answers, {total_chars} characters of source")
+        for name, elapsed in results.items():
+            self.stdout.write(f"{name:>9}: {elapsed * 1000 / len(texts):9.3f} ms per answer")
+        if results['engine']:
+            self.stdout.write(f"{'speedup':>9}: {results['per call'] / results['engine']:9.2f}x")
+        self.stdout.write(f"{mismatches} answers render differently.")
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.course_store import compile_course_data
+
+
+class Command(BaseCommand):
+    help = "Compile the German and logic course modules into the JSON files the course pages load."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='Directory to write to (default: COURSE_DATA_DIR).',
+        )
+
+    def handle(self, *args, **options):
+        directory = options['output'] or settings.COURSE_DATA_DIR
+        if not directory:
+            raise CommandError("Set COURSE_DATA_DIR or pass --output.")
+        total = compile_course_data(directory)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {total} course data files to {directory}."))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.notification_outbox import drain
+
+
+class Command(BaseCommand):
+    help = "Deliver queued answer notifications from the notification outbox."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--limit', type=int, default=None, help="Deliver at most this many events per pass.")
+        parser.add_argument('--loop', action='store_true', help="Keep draining until interrupted.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to sleep between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            events, notifications = drain(limit=options['limit'])
+            if events or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Delivered {events} outbox events as {notifications} notifications."
+                ))
+            if not options['loop']:
+                break
+            if not events:
+                time.sleep(options['interval'])
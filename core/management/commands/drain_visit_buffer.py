@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from core.visit_buffer import request_drain, visit_buffer
+
+
+class Command(BaseCommand):
+    help = "Ask every server process to write its buffered visit events now."
+
+    def handle(self, *args, **options):
+        request_drain()
+        flushed = visit_buffer.flush()
+        self.stdout.write(self.style.SUCCESS(
+            f"Drain requested; running processes flush within a second. Wrote {flushed} local events."
+        ))
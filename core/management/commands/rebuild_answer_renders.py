@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from core.answer_render_store import ANSWER_RENDER_VERSION, store_answer_render
+from core.models import Answer, AnswerRenderedContent
+
+
+class Command(BaseCommand):
+    help = "Render every answer into the stored HTML table (AnswerRenderedContent)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--purge',
+            action='store_true',
+            help='Delete all stored renders before rebuilding.',
+        )
+
+    def handle(self, *args, **options):
+        if options['purge']:
+            deleted, _ = AnswerRenderedContent.objects.all().delete()
+            self.stdout.write(f"Deleted {deleted} stored render rows.")
+        else:
+            deleted, _ = AnswerRenderedContent.objects.exclude(
+                renderer_version=ANSWER_RENDER_VERSION
+            ).delete()
+            if deleted:
+                self.stdout.write(f"Deleted {deleted} outdated render rows.")
+
+        stored = 0
+        for answer in Answer.objects.only('id', 'answer_text').iterator(chunk_size=200):
+            if store_answer_render(answer) is not None:
+                stored += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Stored {stored} answer renders."))
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.question_activity import rebuild_question_activity
+
+
+class Command(BaseCommand):
+    help = "Recompute the stored answers_count, last_answer_at and activity_at columns of every question."
+
+    def handle(self, *args, **options):
+        updated = rebuild_question_activity()
+        self.stdout.write(self.style.SUCCESS(f"Updated activity columns for {updated} questions."))
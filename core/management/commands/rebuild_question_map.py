@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from core.question_map_snapshot import rebuild_question_map_snapshot
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored question-map snapshot from the database."
+
+    def handle(self, *args, **options):
+        snapshot = rebuild_question_map_snapshot()
+        self.stdout.write(self.style.SUCCESS(f"Question map snapshot rebuilt (version {snapshot.version})."))
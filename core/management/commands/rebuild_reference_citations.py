@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from core.models import Answer
+from core.utils import sync_answer_reference_citations
+
+
+class Command(BaseCommand):
+    help = "Re-read reference citations (kaynak/k) from every answer into AnswerReferenceCitation."
+
+    def handle(self, *args, **options):
+        changed = 0
+        answers = Answer.objects.only('id', 'answer_text').order_by('id')
+        for answer in answers.iterator(chunk_size=500):
+            if sync_answer_reference_citations(answer):
+                changed += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Updated reference citations for {changed} answers."))
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from core.search_index import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search documents for questions, answers and users."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=500,
+            help='Rows read and written per batch.',
+        )
+
+    def handle(self, *args, **options):
+        total = rebuild_search_index(chunk_size=options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f"Indexed {total} search documents."))
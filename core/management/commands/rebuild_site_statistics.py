@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.utils.timezone import now
+
+from core.site_statistics import rebuild_site_statistics
+
+
+class Command(BaseCommand):
+    help = "Recount the site statistics rollups (word counts, entry totals, saves, votes, visitor days)."
+
+    def handle(self, *args, **options):
+        totals = rebuild_site_statistics(today=now().date())
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt site statistics: {totals['questions']} questions, {totals['answers']} answers, "
+            f"{totals['words']} words."
+        ))
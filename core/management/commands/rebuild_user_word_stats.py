@@ -0,0 +1,28 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+
+from core.user_word_stats import rebuild_user_word_stats
+
+
+class Command(BaseCommand):
+    help = "Recount the profile word statistics (UserWordCount/UserTextStats)."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            action='append',
+            dest='usernames',
+            help='Only rebuild these usernames (repeatable).',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('id')
+        if options['usernames']:
+            users = users.filter(username__in=options['usernames'])
+
+        rebuilt = 0
+        for user in users.iterator(chunk_size=200):
+            rebuild_user_word_stats(user)
+            rebuilt += 1
+
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt word statistics for {rebuilt} users."))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from core.vote_counts import reconcile_vote_counts
+
+
+class Command(BaseCommand):
+    help = "Recount upvotes/downvotes of questions and answers from Vote and fix any drift."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help="Only report how many rows drifted.")
+
+    def handle(self, *args, **options):
+        fixed = reconcile_vote_counts(dry_run=options['dry_run'])
+        verb = "Would fix" if options['dry_run'] else "Fixed"
+        for label, count in fixed.items():
+            self.stdout.write(self.style.SUCCESS(f"{verb} {count} {label} rows."))
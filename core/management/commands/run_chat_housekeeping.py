@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from core.chat_fanout import prune_online_chat
+from core.radio_utils import expire_live_programs
+
+
+class Command(BaseCommand):
+    help = "Close radio programs past their end time and prune old online chat messages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running until interrupted.")
+        parser.add_argument('--interval', type=float, default=60.0, help="Seconds to sleep between passes with --loop.")
+
+    def handle(self, *args, **options):
+        while True:
+            expired = expire_live_programs()
+            pruned = prune_online_chat()
+            if expired or pruned or not options['loop']:
+                self.stdout.write(self.style.SUCCESS(
+                    f"Expired {expired} radio programs, pruned {pruned} online chat messages."
+                ))
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,85 @@
+import multiprocessing
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+import django
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.export_jobs import build_export_job, claim_next_job, prune_export_jobs
+
+PRUNE_EVERY_SECONDS = 60 * 60
+
+
+class Command(BaseCommand):
+    help = "Build queued DOCX/PDF/paper entry exports in a local process pool."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=2, help="Worker processes; 0 builds in this process.")
+        parser.add_argument('--once', action='store_true', help="Exit once no job is pending.")
+        parser.add_argument('--interval', type=float, default=2.0, help="Seconds to wait between polls when idle.")
+
+    def handle(self, *args, **options):
+        self.last_prune = None
+        if options['processes'] <= 0:
+            self.run_inline(options)
+        else:
+            self.run_pool(options)
+
+    def prune_if_due(self):
+        """Drop replaced and expired artifacts at start and then hourly, while idle."""
+        now = time.monotonic()
+        if self.last_prune is not None and now - self.last_prune < PRUNE_EVERY_SECONDS:
+            return
+        self.last_prune = now
+        pruned = prune_export_jobs()
+        if pruned:
+            self.stdout.write(f"Pruned {pruned} old export jobs.")
+
+    def report(self, job_id, status):
+        style = self.style.SUCCESS if status == 'done' else self.style.ERROR
+        self.stdout.write(style(f"Export job {job_id}: {status}."))
+
+    def run_inline(self, options):
+        while True:
+            job_id = claim_next_job()
+            if job_id is None:
+                self.prune_if_due()
+                if options['once']:
+                    return
+                time.sleep(options['interval'])
+                continue
+            self.report(job_id, build_export_job(job_id))
+
+    def run_pool(self, options):
+        processes = options['processes']
+        # Children open their own connections.
+        connections.close_all()
+        with ProcessPoolExecutor(
+            max_workers=processes,
+            mp_context=multiprocessing.get_context('spawn'),
+            initializer=django.setup,
+        ) as pool:
+            running = {}
+            while True:
+                while len(running) < processes:
+                    job_id = claim_next_job()
+                    if job_id is None:
+                        break
+                    running[pool.submit(build_export_job, job_id)] = job_id
+
+                if not running:
+                    self.prune_if_due()
+                    if options['once']:
+                        return
+                    time.sleep(options['interval'])
+                    continue
+
+                finished, _ = wait(running, timeout=options['interval'], return_when=FIRST_COMPLETED)
+                for future in finished:
+                    job_id = running.pop(future)
+                    try:
+                        status = future.result()
+                    except Exception as exc:
+                        status = f'failed ({exc})'
+                    self.report(job_id, status)
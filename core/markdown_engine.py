@@ -0,0 +1,83 @@
+"""
+Long-lived Markdown + bleach pipeline behind `safe_markdownify`.
+
+django-markdownify's filter builds a new `markdown.Markdown` (loading every
+extension) and a new bleach Cleaner with its CSS sanitizer and linkify
+filter for every call. `MarkdownEngine` builds both once from the same
+MARKDOWNIFY settings and resets the Markdown instance between documents,
+so the output is the same as the filter's.
+
+Neither object is thread-safe; `get_markdown_engine` keeps one engine per
+settings name per thread.
+"""
+
+import threading
+from functools import partial
+
+import bleach
+import markdown
+from bleach import css_sanitizer
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+
+
+_local = threading.local()
+
+
+class MarkdownEngine:
+    def __init__(self, settings_name='default'):
+        try:
+            options = settings.MARKDOWNIFY[settings_name]
+        except (AttributeError, KeyError):
+            options = {}
+
+        self.markdown = markdown.Markdown(
+            extensions=options.get('MARKDOWN_EXTENSIONS', []),
+            extension_configs=options.get('MARKDOWN_EXTENSION_CONFIGS', {}),
+        )
+
+        self.cleaner = None
+        if options.get('BLEACH', True):
+            linkify = None
+            linkify_text = options.get('LINKIFY_TEXT', {'PARSE_URLS': True})
+            if linkify_text.get('PARSE_URLS'):
+                linkify = [partial(
+                    bleach.linkifier.LinkifyFilter,
+                    callbacks=linkify_text.get('CALLBACKS', []),
+                    skip_tags=linkify_text.get('SKIP_TAGS', []),
+                    parse_email=linkify_text.get('PARSE_EMAIL', False),
+                )]
+            self.cleaner = bleach.Cleaner(
+                tags=options.get('WHITELIST_TAGS', bleach.sanitizer.ALLOWED_TAGS),
+                attributes=options.get('WHITELIST_ATTRS', bleach.sanitizer.ALLOWED_ATTRIBUTES),
+                css_sanitizer=css_sanitizer.CSSSanitizer(
+                    allowed_css_properties=options.get('WHITELIST_STYLES', css_sanitizer.ALLOWED_CSS_PROPERTIES),
+                ),
+                protocols=options.get('WHITELIST_PROTOCOLS', bleach.sanitizer.ALLOWED_PROTOCOLS),
+                strip=options.get('STRIP', True),
+                filters=linkify,
+            )
+
+    def convert(self, text):
+        """Markdown to sanitized HTML, like `markdownify(text, settings_name)`."""
+        html = self.markdown.reset().convert(text or '')
+        if self.cleaner is not None:
+            html = self.cleaner.clean(html)
+        return html
+
+
+@receiver(setting_changed)
+def reset_markdown_engines(setting, **kwargs):
+    if setting == 'MARKDOWNIFY':
+        _local.engines = {}
+
+
+def get_markdown_engine(settings_name='default'):
+    engines = getattr(_local, 'engines', None)
+    if engines is None:
+        engines = _local.engines = {}
+    engine = engines.get(settings_name)
+    if engine is None:
+        engine = engines[settings_name] = MarkdownEngine(settings_name)
+    return engine
@@ -3,6 +3,7 @@ from __future__ import annotations
 import hashlib
 import ipaddress
 import time
+import uuid
 from datetime import timedelta
 
 from django.conf import settings
@@ -13,6 +14,7 @@ from django.shortcuts import render
 from django.utils import timezone
 
 from .models import DailyVisitor, UserProfile, VisitSession
+from .visit_buffer import visit_buffer
 
 
 class ServerTimingMiddleware:
@@ -87,6 +89,8 @@ class LastSeenMiddleware:
     Notes:
     - This is not "last_login". It updates while the user is browsing the site.
     - Updates are throttled to avoid a DB write on every request.
+    - With VISIT_TRACKING_BUFFERED, visitor/visit/last-seen writes go through
+      core.visit_buffer and are flushed in batches by its background thread.
     """
 
     VISITOR_COOKIE_KEY = "_daily_visitor_seen"
@@ -191,6 +195,9 @@ class LastSeenMiddleware:
             return
 
         now = timezone.now()
+        if self._buffered():
+            visit_buffer.record_last_seen(user.id, now)
+            return
         try:
             updated = UserProfile.objects.filter(user_id=user.id).update(last_seen=now)
             if updated == 0:
@@ -208,8 +215,10 @@ class LastSeenMiddleware:
         if request.COOKIES.get(self.VISITOR_COOKIE_KEY) == today_marker:
             return None
 
-        visitor_hash = self._build_daily_visitor_hash(request, today)
-        if visitor_hash:
+        visitor_hash = self._visitor_hash(request, today)
+        if visitor_hash and self._buffered():
+            visit_buffer.record_daily_visitor(today, visitor_hash)
+        elif visitor_hash:
             try:
                 DailyVisitor.objects.get_or_create(date=today, visitor_hash=visitor_hash)
             except DatabaseError:
@@ -223,7 +232,7 @@ class LastSeenMiddleware:
 
         current_time = timezone.now()
         today = timezone.localdate()
-        visitor_hash = self._build_daily_visitor_hash(request, today) or ""
+        visitor_hash = self._visitor_hash(request, today) or ""
         visit_token = (request.COOKIES.get(self.VISIT_COOKIE_KEY) or "").strip()
         user = getattr(request, "user", None)
         user_id = user.id if user and user.is_authenticated else None
@@ -232,6 +241,9 @@ class LastSeenMiddleware:
         if throttle_key and cache.get(throttle_key):
             return None
 
+        if self._buffered():
+            return self._track_buffered_visit(visit_token, visitor_hash, user_id, today)
+
         active_visit = None
 
         if visit_token:
@@ -291,6 +303,49 @@ class LastSeenMiddleware:
         )
         return str(new_visit.visit_token)
 
+    def _track_buffered_visit(self, visit_token, visitor_hash, user_id, today):
+        """
+        Same decision as the database path, made from the cache: a visit stays
+        active while its token was seen within VISIT_INACTIVITY_DELTA today.
+        """
+        day_marker = today.isoformat()
+        active_token = None
+        if visit_token and cache.get(f"visit-active:{visit_token}") == day_marker:
+            active_token = visit_token
+        elif visitor_hash:
+            active_token = cache.get(f"visit-visitor:{day_marker}:{visitor_hash}")
+
+        if active_token:
+            visit_buffer.record_visit_touch(active_token, user_id)
+        else:
+            active_token = str(uuid.uuid4())
+            visit_buffer.record_new_visit(active_token, today, visitor_hash, user_id)
+
+        inactivity_seconds = int(self.VISIT_INACTIVITY_DELTA.total_seconds())
+        markers = {f"visit-active:{active_token}": day_marker}
+        if visitor_hash:
+            markers[f"visit-visitor:{day_marker}:{visitor_hash}"] = active_token
+        cache.set_many(markers, inactivity_seconds)
+        cache.set(
+            f"visit-session:{active_token}:{user_id or 0}",
+            True,
+            int(self.THROTTLE_DELTA.total_seconds()),
+        )
+        return active_token if active_token != visit_token else None
+
+    @staticmethod
+    def _buffered():
+        return getattr(settings, "VISIT_TRACKING_BUFFERED", False)
+
+    @staticmethod
+    def _visitor_hash(request, day):
+        """`_build_daily_visitor_hash`, computed at most once per request."""
+        cached = getattr(request, "_daily_visitor_hash", None)
+        if cached is None or cached[0] != day:
+            cached = (day, LastSeenMiddleware._build_daily_visitor_hash(request, day))
+            request._daily_visitor_hash = cached
+        return cached[1]
+
     @staticmethod
     def _should_track_unique_visitor(request):
         """
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0058_notification_related_suggestion_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerRenderedContent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_digest', models.CharField(max_length=64)),
+                ('renderer_version', models.CharField(max_length=16)),
+                ('full_html', models.TextField()),
+                ('summary_html', models.TextField(blank=True, default='')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rendered_contents', to='core.answer')),
+                ('revision', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='rendered_content', to='core.answerrevision')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AnswerRenderedLink',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('definition', 'Definition'), ('reference', 'Reference'), ('question', 'Question'), ('user', 'User')], max_length=12)),
+                ('key', models.CharField(max_length=255)),
+                ('rendered', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='links', to='core.answerrenderedcontent')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'key'], name='core_answer_kind_becd44_idx')],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='answerrenderedcontent',
+            index=models.Index(fields=['answer', 'renderer_version'], name='core_answer_answer__c4f9b9_idx'),
+        ),
+    ]
@@ -0,0 +1,135 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:09
+
+import unicodedata
+
+from django.conf import settings
+from django.db import OperationalError, migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of core.search_index.fold_search_text as of this migration.
+_TURKISH_I_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+
+
+def fold_search_text(text):
+    text = unicodedata.normalize('NFKC', text or '').translate(_TURKISH_I_FOLD).casefold()
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+SQLITE_FTS_SQL = [
+    """
+    CREATE VIRTUAL TABLE core_searchdocument_fts USING fts5(
+        body, content='core_searchdocument', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ai AFTER INSERT ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_ad AFTER DELETE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+    END
+    """,
+    """
+    CREATE TRIGGER core_searchdocument_fts_au AFTER UPDATE ON core_searchdocument BEGIN
+        INSERT INTO core_searchdocument_fts(core_searchdocument_fts, rowid, body)
+        VALUES ('delete', old.id, old.body);
+        INSERT INTO core_searchdocument_fts(rowid, body) VALUES (new.id, new.body);
+    END
+    """,
+]
+
+# Must stay identical to the expression SearchVector('body', config='simple')
+# compiles to, otherwise the planner will not use the index.
+POSTGRESQL_GIN_SQL = (
+    "CREATE INDEX core_searchdocument_body_gin ON core_searchdocument "
+    "USING GIN (to_tsvector('simple'::regconfig, COALESCE(body, '')))"
+)
+
+
+def create_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(POSTGRESQL_GIN_SQL)
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(SQLITE_FTS_SQL[0])
+        except OperationalError:
+            # SQLite built without FTS5: search falls back to substring matching.
+            return
+        for statement in SQLITE_FTS_SQL[1:]:
+            schema_editor.execute(statement)
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX IF EXISTS core_searchdocument_body_gin')
+    elif vendor == 'sqlite':
+        for trigger in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS core_searchdocument_fts_{trigger}')
+        schema_editor.execute('DROP TABLE IF EXISTS core_searchdocument_fts')
+
+
+def populate_search_documents(apps, schema_editor):
+    SearchDocument = apps.get_model('core', 'SearchDocument')
+    Question = apps.get_model('core', 'Question')
+    Answer = apps.get_model('core', 'Answer')
+    User = apps.get_model(settings.AUTH_USER_MODEL)
+
+    sources = [
+        ('question', Question.objects.values_list('id', 'user_id', 'question_text', 'created_at')),
+        ('answer', Answer.objects.values_list('id', 'user_id', 'answer_text', 'created_at')),
+        ('user', User.objects.values_list('id', 'id', 'username', 'date_joined')),
+    ]
+    for kind, rows in sources:
+        batch = []
+        for object_id, user_id, text, created_at in rows.order_by('id').iterator(chunk_size=500):
+            batch.append(SearchDocument(
+                kind=kind,
+                object_id=object_id,
+                user_id=user_id,
+                body=fold_search_text(text),
+                created_at=created_at,
+            ))
+            if len(batch) >= 500:
+                SearchDocument.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0059_answerrenderedcontent'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchDocument',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('question', 'Question'), ('answer', 'Answer'), ('user', 'User')], max_length=12)),
+                ('object_id', models.PositiveIntegerField()),
+                ('body', models.TextField()),
+                ('created_at', models.DateTimeField()),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_documents', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['kind', 'created_at'], name='core_search_kind_b44d75_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='searchdocument',
+            constraint=models.UniqueConstraint(fields=('kind', 'object_id'), name='unique_search_document'),
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+        migrations.RunPython(populate_search_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0061_questionmapsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserTextStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('total_words', models.PositiveIntegerField(default=0)),
+                ('total_chars', models.PositiveIntegerField(default=0)),
+                ('total_entries', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='text_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserWordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=255)),
+                ('count', models.PositiveIntegerField(default=0)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='word_counts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-count'], name='core_userwo_user_id_dde229_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='userwordcount',
+            constraint=models.UniqueConstraint(fields=('user', 'word'), name='unique_user_word_count'),
+        ),
+    ]
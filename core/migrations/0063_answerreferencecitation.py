@@ -0,0 +1,75 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:21
+
+import re
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+# Frozen copy of the core.utils citation parser as of this migration.
+REFERENCE_CITATION_PATTERN = re.compile(
+    r'\((?:kaynak|k)\s*:\s*(?P<reference_id>\d+)'
+    r'(?:(?:\s*,?\s*(?:sayfa|s)\s*:\s*(?P<page>[^)]+)))?\)',
+    re.IGNORECASE,
+)
+REFERENCE_CITATION_PAGE_MAX_LENGTH = 255
+MAX_OBJECT_ID = 2 ** 63 - 1
+
+
+def extract_reference_citations(text):
+    citations = []
+    for match in REFERENCE_CITATION_PATTERN.finditer(text or ''):
+        reference_id = int(match.group('reference_id'))
+        if reference_id > MAX_OBJECT_ID:
+            continue
+        citations.append({
+            'reference_id': reference_id,
+            'page': (match.group('page') or '').strip(),
+        })
+    return citations
+
+
+def populate_reference_citations(apps, schema_editor):
+    Answer = apps.get_model('core', 'Answer')
+    AnswerReferenceCitation = apps.get_model('core', 'AnswerReferenceCitation')
+
+    rows = Answer.objects.filter(answer_text__icontains='(k').values_list('id', 'answer_text')
+    batch = []
+    for answer_id, text in rows.order_by('id').iterator(chunk_size=500):
+        for position, citation in enumerate(extract_reference_citations(text)):
+            batch.append(AnswerReferenceCitation(
+                answer_id=answer_id,
+                reference_id=citation['reference_id'],
+                page=citation['page'][:REFERENCE_CITATION_PAGE_MAX_LENGTH],
+                position=position,
+            ))
+        if len(batch) >= 500:
+            AnswerReferenceCitation.objects.bulk_create(batch)
+            batch = []
+    if batch:
+        AnswerReferenceCitation.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0062_usertextstats_userwordcount'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerReferenceCitation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('page', models.CharField(blank=True, default='', max_length=255)),
+                ('position', models.PositiveIntegerField(default=0)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reference_citations', to='core.answer')),
+                ('reference', models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='citations', to='core.reference')),
+            ],
+            options={
+                'ordering': ['answer_id', 'position'],
+                'indexes': [models.Index(fields=['reference', 'answer'], name='core_answer_referen_f0e929_idx')],
+            },
+        ),
+        migrations.RunPython(populate_reference_citations, migrations.RunPython.noop),
+    ]
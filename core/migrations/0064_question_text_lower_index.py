@@ -0,0 +1,24 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:31
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('core', '0063_answerreferencecitation'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(django.db.models.functions.text.Lower('question_text'), name='core_question_text_lower_idx'),
+        ),
+        # auth.User belongs to another app, so its index is created here by hand.
+        migrations.RunSQL(
+            'CREATE INDEX IF NOT EXISTS core_auth_user_username_lower_idx ON auth_user (LOWER(username))',
+            'DROP INDEX IF EXISTS core_auth_user_username_lower_idx',
+        ),
+    ]
@@ -0,0 +1,50 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:41
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, Max, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce, Greatest
+import django.utils.timezone
+
+
+def populate_question_activity(apps, schema_editor):
+    Answer = apps.get_model('core', 'Answer')
+    Question = apps.get_model('core', 'Question')
+    answers = Answer.objects.filter(question_id=OuterRef('pk')).order_by().values('question_id')
+    Question.objects.update(
+        answers_count=Coalesce(
+            Subquery(answers.annotate(total=Count('id')).values('total')[:1], output_field=IntegerField()),
+            Value(0),
+        ),
+        last_answer_at=Subquery(answers.annotate(latest=Max('created_at')).values('latest')[:1]),
+    )
+    Question.objects.update(activity_at=Greatest('created_at', Coalesce('last_answer_at', 'created_at')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0064_question_text_lower_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='question',
+            name='activity_at',
+            field=models.DateTimeField(default=django.utils.timezone.now, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='answers_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='question',
+            name='last_answer_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-activity_at', '-id'], name='core_question_activity_idx'),
+        ),
+        migrations.RunPython(populate_question_activity, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,99 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:49
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('core', '0065_question_activity_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ContentSaveCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('object_id', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='DailyVisitorCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('unique_visitors', models.PositiveIntegerField(default=0)),
+                ('visit_sessions', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SiteStatistic',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=32, unique=True)),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='SiteWordCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('word', models.CharField(max_length=255, unique=True)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='UserEntryStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_count', models.PositiveIntegerField(default=0)),
+                ('answer_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='answer',
+            index=models.Index(fields=['-upvotes'], name='core_answer_upvotes_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='question',
+            index=models.Index(fields=['-upvotes'], name='core_question_upvotes_idx'),
+        ),
+        migrations.AddField(
+            model_name='userentrystats',
+            name='user',
+            field=models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='entry_stats', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='sitewordcount',
+            index=models.Index(fields=['-count', 'word'], name='core_sitewo_count_365754_idx'),
+        ),
+        migrations.AddField(
+            model_name='contentsavecount',
+            name='content_type',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype'),
+        ),
+        migrations.AddIndex(
+            model_name='userentrystats',
+            index=models.Index(fields=['-question_count'], name='core_useren_questio_40db3e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userentrystats',
+            index=models.Index(fields=['-answer_count'], name='core_useren_answer__df0576_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='contentsavecount',
+            index=models.Index(fields=['content_type', '-count'], name='core_conten_content_a15362_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='contentsavecount',
+            constraint=models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_content_save_count'),
+        ),
+    ]
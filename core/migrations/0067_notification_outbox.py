@@ -0,0 +1,26 @@
+# Generated by Django 4.2.2 on 2026-10-18 10:57
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0066_site_statistics_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationOutbox',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event', models.CharField(choices=[('answer_created', 'Answer Created'), ('answer_updated', 'Answer Updated'), ('answer_mentions', 'Answer Mentions')], max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.answer')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 4.2.2 on 2026-10-18 11:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0068_export_job'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerRevisionSummary',
+            fields=[
+                ('answer', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='revision_summary', serialize=False, to='core.answer')),
+                ('current_revision_no', models.PositiveIntegerField(default=0)),
+                ('revision_count', models.PositiveIntegerField(default=0)),
+                ('open_suggestion_count', models.PositiveIntegerField(default=0)),
+                ('last_revision_actor', models.CharField(blank=True, default='', max_length=150)),
+                ('contributors', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('current_revision', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='core.answerrevision')),
+            ],
+        ),
+    ]
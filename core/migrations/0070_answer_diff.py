@@ -0,0 +1,34 @@
+# Generated by Django 4.2.2 on 2026-10-18 11:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0069_answer_revision_summary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnswerDiff',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('old_digest', models.CharField(max_length=64)),
+                ('new_digest', models.CharField(max_length=64)),
+                ('engine_version', models.CharField(max_length=16)),
+                ('before_html', models.TextField()),
+                ('after_html', models.TextField()),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('removed', models.PositiveIntegerField(default=0)),
+                ('degraded', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('answer', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='stored_diffs', to='core.answer')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='answerdiff',
+            constraint=models.UniqueConstraint(fields=('answer', 'old_digest', 'new_digest', 'engine_version'), name='unique_answer_diff_pair'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 4.2.2 on 2026-10-18 12:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0070_answer_diff'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reference',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+    ]
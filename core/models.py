@@ -1,4 +1,5 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import User
 import os
 import uuid
@@ -228,6 +229,10 @@ class Question(models.Model):
     )
     upvotes = models.IntegerField(default=0)
     downvotes = models.IntegerField(default=0)
+    # Kept by core.question_activity from the Answer save/delete hooks.
+    answers_count = models.PositiveIntegerField(default=0, editable=False)
+    last_answer_at = models.DateTimeField(null=True, blank=True, editable=False)
+    activity_at = models.DateTimeField(default=timezone.now, editable=False)
 
     def clean(self):
         from django.core.exceptions import ValidationError
@@ -269,17 +274,11 @@ class Question(models.Model):
     def get_subquestions(self):
         return self.subquestions.all()
 
-    def get_total_subquestions_count(self, visited=None):
-        if visited is None:
-            visited = set()
-        if self.id in visited:
-            return 0
-        visited.add(self.id)
-        count = 0
-        for subquestion in self.subquestions.all():
-            count += 1  # Doğrudan alt soruyu say
-            count += subquestion.get_total_subquestions_count(visited)  # Alt soruların alt sorularını say
-        return count
+    def get_total_subquestions_count(self):
+        """Number of distinct questions below this one (one recursive query)."""
+        from .question_tree import subtree_sizes
+
+        return subtree_sizes([self.id])[self.id]
 
     class Meta:
         ordering = ['created_at']
@@ -287,6 +286,9 @@ class Question(models.Model):
             models.Index(fields=['user', '-created_at']),      # User's questions
             models.Index(fields=['-created_at']),              # Homepage questions list
             models.Index(fields=['question_text']),            # Search queries
+            models.Index(Lower('question_text'), name='core_question_text_lower_idx'),  # (r:...) links
+            models.Index(fields=['-upvotes'], name='core_question_upvotes_idx'),  # Statistics leaderboard
+            models.Index(fields=['-activity_at', '-id'], name='core_question_activity_idx'),  # Left frame feed
         ]
 
 class QuestionRelationship(models.Model):
@@ -333,6 +335,7 @@ class Answer(models.Model):
             models.Index(fields=['question', '-created_at']),  # Question detail page ordering
             models.Index(fields=['user', '-created_at']),      # User profile ordering
             models.Index(fields=['-created_at']),              # Homepage random items
+            models.Index(fields=['-upvotes'], name='core_answer_upvotes_idx'),  # Statistics leaderboard
         ]
 
     def __str__(self):
@@ -505,6 +508,285 @@ class AnswerRevisionApproval(models.Model):
     def __str__(self):
         return f"r{self.revision.revision_no} · {self.user.username} · {self.status}"
 
+
+class AnswerRevisionSummary(models.Model):
+    """
+    Revision metadata shown next to every answer in lists.
+
+    Kept current by core/revision_summary.py whenever a revision, suggestion
+    or approval of the answer changes, so list pages read one row instead of
+    counting revisions and grouping approvals. `contributors` holds
+    `{"approved"|"pending"|"rejected": [[user_id, username], ...]}` for the
+    current revision, owner first.
+    """
+
+    answer = models.OneToOneField('Answer', on_delete=models.CASCADE, primary_key=True, related_name='revision_summary')
+    current_revision = models.ForeignKey('AnswerRevision', on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    current_revision_no = models.PositiveIntegerField(default=0)
+    revision_count = models.PositiveIntegerField(default=0)
+    open_suggestion_count = models.PositiveIntegerField(default=0)
+    last_revision_actor = models.CharField(max_length=150, blank=True, default='')
+    contributors = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Revision summary of answer #{self.answer_id}"
+
+
+class AnswerDiff(models.Model):
+    """
+    Inline diff and word counts between two texts of an answer.
+
+    Written when a revision or suggestion is created (core/answer_diff_store.py),
+    keyed by the digests of both texts; rows from an older `engine_version`
+    are ignored and rebuilt on the next read.
+    """
+
+    answer = models.ForeignKey('Answer', on_delete=models.CASCADE, related_name='stored_diffs')
+    old_digest = models.CharField(max_length=64)
+    new_digest = models.CharField(max_length=64)
+    engine_version = models.CharField(max_length=16)
+    before_html = models.TextField()
+    after_html = models.TextField()
+    added = models.PositiveIntegerField(default=0)
+    removed = models.PositiveIntegerField(default=0)
+    degraded = models.BooleanField(default=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['answer', 'old_digest', 'new_digest', 'engine_version'],
+                name='unique_answer_diff_pair',
+            ),
+        ]
+
+    def __str__(self):
+        return f"Diff of answer #{self.answer_id} ({self.old_digest[:8]} -> {self.new_digest[:8]})"
+
+
+class AnswerRenderedContent(models.Model):
+    """
+    Stores rendered answer HTML per revision so list pages skip Markdown.
+
+    `source_digest` is the hash of the text that was rendered; rows whose
+    digest no longer matches the answer text are ignored and replaced.
+    """
+
+    revision = models.OneToOneField('AnswerRevision', on_delete=models.CASCADE, related_name='rendered_content')
+    answer = models.ForeignKey('Answer', on_delete=models.CASCADE, related_name='rendered_contents')
+    source_digest = models.CharField(max_length=64)
+    renderer_version = models.CharField(max_length=16)
+    full_html = models.TextField()
+    summary_html = models.TextField(blank=True, default='')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['answer', 'renderer_version']),
+        ]
+
+    def __str__(self):
+        return f"Rendered answer #{self.answer_id} (revision #{self.revision_id})"
+
+
+class AnswerRenderedLink(models.Model):
+    """Content link a stored render depends on; used to drop stale renders."""
+
+    KIND_CHOICES = [
+        ('definition', 'Definition'),
+        ('reference', 'Reference'),
+        ('question', 'Question'),
+        ('user', 'User'),
+    ]
+
+    rendered = models.ForeignKey(AnswerRenderedContent, on_delete=models.CASCADE, related_name='links')
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    key = models.CharField(max_length=255)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['kind', 'key']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.key} -> {self.rendered_id}"
+
+
+class SearchDocument(models.Model):
+    """
+    Folded search text for a question, answer or user. The full-text index
+    (FTS5 on SQLite, GIN on PostgreSQL) is built over `body`.
+    """
+
+    KIND_CHOICES = [
+        ('question', 'Question'),
+        ('answer', 'Answer'),
+        ('user', 'User'),
+    ]
+
+    kind = models.CharField(max_length=12, choices=KIND_CHOICES)
+    object_id = models.PositiveIntegerField()
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='search_documents')
+    body = models.TextField()
+    created_at = models.DateTimeField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['kind', 'object_id'], name='unique_search_document'),
+        ]
+        indexes = [
+            models.Index(fields=['kind', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.kind}:{self.object_id}"
+
+
+class QuestionMapSnapshot(models.Model):
+    """Serialized question-map graph; `version` increases on every change."""
+
+    key = models.CharField(max_length=32, unique=True)
+    version = models.PositiveIntegerField(default=1)
+    payload = models.TextField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
+class UserTextStats(models.Model):
+    """Running word/character totals over a user's questions and answers."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='text_stats')
+    total_words = models.PositiveIntegerField(default=0)
+    total_chars = models.PositiveIntegerField(default=0)
+    total_entries = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.total_words} words"
+
+
+class UserWordCount(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='word_counts')
+    word = models.CharField(max_length=255)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'word'], name='unique_user_word_count'),
+        ]
+        indexes = [
+            models.Index(fields=['user', '-count']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.word} x{self.count}"
+
+
+class AnswerReferenceCitation(models.Model):
+    """
+    One `(k:ID[ s:PAGE])` citation inside an answer. Kept in sync with the
+    answer text so source usage can be counted without scanning answers.
+    """
+
+    answer = models.ForeignKey(Answer, on_delete=models.CASCADE, related_name='reference_citations')
+    # No database constraint: answers may cite ids that were never created or
+    # were deleted, and those citations still count like the text says.
+    reference = models.ForeignKey(
+        'Reference',
+        on_delete=models.DO_NOTHING,
+        db_constraint=False,
+        related_name='citations',
+    )
+    page = models.CharField(max_length=255, blank=True, default='')
+    position = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['answer_id', 'position']
+        indexes = [
+            models.Index(fields=['reference', 'answer']),
+        ]
+
+    def __str__(self):
+        return f"answer {self.answer_id} -> reference {self.reference_id}"
+
+
+class SiteStatistic(models.Model):
+    """One running site-wide total (questions, answers, words, likes...)."""
+
+    key = models.CharField(max_length=32, unique=True)
+    value = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.key}: {self.value}"
+
+
+class SiteWordCount(models.Model):
+    """Word frequencies over every question and answer text."""
+
+    word = models.CharField(max_length=255, unique=True)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-count', 'word']),
+        ]
+
+    def __str__(self):
+        return f"{self.word} x{self.count}"
+
+
+class UserEntryStats(models.Model):
+    """Question/answer totals per user for the statistics leaderboards."""
+
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='entry_stats')
+    question_count = models.PositiveIntegerField(default=0)
+    answer_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-question_count']),
+            models.Index(fields=['-answer_count']),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.question_count} questions, {self.answer_count} answers"
+
+
+class ContentSaveCount(models.Model):
+    """How many users saved a question or answer (SavedItem rows per object)."""
+
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE)
+    object_id = models.PositiveIntegerField()
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='unique_content_save_count'),
+        ]
+        indexes = [
+            models.Index(fields=['content_type', '-count']),
+        ]
+
+    def __str__(self):
+        return f"{self.content_type_id}:{self.object_id} saved x{self.count}"
+
+
+class DailyVisitorCount(models.Model):
+    """DailyVisitor/VisitSession totals of a finished day."""
+
+    date = models.DateField(unique=True)
+    unique_visitors = models.PositiveIntegerField(default=0)
+    visit_sessions = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['date']
+
+    def __str__(self):
+        return f"{self.date}: {self.unique_visitors} visitors"
+
 class Message(models.Model):
     MESSAGE_TYPES = (
         ('normal', 'Normal'),
@@ -787,6 +1069,7 @@ class Reference(models.Model):
         verbose_name="Kısaltma (Opsiyonel)"
     )
     created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='references')
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         # Çoklu yazarları düzgün formatla: "Dumézil, Georges; Ceminay, Cem"
@@ -806,25 +1089,10 @@ class Reference(models.Model):
 
     def get_usage_count(self):
         """
-        Answer modelindeki answer_text alanında,
-        hem (kaynak:REF_ID[, sayfa:NUM]) hem de kısa form (k:REF_ID[ s:NUM])
-        şeklinde geçen ifadeleri sayar.
+        Yanıtlarda geçen (kaynak:REF_ID[, sayfa:NUM]) ve (k:REF_ID[ s:NUM])
+        atıflarının sayısı; AnswerReferenceCitation tablosundan okunur.
         """
-        from .models import Answer  # Lokal import döngüsel importları önlemek için.
-        from django.db.models import Q
-
-        pattern = re.compile(
-            r'\((?:kaynak|k):{}(?:(?:,\s*sayfa:[^)]+)|(?:\s*s:[^)]+))?\)'.format(self.id)
-        )
-        count = 0
-        # İlk filtre, answer_text içerisinde "(kaynak:REF_ID" veya "(k:REF_ID" ifadesi geçiyorsa getiriyor
-        answers = Answer.objects.filter(
-            Q(answer_text__icontains=f"(kaynak:{self.id}") | Q(answer_text__icontains=f"(k:{self.id}")
-        )
-        for answer in answers:
-            matches = pattern.findall(answer.answer_text)
-            count += len(matches)
-        return count
+        return self.citations.count()
 
 
 class LibraryFile(models.Model):
@@ -870,6 +1138,47 @@ class LibraryFile(models.Model):
             count += len(matches)
         return count
 
+class ExportJob(models.Model):
+    """
+    Background build of a DOCX/PDF/paper entry export (see core/export_jobs.py).
+
+    Finished files are kept under MEDIA_ROOT/exports and reused by any later
+    export whose cache_key matches, until run_export_worker prunes them.
+    """
+    FORMAT_CHOICES = (
+        ('docx', 'DOCX'),
+        ('pdf', 'PDF'),
+        ('paper', 'Paper DOCX'),
+    )
+    STATUS_CHOICES = (
+        ('pending', 'Pending'),
+        ('running', 'Running'),
+        ('done', 'Done'),
+        ('failed', 'Failed'),
+    )
+
+    requested_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='export_jobs')
+    target_user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='+')
+    export_format = models.CharField(max_length=10, choices=FORMAT_CHOICES)
+    options = models.JSONField(default=dict)
+    cache_key = models.CharField(max_length=64, db_index=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    file = models.FileField(upload_to='exports/', blank=True)
+    error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.export_format} export of {self.target_user_id} ({self.status})"
+
+
 class IATResult(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     test_type = models.CharField(
@@ -1014,22 +1323,16 @@ class HashtagUsage(models.Model):
         return f"#{self.hashtag.name} in question {self.question.id}"
 
 
-# ========== SIGNALS FOR MENTIONS AND HASHTAGS ==========
+# ========== SIGNALS FOR HASHTAGS ==========
 
 @receiver(post_save, sender=Answer)
-def process_answer_mentions_and_hashtags(sender, instance, created, **kwargs):
+def process_answer_hashtags(sender, instance, created, **kwargs):
     """
-    Process mentions and hashtags when an answer is created or updated
+    Process hashtags when an answer is created or updated; mention
+    notifications go through the notification outbox.
     """
-    from .utils import extract_mentions, send_mention_notifications, process_hashtags
-
-    if created:
-        # Extract and send mention notifications
-        mentioned_usernames = extract_mentions(instance.answer_text)
-        if mentioned_usernames:
-            send_mention_notifications(instance, mentioned_usernames)
+    from .utils import process_hashtags
 
-    # Process hashtags (both create and update)
     process_hashtags(answer=instance)
 
 
@@ -1150,22 +1453,43 @@ class Notification(models.Model):
     def mark_as_read(self):
         """Mark this notification as read"""
         if not self.is_read:
+            from .unread_counters import adjust_unread
+
             self.is_read = True
             self.save(update_fields=['is_read'])
+            adjust_unread(self.recipient_id, 'notification_count', -1)
+
+    ANSWER_MESSAGES = {
+        'mention': "{sender} seni bir yanıtta bahsetti: {question}",
+        'new_answer': "{sender} takip ettiğin başlığa yanıt verdi: {question}",
+        'answer_update': "{sender} takip ettiğin yanıtı güncelledi",
+        'followed_user_entry': "{sender} yeni bir entry girdi: {question}",
+    }
+
+    @classmethod
+    def build_answer_notification(cls, notification_type, recipient_id, answer, sender=None):
+        """Unsaved answer notification (mention or follow fan-out), ready for bulk_create"""
+        sender = sender or answer.user
+        message = cls.ANSWER_MESSAGES[notification_type].format(
+            sender=sender.username,
+            question=answer.question.question_text,
+        )
+        return cls(
+            recipient_id=recipient_id,
+            sender=sender,
+            notification_type=notification_type,
+            message=message,
+            related_answer=answer,
+            related_question=answer.question,
+        )
 
     @classmethod
     def create_mention_notification(cls, recipient, sender, answer=None, question=None):
         """Create a mention notification"""
         if answer:
-            message = f"{sender.username} seni bir yanıtta bahsetti: {answer.question.question_text}"
-            return cls.objects.create(
-                recipient=recipient,
-                sender=sender,
-                notification_type='mention',
-                message=message,
-                related_answer=answer,
-                related_question=answer.question
-            )
+            notification = cls.build_answer_notification('mention', recipient.id, answer, sender=sender)
+            notification.save()
+            return notification
         elif question:
             message = f"{sender.username} seni bir başlıkta bahsetti: {question.question_text}"
             return cls.objects.create(
@@ -1179,28 +1503,16 @@ class Notification(models.Model):
     @classmethod
     def create_new_answer_notification(cls, recipient, answer):
         """Create notification for new answer to followed question"""
-        message = f"{answer.user.username} takip ettiğin başlığa yanıt verdi: {answer.question.question_text}"
-        return cls.objects.create(
-            recipient=recipient,
-            sender=answer.user,
-            notification_type='new_answer',
-            message=message,
-            related_answer=answer,
-            related_question=answer.question
-        )
+        notification = cls.build_answer_notification('new_answer', recipient.id, answer)
+        notification.save()
+        return notification
 
     @classmethod
     def create_answer_update_notification(cls, recipient, answer):
         """Create notification for update to followed answer"""
-        message = f"{answer.user.username} takip ettiğin yanıtı güncelledi"
-        return cls.objects.create(
-            recipient=recipient,
-            sender=answer.user,
-            notification_type='answer_update',
-            message=message,
-            related_answer=answer,
-            related_question=answer.question
-        )
+        notification = cls.build_answer_notification('answer_update', recipient.id, answer)
+        notification.save()
+        return notification
 
     @classmethod
     def create_question_update_notification(cls, recipient, question):
@@ -1229,15 +1541,9 @@ class Notification(models.Model):
     @classmethod
     def create_followed_user_entry_notification(cls, recipient, answer):
         """Create notification for new entry from followed user"""
-        message = f"{answer.user.username} yeni bir entry girdi: {answer.question.question_text}"
-        return cls.objects.create(
-            recipient=recipient,
-            sender=answer.user,
-            notification_type='followed_user_entry',
-            message=message,
-            related_answer=answer,
-            related_question=answer.question
-        )
+        notification = cls.build_answer_notification('followed_user_entry', recipient.id, answer)
+        notification.save()
+        return notification
 
     @classmethod
     def create_new_follower_notification(cls, recipient, follower):
@@ -1372,34 +1678,38 @@ class Notification(models.Model):
         )
 
 
+class NotificationOutbox(models.Model):
+    """
+    Pending notification fan-out for one answer event.
+
+    Saving an answer only writes one of these rows; recipients are collected
+    and notified in bulk after commit (see core/notification_outbox.py).
+    """
+    EVENT_CHOICES = (
+        ('answer_created', 'Answer Created'),    # mentions + question and author followers
+        ('answer_updated', 'Answer Updated'),    # answer followers
+        ('answer_mentions', 'Answer Mentions'),  # mentions of an edited answer
+    )
+
+    event = models.CharField(max_length=20, choices=EVENT_CHOICES)
+    answer = models.ForeignKey(Answer, on_delete=models.CASCADE, related_name='+')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['id']
+
+    def __str__(self):
+        return f"{self.event} for answer {self.answer_id}"
+
+
 # ========== SIGNALS FOR FOLLOW NOTIFICATIONS ==========
 
 @receiver(post_save, sender=Answer)
-def notify_question_followers_on_new_answer(sender, instance, created, **kwargs):
-    """Notify followers when a new answer is added to a question they follow"""
-    if created:
-        # Get all users following this question
-        followers = QuestionFollow.objects.filter(
-            question=instance.question
-        ).exclude(user=instance.user).select_related('user')
+def queue_answer_notifications(sender, instance, created, **kwargs):
+    """Queue mention and follower notifications for a new or updated answer"""
+    from .notification_outbox import enqueue_answer_event
 
-        # Create notifications for each follower
-        for follow in followers:
-            Notification.create_new_answer_notification(
-                recipient=follow.user,
-                answer=instance
-            )
-    else:
-        # Answer was updated - notify answer followers
-        followers = AnswerFollow.objects.filter(
-            answer=instance
-        ).exclude(user=instance.user).select_related('user')
-
-        for follow in followers:
-            Notification.create_answer_update_notification(
-                recipient=follow.user,
-                answer=instance
-            )
+    enqueue_answer_event(instance, 'answer_created' if created else 'answer_updated')
 
 
 @receiver(post_save, sender=Question)
@@ -1418,24 +1728,6 @@ def notify_question_followers_on_update(sender, instance, created, **kwargs):
             )
 
 
-@receiver(post_save, sender=Answer)
-def notify_user_followers_on_new_entry(sender, instance, created, **kwargs):
-    """Notify followers when a followed user posts a new entry"""
-    if created:
-        try:
-            author_profile = instance.user.userprofile
-            # Get all users following this author
-            followers = author_profile.followers.all()
-
-            for follower_profile in followers:
-                Notification.create_followed_user_entry_notification(
-                    recipient=follower_profile.user,
-                    answer=instance
-                )
-        except UserProfile.DoesNotExist:
-            pass
-
-
 # ==================== RADYO SİSTEMİ ====================
 
 class RadioProgram(models.Model):
@@ -1515,6 +1807,11 @@ class RadioProgram(models.Model):
                 f'({conflict.dj.username})'
             )
 
+    @property
+    def is_on_air(self):
+        """Canlı ve süresi dolmamış mı? (is_live bayrağını run_chat_housekeeping kapatır)"""
+        return self.is_live and not self.is_finished and self.end_time > timezone.now()
+
     @property
     def is_upcoming(self):
         """Program henüz başlamadı mı?"""
@@ -0,0 +1,174 @@
+"""
+Deferred, bulk notification fan-out for answers.
+
+Saving an answer writes a single NotificationOutbox row. After the
+transaction commits, the row is delivered in one of three ways, picked by
+NOTIFICATION_FANOUT:
+
+- ``inline``: right after commit, in the same thread (the default);
+- ``thread``: in a background worker thread of this process;
+- ``queue``: not at all here; `drain_notification_outbox` delivers it.
+
+Delivery collects mention, question-follower and author-follower recipients
+with set-based queries. Each recipient gets at most one notification per
+event (mention wins over new_answer, which wins over followed_user_entry).
+All of them are written with one bulk_create. Rows whose delivery fails stay
+in the outbox for the drain command.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from collections import Counter
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from .models import Answer, AnswerFollow, Notification, NotificationOutbox, QuestionFollow, UserProfile
+from .unread_counters import adjust_unread
+
+
+logger = logging.getLogger(__name__)
+
+FANOUT_MODES = ('inline', 'thread', 'queue')
+DRAIN_BATCH_SIZE = 100
+
+
+def fanout_mode():
+    mode = getattr(settings, 'NOTIFICATION_FANOUT', 'inline')
+    return mode if mode in FANOUT_MODES else 'inline'
+
+
+def enqueue_answer_event(answer, event):
+    """Record `event` for `answer` and schedule its delivery after commit."""
+    entry = NotificationOutbox.objects.create(event=event, answer=answer)
+    mode = fanout_mode()
+    if mode == 'inline':
+        transaction.on_commit(lambda: _deliver_safely(entry.id))
+    elif mode == 'thread':
+        transaction.on_commit(lambda: _worker.submit(entry.id))
+    return entry
+
+
+def collect_recipients(answer, event):
+    """Return `{recipient_id: notification_type}` for one event, author excluded."""
+    from .utils import find_mentioned_users
+
+    recipients = {}
+
+    def add(notification_type, user_ids):
+        for user_id in user_ids:
+            recipients.setdefault(user_id, notification_type)
+
+    if event in ('answer_created', 'answer_mentions'):
+        add('mention', (user.id for user in find_mentioned_users(answer.answer_text)))
+    if event == 'answer_created':
+        add('new_answer', QuestionFollow.objects.filter(
+            question_id=answer.question_id,
+        ).values_list('user_id', flat=True))
+        add('followed_user_entry', UserProfile.objects.filter(
+            following__user_id=answer.user_id,
+        ).values_list('user_id', flat=True))
+    elif event == 'answer_updated':
+        add('answer_update', AnswerFollow.objects.filter(
+            answer_id=answer.id,
+        ).values_list('user_id', flat=True))
+
+    recipients.pop(answer.user_id, None)
+    return recipients
+
+
+def deliver(entry_ids):
+    """Deliver and remove the given outbox rows; returns the notifications written."""
+    written = 0
+    with transaction.atomic():
+        entries = list(
+            NotificationOutbox.objects.select_for_update(skip_locked=True)
+            .filter(id__in=entry_ids)
+            .order_by('id')
+        )
+        if not entries:
+            return 0
+        answers = Answer.objects.select_related('question', 'user').in_bulk(
+            {entry.answer_id for entry in entries}
+        )
+        notifications = []
+        for entry in entries:
+            answer = answers.get(entry.answer_id)
+            if answer is None:
+                continue
+            for recipient_id, notification_type in collect_recipients(answer, entry.event).items():
+                notifications.append(
+                    Notification.build_answer_notification(notification_type, recipient_id, answer)
+                )
+        if notifications:
+            Notification.objects.bulk_create(notifications, batch_size=500)
+            written = len(notifications)
+            # bulk_create sends no post_save, so move the navbar counters here.
+            for recipient_id, count in Counter(n.recipient_id for n in notifications).items():
+                adjust_unread(recipient_id, 'notification_count', count)
+        NotificationOutbox.objects.filter(id__in=[entry.id for entry in entries]).delete()
+    return written
+
+
+def drain(limit=None, batch_size=DRAIN_BATCH_SIZE):
+    """Deliver pending outbox rows oldest first; returns `(events, notifications)`."""
+    events = notifications = last_id = 0
+    while limit is None or events < limit:
+        size = batch_size if limit is None else min(batch_size, limit - events)
+        entry_ids = list(
+            NotificationOutbox.objects.filter(id__gt=last_id)
+            .order_by('id')
+            .values_list('id', flat=True)[:size]
+        )
+        if not entry_ids:
+            break
+        # Rows locked by another drainer are skipped, not retried here.
+        notifications += deliver(entry_ids)
+        events += len(entry_ids)
+        last_id = entry_ids[-1]
+    return events, notifications
+
+
+def _deliver_safely(entry_id):
+    try:
+        deliver([entry_id])
+    except Exception:
+        # The row stays queued for drain_notification_outbox.
+        logger.exception('Notification outbox delivery failed for entry %s', entry_id)
+
+
+class _OutboxWorker:
+    """Single daemon thread delivering outbox rows submitted after commit."""
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def submit(self, entry_id):
+        self._ensure_started()
+        self._queue.put(entry_id)
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._run, name='notification-outbox', daemon=True
+                )
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            entry_id = self._queue.get()
+            close_old_connections()
+            try:
+                _deliver_safely(entry_id)
+            finally:
+                close_old_connections()
+                self._queue.task_done()
+
+
+_worker = _OutboxWorker()
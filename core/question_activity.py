@@ -0,0 +1,55 @@
+"""
+Stored activity columns for Question.
+
+`answers_count`, `last_answer_at` and `activity_at` (the later of the question
+date and its newest answer) are kept on the row so the left-frame feed can
+filter and sort on plain indexed columns instead of per-question subqueries.
+A new answer bumps the columns in one UPDATE; deleting or moving an answer
+recounts that question. `rebuild_question_activity` recomputes every row.
+"""
+
+from django.db.models import Case, Count, F, IntegerField, Max, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce, Greatest
+
+from .models import Answer, Question
+
+
+def record_new_answer(answer):
+    """Count a freshly created answer without re-reading the question's answers."""
+    answered_at = answer.created_at
+    Question.objects.filter(pk=answer.question_id).update(
+        answers_count=F('answers_count') + 1,
+        last_answer_at=Case(
+            When(Q(last_answer_at__isnull=True) | Q(last_answer_at__lt=answered_at), then=Value(answered_at)),
+            default=F('last_answer_at'),
+        ),
+        activity_at=Case(
+            When(activity_at__lt=answered_at, then=Value(answered_at)),
+            default=F('activity_at'),
+        ),
+    )
+
+
+def refresh_question_activity(question_ids):
+    """Recount the stored columns of the given questions from their answers."""
+    question_ids = [question_id for question_id in set(question_ids) if question_id]
+    if not question_ids:
+        return
+    _update_activity(Question.objects.filter(pk__in=question_ids))
+
+
+def rebuild_question_activity():
+    return _update_activity(Question.objects.all())
+
+
+def _update_activity(queryset):
+    answers = Answer.objects.filter(question_id=OuterRef('pk')).order_by().values('question_id')
+    updated = queryset.update(
+        answers_count=Coalesce(
+            Subquery(answers.annotate(total=Count('id')).values('total')[:1], output_field=IntegerField()),
+            Value(0),
+        ),
+        last_answer_at=Subquery(answers.annotate(latest=Max('created_at')).values('latest')[:1]),
+    )
+    queryset.update(activity_at=Greatest('created_at', Coalesce('last_answer_at', 'created_at')))
+    return updated
@@ -0,0 +1,150 @@
+"""
+Per-user adjacency index of the question map (QuestionRelationship rows).
+
+Linking a question checks whether the new parent already sits below the
+child. The schema pages need a user's roots, child counts, depths and the
+path to a question. All of these are answered in memory from one
+`QuestionGraph` per user.
+
+The graph's edges are loaded with one `values_list` query. For the schema
+pages they are kept in the cache until a relationship of that user is saved
+or deleted (see the QUESTION GRAPH signals); without a shared cache
+(SHARED_CACHE) other workers never see that, so there they expire after a
+few seconds. Cycle checks guard writes and always load fresh edges
+(`load_user_question_graph`). Walks are iterative BFS, so cycles and deep
+maps cost no recursion.
+"""
+
+from collections import deque
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import QuestionRelationship
+
+
+QUESTION_GRAPH_CACHE_TIMEOUT = 60 * 60 * 24
+LOCAL_QUESTION_GRAPH_CACHE_TIMEOUT = 10
+
+
+def question_graph_cache_timeout():
+    if getattr(settings, 'SHARED_CACHE', False):
+        return QUESTION_GRAPH_CACHE_TIMEOUT
+    return LOCAL_QUESTION_GRAPH_CACHE_TIMEOUT
+
+
+def question_graph_cache_key(user_id):
+    return f'question-graph:{user_id}'
+
+
+class QuestionGraph:
+    def __init__(self, edges):
+        self.edges = tuple(edges)
+        children = {}
+        parents = {}
+        for parent_id, child_id in self.edges:
+            children.setdefault(parent_id, set()).add(child_id)
+            parents.setdefault(child_id, set()).add(parent_id)
+        self.children = {parent_id: sorted(child_ids) for parent_id, child_ids in children.items()}
+        self.parents = {child_id: sorted(parent_ids) for child_id, parent_ids in parents.items()}
+
+    @property
+    def question_ids(self):
+        return set(self.children) | set(self.parents)
+
+    def inferred_root_ids(self):
+        """Questions that have children but no parent, in id order."""
+        return sorted(set(self.children) - set(self.parents))
+
+    def child_count(self, question_id):
+        return len(self.children.get(question_id, ()))
+
+    def descendant_ids(self, root_id):
+        """Ids of everything below `root_id` (itself only if a cycle leads back)."""
+        found = set()
+        queue = deque([root_id])
+        while queue:
+            for child_id in self.children.get(queue.popleft(), ()):
+                if child_id not in found:
+                    found.add(child_id)
+                    queue.append(child_id)
+        return found
+
+    def subtree_size(self, root_id):
+        """Number of distinct questions below `root_id`."""
+        return len(self.descendant_ids(root_id) - {root_id})
+
+    def has_path(self, start_id, target_id):
+        return start_id == target_id or target_id in self.descendant_ids(start_id)
+
+    def would_create_cycle(self, parent_id, child_id):
+        """True when `child_id` is `parent_id` or already above it."""
+        return self.has_path(child_id, parent_id)
+
+    def spanning_tree(self, root_ids):
+        """
+        Return `(depth_by_id, parent_by_id)` of a BFS from the roots in order.
+        A question reachable from several roots keeps the first one found.
+        """
+        depth_by_id = {}
+        parent_by_id = {}
+        for root_id in root_ids:
+            if root_id in depth_by_id:
+                continue
+            depth_by_id[root_id] = 0
+            parent_by_id[root_id] = None
+            queue = deque([root_id])
+            while queue:
+                current_id = queue.popleft()
+                for child_id in self.children.get(current_id, ()):
+                    if child_id in depth_by_id:
+                        continue
+                    depth_by_id[child_id] = depth_by_id[current_id] + 1
+                    parent_by_id[child_id] = current_id
+                    queue.append(child_id)
+        return depth_by_id, parent_by_id
+
+    @staticmethod
+    def ancestor_path(question_id, parent_by_id, max_hops=300):
+        """Ids from the root down to `question_id` along a `spanning_tree` parent map."""
+        path = []
+        current = question_id
+        seen = set()
+        while current is not None and current not in seen and len(path) < max_hops:
+            path.append(current)
+            seen.add(current)
+            current = parent_by_id.get(current)
+        path.reverse()
+        return path
+
+
+def _load_edges(user_id):
+    return list(
+        QuestionRelationship.objects.filter(user_id=user_id)
+        .order_by()
+        .values_list('parent_id', 'child_id')
+    )
+
+
+def load_user_question_graph(user):
+    """The map of `user` read from the database now (one query), for checks before a write."""
+    return QuestionGraph(_load_edges(getattr(user, 'pk', user)))
+
+
+def user_question_graph(user):
+    """The cached map of `user` (a User or a user id)."""
+    user_id = getattr(user, 'pk', user)
+    cache_key = question_graph_cache_key(user_id)
+    edges = cache.get(cache_key)
+    if edges is None:
+        edges = _load_edges(user_id)
+        cache.set(cache_key, edges, question_graph_cache_timeout())
+    return QuestionGraph(edges)
+
+
+def invalidate_user_question_graph(user_id):
+    cache_key = question_graph_cache_key(user_id)
+    cache.delete(cache_key)
+    # A request that read the old rows before this commit may have cached them again.
+    transaction.on_commit(lambda: cache.delete(cache_key))
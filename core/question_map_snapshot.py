@@ -0,0 +1,306 @@
+"""
+Materialized question-map graph.
+
+The map needs every starting question, every QuestionRelationship and the
+earliest answer per user on each mapped question. Instead of rebuilding that
+from the ORM on each request, it lives in one JSON blob (QuestionMapSnapshot)
+that signals patch per question. Views filter the parsed snapshot in memory.
+"""
+
+import hashlib
+import json
+from collections import defaultdict
+
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import (
+    Answer,
+    HashtagUsage,
+    Question,
+    QuestionMapSnapshot,
+    QuestionRelationship,
+    StartingQuestion,
+)
+
+
+QUESTION_MAP_SNAPSHOT_KEY = 'question-map'
+
+# Parsed payload for the snapshot revision this process saw last.
+_parsed_snapshot = {'tag': None, 'data': None}
+
+
+def _snapshot_tag(version, updated_at):
+    return f'{version}-{int(updated_at.timestamp() * 1_000_000)}'
+
+
+def _collect(question_ids=None):
+    """
+    Read the map rows for `question_ids` (all mapped questions when None):
+    starting pairs and relationships touching them, plus node details for the
+    ones that are on the map.
+    """
+    starting = StartingQuestion.objects.all()
+    relationships = QuestionRelationship.objects.all()
+    if question_ids is not None:
+        starting = starting.filter(question_id__in=question_ids)
+        relationships = relationships.filter(Q(parent_id__in=question_ids) | Q(child_id__in=question_ids))
+
+    starting_rows = sorted(set(starting.values_list('question_id', 'user_id')))
+    relationship_rows = [
+        list(row)
+        for row in relationships.order_by('id').values_list('id', 'parent_id', 'child_id', 'user_id')
+    ]
+
+    member_ids = {question_id for question_id, _ in starting_rows}
+    for _, parent_id, child_id, _ in relationship_rows:
+        member_ids.add(parent_id)
+        member_ids.add(child_id)
+    if question_ids is not None:
+        member_ids &= set(question_ids)
+
+    nodes = {}
+    questions = (
+        Question.objects.filter(id__in=member_ids)
+        .order_by('created_at', 'id')
+        .values_list('id', 'question_text', 'slug', 'created_at')
+    )
+    for question_id, text, slug, created_at in questions:
+        nodes[question_id] = {
+            'label': text,
+            'slug': slug,
+            'created_at': created_at.isoformat(),
+            'members': [],
+            'answers': [],
+            'hashtags': [],
+        }
+
+    if nodes:
+        memberships = Question.users.through.objects.filter(question_id__in=nodes).values_list(
+            'question_id', 'user_id'
+        )
+        for question_id, user_id in memberships.order_by('question_id', 'user_id'):
+            nodes[question_id]['members'].append(user_id)
+
+        earliest_seen = set()
+        answers = (
+            Answer.objects.filter(question_id__in=nodes)
+            .order_by('created_at', 'id')
+            .values_list('question_id', 'user_id', 'user__username', 'id')
+        )
+        for question_id, user_id, username, answer_id in answers:
+            if (question_id, user_id) in earliest_seen:
+                continue
+            earliest_seen.add((question_id, user_id))
+            nodes[question_id]['answers'].append([user_id, username, answer_id])
+
+        hashtag_rows = (
+            HashtagUsage.objects.filter(answer__question_id__in=nodes)
+            .values_list('answer__question_id', 'hashtag__name')
+            .distinct()
+        )
+        for question_id, name in hashtag_rows:
+            if name not in nodes[question_id]['hashtags']:
+                nodes[question_id]['hashtags'].append(name)
+
+    return {
+        'nodes': nodes,
+        'starting': [list(row) for row in starting_rows],
+        'relationships': relationship_rows,
+    }
+
+
+def _serialize(nodes, starting, relationships):
+    ordered_nodes = sorted(nodes.items(), key=lambda item: (item[1]['created_at'], int(item[0])))
+    return json.dumps(
+        {
+            'nodes': {str(question_id): node for question_id, node in ordered_nodes},
+            'starting': sorted(starting),
+            'relationships': sorted(relationships),
+        },
+        ensure_ascii=False,
+        separators=(',', ':'),
+    )
+
+
+def rebuild_question_map_snapshot():
+    """Rebuild the whole snapshot from the database and bump its version."""
+    collected = _collect()
+    payload = _serialize(collected['nodes'], collected['starting'], collected['relationships'])
+    with transaction.atomic():
+        updated = QuestionMapSnapshot.objects.filter(key=QUESTION_MAP_SNAPSHOT_KEY).update(
+            payload=payload,
+            version=F('version') + 1,
+            updated_at=timezone.now(),
+        )
+        if not updated:
+            QuestionMapSnapshot.objects.create(key=QUESTION_MAP_SNAPSHOT_KEY, payload=payload)
+    return QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY)
+
+
+def update_question_map(question_ids, *, membership_changed=True):
+    """
+    Re-read the given questions into the stored snapshot.
+
+    With `membership_changed=False` (answers, titles, hashtags) questions that
+    are not on the map are ignored, since such changes cannot add them.
+    """
+    question_ids = {int(question_id) for question_id in question_ids if question_id}
+    if not question_ids:
+        return False
+
+    with transaction.atomic():
+        snapshot = (
+            QuestionMapSnapshot.objects.select_for_update()
+            .filter(key=QUESTION_MAP_SNAPSHOT_KEY)
+            .first()
+        )
+        if snapshot is None:
+            # Built lazily on the next read.
+            return False
+
+        data = _parse(snapshot)
+        if not membership_changed:
+            question_ids = {question_id for question_id in question_ids if str(question_id) in data['nodes']}
+            if not question_ids:
+                return False
+
+        collected = _collect(question_ids)
+        nodes = {
+            int(question_id): node
+            for question_id, node in data['nodes'].items()
+            if int(question_id) not in question_ids
+        }
+        nodes.update(collected['nodes'])
+        starting = [row for row in data['starting'] if row[0] not in question_ids]
+        starting += collected['starting']
+        relationships = {
+            row[0]: row
+            for row in data['relationships']
+            if row[1] not in question_ids and row[2] not in question_ids
+        }
+        relationships.update((row[0], row) for row in collected['relationships'])
+
+        snapshot.payload = _serialize(nodes, starting, list(relationships.values()))
+        snapshot.version += 1
+        snapshot.save(update_fields=['payload', 'version', 'updated_at'])
+    return True
+
+
+def _parse(snapshot):
+    tag = _snapshot_tag(snapshot.version, snapshot.updated_at)
+    if _parsed_snapshot['tag'] != tag:
+        _parsed_snapshot['data'] = json.loads(snapshot.payload)
+        _parsed_snapshot['tag'] = tag
+    return _parsed_snapshot['data']
+
+
+def question_map_snapshot_tag():
+    """Cheap revision tag for ETags; builds the snapshot if it does not exist."""
+    row = (
+        QuestionMapSnapshot.objects.filter(key=QUESTION_MAP_SNAPSHOT_KEY)
+        .values_list('version', 'updated_at')
+        .first()
+    )
+    if row is None:
+        snapshot = rebuild_question_map_snapshot()
+        return _snapshot_tag(snapshot.version, snapshot.updated_at)
+    return _snapshot_tag(*row)
+
+
+def load_question_map_snapshot(tag=None):
+    """Parsed snapshot; the payload is only read when `tag` is not cached yet."""
+    if tag is None:
+        tag = question_map_snapshot_tag()
+    if _parsed_snapshot['tag'] == tag:
+        return _parsed_snapshot['data']
+    return _parse(QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY))
+
+
+def question_map_etag(tag, *parts):
+    digest = hashlib.sha1('|'.join([tag, *map(str, parts)]).encode('utf-8')).hexdigest()
+    return f'"map-{digest[:20]}"'
+
+
+def build_question_map_data(data, *, question_ids=None, member_ids=None, user_filter=None, hashtag=None):
+    """
+    Turn a parsed snapshot into the `{"nodes": [...], "links": [...]}` payload
+    the map script reads.
+
+    question_ids: keep only these questions.
+    member_ids: keep questions associated with any of these users.
+    user_filter: only count these users' starting questions and links.
+    hashtag: keep questions with an answer using this hashtag.
+    """
+    from .views.user_views import get_user_color
+
+    allowed_ids = set(question_ids) if question_ids is not None else None
+    member_ids = set(member_ids) if member_ids else None
+    user_filter = set(user_filter) if user_filter else None
+
+    question_ids = []
+    for key, node in data['nodes'].items():
+        if allowed_ids is not None and int(key) not in allowed_ids:
+            continue
+        if member_ids is not None and not member_ids.intersection(node['members']):
+            continue
+        if hashtag is not None and hashtag not in node['hashtags']:
+            continue
+        question_ids.append(int(key))
+    included = set(question_ids)
+
+    link_user_ids_by_question = defaultdict(set)
+    for question_id, user_id in data['starting']:
+        if question_id in included and (user_filter is None or user_id in user_filter):
+            link_user_ids_by_question[question_id].add(user_id)
+
+    relationships = [
+        (parent_id, child_id, user_id)
+        for _, parent_id, child_id, user_id in data['relationships']
+        if parent_id in included and child_id in included
+        and (user_filter is None or user_id in user_filter)
+    ]
+    for _, child_id, user_id in relationships:
+        link_user_ids_by_question[child_id].add(user_id)
+
+    nodes = []
+    for question_id in question_ids:
+        node = data['nodes'][str(question_id)]
+        link_user_ids = link_user_ids_by_question.get(question_id, set())
+        user_entries = []
+        link_user_entries = []
+        for user_id, username, answer_id in node['answers']:
+            entry = {"id": user_id, "username": username, "answer_id": answer_id}
+            user_entries.append(entry)
+            if user_id in link_user_ids:
+                link_user_entries.append(entry)
+
+        linker_ids = sorted(link_user_ids)
+        # Color reflects who linked the node into a chain, not who answered.
+        if len(linker_ids) == 1:
+            node_color = get_user_color(linker_ids[0])
+        elif len(linker_ids) > 1:
+            node_color = '#CCCCCC'
+        else:
+            node_color = '#87ceeb'
+
+        nodes.append({
+            "id": f"q{question_id}",
+            "label": node['label'],
+            "users": user_entries,
+            "link_users": link_user_entries,
+            "user_ids": [entry["id"] for entry in user_entries],
+            "link_user_ids": linker_ids,
+            "size": 20 + max(0, len(linker_ids) - 1),
+            "color": node_color,
+            "question_id": question_id,
+            "question_ids": [question_id],
+            "slug": node['slug'],
+        })
+
+    links = [
+        {"source": f"q{parent_id}", "target": f"q{child_id}", "user_id": user_id}
+        for parent_id, child_id, user_id in relationships
+    ]
+    return {"nodes": nodes, "links": links}
@@ -0,0 +1,134 @@
+"""
+Descendant traversal of question trees.
+
+Two graphs are walked: a user's own map (QuestionRelationship rows of that
+user) or, with `user=None`, the global `Question.subquestions` links.
+
+On PostgreSQL and SQLite every traversal is a single `WITH RECURSIVE`
+query seeded with all roots at once. Other databases load the user's edges
+with one query and walk them in memory. The same in-memory walk is the
+fallback when the recursive query is cut off at MAX_CTE_DEPTH, which only
+happens for cycles or for trees deeper than that.
+"""
+
+from collections import deque
+
+from django.db import connection
+
+from .models import Question, QuestionRelationship
+
+
+CTE_VENDORS = ('postgresql', 'sqlite')
+MAX_CTE_DEPTH = 64
+
+
+def _edge_source(user):
+    """Return `(table, parent column, child column, extra WHERE, params)` of the graph."""
+    if user is None:
+        through = Question.subquestions.through
+        return (
+            through._meta.db_table,
+            through._meta.get_field('from_question').column,
+            through._meta.get_field('to_question').column,
+            '',
+            [],
+        )
+    user_column = connection.ops.quote_name(QuestionRelationship._meta.get_field('user').column)
+    return (
+        QuestionRelationship._meta.db_table,
+        QuestionRelationship._meta.get_field('parent').column,
+        QuestionRelationship._meta.get_field('child').column,
+        f' AND edge.{user_column} = %s',
+        [getattr(user, 'pk', user)],
+    )
+
+
+def _load_edges(user):
+    if user is None:
+        return Question.subquestions.through.objects.values_list('from_question_id', 'to_question_id')
+    user_id = getattr(user, 'pk', user)
+    return QuestionRelationship.objects.filter(user_id=user_id).values_list('parent_id', 'child_id')
+
+
+def _cte_depths(root_ids, user):
+    table, parent_column, child_column, user_filter, user_params = _edge_source(user)
+    quote = connection.ops.quote_name
+    question_table = quote(Question._meta.db_table)
+    question_id = quote(Question._meta.pk.column)
+    placeholders = ', '.join(['%s'] * len(root_ids))
+    sql = f"""
+        WITH RECURSIVE tree(root_id, question_id, depth) AS (
+            SELECT {question_id}, {question_id}, 0 FROM {question_table} WHERE {question_id} IN ({placeholders})
+            UNION
+            SELECT tree.root_id, edge.{quote(child_column)}, tree.depth + 1
+            FROM tree
+            JOIN {quote(table)} edge ON edge.{quote(parent_column)} = tree.question_id{user_filter}
+            WHERE tree.depth < %s
+        )
+        SELECT root_id, question_id, MIN(depth), MAX(depth)
+        FROM tree
+        GROUP BY root_id, question_id
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [*root_ids, *user_params, MAX_CTE_DEPTH])
+        rows = cursor.fetchall()
+
+    depths = {root_id: {} for root_id in root_ids}
+    for root_id, question_id, min_depth, max_depth in rows:
+        if max_depth >= MAX_CTE_DEPTH:
+            return None
+        depths[root_id][question_id] = min_depth
+    return depths
+
+
+def _memory_depths(root_ids, user):
+    children = {}
+    for parent_id, child_id in _load_edges(user):
+        children.setdefault(parent_id, []).append(child_id)
+
+    depths = {}
+    for root_id in root_ids:
+        found = {root_id: 0}
+        queue = deque([root_id])
+        while queue:
+            current_id = queue.popleft()
+            for child_id in children.get(current_id, ()):
+                if child_id not in found:
+                    found[child_id] = found[current_id] + 1
+                    queue.append(child_id)
+        depths[root_id] = found
+    return depths
+
+
+def descendant_depths(root_ids, user=None):
+    """
+    Return `{root_id: {question_id: depth}}` for every root, root included at
+    depth 0. Depth is the shortest number of links from the root.
+    """
+    root_ids = list(dict.fromkeys(root_ids))
+    if not root_ids:
+        return {}
+
+    depths = None
+    if connection.vendor in CTE_VENDORS:
+        depths = _cte_depths(root_ids, user)
+    if depths is None:
+        depths = _memory_depths(root_ids, user)
+
+    for root_id in root_ids:
+        # Roots are part of their own tree even without a Question row.
+        depths[root_id].setdefault(root_id, 0)
+    return depths
+
+
+def descendant_ids(root_id, user=None):
+    """Ids of `root_id` and everything below it."""
+    return set(descendant_depths([root_id], user)[root_id])
+
+
+def subtree_sizes(root_ids, user=None):
+    """Return `{root_id: number of distinct questions below it}`."""
+    return {
+        root_id: sum(1 for question_id in depths if question_id != root_id)
+        for root_id, depths in descendant_depths(root_ids, user).items()
+    }
@@ -10,3 +10,12 @@ def expire_live_programs(now=None):
         is_live=True,
         end_time__lt=current_time
     ).update(is_live=False, is_finished=True)
+
+
+def live_programs(now=None):
+    """Live programs, leaving out those past end_time that were not expired yet."""
+    return RadioProgram.objects.filter(
+        is_live=True,
+        is_finished=False,
+        end_time__gt=now or timezone.now(),
+    )
@@ -0,0 +1,164 @@
+"""
+Stored revision metadata of answers (AnswerRevisionSummary).
+
+Answer lists show the current version number, revision and open suggestion
+counts and who approved, is still reviewing or rejected the current
+revision. Those values are kept in one AnswerRevisionSummary row per answer
+and recomputed by `refresh_revision_summaries` whenever a revision,
+suggestion or approval of the answer changes (see the REVISION SUMMARY
+signals and the bulk writes in core/answer_git.py).
+
+`summaries_for` reads the rows for a page of answers. Answers that were never
+summarised (before `backfill_revision_summaries` ran) are built in memory
+from the same queries and not saved, so GET requests do not write.
+"""
+
+from collections import defaultdict, namedtuple
+
+from django.db import transaction
+from django.db.models import Count
+
+from .models import Answer, AnswerRevision, AnswerRevisionApproval, AnswerRevisionSummary, AnswerSuggestion
+
+
+RevisionRef = namedtuple('RevisionRef', 'id revision_no is_current')
+ContributorRef = namedtuple('ContributorRef', 'id username')
+
+CONTRIBUTOR_STATUSES = ('approved', 'pending', 'rejected')
+BATCH_SIZE = 500
+
+
+def _sorted_contributors(rows, owner_id):
+    rows = sorted(rows, key=lambda row: (0 if row[0] == owner_id else 1, row[1].lower()))
+    return [[user_id, username] for user_id, username in rows]
+
+
+def build_revision_summaries(answer_ids):
+    """Return unsaved `{answer_id: AnswerRevisionSummary}` computed from the database."""
+    answer_ids = list(set(answer_ids))
+    if not answer_ids:
+        return {}
+
+    owners = {
+        answer_id: (user_id, username)
+        for answer_id, user_id, username in Answer.objects.filter(id__in=answer_ids).values_list(
+            'id', 'user_id', 'user__username'
+        )
+    }
+    current = {
+        row['answer_id']: row
+        for row in AnswerRevision.objects.filter(answer_id__in=owners, is_current=True)
+        .order_by('revision_no')
+        .values('answer_id', 'id', 'revision_no', 'created_by__username')
+    }
+    revision_counts = dict(
+        AnswerRevision.objects.filter(answer_id__in=owners)
+        .order_by()
+        .values('answer_id')
+        .annotate(total=Count('id'))
+        .values_list('answer_id', 'total')
+    )
+    suggestion_counts = dict(
+        AnswerSuggestion.objects.filter(answer_id__in=owners, status='open')
+        .order_by()
+        .values('answer_id')
+        .annotate(total=Count('id'))
+        .values_list('answer_id', 'total')
+    )
+    approvals = defaultdict(lambda: defaultdict(list))
+    for revision_id, user_id, username, status in AnswerRevisionApproval.objects.filter(
+        revision_id__in=[row['id'] for row in current.values()]
+    ).values_list('revision_id', 'user_id', 'user__username', 'status'):
+        approvals[revision_id][status if status in CONTRIBUTOR_STATUSES else 'pending'].append((user_id, username))
+
+    summaries = {}
+    for answer_id, (owner_id, owner_username) in owners.items():
+        revision = current.get(answer_id)
+        grouped = approvals.get(revision['id']) if revision else None
+        if not grouped:
+            # Revisions from before the approval system count the owner as approved.
+            grouped = {'approved': [(owner_id, owner_username)]}
+        summaries[answer_id] = AnswerRevisionSummary(
+            answer_id=answer_id,
+            current_revision_id=revision['id'] if revision else None,
+            current_revision_no=revision['revision_no'] if revision else 0,
+            revision_count=revision_counts.get(answer_id, 0),
+            open_suggestion_count=suggestion_counts.get(answer_id, 0),
+            last_revision_actor=revision['created_by__username'] if revision else owner_username,
+            contributors={
+                status: _sorted_contributors(grouped.get(status, []), owner_id)
+                for status in CONTRIBUTOR_STATUSES
+            },
+        )
+    return summaries
+
+
+def refresh_revision_summaries(answer_ids):
+    """Recompute and store the summaries of these answers."""
+    answer_ids = [answer_id for answer_id in set(answer_ids) if answer_id]
+    if not answer_ids:
+        return 0
+    summaries = build_revision_summaries(answer_ids)
+    with transaction.atomic():
+        AnswerRevisionSummary.objects.filter(answer_id__in=answer_ids).delete()
+        AnswerRevisionSummary.objects.bulk_create(summaries.values(), batch_size=BATCH_SIZE)
+    return len(summaries)
+
+
+def refresh_user_revision_summaries(user_id):
+    """Recompute the summaries that show this user's username (after a rename)."""
+    answer_ids = set(Answer.objects.filter(user_id=user_id).values_list('id', flat=True))
+    answer_ids.update(
+        AnswerRevision.objects.filter(created_by_id=user_id, is_current=True).values_list('answer_id', flat=True)
+    )
+    answer_ids.update(
+        AnswerRevisionApproval.objects.filter(user_id=user_id, revision__is_current=True)
+        .values_list('revision__answer_id', flat=True)
+    )
+    answer_ids = sorted(answer_ids)
+    for start in range(0, len(answer_ids), BATCH_SIZE):
+        refresh_revision_summaries(answer_ids[start:start + BATCH_SIZE])
+
+
+def summaries_for(answer_ids):
+    """Stored summaries of these answers; missing ones are built but not saved."""
+    answer_ids = list(answer_ids)
+    summaries = AnswerRevisionSummary.objects.in_bulk(answer_ids)
+    missing = [answer_id for answer_id in answer_ids if answer_id not in summaries]
+    if missing:
+        summaries.update(build_revision_summaries(missing))
+    return summaries
+
+
+def backfill_revision_summaries(batch_size=BATCH_SIZE):
+    """
+    Store everything list pages used to create on the fly: initial revisions,
+    approval snapshots of pre-approval revisions, and every summary row.
+    Returns the number of summaries written.
+    """
+    from .answer_git import _ensure_revision_approval_snapshots, ensure_initial_revision
+
+    without_revision = Answer.objects.exclude(revisions__is_current=True).select_related('user')
+    for answer in without_revision.iterator(chunk_size=batch_size):
+        ensure_initial_revision(answer)
+
+    unapproved = AnswerRevision.objects.filter(approvals__isnull=True).select_related('answer').order_by('id')
+    batch = []
+    for revision in unapproved.iterator(chunk_size=batch_size):
+        batch.append(revision)
+        if len(batch) >= batch_size:
+            _ensure_revision_approval_snapshots(batch)
+            batch = []
+    if batch:
+        _ensure_revision_approval_snapshots(batch)
+
+    total = 0
+    batch = []
+    for answer_id in Answer.objects.order_by('id').values_list('id', flat=True).iterator(chunk_size=batch_size):
+        batch.append(answer_id)
+        if len(batch) >= batch_size:
+            total += refresh_revision_summaries(batch)
+            batch = []
+    if batch:
+        total += refresh_revision_summaries(batch)
+    return total
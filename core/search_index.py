@@ -0,0 +1,267 @@
+"""
+Full-text search over questions, answers and usernames.
+
+Text is folded (Turkish dotless/dotted i, diacritics, case) into
+`SearchDocument.body`. SQLite searches it through an FTS5 table kept in sync
+by triggers, PostgreSQL through a GIN index on `to_tsvector('simple', body)`;
+other databases fall back to substring matching on the folded text. Results
+are paged with opaque keyset cursors instead of OFFSET.
+"""
+
+import base64
+import json
+import re
+import unicodedata
+
+from django.db import connection
+from django.db.models import Q, Value
+from django.db.models.fields import FloatField
+
+from .models import SearchDocument
+
+
+SEARCH_FTS_TABLE = 'core_searchdocument_fts'
+SEARCH_MAX_TERMS = 8
+SEARCH_MAX_TERM_LENGTH = 64
+
+_TURKISH_I_FOLD = str.maketrans({'İ': 'i', 'I': 'i', 'ı': 'i'})
+_TERM_RE = re.compile(r'\w+')
+
+
+def fold_search_text(text):
+    """Lowercase and strip diacritics so `Işık`, `ışık` and `isik` match."""
+    text = unicodedata.normalize('NFKC', text or '').translate(_TURKISH_I_FOLD).casefold()
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in text if not unicodedata.combining(char))
+
+
+def search_terms(query):
+    terms = []
+    for term in _TERM_RE.findall(fold_search_text(query)):
+        term = term[:SEARCH_MAX_TERM_LENGTH]
+        if term not in terms:
+            terms.append(term)
+    return terms[:SEARCH_MAX_TERMS]
+
+
+# ---------------------------------------------------------------------------
+# Index maintenance
+# ---------------------------------------------------------------------------
+
+def _store_document(kind, object_id, user_id, text, created_at):
+    SearchDocument.objects.update_or_create(
+        kind=kind,
+        object_id=object_id,
+        defaults={
+            'user_id': user_id,
+            'body': fold_search_text(text),
+            'created_at': created_at,
+        },
+    )
+
+
+def index_question(question):
+    _store_document('question', question.id, question.user_id, question.question_text, question.created_at)
+
+
+def index_answer(answer):
+    _store_document('answer', answer.id, answer.user_id, answer.answer_text, answer.created_at)
+
+
+def index_user(user):
+    _store_document('user', user.id, user.id, user.username, user.date_joined)
+
+
+def remove_search_document(kind, object_id):
+    SearchDocument.objects.filter(kind=kind, object_id=object_id).delete()
+
+
+def rebuild_search_index(chunk_size=500):
+    """Rebuild every search document from the source tables."""
+    from django.contrib.auth.models import User
+
+    from .models import Answer, Question
+
+    SearchDocument.objects.all().delete()
+    sources = [
+        ('question', Question.objects.only('id', 'user_id', 'question_text', 'created_at'),
+         lambda obj: (obj.user_id, obj.question_text, obj.created_at)),
+        ('answer', Answer.objects.only('id', 'user_id', 'answer_text', 'created_at'),
+         lambda obj: (obj.user_id, obj.answer_text, obj.created_at)),
+        ('user', User.objects.only('id', 'username', 'date_joined'),
+         lambda obj: (obj.id, obj.username, obj.date_joined)),
+    ]
+    total = 0
+    for kind, queryset, fields in sources:
+        batch = []
+        for obj in queryset.order_by('id').iterator(chunk_size=chunk_size):
+            user_id, text, created_at = fields(obj)
+            batch.append(SearchDocument(
+                kind=kind,
+                object_id=obj.id,
+                user_id=user_id,
+                body=fold_search_text(text),
+                created_at=created_at,
+            ))
+            if len(batch) >= chunk_size:
+                SearchDocument.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        if batch:
+            SearchDocument.objects.bulk_create(batch)
+            total += len(batch)
+    return total
+
+
+# ---------------------------------------------------------------------------
+# Cursors
+# ---------------------------------------------------------------------------
+
+def encode_search_cursor(sort_value, document_id):
+    raw = json.dumps([sort_value, document_id], separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_search_cursor(value):
+    """Return `(sort_value, document_id)` or None for a missing/garbled cursor."""
+    if not value:
+        return None
+    try:
+        padded = value + '=' * (-len(value) % 4)
+        sort_value, document_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        return None
+    if not isinstance(document_id, int) or isinstance(sort_value, bool):
+        return None
+    if not isinstance(sort_value, (int, float, str)):
+        return None
+    return sort_value, document_id
+
+
+def _page(rows, limit):
+    """`rows` are `(document_id, kind, object_id, sort_value)`, at most limit + 1."""
+    rows = list(rows)
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    hits = [(kind, object_id) for _, kind, object_id, _ in rows]
+    next_cursor = None
+    if has_more and rows:
+        document_id, _, _, sort_value = rows[-1]
+        next_cursor = encode_search_cursor(sort_value, document_id)
+    return hits, next_cursor
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+def _sqlite_fts_available():
+    available = getattr(connection, '_search_fts_available', None)
+    if available is None:
+        with connection.cursor() as cursor:
+            available = SEARCH_FTS_TABLE in connection.introspection.table_names(cursor)
+        connection._search_fts_available = available
+    return available
+
+
+def _search_sqlite(terms, documents, limit, cursor):
+    document_table = SearchDocument._meta.db_table
+    match = ' '.join(f'"{term}"*' for term in terms)
+    base_sql, base_params = documents.values('id').query.sql_with_params()
+
+    sql = (
+        f'SELECT id, kind, object_id, score FROM ('
+        f'SELECT d.id AS id, d.kind AS kind, d.object_id AS object_id, '
+        f'bm25({SEARCH_FTS_TABLE}) AS score '
+        f'FROM {SEARCH_FTS_TABLE} JOIN {document_table} d ON d.id = {SEARCH_FTS_TABLE}.rowid '
+        f'WHERE {SEARCH_FTS_TABLE} MATCH %s AND d.id IN ({base_sql})'
+        f') AS ranked'
+    )
+    params = [match, *base_params]
+    if cursor is not None:
+        score, document_id = cursor
+        sql += ' WHERE score > %s OR (score = %s AND id > %s)'
+        params += [score, score, document_id]
+    sql += ' ORDER BY score, id LIMIT %s'
+    params.append(limit + 1)
+
+    with connection.cursor() as db_cursor:
+        db_cursor.execute(sql, params)
+        return db_cursor.fetchall()
+
+
+def _search_postgresql(terms, documents, limit, cursor):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+
+    vector = SearchVector('body', config='simple')
+    query = SearchQuery(' & '.join(f'{term}:*' for term in terms), config='simple', search_type='raw')
+    # Ranks are negated so every backend pages by ascending score.
+    ranked = documents.annotate(search=vector).filter(search=query).annotate(
+        score=SearchRank(vector, query) * Value(-1.0, output_field=FloatField()),
+    )
+    return _keyset_rows(ranked, limit, cursor)
+
+
+def _search_fallback(terms, documents, limit, cursor):
+    for term in terms:
+        documents = documents.filter(body__contains=term)
+    return _keyset_rows(documents.annotate(score=Value(0.0, output_field=FloatField())), limit, cursor)
+
+
+def _keyset_rows(queryset, limit, cursor):
+    if cursor is not None:
+        score, document_id = cursor
+        queryset = queryset.filter(Q(score__gt=score) | Q(score=score, id__gt=document_id))
+    return queryset.order_by('score', 'id').values_list('id', 'kind', 'object_id', 'score')[:limit + 1]
+
+
+def _search_backend():
+    if connection.vendor == 'postgresql':
+        return _search_postgresql
+    if connection.vendor == 'sqlite' and _sqlite_fts_available():
+        return _search_sqlite
+    return _search_fallback
+
+
+# ---------------------------------------------------------------------------
+# Queries
+# ---------------------------------------------------------------------------
+
+def search_documents(query, documents=None, *, limit=20, cursor=None):
+    """
+    Rank documents matching every term of `query` (prefix match) and return
+    `([(kind, object_id), ...], next_cursor)`.
+
+    `documents` narrows the candidates, e.g. by kind, author or date.
+    """
+    terms = search_terms(query)
+    if not terms:
+        return [], None
+    if documents is None:
+        documents = SearchDocument.objects.all()
+    cursor = decode_search_cursor(cursor)
+    if cursor is not None and isinstance(cursor[0], str):
+        cursor = None
+    rows = _search_backend()(terms, documents, limit, cursor)
+    return _page(rows, limit)
+
+
+def browse_documents(documents, *, limit=20, cursor=None):
+    """Page through `documents` oldest first, without a text query."""
+    cursor = decode_search_cursor(cursor)
+    if cursor is not None and not isinstance(cursor[0], str):
+        cursor = None
+    queryset = documents
+    if cursor is not None:
+        created_at, document_id = cursor
+        queryset = queryset.filter(
+            Q(created_at__gt=created_at) | Q(created_at=created_at, id__gt=document_id)
+        )
+    rows = queryset.order_by('created_at', 'id').values_list(
+        'id', 'kind', 'object_id', 'created_at',
+    )[:limit + 1]
+    rows = [
+        (document_id, kind, object_id, created_at.isoformat())
+        for document_id, kind, object_id, created_at in rows
+    ]
+    return _page(rows, limit)
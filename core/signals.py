@@ -1,8 +1,26 @@
 from django.contrib.auth import get_user_model
 User = get_user_model()
-from django.db.models.signals import post_save, post_delete
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_save, post_delete, pre_save
+from django.contrib.contenttypes.models import ContentType
 from django.dispatch import receiver
-from .models import UserProfile, Answer, Question, QuestionRelationship
+from .answer_render_store import invalidate_answer_renders, store_answer_render
+from .chat_fanout import forget_channel, online_channel, publish, radio_channel
+from .content_link_preload import invalidate_content_link_cache
+from .revision_summary import refresh_revision_summaries, refresh_user_revision_summaries
+from .search_index import index_answer, index_question, index_user, remove_search_document
+from .models import (
+    UserProfile, Answer, AnswerRevision, AnswerRevisionApproval, AnswerSuggestion, Definition, HashtagUsage, Message, Notification, OnlineChatMessage, Question,
+    QuestionRelationship, RadioChatMessage, Reference, SavedItem, StartingQuestion, Vote,
+)
+from .question_activity import record_new_answer, refresh_question_activity
+from .question_graph import invalidate_user_question_graph
+from .question_map_snapshot import update_question_map
+from .site_statistics import apply_entry_change, apply_save_change, apply_vote_total_change, forget_saved_object
+from .unread_counters import adjust_unread, forget_unread_counts, online_chat_changed
+from .user_word_stats import apply_text_change
+from .utils import sync_answer_reference_citations
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -15,7 +33,7 @@ def create_user_profile(sender, instance, created, **kwargs):
 
 
 @receiver(post_delete, sender=Answer)
-def cleanup_question_relationships_on_answer_delete(sender, instance, **kwargs):
+def cleanup_question_relationships_on_answer_delete(sender, instance, origin=None, **kwargs):
     """
     Entry silindiğinde:
     1. Kullanıcının o soruda başka entry'si yoksa
@@ -51,5 +69,491 @@ def cleanup_question_relationships_on_answer_delete(sender, instance, **kwargs):
         question.users.remove(user)
 
     # Eğer bu sorunun hiç entry'si kalmadıysa, soruyu da sil
+    # (soru zaten aynı silme işleminde siliniyorsa tekrar silme; aksi halde
+    # post_delete sinyalleri soru için iki kez çalışır).
+    if _deletion_includes_question(origin, question):
+        return
     if not Answer.objects.filter(question=question).exists():
         question.delete()
+
+
+def _deletion_includes_question(origin, question):
+    if isinstance(origin, Question):
+        return origin.pk == question.pk
+    if isinstance(origin, User):
+        return origin.pk == question.user_id
+    return isinstance(origin, QuerySet) and origin.model is Question
+
+
+# ========== RENDERED ANSWER STORE ==========
+
+@receiver(post_save, sender=Answer)
+def store_rendered_answer_on_save(sender, instance, **kwargs):
+    store_answer_render(instance)
+
+
+@receiver(post_save, sender=Definition)
+@receiver(post_delete, sender=Definition)
+def invalidate_renders_on_definition_change(sender, instance, **kwargs):
+    invalidate_answer_renders('definition', [instance.id])
+
+
+@receiver(post_save, sender=Reference)
+@receiver(post_delete, sender=Reference)
+def invalidate_renders_on_reference_change(sender, instance, **kwargs):
+    invalidate_answer_renders('reference', [instance.id])
+
+
+@receiver(pre_save, sender=Question)
+def remember_previous_question_text(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and 'question_text' not in update_fields):
+        return
+    instance._previous_question_text = (
+        Question.objects.filter(pk=instance.pk).values_list('question_text', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=Question)
+def invalidate_renders_on_question_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'question_text' not in update_fields:
+        return
+    previous_text = getattr(instance, '_previous_question_text', None)
+    if not created and previous_text == instance.question_text:
+        return
+    invalidate_answer_renders('question', [instance.question_text, previous_text])
+
+
+@receiver(post_delete, sender=Question)
+def invalidate_renders_on_question_delete(sender, instance, **kwargs):
+    invalidate_answer_renders('question', [instance.question_text])
+
+
+@receiver(post_save, sender=User)
+def invalidate_renders_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    # Logins only touch last_login; full saves may carry a rename.
+    if not created and update_fields is not None and 'username' not in update_fields:
+        return
+    previous_username = getattr(instance, '_previous_username', None)
+    if not created and previous_username == instance.username:
+        return
+    invalidate_answer_renders('user', [instance.username, previous_username])
+    if previous_username:
+        # Definition popovers carry the author's username.
+        invalidate_answer_renders('definition', Definition.objects.filter(user=instance).values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=User)
+def invalidate_renders_on_user_delete(sender, instance, **kwargs):
+    invalidate_answer_renders('user', [instance.username])
+
+
+# ========== CONTENT LINK CACHE ==========
+
+@receiver(post_save, sender=Definition)
+@receiver(post_delete, sender=Definition)
+def forget_cached_definition(sender, instance, **kwargs):
+    invalidate_content_link_cache('definition', [instance.id])
+
+
+@receiver(post_save, sender=Reference)
+@receiver(post_delete, sender=Reference)
+def forget_cached_reference(sender, instance, **kwargs):
+    invalidate_content_link_cache('reference', [instance.id])
+
+
+@receiver(post_save, sender=Question)
+def forget_cached_question_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and not {'question_text', 'slug'} & set(update_fields):
+        return
+    # Creating a question also clears a cached miss for its title.
+    invalidate_content_link_cache(
+        'question',
+        [instance.question_text, getattr(instance, '_previous_question_text', None)],
+    )
+
+
+@receiver(post_delete, sender=Question)
+def forget_cached_question_on_delete(sender, instance, **kwargs):
+    invalidate_content_link_cache('question', [instance.question_text])
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and 'username' not in update_fields):
+        return
+    instance._previous_username = (
+        User.objects.filter(pk=instance.pk).values_list('username', flat=True).first()
+    )
+
+
+@receiver(post_save, sender=User)
+def forget_cached_user_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'username' not in update_fields:
+        return
+    previous_username = getattr(instance, '_previous_username', None)
+    invalidate_content_link_cache('user', [instance.username, previous_username])
+    if previous_username and previous_username != instance.username:
+        # Definition popovers carry the author's username.
+        invalidate_content_link_cache(
+            'definition',
+            Definition.objects.filter(user=instance).values_list('id', flat=True),
+        )
+
+
+@receiver(post_delete, sender=User)
+def forget_cached_user_on_delete(sender, instance, **kwargs):
+    invalidate_content_link_cache('user', [instance.username])
+
+
+# ========== SEARCH INDEX ==========
+
+@receiver(post_save, sender=Question)
+def index_question_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'question_text' not in update_fields:
+        return
+    index_question(instance)
+
+
+@receiver(post_delete, sender=Question)
+def remove_question_from_search(sender, instance, **kwargs):
+    remove_search_document('question', instance.id)
+
+
+@receiver(post_save, sender=Answer)
+def index_answer_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'answer_text' not in update_fields:
+        return
+    index_answer(instance)
+
+
+@receiver(post_delete, sender=Answer)
+def remove_answer_from_search(sender, instance, **kwargs):
+    remove_search_document('answer', instance.id)
+
+
+@receiver(post_save, sender=User)
+def index_user_on_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'username' not in update_fields:
+        return
+    index_user(instance)
+
+
+# ========== QUESTION MAP SNAPSHOT ==========
+
+@receiver(post_save, sender=QuestionRelationship)
+@receiver(post_delete, sender=QuestionRelationship)
+def update_question_map_on_relationship_change(sender, instance, **kwargs):
+    update_question_map([instance.parent_id, instance.child_id])
+
+
+@receiver(post_save, sender=StartingQuestion)
+@receiver(post_delete, sender=StartingQuestion)
+def update_question_map_on_starting_question_change(sender, instance, **kwargs):
+    update_question_map([instance.question_id])
+
+
+@receiver(post_save, sender=Answer)
+def update_question_map_on_answer_save(sender, instance, created, update_fields=None, **kwargs):
+    # Vote and text edits do not change who answered a mapped question.
+    if not created and update_fields is not None:
+        return
+    update_question_map([instance.question_id], membership_changed=False)
+
+
+@receiver(post_delete, sender=Answer)
+def update_question_map_on_answer_delete(sender, instance, **kwargs):
+    update_question_map([instance.question_id], membership_changed=False)
+
+
+@receiver(post_save, sender=Question)
+def update_question_map_on_question_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not {'question_text', 'slug'} & set(update_fields)):
+        return
+    update_question_map([instance.id], membership_changed=False)
+
+
+@receiver(post_delete, sender=Question)
+def update_question_map_on_question_delete(sender, instance, **kwargs):
+    update_question_map([instance.id], membership_changed=False)
+
+
+@receiver(m2m_changed, sender=Question.users.through)
+def update_question_map_on_members_change(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # post_clear does not report which questions the user was removed from.
+        instance._cleared_question_ids = list(instance.associated_questions.values_list('id', flat=True))
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        question_ids = [instance.pk]
+    elif action == 'post_clear':
+        question_ids = getattr(instance, '_cleared_question_ids', [])
+    else:
+        question_ids = pk_set or []
+    update_question_map(question_ids, membership_changed=False)
+
+
+@receiver(post_save, sender=HashtagUsage)
+@receiver(post_delete, sender=HashtagUsage)
+def update_question_map_on_hashtag_change(sender, instance, **kwargs):
+    if not instance.answer_id:
+        return
+    question_ids = Answer.objects.filter(id=instance.answer_id).values_list('question_id', flat=True)
+    update_question_map(question_ids, membership_changed=False)
+
+
+@receiver(post_save, sender=User)
+def update_question_map_on_user_save(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and 'username' not in update_fields):
+        return
+    question_ids = Answer.objects.filter(user=instance).values_list('question_id', flat=True).distinct()
+    update_question_map(question_ids, membership_changed=False)
+
+
+# ========== QUESTION GRAPH ==========
+
+@receiver(post_save, sender=QuestionRelationship)
+@receiver(post_delete, sender=QuestionRelationship)
+def invalidate_question_graph_on_relationship_change(sender, instance, **kwargs):
+    invalidate_user_question_graph(instance.user_id)
+
+
+# ========== PROFILE WORD STATS ==========
+
+@receiver(pre_save, sender=Answer)
+def remember_previous_answer_text(sender, instance, update_fields=None, **kwargs):
+    # Also stashes the question id for QUESTION ACTIVITY, in the same query.
+    if not instance.pk or (update_fields is not None and not {'answer_text', 'question'} & set(update_fields)):
+        return
+    previous = Answer.objects.filter(pk=instance.pk).values_list('answer_text', 'question_id').first()
+    instance._previous_answer_text, instance._previous_question_id = previous or (None, None)
+
+
+@receiver(post_save, sender=Answer)
+def update_word_stats_on_answer_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_text_change(instance.user_id, '', instance.answer_text, entry_delta=1)
+    elif update_fields is None or 'answer_text' in update_fields:
+        apply_text_change(instance.user_id, getattr(instance, '_previous_answer_text', None), instance.answer_text)
+
+
+@receiver(post_delete, sender=Answer)
+def update_word_stats_on_answer_delete(sender, instance, **kwargs):
+    apply_text_change(instance.user_id, instance.answer_text, '', entry_delta=-1)
+
+
+@receiver(post_save, sender=Question)
+def update_word_stats_on_question_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_text_change(instance.user_id, '', instance.question_text)
+    elif update_fields is None or 'question_text' in update_fields:
+        apply_text_change(instance.user_id, getattr(instance, '_previous_question_text', None), instance.question_text)
+
+
+@receiver(post_delete, sender=Question)
+def update_word_stats_on_question_delete(sender, instance, **kwargs):
+    apply_text_change(instance.user_id, instance.question_text, '')
+
+
+# ========== REFERENCE CITATIONS ==========
+
+@receiver(post_save, sender=Answer)
+def sync_reference_citations_on_answer_save(sender, instance, created, update_fields=None, **kwargs):
+    if not created and update_fields is not None and 'answer_text' not in update_fields:
+        return
+    if not created and getattr(instance, '_previous_answer_text', None) == instance.answer_text:
+        return
+    sync_answer_reference_citations(instance)
+
+
+# ========== QUESTION ACTIVITY ==========
+
+@receiver(post_save, sender=Answer)
+def update_question_activity_on_answer_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        record_new_answer(instance)
+        return
+    # created_at is auto_now_add, so only a move to another question changes the columns.
+    previous_question_id = getattr(instance, '_previous_question_id', None)
+    if previous_question_id and previous_question_id != instance.question_id:
+        refresh_question_activity([previous_question_id, instance.question_id])
+
+
+@receiver(post_delete, sender=Answer)
+def update_question_activity_on_answer_delete(sender, instance, **kwargs):
+    refresh_question_activity([instance.question_id])
+
+
+# ========== SITE STATISTICS ==========
+
+@receiver(post_save, sender=Question)
+def update_site_statistics_on_question_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_entry_change(instance.user_id, '', instance.question_text, question_delta=1)
+    elif update_fields is None or 'question_text' in update_fields:
+        apply_entry_change(instance.user_id, getattr(instance, '_previous_question_text', None), instance.question_text)
+
+
+@receiver(post_delete, sender=Question)
+def update_site_statistics_on_question_delete(sender, instance, **kwargs):
+    apply_entry_change(instance.user_id, instance.question_text, '', question_delta=-1)
+    forget_saved_object(ContentType.objects.get_for_model(Question).id, instance.pk)
+
+
+@receiver(post_save, sender=Answer)
+def update_site_statistics_on_answer_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_entry_change(instance.user_id, '', instance.answer_text, answer_delta=1)
+    elif update_fields is None or 'answer_text' in update_fields:
+        apply_entry_change(instance.user_id, getattr(instance, '_previous_answer_text', None), instance.answer_text)
+
+
+@receiver(post_delete, sender=Answer)
+def update_site_statistics_on_answer_delete(sender, instance, **kwargs):
+    apply_entry_change(instance.user_id, instance.answer_text, '', answer_delta=-1)
+    forget_saved_object(ContentType.objects.get_for_model(Answer).id, instance.pk)
+
+
+@receiver(pre_save, sender=Vote)
+def remember_previous_vote_value(sender, instance, update_fields=None, **kwargs):
+    if not instance.pk or (update_fields is not None and 'value' not in update_fields):
+        return
+    instance._previous_vote_value = Vote.objects.filter(pk=instance.pk).values_list('value', flat=True).first()
+
+
+@receiver(post_save, sender=Vote)
+def update_site_statistics_on_vote_save(sender, instance, created, update_fields=None, **kwargs):
+    if created:
+        apply_vote_total_change(0, instance.value)
+    elif update_fields is None or 'value' in update_fields:
+        apply_vote_total_change(getattr(instance, '_previous_vote_value', None), instance.value)
+
+
+@receiver(post_delete, sender=Vote)
+def update_site_statistics_on_vote_delete(sender, instance, **kwargs):
+    apply_vote_total_change(instance.value, 0)
+
+
+@receiver(post_save, sender=SavedItem)
+def update_site_statistics_on_saved_item_save(sender, instance, created, **kwargs):
+    if created:
+        apply_save_change(instance.content_type_id, instance.object_id, 1)
+
+
+@receiver(post_delete, sender=SavedItem)
+def update_site_statistics_on_saved_item_delete(sender, instance, **kwargs):
+    apply_save_change(instance.content_type_id, instance.object_id, -1)
+
+
+# ========== UNREAD COUNTERS ==========
+
+@receiver(post_save, sender=User)
+def forget_unread_counts_of_new_user(sender, instance, created, **kwargs):
+    # Ids can be reused (e.g. SQLite after a rollback); never inherit old counts.
+    if created:
+        forget_unread_counts([instance.pk])
+
+
+@receiver(post_save, sender=Notification)
+def count_new_notification(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread(instance.recipient_id, 'notification_count', 1)
+
+
+@receiver(post_delete, sender=Notification)
+def uncount_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.recipient_id, 'notification_count', -1)
+
+
+@receiver(post_save, sender=Message)
+def count_new_message(sender, instance, created, **kwargs):
+    if created and not instance.is_read:
+        adjust_unread(instance.recipient_id, 'message_count', 1)
+
+
+@receiver(post_delete, sender=Message)
+def uncount_deleted_message(sender, instance, **kwargs):
+    if not instance.is_read:
+        adjust_unread(instance.recipient_id, 'message_count', -1)
+
+
+@receiver(post_save, sender=OnlineChatMessage)
+def count_new_online_chat_message(sender, instance, created, **kwargs):
+    if created:
+        online_chat_changed()
+
+
+@receiver(post_delete, sender=OnlineChatMessage)
+def uncount_deleted_online_chat_message(sender, instance, **kwargs):
+    online_chat_changed()
+
+
+# ========== CHAT FAN-OUT ==========
+
+@receiver(post_save, sender=OnlineChatMessage)
+def publish_online_chat_message(sender, instance, created, **kwargs):
+    if created:
+        publish(online_channel(), instance.id)
+
+
+@receiver(post_save, sender=RadioChatMessage)
+def publish_radio_chat_message(sender, instance, created, **kwargs):
+    if created:
+        publish(radio_channel(instance.program_id), instance.id)
+
+
+@receiver(post_delete, sender=OnlineChatMessage)
+def forget_online_chat_channel(sender, instance, **kwargs):
+    forget_channel(online_channel())
+
+
+@receiver(post_delete, sender=RadioChatMessage)
+def forget_radio_chat_channel(sender, instance, **kwargs):
+    forget_channel(radio_channel(instance.program_id))
+
+
+# ========== REVISION SUMMARY ==========
+# Deletes refresh after commit: when the answer itself is being deleted its
+# revisions go first, and a summary written mid-cascade would outlive it.
+
+def _refresh_summary_after_commit(answer_id):
+    transaction.on_commit(lambda: refresh_revision_summaries([answer_id]))
+
+
+@receiver(post_save, sender=AnswerRevision)
+@receiver(post_save, sender=AnswerSuggestion)
+def refresh_revision_summary_on_save(sender, instance, **kwargs):
+    refresh_revision_summaries([instance.answer_id])
+
+
+@receiver(post_delete, sender=AnswerRevision)
+@receiver(post_delete, sender=AnswerSuggestion)
+def refresh_revision_summary_on_delete(sender, instance, **kwargs):
+    _refresh_summary_after_commit(instance.answer_id)
+
+
+def _approval_answer_id(approval):
+    if AnswerRevisionApproval.revision.is_cached(approval):
+        return approval.revision.answer_id
+    return AnswerRevision.objects.filter(pk=approval.revision_id).values_list('answer_id', flat=True).first()
+
+
+@receiver(post_save, sender=AnswerRevisionApproval)
+def refresh_revision_summary_on_approval(sender, instance, **kwargs):
+    refresh_revision_summaries([_approval_answer_id(instance)])
+
+
+@receiver(post_delete, sender=AnswerRevisionApproval)
+def refresh_revision_summary_on_approval_delete(sender, instance, **kwargs):
+    answer_id = _approval_answer_id(instance)
+    if answer_id:
+        _refresh_summary_after_commit(answer_id)
+
+
+@receiver(post_save, sender=User)
+def refresh_revision_summaries_on_rename(sender, instance, created, **kwargs):
+    previous_username = getattr(instance, '_previous_username', None)
+    if not created and previous_username and previous_username != instance.username:
+        refresh_user_revision_summaries(instance.id)
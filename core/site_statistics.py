@@ -0,0 +1,259 @@
+"""
+Rollup tables behind the site statistics page.
+
+Site totals (SiteStatistic), corpus word counts (SiteWordCount), per-user
+entry totals (UserEntryStats) and per-object save counts (ContentSaveCount)
+are patched from the question, answer, vote and saved-item signals with
+single `F()` updates, so concurrent writers never wait on a row lock taken
+up front. Counts that drop to zero keep their row until the next rebuild.
+Finished days of DailyVisitor/VisitSession are folded into DailyVisitorCount
+when the page is opened, recounting the last ROLLUP_TRAILING_DAYS so visits
+flushed late by the visit buffer are included; today is still counted live.
+
+Everything is built from scratch by the `rebuild_site_statistics` command,
+never on the request path; until then changes are skipped and the page
+shows zeros. Whether the rollups exist is remembered in the cache once they
+do, so signal handlers do not query for it on every write.
+"""
+
+import re
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Case, Count, F, Value, When
+from django.db.models.functions import Greatest
+
+from .models import (
+    Answer,
+    ContentSaveCount,
+    DailyVisitor,
+    DailyVisitorCount,
+    Question,
+    SavedItem,
+    SiteStatistic,
+    SiteWordCount,
+    UserEntryStats,
+    VisitSession,
+    Vote,
+)
+
+
+WORD_PATTERN = re.compile(r'\b\w+\b', re.UNICODE)
+WORD_MAX_LENGTH = 255
+COUNTER_KEYS = ('questions', 'answers', 'words', 'characters', 'likes', 'dislikes')
+ROLLUP_TRAILING_DAYS = 2
+BUILT_CACHE_KEY = 'site-statistics:built'
+BUILT_CACHE_TIMEOUT = 60 * 60 * 24
+
+
+def corpus_text_stats(text):
+    """Return `(word Counter, word total, character total)` for one text."""
+    if not text:
+        return Counter(), 0, 0
+    words = WORD_PATTERN.findall(text.lower())
+    counts = Counter(word for word in words if len(word) <= WORD_MAX_LENGTH)
+    return counts, len(words), len(text)
+
+
+def _rollups_built():
+    if cache.get(BUILT_CACHE_KEY):
+        return True
+    # Only "built" is cached: a rebuild in another process must not be
+    # ignored here because of a stale "not built".
+    built = SiteStatistic.objects.filter(key='questions').exists()
+    if built:
+        cache.set(BUILT_CACHE_KEY, True, BUILT_CACHE_TIMEOUT)
+    return built
+
+
+def _apply_word_delta(delta):
+    delta = {word: change for word, change in delta.items() if change}
+    if not delta:
+        return
+    SiteWordCount.objects.bulk_create(
+        [SiteWordCount(word=word, count=0) for word, change in delta.items() if change > 0],
+        batch_size=500,
+        ignore_conflicts=True,
+    )
+    # One UPDATE per distinct change; most edits only add or remove a word once.
+    words_by_change = defaultdict(list)
+    for word, change in delta.items():
+        words_by_change[change].append(word)
+    for change, words in words_by_change.items():
+        SiteWordCount.objects.filter(word__in=words).update(count=Greatest(F('count') + change, 0))
+
+
+def _bump_counters(changes):
+    changes = {key: change for key, change in changes.items() if change}
+    if changes:
+        SiteStatistic.objects.filter(key__in=changes).update(value=Greatest(
+            F('value') + Case(*[When(key=key, then=Value(change)) for key, change in changes.items()]),
+            0,
+        ))
+
+
+def apply_entry_change(user_id, old_text, new_text, *, question_delta=0, answer_delta=0):
+    """Move the corpus from `old_text` to `new_text` and count added/removed entries."""
+    if old_text == new_text and not (question_delta or answer_delta):
+        return False
+    if not _rollups_built():
+        return False
+    with transaction.atomic():
+        old_words, old_word_total, old_char_total = corpus_text_stats(old_text)
+        new_words, new_word_total, new_char_total = corpus_text_stats(new_text)
+        delta = Counter(new_words)
+        delta.subtract(old_words)
+        _apply_word_delta(delta)
+        _bump_counters({
+            'questions': question_delta,
+            'answers': answer_delta,
+            'words': new_word_total - old_word_total,
+            'characters': new_char_total - old_char_total,
+        })
+
+        if question_delta or answer_delta:
+            stats, _ = UserEntryStats.objects.get_or_create(user_id=user_id)
+            UserEntryStats.objects.filter(pk=stats.pk).update(
+                question_count=Greatest(F('question_count') + question_delta, 0),
+                answer_count=Greatest(F('answer_count') + answer_delta, 0),
+            )
+    return True
+
+
+def apply_vote_total_change(old_value, new_value):
+    old_value, new_value = old_value or 0, new_value or 0
+    if old_value == new_value:
+        return False
+    if not _rollups_built():
+        return False
+    _bump_counters({
+        'likes': (new_value == 1) - (old_value == 1),
+        'dislikes': (new_value == -1) - (old_value == -1),
+    })
+    return True
+
+
+def apply_save_change(content_type_id, object_id, delta):
+    if not _rollups_built():
+        return False
+    if delta > 0:
+        ContentSaveCount.objects.bulk_create(
+            [ContentSaveCount(content_type_id=content_type_id, object_id=object_id, count=0)],
+            ignore_conflicts=True,
+        )
+    ContentSaveCount.objects.filter(content_type_id=content_type_id, object_id=object_id).update(
+        count=Greatest(F('count') + delta, 0),
+    )
+    return True
+
+
+def forget_saved_object(content_type_id, object_id):
+    ContentSaveCount.objects.filter(content_type_id=content_type_id, object_id=object_id).delete()
+
+
+def roll_visitor_days(today):
+    """
+    Fold finished days into DailyVisitorCount: every day not rolled yet, and
+    the last ROLLUP_TRAILING_DAYS again in case their events arrived late.
+    Returns the number of days written.
+    """
+    last_rolled = DailyVisitorCount.objects.order_by('-date').values_list('date', flat=True).first()
+    visitors = DailyVisitor.objects.filter(date__lt=today)
+    visits = VisitSession.objects.filter(date__lt=today)
+    if last_rolled is not None:
+        since = min(last_rolled + timedelta(days=1), today - timedelta(days=ROLLUP_TRAILING_DAYS))
+        visitors = visitors.filter(date__gte=since)
+        visits = visits.filter(date__gte=since)
+
+    days = {}
+    for row in visitors.values('date').annotate(total=Count('id')).order_by():
+        days.setdefault(row['date'], [0, 0])[0] = row['total']
+    for row in visits.values('date').annotate(total=Count('id')).order_by():
+        days.setdefault(row['date'], [0, 0])[1] = row['total']
+    if not days:
+        return 0
+
+    rolled = {row.date: row for row in DailyVisitorCount.objects.filter(date__in=days)}
+    to_create, to_update = [], []
+    for day, (unique_visitors, visit_sessions) in days.items():
+        row = rolled.get(day)
+        if row is None:
+            to_create.append(DailyVisitorCount(date=day, unique_visitors=unique_visitors, visit_sessions=visit_sessions))
+        elif (row.unique_visitors, row.visit_sessions) != (unique_visitors, visit_sessions):
+            row.unique_visitors, row.visit_sessions = unique_visitors, visit_sessions
+            to_update.append(row)
+    if to_create:
+        # Another request may be rolling the same days.
+        DailyVisitorCount.objects.bulk_create(to_create, ignore_conflicts=True)
+    if to_update:
+        DailyVisitorCount.objects.bulk_update(to_update, ['unique_visitors', 'visit_sessions'])
+    return len(to_create) + len(to_update)
+
+
+def rebuild_site_statistics(today=None):
+    """Recount every rollup table from the source tables."""
+    word_counts = Counter()
+    totals = dict.fromkeys(COUNTER_KEYS, 0)
+    sources = [
+        ('questions', Question.objects.values_list('question_text', flat=True)),
+        ('answers', Answer.objects.values_list('answer_text', flat=True)),
+    ]
+    for key, queryset in sources:
+        for text in queryset.iterator(chunk_size=500):
+            totals[key] += 1
+            words, word_total, char_total = corpus_text_stats(text)
+            word_counts.update(words)
+            totals['words'] += word_total
+            totals['characters'] += char_total
+
+    vote_totals = dict(Vote.objects.values_list('value').annotate(total=Count('id')).order_by())
+    totals['likes'] = vote_totals.get(1, 0)
+    totals['dislikes'] = vote_totals.get(-1, 0)
+
+    entry_stats = {}
+    for user_id, total in Question.objects.values_list('user_id').annotate(total=Count('id')).order_by():
+        entry_stats.setdefault(user_id, UserEntryStats(user_id=user_id)).question_count = total
+    for user_id, total in Answer.objects.values_list('user_id').annotate(total=Count('id')).order_by():
+        entry_stats.setdefault(user_id, UserEntryStats(user_id=user_id)).answer_count = total
+
+    save_counts = (
+        SavedItem.objects.values_list('content_type_id', 'object_id')
+        .annotate(total=Count('id'))
+        .order_by()
+    )
+
+    with transaction.atomic():
+        SiteWordCount.objects.all().delete()
+        SiteWordCount.objects.bulk_create(
+            [SiteWordCount(word=word, count=count) for word, count in word_counts.items()],
+            batch_size=500,
+        )
+        UserEntryStats.objects.all().delete()
+        UserEntryStats.objects.bulk_create(entry_stats.values(), batch_size=500)
+        ContentSaveCount.objects.all().delete()
+        ContentSaveCount.objects.bulk_create(
+            [
+                ContentSaveCount(content_type_id=content_type_id, object_id=object_id, count=total)
+                for content_type_id, object_id, total in save_counts
+            ],
+            batch_size=500,
+        )
+        SiteStatistic.objects.all().delete()
+        SiteStatistic.objects.bulk_create([SiteStatistic(key=key, value=value) for key, value in totals.items()])
+        if today is not None:
+            DailyVisitorCount.objects.all().delete()
+            roll_visitor_days(today)
+    transaction.on_commit(lambda: cache.set(BUILT_CACHE_KEY, True, BUILT_CACHE_TIMEOUT))
+    return totals
+
+
+def load_site_totals(today):
+    """Counter values by key, or None until `rebuild_site_statistics` has run."""
+    roll_visitor_days(today)
+    totals = dict(SiteStatistic.objects.values_list('key', 'value'))
+    if not totals:
+        return None
+    cache.set(BUILT_CACHE_KEY, True, BUILT_CACHE_TIMEOUT)
+    return {key: totals.get(key, 0) for key in COUNTER_KEYS}
@@ -1,5 +1,8 @@
+import itertools
 import re
 import unicodedata
+import uuid
+from functools import lru_cache
 
 from django import template
 from django.urls import reverse
@@ -8,19 +11,25 @@ from django.utils.html import escape
 from core.models import Question, PollVote, Definition,Reference
 from django.contrib.auth.models import User
 from urllib.parse import quote_plus, urlparse, unquote
-from html import unescape as html_unescape
+from html import escape as html_escape, unescape as html_unescape
 
 from core.content_link_preload import (
     get_preloaded_definition,
     get_preloaded_question,
     get_preloaded_reference,
     get_preloaded_user,
+    load_definitions,
+    load_questions_by_label,
+    load_references,
+    load_users_by_username,
 )
 from core.diagram_markup import (
     DIAGRAM_MARKER_PATTERN,
     decode_diagram_payload,
     render_diagram_html,
 )
+from core.markdown_engine import get_markdown_engine
+from core.utils import is_storable_id
 
 
 
@@ -66,10 +75,199 @@ def _apply_outside_math(text, transform):
     return ''.join(result)
 
 
+@lru_cache(maxsize=4096)
 def _build_hashtag_link(hashtag_name):
     url = reverse('hashtag_view', args=[hashtag_name.lower()])
     return f'<a href="{url}" class="hashtag-link">#{hashtag_name}</a>'
 
+
+def _bkz_html(query):
+    url = reverse('bkz', args=[query])
+    return f'(bkz: <a href="{url}" target="_blank" rel="noopener noreferrer" style="text-decoration: none;">{escape(query)}</a>)'
+
+
+def _question_ref_html(ref_text, question_cache):
+    cache_key = ref_text.casefold()
+    q = question_cache.get(cache_key)
+    if q is None and cache_key not in question_cache:
+        is_preloaded, q = get_preloaded_question(ref_text)
+        if not is_preloaded:
+            q = load_questions_by_label([ref_text]).get(cache_key)
+        question_cache[cache_key] = q
+    if q is not None:
+        url = reverse('question_detail', args=[q.slug])
+        return f'<a href="{url}" target="_blank" style="text-decoration: none;">{escape(ref_text)}</a>'
+    create_url = reverse('add_question_from_search') + f'?q={quote_plus(ref_text)}'
+    return f'<a href="{create_url}" target="_blank" style="text-decoration: none;">{escape(ref_text)}</a>'
+
+
+# Tanım içinde geçen kaynak notlarını popover'da göstermeyelim.
+DEFINITION_SOURCE_PATTERN = re.compile(
+    r'\((?:kaynak|k):\d+(?:(?:,\s*sayfa:[^)]+)|(?:\s*s:[^)]+))?\)'
+)
+REPEATED_SPACE_PATTERN = re.compile(r'\s{2,}')
+
+
+def _definition_html(question_word, def_id_str, definition_cache):
+    definition = definition_cache.get(def_id_str)
+    if definition is None and def_id_str not in definition_cache:
+        is_preloaded, definition = get_preloaded_definition(def_id_str)
+        if not is_preloaded:
+            definition = load_definitions([def_id_str]).get(int(def_id_str))
+        definition_cache[def_id_str] = definition
+    if definition is not None:
+        # Tanım metni
+        def_text = definition.definition_text
+        clean_def_text = DEFINITION_SOURCE_PATTERN.sub('', def_text)
+        clean_def_text = REPEATED_SPACE_PATTERN.sub(' ', clean_def_text).strip()
+        # (İstersen "definition.user.username" vs. de popover’a ekleyebilirsin.)
+        user_name = definition.user.username
+
+
+        # HTML popover
+        # Bootstrap 5: data-bs-toggle="popover" data-bs-content="..."
+        # Hover/focus ile açtırmak için -> data-bs-trigger="hover focus"
+        return f'''<span class="tanim-popover" 
+                      style="text-decoration:underline; cursor:pointer;"
+                      data-bs-toggle="popover" 
+                      data-bs-placement="top" 
+                      data-bs-trigger="hover focus"
+                      data-bs-title="{escape(user_name)}"
+                      data-bs-content="{escape(clean_def_text)}">
+                      {escape(question_word)}
+                   </span>'''
+    # ID bulunamadıysa => orijinal metni döndürmek yerine 
+    # plain text olarak "kelime" döndürebiliriz veya "Tanım yok" diyen bir span.
+    return escape(question_word)
+
+
+def _load_references(reference_ids):
+    reference_cache = {}
+    missing_reference_ids = set()
+    for reference_id in reference_ids:
+        is_preloaded, reference = get_preloaded_reference(reference_id)
+        if is_preloaded:
+            reference_cache[reference_id] = reference
+        else:
+            missing_reference_ids.add(reference_id)
+    if missing_reference_ids:
+        reference_cache.update(load_references(missing_reference_ids))
+    return reference_cache
+
+
+def _reference_html(ref_obj, ref_id, sayfa, ref_num):
+    if ref_obj is not None:
+        # Çoklu yazarları düzgün formatla
+        surnames = [s.strip() for s in ref_obj.author_surname.split(';') if s.strip()]
+        names = [n.strip() for n in ref_obj.author_name.split(';') if n.strip()]
+
+        authors = []
+        for i in range(max(len(surnames), len(names))):
+            surname = surnames[i] if i < len(surnames) else ''
+            name = names[i] if i < len(names) else ''
+            if surname or name:
+                authors.append(f"{surname}, {name}".strip(', '))
+
+        author_str = '; '.join(authors)
+        metin = f". {ref_obj.metin_ismi}" if ref_obj.metin_ismi else ""
+        full_citation = f"{author_str}{metin} ({ref_obj.year}). {ref_obj.rest}"
+        if ref_obj.abbreviation:
+            full_citation += f" [{ref_obj.abbreviation}]"
+        if sayfa:
+            full_citation += f", s. {sayfa.strip()}"
+    else:
+        full_citation = f"Kaynak bulunamadı (ID: {ref_id})"
+
+    return f'<sup class="reference-tooltip" data-bs-toggle="tooltip" title="{escape(full_citation)}">[{ref_num}]</sup>'
+
+
+MENTION_DASHES = ('‐', '‑', '‒', '–', '—', '−')
+
+
+def _mention_html(raw_candidate, user_cache):
+    candidate = unicodedata.normalize('NFKC', raw_candidate)
+    candidate = candidate.replace('\u00A0', ' ')  # nbsp -> space
+    for dash in MENTION_DASHES:
+        candidate = candidate.replace(dash, '-')
+    candidate = ' '.join(candidate.split())
+
+    words = candidate.split()
+    for i in range(len(words), 0, -1):
+        username = ' '.join(words[:i])
+        cache_key = username.casefold()
+        user = user_cache.get(cache_key)
+        if user is None and cache_key not in user_cache:
+            is_preloaded, user = get_preloaded_user(username)
+            if not is_preloaded:
+                user = load_users_by_username([username]).get(cache_key)
+            user_cache[cache_key] = user
+        if user is not None:
+            url = reverse('user_profile', args=[user.username])
+            # kalan kelimeler ek veya düz metin olur
+            tail = ' '.join(words[i:])
+            safe_username = escape(username)
+            safe_tail = escape(tail) if tail else ""
+            return f'<a href="{url}" class="mention">@{safe_username}</a>{(" " + safe_tail) if safe_tail else ""}'
+    # hiçbiri yoksa düz metin döndür
+    return f'@{escape(candidate)}'
+
+
+IMAGE_ATTR_PATTERN = re.compile(r'([a-zA-Z_:][a-zA-Z0-9_:\-]*)\s*=\s*"([^"]*)"')
+
+
+def _image_details_html(raw_attrs):
+    attrs = {
+        key.lower(): html_unescape(value)
+        for key, value in IMAGE_ATTR_PATTERN.findall(raw_attrs)
+    }
+    src = (attrs.get('src') or '').strip()
+    if not src:
+        return None
+
+    alt = (attrs.get('alt') or '').strip()
+    if alt:
+        image_name = alt
+    else:
+        filename = unquote(urlparse(src).path.rsplit('/', 1)[-1]).strip()
+        image_name = filename or "Gorsel"
+
+    safe_src = escape(src)
+    safe_name = escape(image_name)
+    safe_alt = escape(alt if alt else image_name)
+
+    return (
+        '<details class="answer-image-toggle">'
+        '<summary class="answer-image-summary">'
+        '<span class="answer-image-summary-main">'
+        '<span class="answer-image-summary-arrow" aria-hidden="true">&#9656;</span>'
+        '<span class="answer-image-summary-label">Gorsel</span>'
+        f'<span class="answer-image-summary-name">{safe_name}</span>'
+        '</span>'
+        f'<img class="answer-image-summary-thumb" src="{safe_src}" alt="{safe_alt}" loading="lazy" decoding="async">'
+        '</summary>'
+        '<div class="answer-image-content">'
+        f'<img class="answer-image-enlargeable" src="{safe_src}" alt="{safe_alt}" loading="lazy" decoding="async">'
+        '</div>'
+        '</details>'
+    )
+
+
+def _spoiler_html(hidden_text):
+    # HTML encode to prevent XSS
+    escaped_text = html_escape(hidden_text)
+    # Bu filter'dan sonra bkz/reference/mention filtreleri çalıştığı için,
+    # tooltip içeriğindeki özel işaretleri entity'e çevirip ikinci parse'ı engelliyoruz.
+    escaped_text = (
+        escaped_text
+        .replace('(', '&#40;')
+        .replace(')', '&#41;')
+        .replace('@', '&#64;')
+    )
+    return (
+        '<span class="spoiler-text" data-bs-toggle="tooltip" '
+        f'data-bs-html="false" title="{escaped_text}">*</span>'
+    )
+
 @register.filter
 def get_item(dictionary, key):
     return dictionary.get(key, 0)
@@ -84,9 +282,7 @@ def dict_get(dictionary, key):
 def bkz_link(text):
     pattern = r'\(bkz:\s*(.*?)\)'
     def replace(match):
-        query = match.group(1).strip()
-        url = reverse('bkz', args=[query])
-        return f'(bkz: <a href="{url}" target="_blank" rel="noopener noreferrer" style="text-decoration: none;">{escape(query)}</a>)'
+        return _bkz_html(match.group(1).strip())
 
     return mark_safe(_apply_outside_math(text, lambda chunk: re.sub(pattern, replace, chunk)))
 
@@ -97,19 +293,7 @@ def ref_link(text):
     question_cache = {}
 
     def replace_ref(match):
-        ref_text = match.group(1).strip()
-        cache_key = ref_text.casefold()
-        q = question_cache.get(cache_key)
-        if q is None and cache_key not in question_cache:
-            is_preloaded, q = get_preloaded_question(ref_text)
-            if not is_preloaded:
-                q = Question.objects.only('slug').filter(question_text__iexact=ref_text).first()
-            question_cache[cache_key] = q
-        if q is not None:
-            url = reverse('question_detail', args=[q.slug])
-            return f'<a href="{url}" target="_blank" style="text-decoration: none;">{escape(ref_text)}</a>'
-        create_url = reverse('add_question_from_search') + f'?q={quote_plus(ref_text)}'
-        return f'<a href="{create_url}" target="_blank" style="text-decoration: none;">{escape(ref_text)}</a>'
+        return _question_ref_html(match.group(1).strip(), question_cache)
 
     return mark_safe(_apply_outside_math(text, lambda chunk: re.sub(pattern, replace_ref, chunk)))
 
@@ -137,50 +321,10 @@ def tanim_link(text):
     #  Grup 1 => kelime
     #  Grup 2 => id
     pattern = re.compile(r'\((?:tanim|t):([^:]+):(\d+)\)')
-    # Tanım içinde geçen kaynak notlarını popover'da göstermeyelim.
-    source_pattern = re.compile(
-        r'\((?:kaynak|k):\d+(?:(?:,\s*sayfa:[^)]+)|(?:\s*s:[^)]+))?\)'
-    )
     definition_cache = {}
 
     def replacer(match):
-        question_word = match.group(1).strip()  # "Özgürlük"
-        def_id_str    = match.group(2).strip()  # "42"
-        definition = definition_cache.get(def_id_str)
-        if definition is None and def_id_str not in definition_cache:
-            is_preloaded, definition = get_preloaded_definition(def_id_str)
-            if not is_preloaded:
-                definition = (
-                    Definition.objects.select_related('user')
-                    .only('id', 'definition_text', 'user__username')
-                    .filter(id=def_id_str)
-                    .first()
-                )
-            definition_cache[def_id_str] = definition
-        if definition is not None:
-            # Tanım metni
-            def_text = definition.definition_text
-            clean_def_text = source_pattern.sub('', def_text)
-            clean_def_text = re.sub(r'\s{2,}', ' ', clean_def_text).strip()
-            # (İstersen "definition.user.username" vs. de popover’a ekleyebilirsin.)
-            user_name = definition.user.username
-
-
-            # HTML popover
-            # Bootstrap 5: data-bs-toggle="popover" data-bs-content="..."
-            # Hover/focus ile açtırmak için -> data-bs-trigger="hover focus"
-            return f'''<span class="tanim-popover" 
-                          style="text-decoration:underline; cursor:pointer;"
-                          data-bs-toggle="popover" 
-                          data-bs-placement="top" 
-                          data-bs-trigger="hover focus"
-                          data-bs-title="{escape(user_name)}"
-                          data-bs-content="{escape(clean_def_text)}">
-                          {escape(question_word)}
-                       </span>'''
-        # ID bulunamadıysa => orijinal metni döndürmek yerine 
-        # plain text olarak "kelime" döndürebiliriz veya "Tanım yok" diyen bir span.
-        return escape(question_word)
+        return _definition_html(match.group(1).strip(), match.group(2).strip(), definition_cache)
 
     # text içinde tüm (tanim:word:id) kalıplarını replacer ile değiştir.
     new_text = _apply_outside_math(text, lambda chunk: pattern.sub(replacer, chunk))
@@ -198,70 +342,18 @@ def reference_link(text):
         return ""
 
     reference_map = {}
-    current_index = 1
 
     pattern = REFERENCE_LINK_PATTERN
-    reference_ids = {
+    reference_cache = _load_references({
         int(match.group(1))
         for match in pattern.finditer(str(text))
-    }
-    reference_cache = {}
-    missing_reference_ids = set()
-    for reference_id in reference_ids:
-        is_preloaded, reference = get_preloaded_reference(reference_id)
-        if is_preloaded:
-            reference_cache[reference_id] = reference
-        else:
-            missing_reference_ids.add(reference_id)
-    if missing_reference_ids:
-        reference_cache.update(Reference.objects.only(
-            'id',
-            'author_surname',
-            'author_name',
-            'year',
-            'metin_ismi',
-            'rest',
-            'abbreviation',
-        ).in_bulk(missing_reference_ids))
+    })
 
     def replace_reference(match):
-        nonlocal current_index
-        ref_id_str = match.group(1)
         sayfa = match.group(2) or match.group(3)  # Opsiyonel: None veya string (12-14, 123a vs.)
-        ref_id = int(ref_id_str)
-
-        if ref_id not in reference_map:
-            reference_map[ref_id] = current_index
-            current_index += 1
-
-        ref_num = reference_map[ref_id]
-
-        ref_obj = reference_cache.get(ref_id)
-
-        if ref_obj is not None:
-            # Çoklu yazarları düzgün formatla
-            surnames = [s.strip() for s in ref_obj.author_surname.split(';') if s.strip()]
-            names = [n.strip() for n in ref_obj.author_name.split(';') if n.strip()]
-
-            authors = []
-            for i in range(max(len(surnames), len(names))):
-                surname = surnames[i] if i < len(surnames) else ''
-                name = names[i] if i < len(names) else ''
-                if surname or name:
-                    authors.append(f"{surname}, {name}".strip(', '))
-
-            author_str = '; '.join(authors)
-            metin = f". {ref_obj.metin_ismi}" if ref_obj.metin_ismi else ""
-            full_citation = f"{author_str}{metin} ({ref_obj.year}). {ref_obj.rest}"
-            if ref_obj.abbreviation:
-                full_citation += f" [{ref_obj.abbreviation}]"
-            if sayfa:
-                full_citation += f", s. {sayfa.strip()}"
-        else:
-            full_citation = f"Kaynak bulunamadı (ID: {ref_id})"
-
-        html = f'<sup class="reference-tooltip" data-bs-toggle="tooltip" title="{escape(full_citation)}">[{ref_num}]</sup>'
-        return html
+        ref_id = int(match.group(1))
+        ref_num = reference_map.setdefault(ref_id, len(reference_map) + 1)
+        return _reference_html(reference_cache.get(ref_id), ref_id, sayfa, ref_num)
 
     # HTML etiketlerinin/attribute'larının içini değiştirmeyelim.
     # Aksi halde data-bs-content gibi attribute'larda HTML kırılabilir.
@@ -301,38 +393,17 @@ def mention_link(text):
     user_cache = {}
 
     def replace(match):
-        import unicodedata
-
-        candidate = unicodedata.normalize('NFKC', match.group(1))
-        candidate = candidate.replace('\u00A0', ' ')  # nbsp -> space
-        for dash in ('‐', '‑', '‒', '–', '—', '−'):
-            candidate = candidate.replace(dash, '-')
-        candidate = ' '.join(candidate.split())
-
-        words = candidate.split()
-        for i in range(len(words), 0, -1):
-            username = ' '.join(words[:i])
-            cache_key = username.casefold()
-            user = user_cache.get(cache_key)
-            if user is None and cache_key not in user_cache:
-                is_preloaded, user = get_preloaded_user(username)
-                if not is_preloaded:
-                    user = User.objects.only('username').filter(username__iexact=username).first()
-                user_cache[cache_key] = user
-            if user is not None:
-                url = reverse('user_profile', args=[user.username])
-                # kalan kelimeler ek veya düz metin olur
-                tail = ' '.join(words[i:])
-                safe_username = escape(username)
-                safe_tail = escape(tail) if tail else ""
-                return f'<a href="{url}" class="mention">@{safe_username}</a>{(" " + safe_tail) if safe_tail else ""}'
-            continue
-        # hiçbiri yoksa düz metin döndür
-        return f'@{escape(candidate)}'
+        return _mention_html(match.group(1), user_cache)
 
     result = _apply_outside_math(text, lambda chunk: re.sub(pattern, replace, chunk))
     return mark_safe(result)
 
+IMAGE_PARAGRAPH_PATTERN = re.compile(
+    r'<p>\s*(.*?)\s*<img\s+([^>]*?)\s*/?>\s*(.*?)\s*</p>',
+    flags=re.IGNORECASE | re.DOTALL
+)
+
+
 @register.filter
 def collapsible_images(text):
     """
@@ -342,59 +413,12 @@ def collapsible_images(text):
     if not text:
         return ""
 
-    def parse_attrs(raw_attrs):
-        attrs = {}
-        for key, value in re.findall(r'([a-zA-Z_:][a-zA-Z0-9_:\-]*)\s*=\s*"([^"]*)"', raw_attrs):
-            attrs[key.lower()] = html_unescape(value)
-        return attrs
-
-    def build_image_name(src_value, alt_value):
-        if alt_value and alt_value.strip():
-            return alt_value.strip()
-        parsed = urlparse(src_value or "")
-        filename = unquote(parsed.path.rsplit('/', 1)[-1]).strip()
-        return filename or "Gorsel"
-
-    def build_details_html(raw_attrs):
-        attrs = parse_attrs(raw_attrs)
-        src = (attrs.get('src') or '').strip()
-        if not src:
-            return None
-
-        alt = (attrs.get('alt') or '').strip()
-        image_name = build_image_name(src, alt)
-
-        safe_src = escape(src)
-        safe_name = escape(image_name)
-        safe_alt = escape(alt if alt else image_name)
-
-        return (
-            '<details class="answer-image-toggle">'
-            '<summary class="answer-image-summary">'
-            '<span class="answer-image-summary-main">'
-            '<span class="answer-image-summary-arrow" aria-hidden="true">&#9656;</span>'
-            '<span class="answer-image-summary-label">Gorsel</span>'
-            f'<span class="answer-image-summary-name">{safe_name}</span>'
-            '</span>'
-            f'<img class="answer-image-summary-thumb" src="{safe_src}" alt="{safe_alt}" loading="lazy" decoding="async">'
-            '</summary>'
-            '<div class="answer-image-content">'
-            f'<img class="answer-image-enlargeable" src="{safe_src}" alt="{safe_alt}" loading="lazy" decoding="async">'
-            '</div>'
-            '</details>'
-        )
-
-    paragraph_with_image_pattern = re.compile(
-        r'<p>\s*(.*?)\s*<img\s+([^>]*?)\s*/?>\s*(.*?)\s*</p>',
-        flags=re.IGNORECASE | re.DOTALL
-    )
-
     def replace_paragraph(match):
         before_html = (match.group(1) or '').strip()
         attrs_raw = match.group(2)
         after_html = (match.group(3) or '').strip()
 
-        details_html = build_details_html(attrs_raw)
+        details_html = _image_details_html(attrs_raw)
         if not details_html:
             return match.group(0)
 
@@ -409,7 +433,7 @@ def collapsible_images(text):
 
     # Tek geçiş uygula. Döngüsel tekrar, bazı içeriklerde üretilen HTML'i
     # tekrar eşleştirip metni sonsuz büyütebiliyor.
-    transformed = paragraph_with_image_pattern.sub(replace_paragraph, text)
+    transformed = IMAGE_PARAGRAPH_PATTERN.sub(replace_paragraph, text)
     return mark_safe(transformed)
 
 @register.filter
@@ -426,6 +450,98 @@ def hashtag_link(text):
     result = HASHTAG_PATTERN.sub(replace, text)
     return mark_safe(result)
 
+DISPLAY_MATH_PATTERN = re.compile(r'\$\$(.+?)\$\$', re.DOTALL)
+INLINE_MATH_PATTERN = re.compile(r'(?<!\\)\$(?!\$)(.+?)(?<!\\)\$(?!\$)', re.DOTALL)
+MATH_LINE_END_BACKSLASH_PATTERN = re.compile(r'\\[ \t]*\r?\n')
+MATH_DOUBLE_ESCAPED_COMMAND_PATTERN = re.compile(r'\\\\([A-Za-z])')
+MATH_SINGLE_ROW_BREAK_PATTERN = re.compile(r'(?<!\\)\\\s*(\d)')
+DIAGRAM_MARKER_RE = re.compile(DIAGRAM_MARKER_PATTERN, re.MULTILINE)
+INDENT_PATTERN = re.compile(r'(^|(?:\r?\n))(\u2003{1,})(?=\S)')
+OUTLINE_LINE_PATTERN = re.compile(r'^\s*((?:\d+\.){1,4})\s+(.+)$')
+MULTI_DIGIT_ORDINAL_PATTERN = re.compile(r'(?m)^(\s*)(\d{2,4})\.(?=\s+\S)')
+EXTRA_BLANK_LINES_PATTERN = re.compile(r'(?:\r?\n){3,}')
+LINK_OPEN_PATTERN = re.compile(r'<a\s+href="([^"]+)"')
+HTML_TAG_SPLIT_PATTERN = re.compile(r'(<[^>]+>)')
+HTML_TAG_NAME_PATTERN = re.compile(r'<\s*(/)?\s*([A-Za-z0-9]+)')
+HASHTAG_SKIP_TAGS = ('a', 'code', 'pre', 'script', 'style')
+PARAGRAPH_INDENT_HTML = '<span class="answer-paragraph-indent" aria-hidden="true"></span>'
+# Placeholders are KIND_<process salt><counter>_END. The salt keeps authors
+# from typing a placeholder that would be swapped for stored markup.
+MARKDOWN_PLACEHOLDER_SALT = uuid.uuid4().hex[:8]
+MARKDOWN_PLACEHOLDER_PATTERN = re.compile(
+    rf'(<p>)?((SPACER|BLOCK|OUTLINE|DIAGRAM|INDENT|HASHTAG|MATH)_{MARKDOWN_PLACEHOLDER_SALT}\d+_END)(</p>)?'
+)
+# These replace a whole paragraph that holds nothing but the placeholder.
+MARKDOWN_BLOCK_PLACEHOLDERS = {'SPACER', 'BLOCK', 'OUTLINE', 'DIAGRAM'}
+
+
+def _normalize_math_backslashes(raw_block):
+    """
+    Normalize double-escaped TeX commands inside math blocks.
+    Example: $$\\int_0^\\infty$$ -> $$\\int_0^\\infty$$ with single slashes.
+    """
+    if raw_block.startswith('$$') and raw_block.endswith('$$'):
+        delim = '$$'
+        content = raw_block[2:-2]
+    elif raw_block.startswith('$') and raw_block.endswith('$'):
+        delim = '$'
+        content = raw_block[1:-1]
+    else:
+        delim = ''
+        content = raw_block
+
+    # Convert accidental double-escaped commands (\\int -> \int) without touching line breaks.
+    content = MATH_DOUBLE_ESCAPED_COMMAND_PATTERN.sub(r'\\\1', content)
+    # Fix accidental single backslash row breaks like "\3" or "\ 3" -> "\\ 3".
+    # Already-correct row breaks such as "\\ 3" must be left untouched.
+    content = MATH_SINGLE_ROW_BREAK_PATTERN.sub(lambda m: "\\\\ " + m.group(1), content)
+    return f"{delim}{content}{delim}"
+
+
+def _protect_leading_multi_digit_ordinals(raw_text):
+    # Markdown treats "16. yuzyil" as an ordered list and renders it as "1.".
+    # Keep two-or-more digit sentence starts as prose while preserving 1./2. lists.
+    return MULTI_DIGIT_ORDINAL_PATTERN.sub(r'\1\2\\.', raw_text)
+
+
+def _link_hashtags_in_text_nodes(html):
+    # Convert hashtags only on text nodes so we never touch href/src attribute
+    # fragments such as https://example.com/page#section.
+    open_tag_counts = dict.fromkeys(HASHTAG_SKIP_TAGS, 0)
+
+    def replace_hashtag(match):
+        prefix = match.group(1)
+        hashtag_name = match.group(2)
+        return f'{prefix}{_build_hashtag_link(hashtag_name)}'
+
+    def update_tag_state(tag_html):
+        tag_match = HTML_TAG_NAME_PATTERN.match(tag_html)
+        if not tag_match:
+            return
+        is_closing = bool(tag_match.group(1))
+        tag_name = tag_match.group(2).lower()
+        if tag_name not in open_tag_counts:
+            return
+        if is_closing:
+            open_tag_counts[tag_name] = max(0, open_tag_counts[tag_name] - 1)
+        elif not tag_html.rstrip().endswith('/>'):
+            open_tag_counts[tag_name] += 1
+
+    processed_parts = []
+    for part in HTML_TAG_SPLIT_PATTERN.split(html):
+        if not part:
+            continue
+        if part.startswith('<') and part.endswith('>'):
+            update_tag_state(part)
+            processed_parts.append(part)
+            continue
+        if any(open_tag_counts.values()):
+            processed_parts.append(part)
+            continue
+        processed_parts.append(HASHTAG_PATTERN.sub(replace_hashtag, part))
+    return ''.join(processed_parts)
+
+
 @register.filter
 def safe_markdownify(text, arg='default'):
     """
@@ -434,88 +550,48 @@ def safe_markdownify(text, arg='default'):
     like https://example.com/page#section are not corrupted.
     Supports Turkish characters: ç, ğ, ı, ö, ş, ü and their uppercase versions
     """
-    import uuid
-    from markdownify.templatetags.markdownify import markdownify as original_markdownify
-
     if not text:
         return ""
 
-    text_with_placeholders = text
-    hashtag_map = {}
-    spacer_map = {}
-    block_map = {}
-    indent_map = {}
-    outline_map = {}
-    diagram_map = {}
-
-    # Protect TeX blocks so Markdown doesn't eat backslashes like `\\` (align/matrix).
-    # We restore as HTML-escaped text so BLEACH safety is preserved.
-    math_map = {}
-    display_math_re = re.compile(r'\$\$(.+?)\$\$', re.DOTALL)
-    inline_math_re = re.compile(r'(?<!\\)\$(?!\$)(.+?)(?<!\\)\$(?!\$)', re.DOTALL)
-
-    def _normalize_math_backslashes(raw_block: str) -> str:
-        """
-        Normalize double-escaped TeX commands inside math blocks.
-        Example: $$\\int_0^\\infty$$ -> $$\\int_0^\\infty$$ with single slashes.
-        """
-        if raw_block.startswith('$$') and raw_block.endswith('$$'):
-            delim = '$$'
-            content = raw_block[2:-2]
-        elif raw_block.startswith('$') and raw_block.endswith('$'):
-            delim = '$'
-            content = raw_block[1:-1]
-        else:
-            delim = ''
-            content = raw_block
+    # Markup kept out of Markdown's reach, by placeholder. TeX blocks are kept
+    # so Markdown doesn't eat backslashes like `\\` (align/matrix); they are
+    # restored as HTML-escaped text so BLEACH safety is preserved.
+    stored = {}
+    counter = itertools.count()
 
-        # Convert accidental double-escaped commands (\\int -> \int) without touching line breaks.
-        content = re.sub(r'\\\\([A-Za-z])', r'\\\1', content)
-        # Fix accidental single backslash row breaks like "\3" or "\ 3" -> "\\ 3".
-        # Already-correct row breaks such as "\\ 3" must be left untouched.
-        content = re.sub(r'(?<!\\)\\\s*(\d)', lambda m: "\\\\ " + m.group(1), content)
-        return f"{delim}{content}{delim}"
+    def _store(kind, html):
+        placeholder = f"{kind}_{MARKDOWN_PLACEHOLDER_SALT}{next(counter)}_END"
+        stored[placeholder] = html
+        return placeholder
 
-    def _store_math_block(raw_block: str) -> str:
+    def _store_math_block(match):
         # Some users naturally end TeX lines with a single "\" before newline.
         # In TeX environments like align/pmatrix, line breaks require "\\".
         # Normalize only the "backslash + newline" case to avoid touching valid commands.
-        raw_block = re.sub(r'\\[ \t]*\r?\n', r'\\\\\n', raw_block)
+        raw_block = MATH_LINE_END_BACKSLASH_PATTERN.sub(r'\\\\\n', match.group(0))
         raw_block = _normalize_math_backslashes(raw_block)
-        placeholder = f"MATH_{uuid.uuid4().hex[:10]}_END"
-        math_map[placeholder] = escape(raw_block)
-        return placeholder
+        return _store('MATH', escape(raw_block))
 
     def _store_hashtag(match):
         prefix = match.group(1)
         hashtag_name = match.group(2)
-        placeholder = f"HASHTAG_{uuid.uuid4().hex[:10]}_END"
-        hashtag_map[placeholder] = _build_hashtag_link(hashtag_name)
-        return f"{prefix}{placeholder}"
+        return f"{prefix}{_store('HASHTAG', _build_hashtag_link(hashtag_name))}"
 
     def _store_spacer(match):
         newline_count = match.group(0).count('\n')
         extra_breaks = max(1, newline_count - 2)
-        placeholder = f"SPACER_{uuid.uuid4().hex[:10]}_END"
-        spacer_map[placeholder] = '<br>' * extra_breaks
-        return f"\n\n{placeholder}\n\n"
+        return f"\n\n{_store('SPACER', '<br>' * extra_breaks)}\n\n"
 
     def _store_block(tag_name, content=''):
-        placeholder = f"BLOCK_{uuid.uuid4().hex[:10]}_END"
         if tag_name == 'hr':
-            block_map[placeholder] = '<hr>'
-        else:
-            block_map[placeholder] = f'<{tag_name}>{escape(content.strip())}</{tag_name}>'
-        return placeholder
+            return _store('BLOCK', '<hr>')
+        return _store('BLOCK', f'<{tag_name}>{escape(content.strip())}</{tag_name}>')
 
     def _store_indent(match):
         prefix = match.group(1)
-        placeholder = f"INDENT_{uuid.uuid4().hex[:10]}_END"
-        indent_map[placeholder] = '<span class="answer-paragraph-indent" aria-hidden="true"></span>'
-        return f"{prefix}{placeholder}"
+        return f"{prefix}{_store('INDENT', PARAGRAPH_INDENT_HTML)}"
 
     def _store_outline_block(lines):
-        placeholder = f"OUTLINE_{uuid.uuid4().hex[:10]}_END"
         items = []
         for marker, content in lines:
             level = min(4, marker.rstrip('.').count('.') + 1)
@@ -526,26 +602,22 @@ def safe_markdownify(text, arg='default'):
                 f'<span class="answer-outline-content">{escape(content.strip())}</span>'
                 '</div>'
             )
-        outline_map[placeholder] = '<div class="answer-outline-list">' + ''.join(items) + '</div>'
-        return placeholder
+        return _store('OUTLINE', '<div class="answer-outline-list">' + ''.join(items) + '</div>')
 
     def _store_diagram(match):
         encoded_payload = match.group(1)
         payload = decode_diagram_payload(encoded_payload)
         if not payload:
             return match.group(0)
-        placeholder = f"DIAGRAM_{uuid.uuid4().hex[:10]}_END"
-        diagram_map[placeholder] = render_diagram_html(payload, encoded_payload)
-        return f"\n\n{placeholder}\n\n"
+        return f"\n\n{_store('DIAGRAM', render_diagram_html(payload, encoded_payload))}\n\n"
 
     def _replace_numbered_outline_blocks(raw_text):
-        line_pattern = re.compile(r'^\s*((?:\d+\.){1,4})\s+(.+)$')
         lines = raw_text.splitlines()
         transformed = []
         index = 0
 
         while index < len(lines):
-            match = line_pattern.match(lines[index])
+            match = OUTLINE_LINE_PATTERN.match(lines[index])
             if not match:
                 transformed.append(lines[index])
                 index += 1
@@ -554,7 +626,7 @@ def safe_markdownify(text, arg='default'):
             block = []
             has_nested_marker = False
             while index < len(lines):
-                line_match = line_pattern.match(lines[index])
+                line_match = OUTLINE_LINE_PATTERN.match(lines[index])
                 if not line_match:
                     break
                 marker = line_match.group(1)
@@ -593,113 +665,39 @@ def safe_markdownify(text, arg='default'):
             transformed.append(line)
         return '\n'.join(transformed)
 
-    def _protect_leading_multi_digit_ordinals(raw_text):
-        # Markdown treats "16. yuzyil" as an ordered list and renders it as "1.".
-        # Keep two-or-more digit sentence starts as prose while preserving 1./2. lists.
-        return re.sub(r'(?m)^(\s*)(\d{2,4})\.(?=\s+\S)', r'\1\2\\.', raw_text)
-
-    def _replace_display(match):
-        raw = match.group(0)
-        return _store_math_block(raw)
-
-    def _replace_inline(match):
-        raw = match.group(0)
-        return _store_math_block(raw)
-
-    text_with_placeholders = re.sub(
-        DIAGRAM_MARKER_PATTERN,
-        _store_diagram,
-        text_with_placeholders,
-        flags=re.MULTILINE,
-    )
-    text_with_placeholders = display_math_re.sub(_replace_display, text_with_placeholders)
-    text_with_placeholders = inline_math_re.sub(_replace_inline, text_with_placeholders)
+    def _restore(match):
+        opening, placeholder, kind, closing = match.groups()
+        # Headings and outlines hold the hashtag and math placeholders of their line.
+        html = MARKDOWN_PLACEHOLDER_PATTERN.sub(_restore, stored[placeholder])
+        if kind in MARKDOWN_BLOCK_PLACEHOLDERS and opening and closing:
+            return html
+        return f"{opening or ''}{html}{closing or ''}"
+
+    text_with_placeholders = DIAGRAM_MARKER_RE.sub(_store_diagram, text)
+    text_with_placeholders = DISPLAY_MATH_PATTERN.sub(_store_math_block, text_with_placeholders)
+    text_with_placeholders = INLINE_MATH_PATTERN.sub(_store_math_block, text_with_placeholders)
     # Protect plain-text hashtags before markdown so `#etiket` line starts
     # are not interpreted as markdown headings.
     text_with_placeholders = HASHTAG_PATTERN.sub(_store_hashtag, text_with_placeholders)
-    text_with_placeholders = re.sub(r'(^|(?:\r?\n))(\u2003{1,})(?=\S)', _store_indent, text_with_placeholders)
+    text_with_placeholders = INDENT_PATTERN.sub(_store_indent, text_with_placeholders)
     text_with_placeholders = _replace_custom_block_markers(text_with_placeholders)
     text_with_placeholders = _replace_numbered_outline_blocks(text_with_placeholders)
     text_with_placeholders = _protect_leading_multi_digit_ordinals(text_with_placeholders)
     # Preserve user-authored extra blank lines beyond the normal paragraph break.
-    text_with_placeholders = re.sub(r'(?:\r?\n){3,}', _store_spacer, text_with_placeholders)
+    text_with_placeholders = EXTRA_BLANK_LINES_PATTERN.sub(_store_spacer, text_with_placeholders)
 
-    # Apply markdown
-    markdown_result = original_markdownify(text_with_placeholders, arg)
+    markdown_result = get_markdown_engine(arg).convert(text_with_placeholders)
 
     # Add target="_blank" to all external links (not hashtag links)
     # This makes all markdown links open in new tab
-    markdown_result = re.sub(
-        r'<a\s+href="([^"]+)"',
+    markdown_result = LINK_OPEN_PATTERN.sub(
         r'<a href="\1" target="_blank" rel="noopener noreferrer"',
         markdown_result
     )
+    markdown_result = _link_hashtags_in_text_nodes(markdown_result)
 
-    # Convert hashtags only on text nodes so we never touch href/src attribute
-    # fragments such as https://example.com/page#section.
-    skip_tags = {'a', 'code', 'pre', 'script', 'style'}
-    open_tag_counts = {tag: 0 for tag in skip_tags}
-
-    def replace_hashtag(match):
-        prefix = match.group(1)
-        hashtag_name = match.group(2)
-        return f'{prefix}{_build_hashtag_link(hashtag_name)}'
-
-    def update_tag_state(tag_html):
-        tag_match = re.match(r'<\s*(/)?\s*([A-Za-z0-9]+)', tag_html)
-        if not tag_match:
-            return
-        is_closing = bool(tag_match.group(1))
-        tag_name = tag_match.group(2).lower()
-        if tag_name not in open_tag_counts:
-            return
-        if is_closing:
-            open_tag_counts[tag_name] = max(0, open_tag_counts[tag_name] - 1)
-        elif not tag_html.rstrip().endswith('/>'):
-            open_tag_counts[tag_name] += 1
-
-    processed_parts = []
-    for part in re.split(r'(<[^>]+>)', markdown_result):
-        if not part:
-            continue
-        if part.startswith('<') and part.endswith('>'):
-            update_tag_state(part)
-            processed_parts.append(part)
-            continue
-        if any(open_tag_counts.values()):
-            processed_parts.append(part)
-            continue
-        processed_parts.append(HASHTAG_PATTERN.sub(replace_hashtag, part))
-
-    markdown_result = ''.join(processed_parts)
-
-    for placeholder, spacer_html in spacer_map.items():
-        markdown_result = markdown_result.replace(f'<p>{placeholder}</p>', spacer_html)
-        markdown_result = markdown_result.replace(placeholder, spacer_html)
-
-    for placeholder, block_html in block_map.items():
-        markdown_result = markdown_result.replace(f'<p>{placeholder}</p>', block_html)
-        markdown_result = markdown_result.replace(placeholder, block_html)
-
-    for placeholder, outline_html in outline_map.items():
-        markdown_result = markdown_result.replace(f'<p>{placeholder}</p>', outline_html)
-        markdown_result = markdown_result.replace(placeholder, outline_html)
-
-    for placeholder, diagram_html in diagram_map.items():
-        markdown_result = markdown_result.replace(f'<p>{placeholder}</p>', diagram_html)
-        markdown_result = markdown_result.replace(placeholder, diagram_html)
-
-    for placeholder, indent_html in indent_map.items():
-        markdown_result = markdown_result.replace(placeholder, indent_html)
-
-    # Restore pre-protected hashtags after markdown rendering.
-    for placeholder, hashtag_html in hashtag_map.items():
-        markdown_result = markdown_result.replace(placeholder, hashtag_html)
-
-    # Restore math blocks last (still HTML-escaped so it stays safe).
-    for placeholder, math_html in math_map.items():
-        markdown_result = markdown_result.replace(placeholder, math_html)
-
+    # One pass puts every stored piece back; math stays HTML-escaped so it stays safe.
+    markdown_result = MARKDOWN_PLACEHOLDER_PATTERN.sub(_restore, markdown_result)
     return mark_safe(markdown_result)
 
 
@@ -968,7 +966,7 @@ def extract_bibliography(text):
             if page_str not in reference_pages[ref_id]:
                 reference_pages[ref_id].append(page_str)
 
-    references = Reference.objects.in_bulk(reference_map)
+    references = Reference.objects.in_bulk([ref_id for ref_id in reference_map if is_storable_id(ref_id)])
 
     # Build the bibliography list
     bibliography = []
@@ -1013,35 +1011,18 @@ def spoiler_link(text):
     """
     def replace(match):
         hidden_text = match.group(1).strip()
-        # HTML encode to prevent XSS
-        from html import escape
-        escaped_text = escape(hidden_text)
         # reference_link runs after this filter. Keep citations in their original
         # position so its numbering remains aligned with the raw bibliography.
         reference_markers = ''.join(
             (
                 '<span class="spoiler-reference-index" '
                 'hidden aria-hidden="true">'
-                f'{escape(reference.group(0))}'
+                f'{html_escape(reference.group(0))}'
                 '</span>'
             )
             for reference in REFERENCE_LINK_PATTERN.finditer(hidden_text)
         )
-
-        # Bu filter'dan sonra bkz/reference/mention filtreleri çalıştığı için,
-        # tooltip içeriğindeki özel işaretleri entity'e çevirip ikinci parse'ı engelliyoruz.
-        escaped_text = (
-            escaped_text
-            .replace('(', '&#40;')
-            .replace(')', '&#41;')
-            .replace('@', '&#64;')
-        )
-
-        return (
-            '<span class="spoiler-text" data-bs-toggle="tooltip" '
-            f'data-bs-html="false" title="{escaped_text}">*</span>'
-            f'{reference_markers}'
-        )
+        return _spoiler_html(hidden_text) + reference_markers
 
     # Yeni kısa format: -g- text -g-
     pattern_new = r'-g-\s+(.*?)\s+-g-'
@@ -1052,3 +1033,118 @@ def spoiler_link(text):
     text = re.sub(pattern_old, replace, text, flags=re.DOTALL)
 
     return mark_safe(text)
+
+
+# One alternation per content marker, tried left to right over the rendered
+# markdown. HTML tags and math spans are their own tokens so markers inside
+# attributes or TeX are copied untouched.
+CONTENT_LINK_TOKEN_PATTERN = re.compile(
+    r'(?P<image>(?i:<p>\s*(?P<image_before>(?:(?!</p>).)*?)\s*<img\s+(?P<image_attrs>[^>]*?)\s*/?>'
+    r'\s*(?P<image_after>.*?)\s*</p>))'
+    r'|(?P<spoiler>-g-\s+(?P<spoiler_text>.*?)\s+-g-|--gizli--(?P<spoiler_legacy>.*?)--gizli--)'
+    r'|(?P<math>(?<!\\)\$\$.+?(?<!\\)\$\$|(?<!\\)\$(?!\$).+?(?<!\\)\$(?!\$))'
+    r'|(?P<tag><[^>]+>)'
+    r'|(?P<bkz>\(bkz:\s*(?P<bkz_query>[^\n]*?)\))'
+    r'|(?P<definition>\((?:tanim|t):(?P<definition_word>[^:]+):(?P<definition_id>\d+)\))'
+    r'|(?P<reference>(?i:\((?:kaynak|k):(?P<reference_id>\d+)'
+    r'(?:(?:,\s*sayfa:(?P<reference_page>[^)<]+))|(?:\s*s:(?P<reference_short_page>[^)<]+)))?\)))'
+    r'|(?P<question>\((?:ref|r):(?P<question_text>[^\)]+)\))'
+    # The filter chain replaced spoilers before mentions, so a mention stops
+    # where a complete spoiler starts.
+    r'|@(?P<mention>(?:(?!-g-\s+.*?\s+-g-|--gizli--.*?--gizli--)[\w.\-\u00A0 ]){1,50})',
+    re.DOTALL,
+)
+
+
+@register.filter
+def content_links(text):
+    """
+    safe_markdownify çıktısını tek geçişte işler; şu zincirle aynı işi yapar:
+    spoiler_link|bkz_link|tanim_link|reference_link|ref_link|mention_link|collapsible_images
+
+    Üretilen HTML tekrar taranmaz, kaynak künyeleri en sonda tek sorguyla
+    doldurulur.
+    """
+    if not text:
+        return ""
+
+    parts = []
+    reference_numbers = {}
+    reference_slots = []
+    definition_cache = {}
+    question_cache = {}
+    user_cache = {}
+
+    def add_reference(ref_id, sayfa):
+        ref_num = reference_numbers.setdefault(ref_id, len(reference_numbers) + 1)
+        reference_slots.append((len(parts), ref_id, sayfa, ref_num))
+        parts.append('')
+
+    def render(segment):
+        position = 0
+        while True:
+            match = CONTENT_LINK_TOKEN_PATTERN.search(segment, position)
+            if match is None:
+                break
+            parts.append(segment[position:match.start()])
+            position = match.end()
+            kind = match.lastgroup
+
+            if kind == 'image':
+                details_html = _image_details_html(match.group('image_attrs'))
+                if details_html is None:
+                    # src'siz görsel: <p>'yi olduğu gibi bırakıp içeriği taramaya devam et.
+                    position = match.start() + 3
+                    parts.append(segment[match.start():position])
+                    continue
+                before_html = match.group('image_before').strip()
+                after_html = match.group('image_after').strip()
+                if before_html:
+                    parts.append('<p>')
+                    render(before_html)
+                    parts.append('</p>')
+                parts.append(details_html)
+                if after_html:
+                    parts.append('<p>')
+                    render(after_html)
+                    parts.append('</p>')
+            elif kind == 'spoiler':
+                hidden_text = match.group('spoiler_text')
+                if hidden_text is None:
+                    hidden_text = match.group('spoiler_legacy')
+                hidden_text = hidden_text.strip()
+                parts.append(_spoiler_html(hidden_text))
+                # Gizli metindeki kaynaklar numaralandırmada yerini korusun.
+                for reference in REFERENCE_LINK_PATTERN.finditer(hidden_text):
+                    parts.append('<span class="spoiler-reference-index" hidden aria-hidden="true">')
+                    add_reference(int(reference.group(1)), reference.group(2) or reference.group(3))
+                    parts.append('</span>')
+            elif kind in ('math', 'tag'):
+                parts.append(match.group(0))
+            elif kind == 'bkz':
+                parts.append(_bkz_html(match.group('bkz_query').strip()))
+            elif kind == 'definition':
+                parts.append(_definition_html(
+                    match.group('definition_word').strip(),
+                    match.group('definition_id'),
+                    definition_cache,
+                ))
+            elif kind == 'reference':
+                add_reference(
+                    int(match.group('reference_id')),
+                    match.group('reference_page') or match.group('reference_short_page'),
+                )
+            elif kind == 'question':
+                parts.append(_question_ref_html(match.group('question_text').strip(), question_cache))
+            else:
+                parts.append(_mention_html(match.group('mention'), user_cache))
+        parts.append(segment[position:])
+
+    render(str(text))
+
+    if reference_slots:
+        reference_cache = _load_references({ref_id for _, ref_id, _, _ in reference_slots})
+        for index, ref_id, sayfa, ref_num in reference_slots:
+            parts[index] = _reference_html(reference_cache.get(ref_id), ref_id, sayfa, ref_num)
+
+    return mark_safe(''.join(parts))
@@ -0,0 +1,86 @@
+import random
+from difflib import SequenceMatcher
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+
+from .answer_git import create_answer_revision, create_answer_suggestion, get_answer_diff_stats
+from .models import Answer, AnswerDiff, Question
+from .text_diff import diff_opcodes
+
+
+def apply_opcodes(a, b, opcodes):
+    rebuilt = []
+    for tag, i1, i2, j1, j2 in opcodes:
+        if tag == 'equal':
+            assert a[i1:i2] == b[j1:j2]
+            rebuilt.extend(a[i1:i2])
+        else:
+            rebuilt.extend(b[j1:j2])
+    return rebuilt
+
+
+class DiffEngineTests(SimpleTestCase):
+    def test_short_texts_match_difflib(self):
+        a = 'bir iki uc dort bes'.split()
+        b = 'bir uc dort alti bes'.split()
+
+        opcodes, degraded = diff_opcodes(a, b)
+
+        self.assertEqual(opcodes, SequenceMatcher(None, a, b).get_opcodes())
+        self.assertFalse(degraded)
+
+    def test_long_texts_are_anchored_on_unique_words(self):
+        rng = random.Random(7)
+        a = [f'kelime{index}' if index % 3 else 've' for index in range(30000)]
+        b = list(a)
+        for _ in range(40):
+            position = rng.randrange(len(b))
+            b[position:position + 2] = ['yeni', f'ek{position}']
+
+        opcodes, degraded = diff_opcodes(a, b)
+
+        self.assertFalse(degraded)
+        self.assertEqual(apply_opcodes(a, b, opcodes), b)
+        changed = sum(i2 - i1 for tag, i1, i2, _, _ in opcodes if tag != 'equal')
+        self.assertLess(changed, 200)
+
+    def test_long_texts_without_anchors_degrade_to_one_replacement(self):
+        a = ['a', 'b'] * 5000
+        b = ['b', 'a'] * 5000 + ['c']
+
+        opcodes, degraded = diff_opcodes(a, b)
+
+        self.assertTrue(degraded)
+        self.assertEqual(apply_opcodes(a, b, opcodes), b)
+
+    def test_word_stats(self):
+        self.assertEqual(
+            get_answer_diff_stats('bir iki uc', 'bir dort uc bes'),
+            {'added': 2, 'removed': 1, 'changed': 3},
+        )
+
+
+class AnswerDiffStoreTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='diff-owner', password='pass')
+        self.editor = User.objects.create_user(username='diff-editor', password='pass')
+        question = Question.objects.create(question_text='Fark testi', user=self.owner)
+        self.answer = Answer.objects.create(question=question, user=self.owner, answer_text='Ilk metin burada')
+
+    def test_diffs_are_stored_when_written_and_read_on_views(self):
+        revision, _ = create_answer_revision(self.answer, content='Ikinci metin burada', created_by=self.owner)
+        suggestion = create_answer_suggestion(self.answer, proposed_by=self.editor, proposed_text='Ikinci metin orada')
+        self.assertEqual(AnswerDiff.objects.filter(answer=self.answer).count(), 2)
+
+        self.client.force_login(self.owner)
+        history = self.client.get(
+            reverse('answer_git_history', args=[self.answer.id]),
+            {'revision': revision.id},
+        )
+        detail = self.client.get(reverse('answer_suggestion_detail', args=[suggestion.id]))
+
+        self.assertEqual(history.context['selected_revision'].diff_stats, {'added': 1, 'removed': 1, 'changed': 2})
+        self.assertIn('inline-diff-added', str(detail.context['inline_diff']['after_html']))
+        self.assertEqual(AnswerDiff.objects.filter(answer=self.answer).count(), 2)
@@ -0,0 +1,133 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .answer_git import create_answer_revision
+from .answer_render_store import attach_rendered_answer_html
+from .models import Answer, AnswerRenderedContent, Definition, Question, Reference
+
+
+class AnswerRenderStoreTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='render-owner', password='pass')
+        self.question = Question.objects.create(question_text='Render testi', user=self.user)
+        self.definition = Definition.objects.create(
+            user=self.user,
+            question=self.question,
+            definition_text='Ilk tanim metni.',
+        )
+        self.reference = Reference.objects.create(
+            author_surname='Yazar',
+            author_name='Ad',
+            year=2020,
+            rest='Yayinevi',
+            created_by=self.user,
+        )
+        self.answer = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text=(
+                f'**Kalin** (t:Kavram:{self.definition.id}) '
+                f'(k:{self.reference.id}) (ref:Yeni baslik) @render-owner'
+            ),
+        )
+
+    def test_render_is_stored_on_save_and_reused_without_rendering(self):
+        stored = AnswerRenderedContent.objects.get(answer=self.answer)
+        self.assertEqual(stored.revision, self.answer.get_current_revision())
+        self.assertIn('<strong>Kalin</strong>', stored.full_html)
+
+        answer = Answer.objects.get(pk=self.answer.pk)
+        with self.assertNumQueries(1):
+            attach_rendered_answer_html([answer])
+        self.assertEqual(str(answer.rendered_html), stored.full_html)
+        self.assertFalse(answer.rendered_is_truncated)
+
+    def test_new_revision_gets_its_own_render(self):
+        revision, created = create_answer_revision(
+            self.answer,
+            content='Guncel *metin*',
+            created_by=self.user,
+        )
+
+        self.assertTrue(created)
+        stored = AnswerRenderedContent.objects.get(revision=revision)
+        self.assertIn('<em>metin</em>', stored.full_html)
+        self.assertEqual(AnswerRenderedContent.objects.filter(answer=self.answer).count(), 2)
+
+    def test_linked_content_changes_drop_stored_render(self):
+        self.definition.definition_text = 'Degisen tanim.'
+        self.definition.save()
+        self.assertFalse(AnswerRenderedContent.objects.filter(answer=self.answer).exists())
+
+        answer = Answer.objects.get(pk=self.answer.pk)
+        attach_rendered_answer_html([answer])
+        self.assertIn('Degisen tanim.', str(answer.rendered_html))
+        self.assertTrue(AnswerRenderedContent.objects.filter(answer=self.answer).exists())
+
+        Question.objects.create(question_text='yeni BASLIK', user=self.user)
+        self.assertFalse(AnswerRenderedContent.objects.filter(answer=self.answer).exists())
+
+        attach_rendered_answer_html([answer])
+        self.reference.delete()
+        self.assertFalse(AnswerRenderedContent.objects.filter(answer=self.answer).exists())
+
+    def test_renaming_a_user_drops_renders_with_the_old_name(self):
+        author = User.objects.create_user(username='tanim-yazari', password='pass')
+        definition = Definition.objects.create(user=author, question=self.question, definition_text='Yazarin tanimi.')
+        mention = Answer.objects.create(question=self.question, user=author, answer_text='Selam @tanim-yazari')
+        popover = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text=f'Bak (t:Kavram:{definition.id})',
+        )
+
+        author.username = 'yeni-yazar'
+        author.save()
+
+        self.assertFalse(AnswerRenderedContent.objects.filter(answer=mention).exists())
+        self.assertFalse(AnswerRenderedContent.objects.filter(answer=popover).exists())
+        self.assertTrue(AnswerRenderedContent.objects.filter(answer=self.answer).exists())
+
+        answer = Answer.objects.get(pk=popover.pk)
+        attach_rendered_answer_html([answer])
+        self.assertIn('yeni-yazar', str(answer.rendered_html))
+
+        author.save()
+        self.assertTrue(AnswerRenderedContent.objects.filter(answer=popover).exists())
+
+    def test_unrelated_changes_keep_stored_render(self):
+        other_question = Question.objects.create(question_text='Alakasiz', user=self.user)
+        Definition.objects.create(user=self.user, question=other_question, definition_text='Baska')
+        User.objects.create_user(username='baska-kullanici', password='pass')
+
+        self.assertTrue(AnswerRenderedContent.objects.filter(answer=self.answer).exists())
+
+    def test_text_changed_without_revision_is_rendered_again(self):
+        Answer.objects.filter(pk=self.answer.pk).update(answer_text='Elle *degisti*')
+        answer = Answer.objects.get(pk=self.answer.pk)
+
+        attach_rendered_answer_html([answer])
+
+        self.assertIn('<em>degisti</em>', str(answer.rendered_html))
+
+    def test_long_answer_stores_summary(self):
+        answer = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text='kelime ' * 400,
+        )
+        attach_rendered_answer_html([answer])
+
+        self.assertTrue(answer.rendered_is_truncated)
+        self.assertLess(len(answer.rendered_summary_html), len(answer.rendered_html))
+
+    def test_question_detail_serves_stored_html(self):
+        AnswerRenderedContent.objects.filter(answer=self.answer).update(
+            full_html='<p>stored-render-marker</p>'
+        )
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse('question_detail', args=[self.question.slug]))
+
+        self.assertContains(response, 'stored-render-marker')
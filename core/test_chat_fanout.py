@@ -0,0 +1,121 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .chat_fanout import CHANNEL_TIMEOUT, LOCAL_CHANNEL_TIMEOUT, channel_timeout, messages_after, radio_channel
+from .models import OnlineChatMessage, RadioChatMessage, RadioProgram
+
+
+def stream_events(response):
+    events = []
+    for block in b''.join(response.streaming_content).decode('utf-8').split('\n\n'):
+        fields = dict(line.split(': ', 1) for line in block.splitlines() if ': ' in line)
+        if fields.get('event') == 'message':
+            events.append(json.loads(fields['data']))
+    return events
+
+
+@override_settings(CHAT_STREAM_SECONDS=0)
+class ChatFanoutTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.listener = User.objects.create_user(username='chat-listener', password='pass')
+        self.writer = User.objects.create_user(username='chat-writer', password='pass')
+        now = timezone.now()
+        self.program = RadioProgram.objects.create(
+            dj=self.writer,
+            title='Gece yayini',
+            start_time=now - timedelta(minutes=10),
+            end_time=now + timedelta(hours=1),
+            is_live=True,
+        )
+
+    def test_new_radio_messages_are_served_from_the_cache(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = RadioChatMessage.objects.create(program=self.program, user=self.writer, body='ilk')
+        messages_after(radio_channel(self.program.id), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            second = RadioChatMessage.objects.create(program=self.program, user=self.writer, body='ikinci')
+        # One query rebuilds the tail after the new message; then none at all.
+        with self.assertNumQueries(1):
+            self.assertEqual([m['id'] for m in messages_after(radio_channel(self.program.id), first.id)], [second.id])
+        with self.assertNumQueries(0):
+            self.assertEqual([m['id'] for m in messages_after(radio_channel(self.program.id), 0)], [first.id, second.id])
+
+    def test_channel_heads_are_kept_briefly_without_a_shared_cache(self):
+        with override_settings(SHARED_CACHE=False):
+            self.assertEqual(channel_timeout(), LOCAL_CHANNEL_TIMEOUT)
+        with override_settings(SHARED_CACHE=True):
+            self.assertEqual(channel_timeout(), CHANNEL_TIMEOUT)
+
+    def test_radio_stream_sends_messages_after_the_last_event_id(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = RadioChatMessage.objects.create(program=self.program, user=self.writer, body='ilk')
+            second = RadioChatMessage.objects.create(program=self.program, user=self.listener, body='ikinci')
+        self.client.force_login(self.listener)
+
+        response = self.client.get(
+            reverse('radio_chat_stream', args=[self.program.id]),
+            HTTP_LAST_EVENT_ID=str(first.id),
+        )
+
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = stream_events(response)
+        self.assertEqual([(event['id'], event['is_own']) for event in events], [(second.id, True)])
+        self.assertNotIn('user_id', events[0])
+
+    def test_online_chat_stream_from_an_empty_chat_sees_the_first_message(self):
+        self.client.force_login(self.listener)
+        url = reverse('online_chat_stream')
+        self.assertEqual(stream_events(self.client.get(url, {'after': 0})), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            message = OnlineChatMessage.objects.create(user=self.writer, body='ilk mesaj')
+
+        # The reconnect of a short stream carries no Last-Event-ID yet.
+        events = stream_events(self.client.get(url, {'after': 0}))
+        self.assertEqual([event['id'] for event in events], [message.id])
+
+    def test_online_chat_stream_requires_login(self):
+        response = self.client.get(reverse('online_chat_stream'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_chat_polls_do_not_write(self):
+        self.client.force_login(self.listener)
+        poll_url = reverse('radio_chat_messages', args=[self.program.id])
+        self.client.get(poll_url, {'after': '0'})
+        self.program.end_time = timezone.now() - timedelta(minutes=1)
+        self.program.save(update_fields=['end_time'])
+
+        with self.assertNumQueries(3):
+            # Program, session and user; no UPDATE for the expired program.
+            self.client.get(poll_url, {'after': '0'})
+        response = self.client.post(reverse('radio_chat_messages', args=[self.program.id]), {'body': 'selam'})
+
+        self.assertEqual(response.status_code, 400)
+        self.program.refresh_from_db()
+        self.assertTrue(self.program.is_live)
+
+    def test_housekeeping_expires_programs_and_prunes_old_chat(self):
+        old = OnlineChatMessage.objects.create(user=self.writer, body='eski')
+        OnlineChatMessage.objects.filter(pk=old.pk).update(created_at=timezone.now() - timedelta(days=8))
+        OnlineChatMessage.objects.create(user=self.writer, body='yeni')
+        RadioProgram.objects.filter(pk=self.program.pk).update(end_time=timezone.now() - timedelta(minutes=1))
+
+        out = StringIO()
+        call_command('run_chat_housekeeping', stdout=out)
+
+        self.assertIn('Expired 1 radio programs, pruned 1 online chat messages.', out.getvalue())
+        self.program.refresh_from_db()
+        self.assertFalse(self.program.is_live)
+        self.assertTrue(self.program.is_finished)
+        self.assertEqual(list(OnlineChatMessage.objects.values_list('body', flat=True)), ['yeni'])
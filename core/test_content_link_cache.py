@@ -0,0 +1,79 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .answer_render_store import store_answer_render
+from .content_link_preload import (
+    content_link_cache_key,
+    get_preloaded_definition,
+    get_preloaded_question,
+    get_preloaded_user,
+    preload_content_links,
+)
+from .models import Answer, AnswerRenderedContent, Definition, Question, Reference
+
+
+class ContentLinkCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='Ayşe Yılmaz', password='pass')
+        self.question = Question.objects.create(question_text='Özgürlük Nedir', user=self.user)
+        self.definition = Definition.objects.create(
+            question=self.question,
+            user=self.user,
+            definition_text='Eski tanım',
+        )
+        self.reference = Reference.objects.create(
+            author_surname='Berlin', author_name='Isaiah', year=1958, rest='Oxford.', created_by=self.user,
+        )
+        self.text = (
+            f'(t:özgürlük:{self.definition.id}) (k:{self.reference.id}) '
+            '(r:Özgürlük nedir) (r:Henüz Yok) @ayşe yılmaz'
+        )
+
+    def test_second_preload_is_served_from_cache(self):
+        with preload_content_links([self.text]):
+            pass
+
+        with self.assertNumQueries(0):
+            with preload_content_links([self.text]):
+                self.assertEqual(get_preloaded_question('Özgürlük nedir')[1], self.question)
+                self.assertEqual(get_preloaded_user('ayşe yılmaz')[1], self.user)
+                self.assertEqual(get_preloaded_question('Henüz Yok'), (True, None))
+
+    def test_saves_invalidate_cached_entries(self):
+        with preload_content_links([self.text]):
+            pass
+
+        self.definition.definition_text = 'Yeni tanım'
+        self.definition.save()
+        created = Question.objects.create(question_text='Henüz yok', user=self.user)
+        self.user.username = 'ayse'
+        self.user.save()
+
+        with preload_content_links([self.text]):
+            self.assertEqual(get_preloaded_definition(self.definition.id)[1].definition_text, 'Yeni tanım')
+            self.assertEqual(get_preloaded_question('Henüz Yok')[1], created)
+            self.assertEqual(get_preloaded_user('ayşe yılmaz'), (True, None))
+
+    def test_deleted_question_is_forgotten(self):
+        with preload_content_links([self.text]):
+            pass
+
+        Question.objects.filter(pk=self.question.pk).get().delete()
+
+        with preload_content_links([self.text]):
+            self.assertEqual(get_preloaded_question('Özgürlük nedir'), (True, None))
+
+    def test_stored_renders_do_not_trust_cached_misses(self):
+        created = Question.objects.create(question_text='Başka süreçte açıldı', user=self.user)
+        # Another process cached the miss before the question existed.
+        cache.set(content_link_cache_key('question', 'Başka süreçte açıldı'), 'missing')
+
+        answer = Answer.objects.create(question=self.question, user=self.user, answer_text='(r:Başka süreçte açıldı)')
+        AnswerRenderedContent.objects.filter(answer=answer).delete()
+        store_answer_render(answer)
+
+        stored = AnswerRenderedContent.objects.get(answer=answer)
+        self.assertIn(reverse('question_detail', args=[created.slug]), stored.full_html)
@@ -0,0 +1,113 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from .models import Answer, Definition, Question, Reference
+from .templatetags.custom_tags import (
+    bkz_link,
+    collapsible_images,
+    content_links,
+    mention_link,
+    ref_link,
+    reference_link,
+    safe_markdownify,
+    spoiler_link,
+    tanim_link,
+)
+
+
+def render_with_filter_chain(text):
+    rendered = safe_markdownify(text, "default")
+    for content_filter in (
+        spoiler_link,
+        bkz_link,
+        tanim_link,
+        reference_link,
+        ref_link,
+        mention_link,
+        collapsible_images,
+    ):
+        rendered = content_filter(rendered)
+    return str(rendered)
+
+
+class ContentLinksTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='ali veli', password='pass')
+        self.question = Question.objects.create(question_text='Başka Soru', user=self.user)
+        self.definition = Definition.objects.create(
+            question=self.question,
+            user=self.user,
+            definition_text='Kısa tanım',
+        )
+        self.first = Reference.objects.create(
+            author_surname='Arendt', author_name='Hannah', year=1958, rest='Chicago.', created_by=self.user,
+        )
+        self.second = Reference.objects.create(
+            author_surname='Weil', author_name='Simone', year=1949, rest='Gallimard.', created_by=self.user,
+        )
+
+    def render(self, text):
+        return str(content_links(safe_markdownify(text, "default")))
+
+    def test_matches_filter_chain(self):
+        text = (
+            "![kapak](https://example.com/kapak.png)\n\n"
+            f"Selam @ali veli (bkz: başka soru) (r:Başka Soru) (r:Olmayan) "
+            f"(t:kelime:{self.definition.id}) (kaynak:{self.first.id}, sayfa:12)\n\n"
+            f"-g- gizli (k:{self.second.id} s:4) -g- tekrar (K:{self.first.id}) $x (bkz: y)$\n\n"
+            "--gizli--eski--gizli-- #etiket"
+        )
+
+        self.assertEqual(self.render(text), render_with_filter_chain(text))
+
+    def test_mention_next_to_a_spoiler_matches_filter_chain(self):
+        for text, spoilers in (
+            ("@ali veli -g- gizli şey -g-", 1),
+            ("@yok -g- gizli şey -g- sonra", 1),
+            ("@ali veli --gizli--eski sır--gizli--", 1),
+            ("@ali-g- bitişik -g-", 1),
+            ("@ali veli -g-kapanmayan", 0),
+        ):
+            with self.subTest(text=text):
+                rendered = self.render(text)
+                self.assertEqual(rendered, render_with_filter_chain(text))
+                self.assertEqual(rendered.count('class="spoiler-text"'), spoilers)
+
+    def test_markers_inside_html_attributes_are_left_alone(self):
+        rendered = self.render('[profil](https://example.com/@ali) @ali veli')
+
+        self.assertIn('href="https://example.com/@ali"', rendered)
+        self.assertEqual(rendered.count('class="mention"'), 1)
+
+    def test_image_paragraph_does_not_swallow_previous_paragraph(self):
+        rendered = self.render('Önce\n\n![kapak](https://example.com/kapak.png)')
+
+        self.assertTrue(rendered.startswith('<p>Önce</p>'))
+        self.assertNotIn('<p></p>', rendered)
+        self.assertIn('class="answer-image-toggle"', rendered)
+
+    def test_references_are_loaded_with_one_query(self):
+        text = ' '.join(f'(k:{reference_id})' for reference_id in (self.first.id, self.second.id, self.first.id))
+
+        with self.assertNumQueries(1):
+            rendered = self.render(text)
+
+        self.assertEqual(rendered.count('[1]'), 2)
+        self.assertEqual(rendered.count('[2]'), 1)
+
+    def test_benchmark_command_reports_both_renderers(self):
+        Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text=f'Uzun yanıt (k:{self.first.id}) @ali veli (bkz: test)',
+        )
+        out = StringIO()
+
+        call_command('benchmark_content_links', '--repeat', '1', stdout=out)
+
+        self.assertIn('filter chain', out.getvalue())
+        self.assertIn('content_links', out.getvalue())
+        self.assertIn('0 answers render differently', out.getvalue())
@@ -0,0 +1,131 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from random import Random
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+from . import course_store
+from .course_store import shuffle_lesson_exercises
+from .german_course_data import GERMAN_LESSONS, get_german_lesson, get_german_lesson_artifact
+from .logic_course_data import VISIBLE_LOGIC_LESSONS, get_logic_course, resolve_logic_lesson
+
+
+class GermanLessonArtifactTests(SimpleTestCase):
+    def setUp(self):
+        self.lesson_slug = GERMAN_LESSONS["a1"][0]["slug"]
+
+    def test_artifact_is_built_once_and_shared(self):
+        artifact = get_german_lesson_artifact("a1", self.lesson_slug)
+        first = get_german_lesson("a1", self.lesson_slug)
+        second = get_german_lesson("a1", self.lesson_slug)
+
+        self.assertIs(get_german_lesson_artifact("a1", self.lesson_slug), artifact)
+        self.assertIs(first["vocabulary"], artifact["vocabulary"])
+        self.assertIs(first["grammar_sections"], second["grammar_sections"])
+        self.assertIsNot(first["exercises"], second["exercises"])
+        self.assertIsNot(first["exercises"][0]["questions"][0], artifact["exercises"][0]["questions"][0])
+
+    def test_request_copies_do_not_touch_the_artifact(self):
+        artifact = get_german_lesson_artifact("a1", self.lesson_slug)
+        questions = [dict(question) for exercise in artifact["exercises"] for question in exercise.get("questions", [])]
+
+        lesson = get_german_lesson("a1", self.lesson_slug)
+        lesson["exercises"][0]["questions"].clear()
+
+        self.assertEqual(
+            [dict(question) for exercise in artifact["exercises"] for question in exercise.get("questions", [])],
+            questions,
+        )
+
+    def test_generated_questions_get_three_options_with_the_correct_one(self):
+        artifact = get_german_lesson_artifact("a1", self.lesson_slug)
+        lesson = shuffle_lesson_exercises(artifact, Random(7))
+        generated = {exercise["id"]: exercise for exercise in artifact["exercises"]}["meaning-marathon"]
+        realized = {exercise["id"]: exercise for exercise in lesson["exercises"]}["meaning-marathon"]
+        correct_by_prompt = {question["prompt"]: question["correct_option"] for question in generated["questions"]}
+
+        self.assertEqual(len(realized["questions"]), len(generated["questions"]))
+        for question in realized["questions"]:
+            self.assertEqual(len(set(question["options"])), 3)
+            self.assertEqual(question["options"][question["correct_index"]], correct_by_prompt[question["prompt"]])
+            self.assertNotIn("distractors", question)
+
+    def test_unknown_lesson(self):
+        self.assertIsNone(get_german_lesson("a1", "yok-boyle-ders"))
+
+
+class LogicCourseArtifactTests(SimpleTestCase):
+    def test_course_lessons_are_shared_between_calls(self):
+        first = get_logic_course()
+        second = get_logic_course()
+
+        self.assertIsNot(first, second)
+        self.assertIs(first["lessons"][0], second["lessons"][0])
+        self.assertEqual([lesson["display_order"] for lesson in first["lessons"]], list(range(1, len(VISIBLE_LOGIC_LESSONS) + 1)))
+
+    def test_resolved_lesson_links_its_neighbours(self):
+        slugs = [lesson["slug"] for lesson in VISIBLE_LOGIC_LESSONS]
+        lesson, redirect_slug = resolve_logic_lesson(slugs[1])
+
+        self.assertIsNone(redirect_slug)
+        self.assertEqual(lesson["previous_lesson"]["slug"], slugs[0])
+        self.assertEqual(lesson["next_lesson"]["slug"], slugs[2])
+        self.assertEqual(lesson["active_lesson_count"], len(VISIBLE_LOGIC_LESSONS))
+        self.assertIsNot(resolve_logic_lesson(slugs[1])[0], lesson)
+
+    def test_lesson_page_renders(self):
+        slug = VISIBLE_LOGIC_LESSONS[0]["slug"]
+        response = self.client.get(reverse("logic_lesson_detail", args=[slug]))
+        self.assertEqual(response.status_code, 200)
+
+
+class CompiledCourseDataTests(SimpleTestCase):
+    def setUp(self):
+        scratch = tempfile.TemporaryDirectory()
+        self.addCleanup(scratch.cleanup)
+        self.directory = scratch.name
+        self.addCleanup(course_store.clear_course_caches)
+        call_command('compile_course_data', output=self.directory, stdout=StringIO())
+
+    def test_compiled_files_match_the_source_modules(self):
+        lesson_slug = GERMAN_LESSONS["a2"][0]["slug"]
+        with override_settings(COURSE_DATA_DIR=self.directory):
+            self.assertEqual(course_store._compiled_directory(), self.directory)
+            compiled = course_store.get_german_lesson_artifact("a2", lesson_slug)
+            logic = course_store.get_logic_course()
+
+        with override_settings(COURSE_DATA_DIR=""):
+            self.assertIsNone(course_store._compiled_directory())
+            source = course_store.get_german_lesson_artifact("a2", lesson_slug)
+
+        self.assertEqual(compiled, json.loads(json.dumps(source)))
+        self.assertEqual(json.loads(json.dumps(get_logic_course())), logic)
+
+    def test_pages_render_from_compiled_files(self):
+        lesson_slug = GERMAN_LESSONS["a1"][1]["slug"]
+        with override_settings(COURSE_DATA_DIR=self.directory):
+            course_store.warm_course_data()
+            lesson_page = self.client.get(reverse("german_lesson_detail", args=["a1", lesson_slug]))
+            level_test = course_store.build_german_level_test("a1")
+            logic_lesson, _ = course_store.resolve_logic_lesson(VISIBLE_LOGIC_LESSONS[0]["slug"])
+
+        self.assertEqual(lesson_page.status_code, 200)
+        self.assertEqual(lesson_page.context["lesson"]["slug"], lesson_slug)
+        self.assertEqual(level_test["slug"], "a1-seviye-bitirme-testi")
+        for exercise in level_test["exercises"]:
+            for question in exercise["questions"]:
+                self.assertEqual(question["options"][question["correct_index"]], question["correct"])
+        self.assertEqual(logic_lesson["next_lesson"]["slug"], VISIBLE_LOGIC_LESSONS[1]["slug"])
+        self.assertIsNone(course_store.build_german_level_test("c1"))
+
+    def test_stale_compile_falls_back_to_the_modules(self):
+        manifest = Path(self.directory) / "manifest.json"
+        manifest.write_text(json.dumps({"version": course_store.COURSE_DATA_VERSION, "sources": "old"}))
+
+        with override_settings(COURSE_DATA_DIR=self.directory), self.assertLogs("core.course_store", "WARNING"):
+            self.assertIsNone(course_store._compiled_directory())
+            self.assertEqual(course_store.get_german_level_lessons("a1")[0]["slug"], GERMAN_LESSONS["a1"][0]["slug"])
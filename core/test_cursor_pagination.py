@@ -0,0 +1,105 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .cursor_pagination import CursorPaginator, encode_cursor
+from .models import Answer, Question
+from .querysets import TODAY_QUESTIONS_ORDERING, get_today_questions_queryset
+from .utils import paginate_queryset_by_cursor
+
+
+class CursorPaginatorTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='cursor-user', password='pass')
+        stamp = timezone.now() - timedelta(hours=1)
+        self.questions = []
+        for index in range(7):
+            question = Question.objects.create(question_text=f'Imlec basligi {index}', user=self.user)
+            self.questions.append(question)
+        # Pairs of identical timestamps force the id tie-breaker.
+        for index, question in enumerate(self.questions):
+            Question.objects.filter(pk=question.pk).update(created_at=stamp - timedelta(minutes=index // 2))
+        self.expected = list(Question.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def test_pages_forward_and_back_across_ties(self):
+        paginator = CursorPaginator(Question.objects.all(), ('-created_at', '-id'), 3)
+
+        first = paginator.page()
+        second = paginator.page(first.next_cursor)
+        third = paginator.page(second.next_cursor)
+
+        self.assertFalse(first.has_previous())
+        self.assertEqual(
+            [q.id for page in (first, second, third) for q in page],
+            self.expected,
+        )
+        self.assertFalse(third.has_next())
+        self.assertEqual([q.id for q in paginator.page(third.previous_cursor)], self.expected[3:6])
+        self.assertEqual([q.id for q in paginator.page(second.previous_cursor)], self.expected[:3])
+
+    def test_page_runs_a_single_query_without_count(self):
+        paginator = CursorPaginator(Question.objects.all(), ('-created_at', '-id'), 3)
+        cursor = paginator.page().next_cursor
+
+        with self.assertNumQueries(1) as context:
+            page = list(paginator.page(cursor))
+        self.assertEqual(len(page), 3)
+        self.assertNotIn('COUNT(', context.captured_queries[0]['sql'].upper())
+        self.assertNotIn('OFFSET', context.captured_queries[0]['sql'].upper())
+
+    def test_garbled_cursor_falls_back_to_first_page(self):
+        paginator = CursorPaginator(Question.objects.all(), ('-created_at', '-id'), 3)
+        first_ids = [q.id for q in paginator.page()]
+
+        for cursor in ('nonsense', encode_cursor('n', ['not-a-date', 'x']), encode_cursor('n', [1])):
+            self.assertEqual([q.id for q in paginator.page(cursor)], first_ids)
+
+    def test_today_questions_ordering_pages_annotated_queryset(self):
+        for question in self.questions:
+            Answer.objects.create(question=question, user=self.user, answer_text='Imlec yaniti')
+        request = RequestFactory().get('/')
+        expected = list(get_today_questions_queryset().values_list('id', flat=True))
+
+        seen = []
+        page = paginate_queryset_by_cursor(get_today_questions_queryset(), request, TODAY_QUESTIONS_ORDERING, 'page', 4)
+        seen.extend(q.id for q in page)
+        request = RequestFactory().get('/', {'page': page.next_cursor})
+        page = paginate_queryset_by_cursor(get_today_questions_queryset(), request, TODAY_QUESTIONS_ORDERING, 'page', 4)
+        seen.extend(q.id for q in page)
+
+        self.assertEqual(seen, expected)
+        self.assertFalse(page.has_next())
+
+    def test_load_more_questions_follows_next_cursor(self):
+        seen = []
+        cursor = ''
+        while True:
+            data = self.client.get(reverse('load_more_questions'), {'limit': 3, 'cursor': cursor}).json()
+            seen.extend(item['slug'] for item in data['questions'])
+            if not data['has_more']:
+                break
+            cursor = data['next_cursor']
+
+        expected_slugs = [Question.objects.get(pk=pk).slug for pk in self.expected]
+        self.assertEqual(seen, expected_slugs)
+        self.assertNotIn('total', data)
+
+    def test_user_answers_cursor_mode_counts_only_first_batch(self):
+        for question in self.questions:
+            Answer.objects.create(question=question, user=self.user, answer_text='Secici yaniti')
+        self.client.force_login(self.user)
+        url = reverse('get_user_answers')
+
+        first = self.client.get(url, {'username': self.user.username, 'cursor': '', 'page_size': 4}).json()
+        second = self.client.get(
+            url, {'username': self.user.username, 'cursor': first['next_cursor'], 'page_size': 4}
+        ).json()
+
+        self.assertEqual(first['total'], 7)
+        self.assertNotIn('total', second)
+        self.assertFalse(second['has_more'])
+        expected = list(Answer.objects.filter(user=self.user).order_by('created_at', 'id').values_list('id', flat=True))
+        self.assertEqual([a['id'] for a in first['answers'] + second['answers']], expected)
@@ -1,14 +1,22 @@
 import base64
 import json
+from unittest import mock
 
+from django.core.cache import cache
 from django.test import SimpleTestCase
 
+from core import diagram_markup
 from core.diagram_markup import (
+    MAX_EDGES,
+    MAX_FREE_ARROWS,
+    MAX_REGIONS,
     _resolved_free_arrow_endpoints,
     decode_diagram_payload,
     encode_diagram_payload,
     normalize_diagram_payload,
+    render_diagram_html,
 )
+from core.management.commands.benchmark_diagrams import build_max_diagram_payload
 from core.templatetags.custom_tags import safe_markdownify, truncate_math_safe
 
 
@@ -889,3 +897,28 @@ class DiagramMarkupTests(SimpleTestCase):
         self.assertEqual(decoded["nodes"][0]["label_offset_y"], 0)
         self.assertEqual(decoded["regions"][0]["label_offset_x"], 0)
         self.assertEqual(decoded["regions"][0]["label_offset_y"], 0)
+
+    def test_rendered_diagram_is_cached_by_payload_digest(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        encoded = encode_diagram_payload(self.payload)
+        decoded = decode_diagram_payload(encoded)
+
+        with mock.patch.object(diagram_markup, "_render_diagram", wraps=diagram_markup._render_diagram) as render:
+            first = render_diagram_html(decoded, encoded)
+            second = render_diagram_html(decoded, encoded)
+
+        self.assertEqual(render.call_count, 1)
+        self.assertEqual(first, second)
+        self.assertEqual(first, render_diagram_html(decoded, encoded, use_cache=False))
+
+    def test_diagram_at_every_limit_renders_all_connections(self):
+        encoded = encode_diagram_payload(build_max_diagram_payload())
+        decoded = decode_diagram_payload(encoded)
+
+        rendered = render_diagram_html(decoded, encoded, use_cache=False)
+
+        self.assertEqual(rendered.count("answer-diagram-edge-group"), MAX_EDGES + MAX_FREE_ARROWS)
+        self.assertEqual(rendered.count('<g class="answer-diagram-region '), MAX_REGIONS)
+        # Blocked straight edges are routed around the boxes in their way.
+        self.assertIn(" H ", rendered)
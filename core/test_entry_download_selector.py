@@ -150,7 +150,7 @@ class EntryDownloadSelectorTests(TestCase):
         )
 
         self.assertEqual(response.status_code, 200)
-        payload = json.loads(response.content.decode("utf-8"))
+        payload = json.loads(b"".join(response.streaming_content).decode("utf-8"))
         self.assertEqual(
             [entry["answer_id"] for entry in payload["entries"]],
             [self.second_answer.id, self.first_answer.id],
@@ -0,0 +1,81 @@
+import json
+from io import BytesIO
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from openpyxl import load_workbook
+
+from .models import Answer, Question, Reference
+
+
+class StreamingEntryExportTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='export-user', password='pass')
+        self.references = [
+            Reference.objects.create(
+                author_surname='Yazar', author_name=f'Ad {index}', year=2000 + index,
+                rest='Yayinevi', created_by=self.user,
+            )
+            for index in range(3)
+        ]
+        self.first = Question.objects.create(question_text='Ilk baslik', user=self.user)
+        self.second = Question.objects.create(question_text='Ikinci baslik', user=self.user)
+        # Answers of the two questions are interleaved in time.
+        texts = [
+            (self.first, f'Bir (kaynak: {self.references[0].id}, sayfa: 12)'),
+            (self.second, f'Iki (k: {self.references[1].id})'),
+            (self.first, f'Uc (kaynak: {self.references[2].id}) (kaynak: 99999)'),
+        ]
+        self.answers = [
+            Answer.objects.create(question=question, user=self.user, answer_text=text)
+            for question, text in texts
+        ]
+        self.client.force_login(self.user)
+
+    def download(self, name, data=None):
+        response = self.client.post(reverse(name, args=[self.user.username]), data or {})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content)
+
+    def test_json_is_streamed_grouped_by_question(self):
+        with CaptureQueriesContext(connection) as context:
+            payload = json.loads(self.download('download_entries_json').decode('utf-8'))
+
+        self.assertEqual(
+            [(question['question_text'], len(question['answers'])) for question in payload['questions']],
+            [('Ilk baslik', 2), ('Ikinci baslik', 1)],
+        )
+        self.assertEqual(payload['entries'], [])
+        self.assertEqual(
+            [(reference['number'], reference.get('pages_used')) for reference in payload['references']],
+            [
+                (self.references[0].id, ['12']),
+                (self.references[1].id, []),
+                (self.references[2].id, []),
+                (99999, None),
+            ],
+        )
+        reference_queries = [query for query in context.captured_queries if '"core_reference"' in query['sql']]
+        self.assertEqual(len(reference_queries), 1)
+
+    def test_json_custom_order_lists_entries_in_requested_order(self):
+        ids = [self.answers[2].id, self.answers[1].id, self.answers[0].id]
+        payload = json.loads(self.download('download_entries_json', {
+            'entry_ids': ','.join(map(str, ids)),
+            'order': 'custom',
+        }).decode('utf-8'))
+
+        self.assertEqual([entry['answer_id'] for entry in payload['entries']], ids)
+        self.assertEqual([question['question_text'] for question in payload['questions']], ['Ilk baslik', 'Ikinci baslik'])
+
+    def test_xlsx_is_written_in_write_only_mode(self):
+        workbook = load_workbook(BytesIO(self.download('download_entries_xlsx', {'order': 'newest'})))
+
+        rows = list(workbook['Entries'].iter_rows(values_only=True))
+        self.assertEqual([row[0] for row in rows if row and row[0]], ['Ilk baslik', 'Ikinci baslik'])
+        self.assertEqual(rows[1][1], self.answers[0].answer_text)
+        self.assertEqual(workbook['Kaynaklar'].max_row, 5)
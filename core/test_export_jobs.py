@@ -0,0 +1,131 @@
+import shutil
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from docx import Document
+
+from .export_jobs import EXPORT_RETENTION, prune_export_jobs
+from .models import Answer, ExportJob, Question, Reference
+
+
+class ExportJobTests(TestCase):
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root, EXPORT_IN_BACKGROUND=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = User.objects.create_user(username='export-job-user', password='pass')
+        question = Question.objects.create(question_text='Arka plan basligi', user=self.user)
+        self.answer = Answer.objects.create(question=question, user=self.user, answer_text='Arka planda yazilan entry')
+        self.client.force_login(self.user)
+
+    def request_job(self, export_format='docx'):
+        response = self.client.post(
+            reverse(f'download_entries_{export_format}', args=[self.user.username]),
+            {'order': 'oldest', 'background': '1'},
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def run_worker(self):
+        out = StringIO()
+        call_command('run_export_worker', processes=0, once=True, stdout=out)
+        return out.getvalue()
+
+    def test_job_is_built_by_worker_and_reused(self):
+        job = self.request_job()
+        self.assertEqual(job['status'], 'pending')
+        self.assertEqual(self.client.get(job['status_url']).json()['status'], 'pending')
+
+        self.assertIn(f"Export job {job['job_id']}: done.", self.run_worker())
+
+        status = self.client.get(job['status_url']).json()
+        self.assertEqual(status['status'], 'done')
+        response = self.client.get(status['download_url'])
+        document = Document(BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('Arka planda yazilan entry', [paragraph.text for paragraph in document.paragraphs])
+
+        # The same export is served from the stored file, both ways.
+        self.assertEqual(self.request_job(), status)
+        direct = self.client.post(reverse('download_entries_docx', args=[self.user.username]), {'order': 'oldest'})
+        self.assertTrue(direct.streaming)
+        self.assertEqual(ExportJob.objects.count(), 1)
+
+    def test_background_is_ignored_without_the_worker_setting(self):
+        with override_settings(EXPORT_IN_BACKGROUND=False):
+            response = self.client.post(
+                reverse('download_entries_docx', args=[self.user.username]),
+                {'order': 'oldest', 'background': '1'},
+            )
+            profile = self.client.get(reverse('user_profile', args=[self.user.username]))
+
+        document = Document(BytesIO(b''.join(response.streaming_content)))
+        self.assertIn('Arka planda yazilan entry', [paragraph.text for paragraph in document.paragraphs])
+        self.assertFalse(ExportJob.objects.exists())
+        self.assertContains(profile, 'const EXPORT_IN_BACKGROUND = false;')
+
+    def test_edited_answers_get_a_new_job(self):
+        first = self.request_job('pdf')
+        self.run_worker()
+        self.assertEqual(self.request_job('pdf')['job_id'], first['job_id'])
+
+        Answer.objects.filter(pk=self.answer.pk).update(
+            answer_text='Degisti', updated_at=timezone.now() + timedelta(minutes=1)
+        )
+        second = self.request_job('pdf')
+
+        self.assertNotEqual(second['job_id'], first['job_id'])
+        self.assertEqual(second['status'], 'pending')
+
+    def test_edited_cited_reference_gets_a_new_job(self):
+        reference = Reference.objects.create(
+            author_surname='Yazar', author_name='Ad', year=2001, rest='Yayinevi', created_by=self.user,
+        )
+        self.answer.answer_text = f'Kaynakli entry (k:{reference.id})'
+        self.answer.save()
+        first = self.request_job('paper')
+        self.run_worker()
+        self.assertEqual(self.request_job('paper')['job_id'], first['job_id'])
+
+        Reference.objects.filter(pk=reference.pk).update(
+            rest='Yeni yayinevi', updated_at=timezone.now() + timedelta(minutes=1)
+        )
+
+        self.assertNotEqual(self.request_job('paper')['job_id'], first['job_id'])
+
+    def test_worker_prunes_replaced_and_expired_artifacts(self):
+        first = self.request_job()
+        self.run_worker()
+        Answer.objects.filter(pk=self.answer.pk).update(updated_at=timezone.now() + timedelta(minutes=1))
+        second = self.request_job()
+        pdf = self.request_job('pdf')
+        old_file = ExportJob.objects.get(id=first['job_id']).file.name
+
+        self.assertIn('Pruned 1 old export jobs.', self.run_worker())
+        self.assertFalse(ExportJob.objects.filter(id=first['job_id']).exists())
+        self.assertFalse(default_storage.exists(old_file))
+        self.assertEqual(
+            set(ExportJob.objects.values_list('id', flat=True)), {second['job_id'], pdf['job_id']}
+        )
+
+        self.assertEqual(prune_export_jobs(now=timezone.now() + EXPORT_RETENTION + timedelta(days=1)), 2)
+        self.assertFalse(ExportJob.objects.exists())
+
+    def test_other_users_cannot_see_the_job(self):
+        job = self.request_job('paper')
+        other = User.objects.create_user(username='export-job-other', password='pass')
+        self.client.force_login(other)
+
+        self.assertEqual(self.client.get(job['status_url']).status_code, 403)
+        self.assertEqual(
+            self.client.get(reverse('export_job_download', args=[job['job_id']])).status_code, 403
+        )
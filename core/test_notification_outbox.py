@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from .models import Answer, AnswerFollow, Notification, NotificationOutbox, Question, QuestionFollow
+from .utils import extract_mentions
+
+
+class NotificationOutboxTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='outbox-author', password='pass')
+        self.question = Question.objects.create(question_text='Bildirim basligi', user=self.author)
+        self.readers = [
+            User.objects.create_user(username=f'outbox reader {index}', password='pass')
+            for index in range(6)
+        ]
+        author_profile = self.author.userprofile
+        for reader in self.readers[:4]:
+            QuestionFollow.objects.create(user=reader, question=self.question)
+        for reader in self.readers[2:]:
+            reader.userprofile.following.add(author_profile)
+
+    def notifications(self):
+        return sorted(
+            Notification.objects.values_list('recipient__username', 'notification_type')
+        )
+
+    def test_new_answer_notifies_each_recipient_once_in_bulk(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            answer = Answer.objects.create(
+                question=self.question,
+                user=self.author,
+                answer_text='Merhaba @outbox reader 0 ve @OUTBOX READER 3 ve @outbox-author',
+            )
+
+        self.assertEqual(self.notifications(), [
+            ('outbox reader 0', 'mention'),
+            ('outbox reader 1', 'new_answer'),
+            ('outbox reader 2', 'new_answer'),
+            ('outbox reader 3', 'mention'),
+            ('outbox reader 4', 'followed_user_entry'),
+            ('outbox reader 5', 'followed_user_entry'),
+        ])
+        self.assertFalse(NotificationOutbox.objects.exists())
+        self.assertTrue(Notification.objects.filter(related_answer=answer).exists())
+
+    def test_delivery_runs_a_fixed_number_of_queries(self):
+        answer_text = ' '.join(f'@outbox reader {index}' for index in range(6))
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Answer.objects.create(question=self.question, user=self.author, answer_text=answer_text)
+
+        # Lock outbox, load answer, mentions, question and author followers,
+        # bulk insert, delete outbox row; savepoint pair around it.
+        with self.assertNumQueries(9):
+            for callback in callbacks:
+                callback()
+        self.assertEqual(Notification.objects.count(), 6)
+
+    def test_extract_mentions_uses_one_query(self):
+        with self.assertNumQueries(1):
+            mentions = extract_mentions('@outbox reader 1 dedi ki @outbox reader 2 @yok boyle biri')
+
+        self.assertEqual(sorted(mentions), ['outbox reader 1', 'outbox reader 2'])
+
+    @override_settings(NOTIFICATION_FANOUT='queue')
+    def test_queue_mode_waits_for_drain_command(self):
+        answer = Answer.objects.create(question=self.question, user=self.author, answer_text='Ilk hali')
+        AnswerFollow.objects.create(user=self.readers[5], answer=answer)
+        answer.answer_text = 'Ikinci hali'
+        answer.save()
+
+        self.assertFalse(Notification.objects.exists())
+        self.assertEqual(NotificationOutbox.objects.count(), 2)
+
+        out = StringIO()
+        call_command('drain_notification_outbox', stdout=out)
+
+        self.assertIn('Delivered 2 outbox events as 7 notifications.', out.getvalue())
+        self.assertEqual(
+            Notification.objects.filter(notification_type='answer_update').get().recipient,
+            self.readers[5],
+        )
+        self.assertFalse(NotificationOutbox.objects.exists())
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+
+from .models import Answer, Question
+from .querysets import get_today_questions_queryset
+from .question_activity import rebuild_question_activity
+
+
+class QuestionActivityTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='activity-user', password='pass')
+        self.first = Question.objects.create(question_text='Etkinlik bir', user=self.user)
+        self.second = Question.objects.create(question_text='Etkinlik iki', user=self.user)
+
+    def stored(self, question):
+        return Question.objects.values_list('answers_count', 'last_answer_at', 'activity_at').get(pk=question.pk)
+
+    def assertMatchesRebuild(self, *questions):
+        before = [self.stored(question) for question in questions]
+        rebuild_question_activity()
+        self.assertEqual(before, [self.stored(question) for question in questions])
+
+    def test_new_question_starts_without_answers(self):
+        count, last_answer_at, activity_at = self.stored(self.first)
+
+        self.assertEqual(count, 0)
+        self.assertIsNone(last_answer_at)
+        self.assertAlmostEqual(activity_at, Question.objects.get(pk=self.first.pk).created_at, delta=timedelta(seconds=1))
+
+    def test_answer_create_delete_and_move_keep_columns_in_sync(self):
+        first_answer = Answer.objects.create(question=self.first, user=self.user, answer_text='Bir')
+        second_answer = Answer.objects.create(question=self.first, user=self.user, answer_text='Iki')
+        Answer.objects.create(question=self.second, user=self.user, answer_text='Uc')
+
+        self.assertEqual(self.stored(self.first)[:2], (2, second_answer.created_at))
+        self.assertMatchesRebuild(self.first, self.second)
+
+        second_answer.question = self.second
+        second_answer.save()
+        self.assertEqual(self.stored(self.first)[:2], (1, first_answer.created_at))
+        self.assertEqual(self.stored(self.second)[0], 2)
+        self.assertMatchesRebuild(self.first, self.second)
+
+        second_answer.delete()
+        self.assertEqual(self.stored(self.second)[0], 1)
+        self.assertMatchesRebuild(self.first, self.second)
+
+    def test_feed_reads_stored_columns_without_subqueries(self):
+        old_date = timezone.now() - timedelta(days=10)
+        Answer.objects.create(question=self.first, user=self.user, answer_text='Guncel')
+        Question.objects.filter(pk=self.second.pk).update(created_at=old_date, activity_at=old_date)
+
+        questions = list(get_today_questions_queryset())
+
+        self.assertEqual([question.id for question in questions], [self.first.id])
+        self.assertEqual(questions[0].answers_count, 1)
+        sql = str(get_today_questions_queryset().query).upper()
+        self.assertEqual(sql.count('SELECT'), 1)
+
+        if connection.vendor == 'sqlite':
+            queryset = Question.objects.filter(activity_at__gte=old_date).order_by('-activity_at', '-id')[:25]
+            sql, params = queryset.query.sql_with_params()
+            with connection.cursor() as cursor:
+                cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+                plan = ' '.join(str(row) for row in cursor.fetchall())
+            self.assertIn('core_question_activity_idx', plan)
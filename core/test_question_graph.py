@@ -0,0 +1,86 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Answer, Question, QuestionRelationship
+from .question_graph import QuestionGraph, question_graph_cache_key, user_question_graph
+from .views.question_link_views import would_create_cycle, would_create_cycle_user_based
+
+
+class QuestionGraphTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='graph-user', password='pass')
+        self.other = User.objects.create_user(username='graph-other', password='pass')
+        self.chain = [
+            Question.objects.create(question_text=f'Halka {index}', user=self.user)
+            for index in range(30)
+        ]
+        for parent, child in zip(self.chain, self.chain[1:]):
+            QuestionRelationship.objects.create(parent=parent, child=child, user=self.user)
+        QuestionRelationship.objects.create(parent=self.chain[-1], child=self.chain[5], user=self.other)
+
+    def test_graph_is_loaded_once_and_dropped_on_relationship_changes(self):
+        with self.assertNumQueries(1):
+            graph = user_question_graph(self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(user_question_graph(self.user.id).edges, graph.edges)
+        self.assertEqual(graph.inferred_root_ids(), [self.chain[0].id])
+
+        extra = Question.objects.create(question_text='Yan dal', user=self.user)
+        with self.captureOnCommitCallbacks(execute=True):
+            relationship = QuestionRelationship.objects.create(parent=self.chain[3], child=extra, user=self.user)
+        self.assertEqual(user_question_graph(self.user).child_count(self.chain[3].id), 2)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            relationship.delete()
+        self.assertEqual(user_question_graph(self.user).child_count(self.chain[3].id), 1)
+
+    def test_cycle_checks_follow_only_the_users_links(self):
+        with self.assertNumQueries(1):
+            self.assertTrue(would_create_cycle_user_based(self.chain[-1], self.chain[0], self.user))
+        self.assertTrue(would_create_cycle_user_based(self.chain[4], self.chain[4], self.user))
+        self.assertFalse(would_create_cycle_user_based(self.chain[0], self.chain[-1], self.user))
+        # Only the other user's map links the last question back to the sixth.
+        self.assertFalse(would_create_cycle_user_based(self.chain[10], self.chain[-1], self.user))
+        self.assertTrue(would_create_cycle_user_based(self.chain[5], self.chain[-1], self.other))
+
+    def test_cycle_checks_ignore_a_stale_cached_graph(self):
+        # Another worker's cache may still hold the map from before a link was added.
+        cache.set(question_graph_cache_key(self.user.id), [])
+
+        with self.assertNumQueries(1):
+            self.assertTrue(would_create_cycle_user_based(self.chain[-1], self.chain[0], self.user))
+
+    def test_global_cycle_check_uses_subquestions(self):
+        first, second, third = self.chain[:3]
+        first.subquestions.add(second)
+        second.subquestions.add(third)
+
+        self.assertTrue(would_create_cycle(third, first))
+        self.assertFalse(would_create_cycle(first, third))
+
+    def test_subtree_sizes_and_ancestor_paths(self):
+        graph = QuestionGraph([(1, 2), (1, 3), (2, 4), (3, 4), (4, 1), (7, 8)])
+
+        self.assertEqual(graph.subtree_size(1), 3)
+        self.assertEqual(graph.subtree_size(4), 3)
+        self.assertEqual(graph.subtree_size(8), 0)
+        depth_by_id, parent_by_id = graph.spanning_tree([7, 1])
+        self.assertEqual(depth_by_id, {7: 0, 8: 1, 1: 0, 2: 1, 3: 1, 4: 2})
+        self.assertEqual(QuestionGraph.ancestor_path(4, parent_by_id), [1, 2, 4])
+
+    def test_linking_rejects_a_cycle_through_a_deep_chain(self):
+        Answer.objects.create(question=self.chain[0], user=self.user, answer_text='kok entry')
+        self.client.force_login(self.user)
+
+        response = self.client.post(
+            reverse('add_existing_subquestion', args=[self.chain[0].slug]),
+            {'subquestion_id': self.chain[-1].id},
+        )
+
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('döngüsel', response.json()['error'])
+        self.assertFalse(QuestionRelationship.objects.filter(parent=self.chain[-1], child=self.chain[0]).exists())
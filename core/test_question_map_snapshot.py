@@ -0,0 +1,100 @@
+import json
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Answer, Hashtag, HashtagUsage, Question, QuestionMapSnapshot, QuestionRelationship, StartingQuestion
+from .question_map_snapshot import (
+    QUESTION_MAP_SNAPSHOT_KEY,
+    _collect,
+    _serialize,
+    load_question_map_snapshot,
+    rebuild_question_map_snapshot,
+)
+
+
+class QuestionMapSnapshotTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='map-owner', password='pass')
+        self.other = User.objects.create_user(username='map-other', password='pass')
+        self.root = Question.objects.create(question_text='Harita koku', user=self.owner)
+        self.child = Question.objects.create(question_text='Harita dali', user=self.owner)
+        self.loose = Question.objects.create(question_text='Bagimsiz baslik', user=self.other)
+
+        StartingQuestion.objects.create(user=self.owner, question=self.root)
+        QuestionRelationship.objects.create(user=self.owner, parent=self.root, child=self.child)
+        self.child_answer = Answer.objects.create(question=self.child, user=self.other, answer_text='Dal yaniti')
+        self.child.users.add(self.other)
+        self.client.force_login(self.owner)
+
+    def assertSnapshotMatchesDatabase(self):
+        stored = json.loads(QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY).payload)
+        collected = _collect()
+        fresh = json.loads(_serialize(collected['nodes'], collected['starting'], collected['relationships']))
+        self.assertEqual(stored, fresh)
+
+    def test_map_data_is_served_from_snapshot_with_etag(self):
+        response = self.client.get(reverse('map_data'))
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual({node['question_id'] for node in data['nodes']}, {self.root.id, self.child.id})
+        self.assertEqual(data['links'], [
+            {'source': f'q{self.root.id}', 'target': f'q{self.child.id}', 'user_id': self.owner.id},
+        ])
+        child_node = next(node for node in data['nodes'] if node['question_id'] == self.child.id)
+        self.assertEqual(child_node['users'][0]['answer_id'], self.child_answer.id)
+        self.assertEqual(child_node['link_user_ids'], [self.owner.id])
+
+        self.client.logout()
+        with self.assertNumQueries(1):
+            cached = self.client.get(reverse('map_data'), HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(cached.status_code, 304)
+
+    def test_changes_update_snapshot_in_place(self):
+        rebuild_question_map_snapshot()
+        version = QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY).version
+
+        QuestionRelationship.objects.create(user=self.other, parent=self.child, child=self.loose)
+        self.assertSnapshotMatchesDatabase()
+
+        Answer.objects.create(question=self.loose, user=self.owner, answer_text='Yeni yanit')
+        self.loose.question_text = 'Yeniden adlandirildi'
+        self.loose.save()
+        self.assertSnapshotMatchesDatabase()
+
+        self.child_answer.delete()
+        StartingQuestion.objects.filter(question=self.root).delete()
+        self.assertSnapshotMatchesDatabase()
+
+        self.loose.delete()
+        self.assertSnapshotMatchesDatabase()
+        self.assertGreater(QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY).version, version)
+
+    def test_changes_to_unmapped_questions_do_not_rewrite_snapshot(self):
+        rebuild_question_map_snapshot()
+        version = QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY).version
+
+        Answer.objects.create(question=self.loose, user=self.owner, answer_text='Haritada olmayan')
+
+        self.assertEqual(QuestionMapSnapshot.objects.get(key=QUESTION_MAP_SNAPSHOT_KEY).version, version)
+
+    def test_filters_run_in_memory(self):
+        hashtag = Hashtag.objects.create(name='harita')
+        HashtagUsage.objects.create(hashtag=hashtag, answer=self.child_answer)
+        load_question_map_snapshot()
+        self.client.logout()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('map_data'), {'hashtag': 'harita'})
+        self.assertEqual([node['question_id'] for node in response.json()['nodes']], [self.child.id])
+
+        response = self.client.get(reverse('map_data'), {'user_id': self.other.id})
+        data = response.json()
+        self.assertEqual([node['question_id'] for node in data['nodes']], [self.child.id])
+        self.assertEqual(data['links'], [])
+
+        self.client.force_login(self.owner)
+        response = self.client.get(reverse('map_data'), {'filter': 'me'})
+        self.assertEqual(response.json()['nodes'], [])
@@ -1,4 +1,5 @@
 from django.contrib.auth.models import User
+from django.core.cache import cache
 from django.test import TestCase
 from django.urls import reverse
 
@@ -7,6 +8,8 @@ from .models import Answer, Question, QuestionRelationship, StartingQuestion
 
 class QuestionSchemaTests(TestCase):
     def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
         self.owner = User.objects.create_user(username="schema-owner", password="pass")
         self.other = User.objects.create_user(username="schema-other", password="pass")
 
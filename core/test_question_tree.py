@@ -0,0 +1,67 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+
+from .models import Question, QuestionRelationship
+from .question_tree import descendant_depths, descendant_ids, subtree_sizes
+from .views.answer_views import get_all_descendant_question_ids
+
+
+class QuestionTreeTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tree-user', password='pass')
+        self.other = User.objects.create_user(username='tree-other', password='pass')
+        self.chain = [
+            Question.objects.create(question_text=f'Dal {index}', user=self.user)
+            for index in range(12)
+        ]
+        for parent, child in zip(self.chain, self.chain[1:]):
+            QuestionRelationship.objects.create(parent=parent, child=child, user=self.user)
+        # A shortcut to the end of the chain and another user's link.
+        QuestionRelationship.objects.create(parent=self.chain[0], child=self.chain[-1], user=self.user)
+        self.stray = Question.objects.create(question_text='Baska harita', user=self.other)
+        QuestionRelationship.objects.create(parent=self.chain[3], child=self.stray, user=self.other)
+
+    def test_deep_tree_is_walked_in_one_query(self):
+        with self.assertNumQueries(1):
+            depths = descendant_depths([self.chain[0].id, self.chain[8].id], self.user)
+
+        self.assertEqual(depths[self.chain[0].id][self.chain[10].id], 10)
+        self.assertEqual(depths[self.chain[0].id][self.chain[-1].id], 1)
+        self.assertEqual(set(depths[self.chain[8].id]), {question.id for question in self.chain[8:]})
+        self.assertNotIn(self.stray.id, depths[self.chain[0].id])
+
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                sorted(get_all_descendant_question_ids(self.chain[9].id, self.user)),
+                [question.id for question in self.chain[9:]],
+            )
+
+    def test_in_memory_backend_gives_the_same_result(self):
+        roots = [question.id for question in self.chain[:4]]
+        expected = descendant_depths(roots, self.user)
+
+        with patch('core.question_tree.CTE_VENDORS', ()), self.assertNumQueries(1):
+            self.assertEqual(descendant_depths(roots, self.user), expected)
+
+    def test_cycles_fall_back_to_the_in_memory_walk(self):
+        QuestionRelationship.objects.create(parent=self.chain[-1], child=self.chain[0], user=self.user)
+
+        with self.assertNumQueries(2):
+            ids = descendant_ids(self.chain[5].id, self.user)
+
+        self.assertEqual(ids, {question.id for question in self.chain})
+
+    def test_subtree_sizes_count_distinct_questions(self):
+        root, left, right, shared = self.chain[:4]
+        Question.objects.filter(id__in=[question.id for question in self.chain[4:]]).delete()
+        root.subquestions.add(left, right)
+        left.subquestions.add(shared)
+        right.subquestions.add(shared)
+
+        with self.assertNumQueries(1):
+            sizes = subtree_sizes([root.id, left.id, shared.id])
+
+        self.assertEqual(sizes, {root.id: 3, left.id: 1, shared.id: 0})
+        self.assertEqual(root.get_total_subquestions_count(), 3)
@@ -7,7 +7,7 @@ from django.test import TestCase
 from django.urls import reverse
 from django.utils import timezone
 
-from .models import Answer, Question
+from .models import Answer, AnswerRenderedContent, Question
 
 
 class ExpandedAnswerContentTests(TestCase):
@@ -26,13 +26,15 @@ class ExpandedAnswerContentTests(TestCase):
             user=self.user,
             answer_text='Tam yanit metni',
         )
+        # Start without a stored render so the endpoint has to render once.
+        AnswerRenderedContent.objects.filter(answer=self.answer).delete()
         self.url = reverse('expanded_answer_content', args=[self.answer.id])
 
     def tearDown(self):
         cache.clear()
 
     @patch(
-        'core.views.answer_page_views.render_answer_content_html',
+        'core.answer_git.render_answer_content_html',
         return_value='<p>Tam yanit</p>',
     )
     def test_rendered_content_is_cached_for_repeated_expansions(self, render_mock):
@@ -46,7 +48,7 @@ class ExpandedAnswerContentTests(TestCase):
         self.assertEqual(render_mock.call_count, 1)
 
     @patch(
-        'core.views.answer_page_views.render_answer_content_html',
+        'core.answer_git.render_answer_content_html',
         side_effect=['<p>Ilk</p>', '<p>Guncel</p>'],
     )
     def test_answer_update_invalidates_cached_content(self, render_mock):
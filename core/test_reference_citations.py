@@ -0,0 +1,97 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Answer, AnswerReferenceCitation, Question, Reference
+from .utils import build_reference_usage_counts
+
+
+class ReferenceCitationTableTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='alinti', password='pass')
+        self.reference = Reference.objects.create(
+            author_surname='Weil',
+            author_name='Simone',
+            year=1949,
+            rest='Gallimard.',
+            created_by=self.user,
+        )
+        self.other_reference = Reference.objects.create(
+            author_surname='Camus',
+            author_name='Albert',
+            year=1942,
+            rest='Gallimard.',
+            created_by=self.user,
+        )
+        self.question = Question.objects.create(question_text='Alıntılar', user=self.user)
+        self.answer = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text=(
+                f'Birinci (kaynak:{self.reference.id}, sayfa:4) '
+                f've ikinci (k:{self.other_reference.id} s:7).'
+            ),
+        )
+
+    def citation_rows(self):
+        return list(
+            AnswerReferenceCitation.objects.filter(answer=self.answer)
+            .order_by('position')
+            .values_list('reference_id', 'page')
+        )
+
+    def test_rows_follow_answer_edits_and_deletes(self):
+        self.assertEqual(self.citation_rows(), [(self.reference.id, '4'), (self.other_reference.id, '7')])
+
+        self.answer.answer_text = f'Sadece (k:{self.reference.id}) ve (K : {self.reference.id}, s : 9).'
+        self.answer.save()
+        self.assertEqual(self.citation_rows(), [(self.reference.id, ''), (self.reference.id, '9')])
+        self.assertEqual(self.reference.get_usage_count(), 2)
+        self.assertEqual(self.other_reference.get_usage_count(), 0)
+
+        self.answer.delete()
+        self.assertFalse(AnswerReferenceCitation.objects.exists())
+
+    def test_usage_counts_come_from_one_query(self):
+        Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text=f'Tekrar (kaynak:{self.reference.id}).',
+        )
+
+        with self.assertNumQueries(1):
+            counts = build_reference_usage_counts()
+
+        self.assertEqual(counts, {self.reference.id: 2, self.other_reference.id: 1})
+
+    def test_partial_save_does_not_touch_citations(self):
+        AnswerReferenceCitation.objects.all().delete()
+
+        self.answer.upvotes = 2
+        self.answer.save(update_fields=['upvotes'])
+
+        self.assertEqual(self.citation_rows(), [])
+
+    def test_rebuild_command_restores_rows(self):
+        AnswerReferenceCitation.objects.all().delete()
+
+        call_command('rebuild_reference_citations', stdout=StringIO())
+
+        self.assertEqual(self.citation_rows(), [(self.reference.id, '4'), (self.other_reference.id, '7')])
+
+    def test_ids_beyond_the_database_range_are_ignored(self):
+        answer = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text=f'metin (k:99999999999999999999999) ve (t:x:99999999999999999999999) (k:{self.reference.id}) son',
+        )
+
+        self.assertEqual(
+            list(answer.reference_citations.values_list('reference_id', flat=True)),
+            [self.reference.id],
+        )
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(reverse('question_detail', args=[self.question.slug])).status_code, 200)
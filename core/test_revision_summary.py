@@ -0,0 +1,77 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import TestCase
+
+from .answer_git import (
+    approve_revision_review,
+    attach_answer_revision_metadata,
+    create_answer_revision,
+    create_answer_suggestion,
+)
+from .models import Answer, AnswerRevision, AnswerRevisionApproval, AnswerRevisionSummary, Question
+
+
+class RevisionSummaryTests(TestCase):
+    def setUp(self):
+        self.owner = User.objects.create_user(username='summary-owner', password='pass')
+        self.editor = User.objects.create_user(username='summary-editor', password='pass')
+        self.question = Question.objects.create(question_text='Ozet testi', user=self.owner)
+        self.answer = Answer.objects.create(question=self.question, user=self.owner, answer_text='Ilk metin')
+
+    def summary(self):
+        return AnswerRevisionSummary.objects.get(answer=self.answer)
+
+    def test_summary_follows_revisions_suggestions_and_reviews(self):
+        self.assertEqual(self.summary().current_revision_no, 1)
+
+        first, _ = create_answer_revision(self.answer, content='Editor metni', created_by=self.editor)
+        create_answer_suggestion(self.answer, proposed_by=self.editor, proposed_text='Oneri')
+        second, _ = create_answer_revision(self.answer, content='Sahibin metni', created_by=self.owner)
+
+        summary = self.summary()
+        self.assertEqual(summary.current_revision_id, second.id)
+        self.assertEqual((summary.current_revision_no, summary.revision_count), (3, 3))
+        self.assertEqual(summary.open_suggestion_count, 1)
+        self.assertEqual(summary.last_revision_actor, 'summary-owner')
+        self.assertEqual(summary.contributors['pending'], [[self.editor.id, 'summary-editor']])
+
+        approve_revision_review(second, user=self.editor)
+
+        self.assertEqual(
+            self.summary().contributors['approved'],
+            [[self.owner.id, 'summary-owner'], [self.editor.id, 'summary-editor']],
+        )
+
+    def test_rename_updates_stored_usernames(self):
+        create_answer_revision(self.answer, content='Editor metni', created_by=self.editor)
+        self.editor.username = 'summary-renamed'
+        self.editor.save()
+
+        self.assertEqual(self.summary().last_revision_actor, 'summary-renamed')
+
+    def test_listing_an_answer_without_revisions_does_not_write(self):
+        AnswerRevision.objects.filter(answer=self.answer).delete()
+        AnswerRevisionSummary.objects.filter(answer=self.answer).delete()
+        answer = Answer.objects.get(pk=self.answer.pk)
+
+        with self.assertNumQueries(5):
+            # Summary lookup, then the read-only build; no INSERTs.
+            attach_answer_revision_metadata([answer], current_user=self.owner)
+
+        self.assertIsNone(answer.current_revision)
+        self.assertEqual(answer.contributor_usernames, ['summary-owner'])
+        self.assertFalse(AnswerRevision.objects.filter(answer=self.answer).exists())
+
+    def test_backfill_creates_initial_revisions_snapshots_and_summaries(self):
+        AnswerRevision.objects.filter(answer=self.answer).delete()
+        AnswerRevisionSummary.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_revision_summaries', stdout=out)
+
+        self.assertIn('Stored revision summaries for 1 answers.', out.getvalue())
+        revision = AnswerRevision.objects.get(answer=self.answer)
+        self.assertTrue(AnswerRevisionApproval.objects.filter(revision=revision, user=self.owner).exists())
+        self.assertEqual(self.summary().current_revision_id, revision.id)
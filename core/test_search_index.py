@@ -0,0 +1,108 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+
+from .models import Answer, Question, SearchDocument
+from .search_index import fold_search_text, rebuild_search_index, search_documents
+
+
+class SearchIndexTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='arayan', password='pass')
+        self.question = Question.objects.create(question_text='Işık ve Gölge', user=self.user)
+        self.answer = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text='Şeffaf cisimler ışığı geçirir.',
+        )
+
+    def test_fold_search_text_handles_turkish_letters(self):
+        self.assertEqual(fold_search_text('IŞIK İğne ÇÖÜ'), 'isik igne cou')
+        self.assertEqual(fold_search_text('ışık'), fold_search_text('ISIK'))
+
+    def test_saves_keep_documents_in_sync(self):
+        hits, _ = search_documents('İŞİ')
+        self.assertIn(('question', self.question.id), hits)
+        self.assertIn(('answer', self.answer.id), hits)
+
+        self.answer.answer_text = 'Tamamen farklı metin'
+        self.answer.save()
+        hits, _ = search_documents('seffaf')
+        self.assertEqual(hits, [])
+
+        self.question.delete()
+        self.assertFalse(SearchDocument.objects.filter(kind='question', object_id=self.question.id).exists())
+
+    def test_vote_style_partial_save_does_not_reindex(self):
+        SearchDocument.objects.filter(kind='question').update(body='bayat')
+
+        self.question.upvotes = 3
+        self.question.save(update_fields=['upvotes'])
+
+        self.assertEqual(SearchDocument.objects.get(kind='question').body, 'bayat')
+
+    def test_prefix_match_and_cursor_paging(self):
+        for index in range(5):
+            Question.objects.create(question_text=f'Gölgelik alan {index}', user=self.user)
+
+        seen = []
+        cursor = None
+        while True:
+            hits, cursor = search_documents(
+                'golge',
+                SearchDocument.objects.filter(kind='question'),
+                limit=2,
+                cursor=cursor,
+            )
+            seen.extend(hits)
+            if cursor is None:
+                break
+
+        self.assertEqual(len(seen), 6)
+        self.assertEqual(len(set(seen)), 6)
+
+    def test_rebuild_restores_missing_documents(self):
+        SearchDocument.objects.all().delete()
+
+        rebuild_search_index(chunk_size=2)
+
+        self.assertTrue(SearchDocument.objects.filter(kind='answer', object_id=self.answer.id).exists())
+        self.assertTrue(SearchDocument.objects.filter(kind='user', object_id=self.user.id).exists())
+
+
+class SearchViewTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='gezgin', password='pass')
+        self.question = Question.objects.create(question_text='İstanbul gezisi', user=self.user)
+        Answer.objects.create(question=self.question, user=self.user, answer_text='Boğaz turu yaptık.')
+
+    def test_suggestions_fold_query_and_use_cursor(self):
+        for index in range(3):
+            Question.objects.create(question_text=f'İstanbul semtleri {index}', user=self.user)
+
+        response = self.client.get(reverse('search_suggestions'), {'q': 'istan', 'limit': 2})
+        data = response.json()
+
+        labels = [item['label'] for item in data['suggestions'] if item['type'] == 'question']
+        self.assertEqual(len(labels), 2)
+        self.assertTrue(data['has_more'])
+
+        response = self.client.get(
+            reverse('search_suggestions'),
+            {'q': 'istan', 'limit': 2, 'cursor': data['next_cursor']},
+        )
+        more_labels = [item['label'] for item in response.json()['suggestions']]
+        self.assertEqual(len(more_labels), 2)
+        self.assertFalse(set(labels) & set(more_labels))
+
+    def test_search_page_filters_by_kind_and_user(self):
+        other = User.objects.create_user(username='baskasi', password='pass')
+        Question.objects.create(question_text='Boğaz köprüsü', user=other)
+
+        response = self.client.get(reverse('search'), {'q': 'bogaz', 'username': 'gezgin'})
+
+        results = response.context['results']
+        self.assertEqual([item['type'] for item in results], ['answer'])
+
+        response = self.client.get(reverse('search'), {'q': 'bogaz', 'search_in': 'question'})
+        self.assertEqual([item['object'].user for item in response.context['results']], [other])
@@ -0,0 +1,173 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from .models import (
+    Answer,
+    ContentSaveCount,
+    DailyVisitor,
+    DailyVisitorCount,
+    Question,
+    SavedItem,
+    SiteStatistic,
+    SiteWordCount,
+    UserEntryStats,
+    VisitSession,
+    Vote,
+)
+from .site_statistics import apply_vote_total_change, rebuild_site_statistics, roll_visitor_days
+
+
+class SiteStatisticsRollupTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.owner = User.objects.create_user(username='stats-owner', password='pass')
+        self.other = User.objects.create_user(username='stats-other', password='pass')
+        self.question = Question.objects.create(question_text='Elma armut', user=self.owner)
+        self.answer = Answer.objects.create(question=self.question, user=self.other, answer_text='Elma kirmizi elma')
+        rebuild_site_statistics()
+
+    def snapshot(self):
+        return {
+            'totals': dict(SiteStatistic.objects.values_list('key', 'value')),
+            # Emptied rows are kept incrementally but not rebuilt.
+            'words': dict(SiteWordCount.objects.filter(count__gt=0).values_list('word', 'count')),
+            'users': sorted(UserEntryStats.objects.exclude(question_count=0, answer_count=0).values_list(
+                'user_id', 'question_count', 'answer_count'
+            )),
+            'saves': sorted(
+                ContentSaveCount.objects.filter(count__gt=0).values_list('content_type_id', 'object_id', 'count')
+            ),
+        }
+
+    def assertMatchesRebuild(self):
+        incremental = self.snapshot()
+        rebuild_site_statistics()
+        self.assertEqual(incremental, self.snapshot())
+
+    def test_entry_changes_are_applied_incrementally(self):
+        self.assertEqual(SiteWordCount.objects.get(word='elma').count, 3)
+
+        second = Question.objects.create(question_text='Portakal', user=self.other)
+        Answer.objects.create(question=second, user=self.owner, answer_text='Portakal ve elma')
+        self.answer.answer_text = 'Sadece armut'
+        self.answer.save()
+        self.assertMatchesRebuild()
+
+        second.delete()
+        self.assertMatchesRebuild()
+        self.assertFalse(SiteWordCount.objects.filter(word='portakal', count__gt=0).exists())
+
+    def test_votes_and_saves_are_applied_incrementally(self):
+        answer_type = ContentType.objects.get_for_model(Answer)
+        vote = Vote.objects.create(user=self.owner, content_type=answer_type, object_id=self.answer.id, value=1)
+        SavedItem.objects.create(user=self.owner, content_type=answer_type, object_id=self.answer.id)
+        saved = SavedItem.objects.create(user=self.other, content_type=answer_type, object_id=self.answer.id)
+        self.assertMatchesRebuild()
+
+        vote.value = -1
+        vote.save()
+        saved.delete()
+        self.assertEqual(SiteStatistic.objects.get(key='dislikes').value, 1)
+        self.assertEqual(ContentSaveCount.objects.get(object_id=self.answer.id).count, 1)
+        self.assertMatchesRebuild()
+
+        vote.delete()
+        self.assertMatchesRebuild()
+
+    def test_built_flag_is_read_from_the_cache(self):
+        with self.assertNumQueries(2):
+            apply_vote_total_change(None, 1)
+        # Once seen, only the counter UPDATE runs.
+        with self.assertNumQueries(1):
+            apply_vote_total_change(1, None)
+
+    def test_changes_before_the_first_build_are_skipped(self):
+        SiteStatistic.objects.all().delete()
+        cache.clear()
+
+        self.assertFalse(apply_vote_total_change(None, 1))
+        rebuild_site_statistics()
+        self.assertTrue(apply_vote_total_change(None, 1))
+
+
+class VisitorDayRollupTests(TestCase):
+    def test_late_visits_of_recent_days_are_recounted(self):
+        today = now().date()
+        yesterday = today - timedelta(days=1)
+        DailyVisitor.objects.create(date=today - timedelta(days=5), visitor_hash='a' * 64)
+        DailyVisitor.objects.create(date=yesterday, visitor_hash='a' * 64)
+        self.assertEqual(roll_visitor_days(today), 2)
+
+        # The visit buffer writes yesterday's last visitors after the rollup.
+        DailyVisitor.objects.create(date=yesterday, visitor_hash='b' * 64)
+        VisitSession.objects.create(date=yesterday, visitor_hash='b' * 64)
+
+        self.assertEqual(roll_visitor_days(today), 1)
+        self.assertEqual(
+            DailyVisitorCount.objects.values_list('date', 'unique_visitors', 'visit_sessions').get(date=yesterday),
+            (yesterday, 2, 1),
+        )
+        self.assertEqual(roll_visitor_days(today), 0)
+
+
+class SiteStatisticsViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(username='stats-viewer', password='pass')
+        question = Question.objects.create(question_text='Gunes sistemi', user=self.user)
+        self.answer = Answer.objects.create(question=question, user=self.user, answer_text='Gunes bir yildizdir')
+        SavedItem.objects.create(
+            user=self.user,
+            content_type=ContentType.objects.get_for_model(Answer),
+            object_id=self.answer.id,
+        )
+        rebuild_site_statistics()
+        self.client.force_login(self.user)
+
+    def test_page_reads_rollups_instead_of_texts(self):
+        today = now().date()
+        DailyVisitor.objects.create(date=today - timedelta(days=2), visitor_hash='a' * 64)
+        DailyVisitor.objects.create(date=today - timedelta(days=2), visitor_hash='b' * 64)
+        DailyVisitor.objects.create(date=today, visitor_hash='c' * 64)
+        VisitSession.objects.create(date=today - timedelta(days=2), visitor_hash='a' * 64)
+        self.client.get(reverse('site_statistics'))
+
+        # Includes re-reading the rolled days of the trailing window.
+        with self.assertNumQueries(22) as context:
+            response = self.client.get(reverse('site_statistics'), {'search_word': 'gunes'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['search_word_count'], 2)
+        self.assertEqual(response.context['top_words'][0], ('gunes', 2))
+        self.assertEqual(response.context['visitor_chart_data']['values'], [2, 1])
+        self.assertEqual([item.save_count for item in response.context['top_saved_answers']], [1])
+        self.assertEqual(
+            DailyVisitorCount.objects.get(date=today - timedelta(days=2)).visit_sessions, 1
+        )
+        unbounded_text_reads = [
+            query['sql'] for query in context.captured_queries
+            if ('"answer_text"' in query['sql'] or '"question_text"' in query['sql'])
+            and 'LIMIT' not in query['sql'] and ' IN (' not in query['sql']
+        ]
+        self.assertEqual(unbounded_text_reads, [])
+
+    def test_page_does_not_build_missing_rollups(self):
+        SiteStatistic.objects.all().delete()
+        SiteWordCount.objects.all().delete()
+
+        response = self.client.get(reverse('site_statistics'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.context['statistics_built'])
+        self.assertEqual(response.context['total_answers'], 0)
+        self.assertContains(response, 'rebuild_site_statistics')
+        self.assertFalse(SiteStatistic.objects.exists())
+        self.assertFalse(SiteWordCount.objects.exists())
@@ -0,0 +1,102 @@
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from .models import Message, Notification, OnlineChatMessage, UserProfile
+from .unread_counters import COUNTER_TIMEOUT, LOCAL_COUNTER_TIMEOUT, counter_timeout, unread_status
+
+
+class UnreadCounterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        # The chat version is shared by everyone; do not leave it to other tests.
+        self.addCleanup(cache.clear)
+        self.viewer = User.objects.create_user(username='unread-viewer', password='pass')
+        self.sender = User.objects.create_user(username='unread-sender', password='pass')
+        UserProfile.objects.filter(user=self.viewer).update(
+            online_chat_last_read_at=timezone.now() - timedelta(minutes=5),
+        )
+
+    def notify(self):
+        return Notification.objects.create(
+            recipient=self.viewer,
+            sender=self.sender,
+            notification_type='system',
+            message='bildirim',
+        )
+
+    def test_counts_are_kept_in_the_cache_after_the_first_build(self):
+        self.assertEqual(unread_status(self.viewer), {
+            'notification_count': 0,
+            'message_count': 0,
+            'online_chat_count': 0,
+        })
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = self.notify()
+            Message.objects.create(sender=self.sender, recipient=self.viewer, body='mesaj')
+            OnlineChatMessage.objects.create(user=self.sender, body='sohbet')
+            OnlineChatMessage.objects.create(user=self.viewer, body='kendi mesajim')
+
+        # New chat messages cost one count; the other numbers were moved in the cache.
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_status(self.viewer), {
+                'notification_count': 1,
+                'message_count': 1,
+                'online_chat_count': 1,
+            })
+        with self.assertNumQueries(0):
+            self.assertEqual(unread_status(self.viewer)['online_chat_count'], 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification.mark_as_read()
+        self.client.force_login(self.viewer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.get(reverse('message_detail', args=[self.sender.username]))
+            self.client.get(reverse('online_chat_messages'), {'mark_read': '1'})
+
+        with self.assertNumQueries(1):
+            self.assertEqual(unread_status(self.viewer), {
+                'notification_count': 0,
+                'message_count': 0,
+                'online_chat_count': 0,
+            })
+        with self.assertNumQueries(0):
+            unread_status(self.viewer)
+
+    def test_counts_are_kept_briefly_without_a_shared_cache(self):
+        with override_settings(SHARED_CACHE=False):
+            self.assertEqual(counter_timeout(), LOCAL_COUNTER_TIMEOUT)
+        with override_settings(SHARED_CACHE=True):
+            self.assertEqual(counter_timeout(), COUNTER_TIMEOUT)
+
+    def test_deleted_unread_notifications_are_uncounted(self):
+        unread_status(self.viewer)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify()
+            extra = self.notify()
+        with self.captureOnCommitCallbacks(execute=True):
+            extra.delete()
+
+        self.assertEqual(unread_status(self.viewer)['notification_count'], 1)
+
+    @override_settings(NAVBAR_LONG_POLL_SECONDS=1)
+    def test_wait_returns_the_new_version_once_something_changes(self):
+        self.client.force_login(self.viewer)
+        first = self.client.get(reverse('navbar_status_wait')).json()
+        self.assertEqual(first['hold'], 1)
+
+        # Nothing changed: the request is held until the timeout.
+        unchanged = self.client.get(reverse('navbar_status_wait'), {'since': first['version']}).json()
+        self.assertEqual(unchanged['version'], first['version'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notify()
+        changed = self.client.get(reverse('navbar_status_wait'), {'since': first['version']}).json()
+
+        self.assertNotEqual(changed['version'], first['version'])
+        self.assertEqual(changed['notification_count'], 1)
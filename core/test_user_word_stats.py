@@ -0,0 +1,77 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Answer, Question, UserTextStats, UserWordCount
+from .user_word_stats import get_user_text_stats, rebuild_user_word_stats
+
+
+class UserWordStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='yazar', password='pass')
+        self.question = Question.objects.create(question_text='Elma ve armut', user=self.user)
+        self.answer = Answer.objects.create(
+            question=self.question,
+            user=self.user,
+            answer_text='Elma [kırmızı](https://ornek.com) olur (bkz: meyve) (k:3)',
+        )
+
+    def counts(self):
+        return dict(UserWordCount.objects.filter(user=self.user).values_list('word', 'count'))
+
+    def assertMatchesRebuild(self):
+        stats = UserTextStats.objects.get(user=self.user)
+        incremental = (self.counts(), stats.total_words, stats.total_chars, stats.total_entries)
+        rebuilt = rebuild_user_word_stats(self.user)
+        self.assertEqual(
+            incremental,
+            (self.counts(), rebuilt.total_words, rebuilt.total_chars, rebuilt.total_entries),
+        )
+
+    def test_rows_are_built_on_first_read(self):
+        stats = get_user_text_stats(self.user)
+
+        self.assertEqual(stats.total_entries, 1)
+        self.assertEqual(self.counts(), {'elma': 2, 've': 1, 'armut': 1, 'kırmızı': 1, 'olur': 1})
+
+    def test_edits_and_deletes_apply_only_the_difference(self):
+        get_user_text_stats(self.user)
+
+        self.answer.answer_text = 'Armut armut olur'
+        self.answer.save()
+        self.assertMatchesRebuild()
+
+        second = Answer.objects.create(question=self.question, user=self.user, answer_text='Yeni elma')
+        self.question.question_text = 'Sadece armut'
+        self.question.save()
+        self.assertMatchesRebuild()
+
+        second.delete()
+        self.assertMatchesRebuild()
+        self.assertNotIn('yeni', self.counts())
+
+    def test_vote_saves_do_not_touch_counts(self):
+        get_user_text_stats(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.answer.upvotes = 2
+            self.answer.save(update_fields=['upvotes'])
+
+        touched = ' '.join(query['sql'] for query in queries.captured_queries)
+        self.assertNotIn('core_userwordcount', touched)
+        self.assertNotIn('core_usertextstats', touched)
+
+    def test_profile_tab_reads_precomputed_words(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(
+            reverse('user_profile', args=[self.user.username]),
+            {'tab': 'kelimeler', 'exclude_word': 've', 'search_word': 'elma'},
+        )
+
+        self.assertEqual(response.context['top_words'][0], ('elma', 2))
+        self.assertNotIn('ve', dict(response.context['top_words']))
+        self.assertEqual(response.context['search_word_count'], 2)
+        self.assertEqual(response.context['total_entries'], 1)
@@ -0,0 +1,104 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+
+from .middleware import LastSeenMiddleware
+from .models import DailyVisitor, UserProfile, VisitSession
+from .visit_buffer import request_drain, visit_buffer
+
+
+@override_settings(VISIT_TRACKING_BUFFERED=True, VISIT_BUFFER_FLUSH_SECONDS=3600, VISIT_BUFFER_MAX_EVENTS=1000)
+class BufferedVisitTrackingTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        visit_buffer.flush()
+        self.factory = RequestFactory()
+        self.user = User.objects.create_user(username='buffered-visitor', password='pass')
+        self.middleware = LastSeenMiddleware(lambda request: HttpResponse('ok'))
+
+    def tearDown(self):
+        # Write leftovers inside the test transaction rather than at exit.
+        visit_buffer.flush()
+
+    def request(self, user=None, cookies=None):
+        request = self.factory.get(
+            '/',
+            HTTP_ACCEPT='text/html',
+            HTTP_USER_AGENT='Mozilla/5.0 Safari/605.1.15',
+            HTTP_SEC_FETCH_DEST='document',
+            REMOTE_ADDR='203.0.113.42',
+        )
+        request.user = user or self.user
+        request.COOKIES.update(cookies or {})
+        return request
+
+    def test_page_view_writes_nothing_until_flush(self):
+        with self.assertNumQueries(0):
+            response = self.middleware(self.request())
+
+        token = response.cookies[LastSeenMiddleware.VISIT_COOKIE_KEY].value
+        self.assertFalse(VisitSession.objects.exists())
+
+        self.assertEqual(visit_buffer.flush(), 3)
+        self.assertEqual(DailyVisitor.objects.count(), 1)
+        visit = VisitSession.objects.get()
+        self.assertEqual(str(visit.visit_token), token)
+        self.assertEqual(visit.user_id, self.user.id)
+        self.assertIsNotNone(UserProfile.objects.get(user=self.user).last_seen)
+
+    def test_active_visit_is_reused_from_cache(self):
+        first = self.middleware(self.request())
+        token = first.cookies[LastSeenMiddleware.VISIT_COOKIE_KEY].value
+        visit_buffer.flush()
+        cache.delete(f'visit-session:{token}:{self.user.id}')
+        cache.delete(f'last-seen:{self.user.id}')
+
+        with self.assertNumQueries(0):
+            second = self.middleware(self.request(cookies={LastSeenMiddleware.VISIT_COOKIE_KEY: token}))
+        self.assertNotIn(LastSeenMiddleware.VISIT_COOKIE_KEY, second.cookies)
+
+        visit_buffer.flush()
+        self.assertEqual(VisitSession.objects.count(), 1)
+
+    def test_visitor_hash_is_built_once_per_request(self):
+        with patch.object(
+            LastSeenMiddleware, '_build_daily_visitor_hash', wraps=LastSeenMiddleware._build_daily_visitor_hash
+        ) as build_hash:
+            self.middleware(self.request())
+
+        self.assertEqual(build_hash.call_count, 1)
+
+    def test_flush_is_triggered_by_event_count(self):
+        with self.settings(VISIT_BUFFER_MAX_EVENTS=3):
+            self.middleware(self.request())
+            # The request itself never writes; the flusher thread does.
+            self.assertFalse(VisitSession.objects.exists())
+            self.assertEqual(visit_buffer.flush_if_due(), 3)
+
+        self.assertEqual(VisitSession.objects.count(), 1)
+        self.assertEqual(visit_buffer.event_count, 0)
+
+    def test_drain_request_flushes_before_the_interval(self):
+        self.middleware(self.request())
+        self.assertEqual(visit_buffer.flush_if_due(), 0)
+
+        request_drain()
+
+        self.assertEqual(visit_buffer.flush_if_due(), 3)
+        self.assertEqual(VisitSession.objects.count(), 1)
+        self.middleware(self.request(user=User.objects.create_user(username='sonraki', password='pass')))
+        self.assertEqual(visit_buffer.flush_if_due(), 0)
+
+    def test_drain_command_writes_local_events(self):
+        self.middleware(self.request())
+        out = StringIO()
+
+        call_command('drain_visit_buffer', stdout=out)
+
+        self.assertIn('Wrote 3 local events', out.getvalue())
+        self.assertEqual(VisitSession.objects.count(), 1)
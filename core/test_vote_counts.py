@@ -0,0 +1,85 @@
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_save
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .models import Answer, AnswerFollow, Question, Vote
+from .vote_counts import reconcile_vote_counts
+
+
+class VoteCounterTests(TestCase):
+    def setUp(self):
+        self.author = User.objects.create_user(username='vote-author', password='pass')
+        self.voter = User.objects.create_user(username='vote-voter', password='pass')
+        self.question = Question.objects.create(question_text='Oy basligi', user=self.author)
+        self.answer = Answer.objects.create(question=self.question, user=self.author, answer_text='Oylanan yanit')
+        AnswerFollow.objects.create(user=self.voter, answer=self.answer)
+        self.client.force_login(self.voter)
+
+    def vote(self, obj, value):
+        response = self.client.post(reverse('vote'), {
+            'content_type': obj._meta.model_name,
+            'object_id': obj.id,
+            'value': value,
+        })
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_vote_moves_counters_without_saving_the_answer(self):
+        saves = []
+
+        def record_save(sender, instance, **kwargs):
+            saves.append(instance.pk)
+
+        post_save.connect(record_save, sender=Answer)
+        try:
+            self.assertEqual(self.vote(self.answer, 1), {'upvotes': 1, 'downvotes': 0, 'user_vote_value': 1})
+            self.assertEqual(self.vote(self.answer, -1), {'upvotes': 0, 'downvotes': 1, 'user_vote_value': -1})
+            self.assertEqual(self.vote(self.answer, -1), {'upvotes': 0, 'downvotes': 0, 'user_vote_value': 0})
+        finally:
+            post_save.disconnect(record_save, sender=Answer)
+
+        self.assertEqual(saves, [])
+        self.assertFalse(self.voter.notifications.filter(notification_type='answer_update').exists())
+
+    def test_vote_runs_no_count_queries(self):
+        with CaptureQueriesContext(connection) as context:
+            self.vote(self.question, 1)
+            self.vote(self.answer, -1)
+
+        queries = [query['sql'] for query in context.captured_queries]
+        vote_counts = [sql for sql in queries if 'COUNT(' in sql.upper() and '"core_vote"' in sql]
+        full_saves = [
+            sql for sql in queries
+            if sql.startswith('UPDATE') and ('"question_text"' in sql or '"answer_text"' in sql)
+        ]
+        self.assertEqual(vote_counts, [])
+        self.assertEqual(full_saves, [])
+        self.question.refresh_from_db()
+        self.assertEqual((self.question.upvotes, self.question.downvotes), (1, 0))
+
+    def test_reconcile_fixes_drift_in_one_pass(self):
+        answer_type = ContentType.objects.get_for_model(Answer)
+        Vote.objects.create(user=self.voter, content_type=answer_type, object_id=self.answer.id, value=1)
+        Vote.objects.create(user=self.author, content_type=answer_type, object_id=self.answer.id, value=-1)
+        Answer.objects.filter(pk=self.answer.pk).update(upvotes=7, downvotes=0)
+        Question.objects.filter(pk=self.question.pk).update(downvotes=3)
+
+        self.assertEqual(reconcile_vote_counts(dry_run=True), {'core.Question': 1, 'core.Answer': 1})
+        out = StringIO()
+        call_command('reconcile_vote_counts', stdout=out)
+
+        self.assertIn('Fixed 1 core.Answer rows.', out.getvalue())
+        self.assertEqual(
+            Answer.objects.values_list('upvotes', 'downvotes').get(pk=self.answer.pk), (1, 1)
+        )
+        self.assertEqual(
+            Question.objects.values_list('upvotes', 'downvotes').get(pk=self.question.pk), (0, 0)
+        )
+        self.assertEqual(reconcile_vote_counts(), {'core.Question': 0, 'core.Answer': 0})
@@ -12,6 +12,7 @@ from django.utils import timezone
 from core.content_limits import EDITOR_CONTENT_MAX_LENGTH
 from core.middleware import LastSeenMiddleware
 from core.models import Answer, Kenarda, Message, Notification, OnlineChatMessage, Question, UserProfile
+from core.question_activity import refresh_question_activity
 from core.querysets import get_today_questions_queryset
 from core.templatetags.custom_tags import bkz_link, safe_markdownify
 from core.views.attendance_views import _normalize_marks, _normalize_sheets
@@ -122,6 +123,28 @@ class MarkdownRenderingTests(SimpleTestCase):
         self.assertIn(r"$\text{(bkz: test)} + x$", rendered)
         self.assertNotIn("<a ", rendered)
 
+    def test_reused_engine_matches_django_markdownify(self):
+        from markdownify.templatetags.markdownify import markdownify
+
+        from core.markdown_engine import get_markdown_engine
+
+        engine = get_markdown_engine("default")
+        texts = [
+            "Dipnot[^1]\n\n[^1]: açıklama",
+            "*[HTML]: kısaltma\n\nHTML ve https://example.com",
+            "<script>alert(1)</script> **kalın**",
+        ]
+        for text in texts * 2:
+            self.assertEqual(engine.convert(text), str(markdownify(text, "default")))
+        self.assertIs(get_markdown_engine("default"), engine)
+
+    def test_heading_placeholders_restore_nested_hashtags_and_math(self):
+        rendered = str(safe_markdownify("== Başlık #etiket $x$\n\nMetin #diger"))
+
+        self.assertIn('<h2>Başlık <a href="/hashtag/etiket/" class="hashtag-link">#etiket</a> $x$</h2>', rendered)
+        self.assertIn('class="hashtag-link">#diger</a>', rendered)
+        self.assertNotIn("_END", rendered)
+
 
 class OnlineChatUnreadCountTests(TestCase):
     def test_unread_count_endpoint_returns_lightweight_payload(self):
@@ -310,6 +333,7 @@ class TodayQuestionsQuerysetTests(TestCase):
         question = Question.objects.create(question_text=text, user=self.user, **kwargs)
         if created_at is not None:
             Question.objects.filter(pk=question.pk).update(created_at=created_at)
+            refresh_question_activity([question.pk])
             question.refresh_from_db()
         return question
 
@@ -322,6 +346,7 @@ class TodayQuestionsQuerysetTests(TestCase):
         Answer.objects.create(question=recent_question, user=self.user, answer_text="İki")
         old_answer = Answer.objects.create(question=old_question, user=self.user, answer_text="Eski")
         Answer.objects.filter(pk=old_answer.pk).update(created_at=self.old_date)
+        refresh_question_activity([old_question.pk])
 
         questions = list(get_today_questions_queryset())
         question_map = {question.id: question for question in questions}
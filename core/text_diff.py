@@ -0,0 +1,136 @@
+"""
+Token diff used by the answer history and suggestion pages.
+
+`diff_opcodes` returns SequenceMatcher-style opcodes. Small inputs go
+straight to difflib, so their output stays what it has always been. Long
+inputs are split in three steps:
+
+1. The common prefix and suffix are trimmed.
+2. The rest is anchored on tokens that occur exactly once on both sides.
+   This is patience diff: an O(n log n) longest increasing subsequence.
+3. difflib runs only on the gaps between anchors that are small enough.
+
+A gap that is still too large is reported as one `replace`. Inputs beyond
+MAX_DIFF_TOKENS skip anchoring entirely. In both cases the result is
+marked `degraded`, so a 20k-word entry costs linear time instead of
+blocking a worker.
+"""
+
+from bisect import bisect_left
+from collections import Counter
+from difflib import SequenceMatcher
+
+
+# len(a) * len(b) up to which difflib is trusted to be quick.
+SEQUENCE_MATCHER_MAX_PRODUCT = 4_000_000
+MAX_DIFF_TOKENS = 200_000
+
+
+def _unique_anchors(a, alo, ahi, b, blo, bhi):
+    """Pairs (i, j) of tokens unique on both sides, in their longest common order."""
+    a_counts = Counter(a[alo:ahi])
+    b_counts = Counter(b[blo:bhi])
+    b_positions = {
+        b[j]: j
+        for j in range(blo, bhi)
+        if b_counts[b[j]] == 1 and a_counts[b[j]] == 1
+    }
+    candidates = [(i, b_positions[a[i]]) for i in range(alo, ahi) if a[i] in b_positions]
+
+    # Patience sorting: pile tops hold the smallest tail of each LIS length.
+    tops = []
+    top_index = []
+    previous = [None] * len(candidates)
+    for index, (_, j) in enumerate(candidates):
+        pile = bisect_left(tops, j)
+        if pile == len(tops):
+            tops.append(j)
+            top_index.append(index)
+        else:
+            tops[pile] = j
+            top_index[pile] = index
+        previous[index] = top_index[pile - 1] if pile else None
+
+    anchors = []
+    index = top_index[-1] if top_index else None
+    while index is not None:
+        anchors.append(candidates[index])
+        index = previous[index]
+    anchors.reverse()
+    return anchors
+
+
+def _append(opcodes, tag, i1, i2, j1, j2):
+    if i1 == i2 and j1 == j2:
+        return
+    if opcodes and opcodes[-1][0] == tag:
+        opcodes[-1] = (tag, opcodes[-1][1], i2, opcodes[-1][3], j2)
+    else:
+        opcodes.append((tag, i1, i2, j1, j2))
+
+
+def _change_tag(i1, i2, j1, j2):
+    if i1 == i2:
+        return 'insert'
+    if j1 == j2:
+        return 'delete'
+    return 'replace'
+
+
+def diff_opcodes(a, b):
+    """
+    Return `(opcodes, degraded)` for the token lists `a` and `b`.
+
+    `degraded` is True when part of the input was reported as a plain
+    replacement instead of being diffed token by token.
+    """
+    if len(a) * len(b) <= SEQUENCE_MATCHER_MAX_PRODUCT:
+        return SequenceMatcher(None, a, b).get_opcodes(), False
+
+    opcodes = []
+    degraded = False
+    anchor_gaps = len(a) <= MAX_DIFF_TOKENS and len(b) <= MAX_DIFF_TOKENS
+    # A stack of pending ranges keeps deep recursion out of Python frames.
+    stack = [('range', 0, len(a), 0, len(b))]
+    while stack:
+        kind, alo, ahi, blo, bhi = stack.pop()
+        if kind == 'equal':
+            _append(opcodes, 'equal', alo, ahi, blo, bhi)
+            continue
+
+        start_a, start_b = alo, blo
+        while alo < ahi and blo < bhi and a[alo] == b[blo]:
+            alo += 1
+            blo += 1
+        _append(opcodes, 'equal', start_a, alo, start_b, blo)
+
+        end_a, end_b = ahi, bhi
+        while ahi > alo and bhi > blo and a[ahi - 1] == b[bhi - 1]:
+            ahi -= 1
+            bhi -= 1
+        suffix = ('equal', ahi, end_a, bhi, end_b)
+
+        if (ahi - alo) * (bhi - blo) <= SEQUENCE_MATCHER_MAX_PRODUCT:
+            for tag, i1, i2, j1, j2 in SequenceMatcher(None, a[alo:ahi], b[blo:bhi]).get_opcodes():
+                _append(opcodes, tag, alo + i1, alo + i2, blo + j1, blo + j2)
+            stack.append(suffix)
+            continue
+
+        anchors = _unique_anchors(a, alo, ahi, b, blo, bhi) if anchor_gaps else []
+        if not anchors:
+            degraded = True
+            _append(opcodes, _change_tag(alo, ahi, blo, bhi), alo, ahi, blo, bhi)
+            stack.append(suffix)
+            continue
+
+        pending = []
+        previous_a, previous_b = alo, blo
+        for i, j in anchors:
+            pending.append(('range', previous_a, i, previous_b, j))
+            pending.append(('equal', i, i + 1, j, j + 1))
+            previous_a, previous_b = i + 1, j + 1
+        pending.append(('range', previous_a, ahi, previous_b, bhi))
+        pending.append(suffix)
+        stack.extend(reversed(pending))
+
+    return opcodes, degraded
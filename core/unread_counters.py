@@ -0,0 +1,180 @@
+"""
+Per-user unread counters for the navbar, kept in the cache.
+
+Each user has three cache keys: the unread notification count, the unread
+message count and the time they last read the online chat. Missing keys are
+built from the database on first use. After that, creating, reading or
+deleting rows only moves the cached numbers (`adjust_unread`,
+`mark_online_chat_read`), and a user's status is served from the cache.
+
+The chat is global, so its unread count is one indexed COUNT query. The
+result is cached per user together with the chat version and read time it
+was counted for; a new or deleted chat message bumps the chat version
+(`online_chat_changed`) and the next status counts again.
+
+Every change bumps a version: one per user, plus one for the chat.
+`wait_for_unread_change` holds a long-poll request until the combined
+version differs from the one the browser already has.
+
+The counts are only kept for a day when SHARED_CACHE is on. A per-process
+cache never sees what other workers (or the notification outbox) change, so
+there they expire after a few seconds and are counted again.
+"""
+
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Message, Notification, OnlineChatMessage, UserProfile
+
+
+COUNTER_TIMEOUT = 60 * 60 * 24
+LOCAL_COUNTER_TIMEOUT = 10
+WAIT_STEP_SECONDS = 1.0
+
+KINDS = ('notification_count', 'message_count')
+CHAT_VERSION_KEY = 'unread:online-chat-version'
+
+
+def counter_timeout():
+    return COUNTER_TIMEOUT if getattr(settings, 'SHARED_CACHE', False) else LOCAL_COUNTER_TIMEOUT
+
+
+def _key(user_id, name):
+    return f'unread:{user_id}:{name}'
+
+
+def _bump(key):
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Start from the clock so a version evicted from the cache does not
+        # come back with a number a waiting browser already has.
+        cache.set(key, int(time.time() * 1000), counter_timeout())
+
+
+def _chat_version(cached):
+    """The chat version from a `get_many` result, starting it from the clock if missing."""
+    version = cached.get(CHAT_VERSION_KEY)
+    if version is None:
+        cache.add(CHAT_VERSION_KEY, int(time.time() * 1000), counter_timeout())
+        version = cache.get(CHAT_VERSION_KEY)
+    return version
+
+
+def adjust_unread(user_id, kind, delta):
+    """Move one cached count of `user_id` by `delta` once the transaction commits."""
+    if not delta:
+        return
+
+    def apply():
+        key = _key(user_id, kind)
+        try:
+            cache.incr(key, delta)
+        except ValueError:
+            # Not built yet; the next read counts from the database.
+            pass
+        _bump(_key(user_id, 'version'))
+
+    transaction.on_commit(apply)
+
+
+def forget_unread_counts(user_ids):
+    """Drop the cached state of these users now; it is rebuilt on next read."""
+    user_ids = list(user_ids)
+    cache.delete_many([_key(user_id, name) for user_id in user_ids for name in (*KINDS, 'chat_read_at', 'online_chat_count')])
+    for user_id in user_ids:
+        _bump(_key(user_id, 'version'))
+
+
+def mark_online_chat_read(user_id, read_at):
+    def apply():
+        cache.set(_key(user_id, 'chat_read_at'), read_at.timestamp(), counter_timeout())
+        _bump(_key(user_id, 'version'))
+
+    transaction.on_commit(apply)
+
+
+def online_chat_changed():
+    """A chat message was posted or deleted; every cached chat count is stale."""
+    transaction.on_commit(lambda: _bump(CHAT_VERSION_KEY))
+
+
+def _online_chat_count(user, read_at, chat_version, cached):
+    """`cached` is the stored `(chat_version, read_at, count)` of `user`, if any."""
+    if cached is not None and chat_version is not None and cached[:2] == (chat_version, read_at):
+        return cached[2]
+    count = (
+        OnlineChatMessage.objects
+        .filter(created_at__gt=datetime.fromtimestamp(read_at, tz=dt_timezone.utc))
+        .exclude(user_id=user.id)
+        .count()
+    )
+    if chat_version is not None:
+        cache.set(_key(user.id, 'online_chat_count'), (chat_version, read_at, count), counter_timeout())
+    return count
+
+
+def _chat_read_at(user):
+    profile, _ = UserProfile.objects.get_or_create(user=user)
+    read_at = profile.online_chat_last_read_at
+    if not read_at:
+        read_at = timezone.now()
+        UserProfile.objects.filter(pk=profile.pk).update(online_chat_last_read_at=read_at)
+    return read_at.timestamp()
+
+
+def _build(user, name):
+    if name == 'notification_count':
+        return Notification.objects.filter(recipient=user, is_read=False).count()
+    if name == 'message_count':
+        return Message.objects.filter(recipient=user, is_read=False).count()
+    return _chat_read_at(user)
+
+
+def unread_status(user):
+    """Return the navbar counts of `user`; touches the database only for missing keys."""
+    names = (*KINDS, 'chat_read_at')
+    keys = {name: _key(user.id, name) for name in names}
+    count_key = _key(user.id, 'online_chat_count')
+    cached = cache.get_many([*keys.values(), count_key, CHAT_VERSION_KEY])
+    values = {}
+    for name, key in keys.items():
+        if key in cached:
+            values[name] = cached[key]
+        else:
+            values[name] = _build(user, name)
+            cache.set(key, values[name], counter_timeout())
+
+    chat_version = _chat_version(cached)
+    return {
+        'notification_count': max(values['notification_count'], 0),
+        'message_count': max(values['message_count'], 0),
+        'online_chat_count': _online_chat_count(user, values['chat_read_at'], chat_version, cached.get(count_key)),
+    }
+
+
+def unread_version(user_id):
+    versions = cache.get_many([_key(user_id, 'version'), CHAT_VERSION_KEY])
+    return f"{versions.get(_key(user_id, 'version'), 0)}.{_chat_version(versions)}"
+
+
+def long_poll_seconds():
+    return max(getattr(settings, 'NAVBAR_LONG_POLL_SECONDS', 0), 0)
+
+
+def wait_for_unread_change(user_id, since, timeout):
+    """Block until the version of `user_id` differs from `since` or `timeout` passes."""
+    deadline = time.monotonic() + timeout
+    version = unread_version(user_id)
+    while since and version == since:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        time.sleep(min(WAIT_STEP_SECONDS, remaining))
+        version = unread_version(user_id)
+    return version
@@ -13,21 +13,21 @@ from .views.delphoi_views import delphoi_home, delphoi_result
 from .views.ethics_views import ethics_atlas
 from .views.error_views import custom_400_view, custom_403_view, custom_404_view, custom_500_view, custom_502_view, debug_show_400, debug_show_403, debug_show_404, debug_show_500, debug_show_502
 from .views.entry_book_views import entry_book_add_entry, entry_book_detail, entry_books
-from .views.export_views import download_entries_docx, download_entries_json, download_entries_paper, download_entries_pdf, download_entries_xlsx, filter_answers
+from .views.export_views import download_entries_docx, download_entries_json, download_entries_paper, download_entries_pdf, download_entries_xlsx, export_job_download, export_job_status, filter_answers
 from .views.german_views import german_course_home, german_lesson_detail, german_level_test
 from .views.hashtag_views import all_hashtags, hashtag_view, search_hashtags, trending_hashtags
 from .views.iat_views import game_of_life, iat_result, iat_result_page, iat_start, iat_test
 from .views.kenarda_views import kenarda_gonder, kenarda_list, kenarda_preview, kenarda_save, kenarda_sil
 from .views.library_views import file_library, file_library_delete, file_library_list, file_library_search, upload_editor_image
 from .views.message_views import check_new_messages, message_detail, message_list, send_message_from_answer, send_message_from_user
-from .views.navbar_views import navbar_status
+from .views.navbar_views import navbar_status, navbar_status_wait
 from .views.notification_views import follow_answer, follow_question, get_unread_notification_count, mark_all_notifications_read, mark_notification_read, notification_list, unfollow_answer, unfollow_question
-from .views.online_chat_views import online_chat_messages, online_chat_unread_count
+from .views.online_chat_views import online_chat_messages, online_chat_stream, online_chat_unread_count
 from .views.poll_views import create_poll, delete_poll, edit_poll, poll_detail, poll_popover_content, poll_question_redirect, polls_home, vote_poll, vote_poll_ajax
 from .views.question_map_views import map_data_view, question_map, question_schema, question_schema_children, question_schema_content, question_schema_search
 from .views.question_link_views import add_existing_subquestion, admin_merge_question, search_questions_for_linking, search_questions_for_merging, unlink_from_parent
 from .views.question_page_views import add_question, add_question_from_search, add_starting_question, add_subquestion, bkz_view, delete_question, question_detail
-from .views.radio_views import create_program, delete_program, dj_dashboard, edit_program, get_agora_token, program_detail, radio_chat_messages, radio_home, start_broadcast, stop_broadcast, update_listener_count
+from .views.radio_views import create_program, delete_program, dj_dashboard, edit_program, get_agora_token, program_detail, radio_chat_messages, radio_chat_stream, radio_home, start_broadcast, stop_broadcast, update_listener_count
 from .views.random_sentence_views import add_random_sentence, get_random_sentence, ignore_random_sentence, vote_random_sentence
 from .views.report_views import report_content, report_content_ajax
 from .views.search_views import load_more_questions, load_more_search_results, reference_search, search, search_suggestions, user_search
@@ -95,8 +95,10 @@ urlpatterns = [
     path('send_message/answer/<int:answer_id>/', send_message_from_answer, name='send_message_from_answer'),
     path('check_new_messages/', check_new_messages, name='check_new_messages'),
     path('navbar/status/', navbar_status, name='navbar_status'),
+    path('navbar/status/wait/', navbar_status_wait, name='navbar_status_wait'),
     path('send_message/user/<int:user_id>/', send_message_from_user, name='send_message_from_user'),
     path('online-chat/messages/', online_chat_messages, name='online_chat_messages'),
+    path('online-chat/stream/', online_chat_stream, name='online_chat_stream'),
     path('online-chat/unread-count/', online_chat_unread_count, name='online_chat_unread_count'),
 
     # Arama
@@ -181,6 +183,8 @@ urlpatterns = [
     path('profile/<str:username>/download_entries_docx/', download_entries_docx, name='download_entries_docx'),
     path('profile/<str:username>/download_entries_paper/', download_entries_paper, name='download_entries_paper'),
     path('profile/<str:username>/download_entries_pdf/', download_entries_pdf, name='download_entries_pdf'),
+    path('exports/<int:job_id>/', export_job_status, name='export_job_status'),
+    path('exports/<int:job_id>/download/', export_job_download, name='export_job_download'),
     path('question/<int:question_id>/filter_answers/', filter_answers, name='filter_answers'),
 
     # Aramalar
@@ -263,6 +267,7 @@ urlpatterns = [
     path('radio/token/<int:program_id>/', get_agora_token, name='get_agora_token'),
     path('radio/listener-count/<int:program_id>/', update_listener_count, name='update_listener_count'),
     path('radio/chat/<int:program_id>/', radio_chat_messages, name='radio_chat_messages'),
+    path('radio/chat/<int:program_id>/stream/', radio_chat_stream, name='radio_chat_stream'),
 
     # SLUG-BASED QUESTION URLS (EN SONDA OLMALI - catch-all)
     # Örnek: /ozgurluk-nedir/ veya /yapılacaklar/ -> question detail
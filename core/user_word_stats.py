@@ -0,0 +1,163 @@
+"""
+Per-user word counts and text totals for the profile statistics tab.
+
+Counts are kept in UserWordCount/UserTextStats and patched with the word
+difference between the old and new text whenever a question or answer is
+saved or deleted. A user's rows are built from scratch the first time the tab
+is opened (or by `rebuild_user_word_stats`); until then changes are skipped.
+"""
+
+import re
+from collections import Counter
+
+from django.db import transaction
+
+from .models import Answer, Question, UserTextStats, UserWordCount
+
+
+WORD_MAX_LENGTH = 255
+
+_MARKDOWN_LINK_RE = re.compile(r'\[([^\]]+)\]\([^\)]+\)')
+_CITATION_RE = re.compile(r'\((?:kaynak|k):\d+(?:(?:,\s*sayfa:[^\)]+)|(?:\s*s:[^\)]+))?\)')
+_FOOTNOTE_RE = re.compile(r'\[\^[^\]]+\]')
+_NUMBERED_REFERENCE_RE = re.compile(r'\[\d+\]')
+_BKZ_RE = re.compile(r'\(bkz:\s*[^\)]+\)')
+_DEF_RE = re.compile(r'\(def:\s*[^\)]+\)')
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+_WORD_RE = re.compile(r'\b\w+\b')
+
+
+def clean_text_for_word_count(text):
+    """Strip markdown links, citations, references and HTML before counting."""
+    if not text:
+        return ''
+    # Markdown links keep their text and must go first.
+    text = _MARKDOWN_LINK_RE.sub(r'\1', text)
+    text = _CITATION_RE.sub('', text)
+    text = _FOOTNOTE_RE.sub('', text)
+    text = _NUMBERED_REFERENCE_RE.sub('', text)
+    text = _BKZ_RE.sub('', text)
+    text = _DEF_RE.sub('', text)
+    text = _HTML_TAG_RE.sub('', text)
+    return text
+
+
+def text_word_stats(text):
+    """Return `(word Counter, word total, non-space character total)` for one entry."""
+    cleaned = clean_text_for_word_count(text)
+    if not cleaned:
+        return Counter(), 0, 0
+    words = Counter(
+        word for word in _WORD_RE.findall(cleaned.lower())
+        if len(word) <= WORD_MAX_LENGTH
+    )
+    return words, len(_WORD_RE.findall(cleaned)), len(cleaned.replace(' ', ''))
+
+
+def _apply_word_delta(user_id, delta):
+    delta = {word: change for word, change in delta.items() if change}
+    if not delta:
+        return
+    rows = {
+        row.word: row
+        for row in UserWordCount.objects.select_for_update().filter(user_id=user_id, word__in=delta)
+    }
+    to_create, to_update, to_delete = [], [], []
+    for word, change in delta.items():
+        row = rows.get(word)
+        if row is None:
+            if change > 0:
+                to_create.append(UserWordCount(user_id=user_id, word=word, count=change))
+            continue
+        row.count = max(0, row.count + change)
+        (to_update if row.count else to_delete).append(row)
+
+    if to_create:
+        UserWordCount.objects.bulk_create(to_create, batch_size=500)
+    if to_update:
+        UserWordCount.objects.bulk_update(to_update, ['count'], batch_size=500)
+    if to_delete:
+        UserWordCount.objects.filter(id__in=[row.id for row in to_delete]).delete()
+
+
+def apply_text_change(user_id, old_text, new_text, *, entry_delta=0):
+    """Move a user's counts from `old_text` to `new_text`."""
+    if old_text == new_text and not entry_delta:
+        return False
+    with transaction.atomic():
+        stats = UserTextStats.objects.select_for_update().filter(user_id=user_id).first()
+        if stats is None:
+            return False
+        old_words, old_word_total, old_char_total = text_word_stats(old_text)
+        new_words, new_word_total, new_char_total = text_word_stats(new_text)
+        delta = Counter(new_words)
+        delta.subtract(old_words)
+        _apply_word_delta(user_id, delta)
+
+        stats.total_words = max(0, stats.total_words + new_word_total - old_word_total)
+        stats.total_chars = max(0, stats.total_chars + new_char_total - old_char_total)
+        stats.total_entries = max(0, stats.total_entries + entry_delta)
+        stats.save(update_fields=['total_words', 'total_chars', 'total_entries', 'updated_at'])
+    return True
+
+
+def rebuild_user_word_stats(user):
+    """Recount every question and answer of `user`."""
+    word_counts = Counter()
+    total_words = 0
+    total_chars = 0
+    total_entries = 0
+    texts = [
+        (False, Question.objects.filter(user=user).values_list('question_text', flat=True)),
+        (True, Answer.objects.filter(user=user).values_list('answer_text', flat=True)),
+    ]
+    for is_entry, queryset in texts:
+        for text in queryset.iterator(chunk_size=500):
+            if not text:
+                continue
+            words, word_total, char_total = text_word_stats(text)
+            word_counts.update(words)
+            total_words += word_total
+            total_chars += char_total
+            # Entry = Answer (yanıt). Sorular sadece başlık, ayrı entry değil.
+            total_entries += int(is_entry)
+
+    with transaction.atomic():
+        UserWordCount.objects.filter(user=user).delete()
+        UserWordCount.objects.bulk_create(
+            [UserWordCount(user=user, word=word, count=count) for word, count in word_counts.items()],
+            batch_size=500,
+        )
+        stats, _ = UserTextStats.objects.update_or_create(
+            user=user,
+            defaults={
+                'total_words': total_words,
+                'total_chars': total_chars,
+                'total_entries': total_entries,
+            },
+        )
+    return stats
+
+
+def get_user_text_stats(user):
+    stats = UserTextStats.objects.filter(user=user).first()
+    if stats is None:
+        stats = rebuild_user_word_stats(user)
+    return stats
+
+
+def top_user_words(user, exclude_words=(), limit=20):
+    return list(
+        UserWordCount.objects.filter(user=user)
+        .exclude(word__in=list(exclude_words))
+        .order_by('-count', 'word')
+        .values_list('word', 'count')[:limit]
+    )
+
+
+def user_word_count(user, word):
+    return (
+        UserWordCount.objects.filter(user=user, word=word)
+        .values_list('count', flat=True)
+        .first()
+    ) or 0
@@ -4,17 +4,25 @@ Utility functions for mention, hashtag processing and pagination
 import re
 from collections import Counter
 from django.contrib.auth.models import User
-from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Q
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from .models import Notification, Hashtag, HashtagUsage, Answer
+from .cursor_pagination import CursorPaginator
+from .models import Hashtag, HashtagUsage, Answer, AnswerReferenceCitation
 
 REFERENCE_CITATION_PATTERN = re.compile(
     r'\((?:kaynak|k)\s*:\s*(?P<reference_id>\d+)'
     r'(?:(?:\s*,?\s*(?:sayfa|s)\s*:\s*(?P<page>[^)]+)))?\)',
     re.IGNORECASE,
 )
-REFERENCE_USAGE_CACHE_KEY = 'reference_usage_counts_all'
-REFERENCE_USAGE_CACHE_TTL = 300
+REFERENCE_CITATION_PAGE_MAX_LENGTH = 255
+# Largest BigAutoField value; bigger ids typed into a text match no row and
+# overflow the database driver.
+MAX_OBJECT_ID = 2 ** 63 - 1
+
+
+def is_storable_id(value):
+    return 0 <= value <= MAX_OBJECT_ID
 
 
 def paginate_queryset(queryset, request, page_param='page', per_page=20):
@@ -43,34 +51,64 @@ def paginate_queryset(queryset, request, page_param='page', per_page=20):
     return page_obj
 
 
-def extract_mentions(text):
+def paginate_queryset_by_cursor(queryset, request, ordering, cursor_param='cursor', per_page=20):
     """
-    Extract all @mentions from text
-    Returns list of usernames (without @)
-    Supports multi-word usernames by checking database
+    Keyset counterpart of paginate_queryset: no COUNT(*), no OFFSET.
+
+    Args:
+        queryset: QuerySet to paginate
+        request: HTTP request object
+        ordering: order_by names ending in a unique column, e.g. ('-created_at', '-id')
+        cursor_param: GET parameter holding the opaque cursor (default: 'cursor')
+        per_page: Number of items per page (default: 20)
+
+    Returns:
+        CursorPage; an unknown or stale cursor yields the first page
     """
-    # Pattern: @ ile başlayan ve sonrasında max 50 karakter (boşluk dahil)
-    pattern = r'@([A-Za-z0-9_.\\-ğüşöçıİĞÜŞÖÇ ]{1,50})'
+    paginator = CursorPaginator(queryset, ordering, per_page, cursor_param=cursor_param)
+    return paginator.page(request.GET.get(cursor_param))
 
-    found_usernames = []
-    matches = re.finditer(pattern, text)
 
-    for match in matches:
-        candidate = match.group(1).strip()
-        words = candidate.split()
+MENTION_PATTERN = re.compile(r'@([A-Za-z0-9_.\\-ğüşöçıİĞÜŞÖÇ ]{1,50})')
+MENTION_MAX_WORDS = 3
 
-        # Try from longest match to shortest (max 3 words)
-        for i in range(min(len(words), 3), 0, -1):
-            username = ' '.join(words[:i])
-            try:
-                # Check if user exists in database
-                User.objects.get(username__iexact=username)
-                found_usernames.append(username)
-                break  # Found valid username, stop checking shorter versions
-            except User.DoesNotExist:
-                continue
 
-    return list(set(found_usernames))  # Remove duplicates
+def find_mentioned_users(text):
+    """
+    Resolve @mentions in text to users with a single query
+    Multi-word usernames match longest first (max 3 words)
+    """
+    candidates = []
+    for match in MENTION_PATTERN.finditer(text or ''):
+        words = match.group(1).strip().split()
+        candidates.append([' '.join(words[:i]) for i in range(min(len(words), MENTION_MAX_WORDS), 0, -1)])
+
+    names = {name for prefixes in candidates for name in prefixes}
+    if not names:
+        return []
+
+    lookup = Q()
+    for name in names:
+        lookup |= Q(username__iexact=name)
+    users = {user.username.lower(): user for user in User.objects.filter(lookup).only('id', 'username')}
+
+    found = {}
+    for prefixes in candidates:
+        for name in prefixes:
+            user = users.get(name.lower())
+            if user is not None:
+                found[user.id] = user
+                break
+    return list(found.values())
+
+
+def extract_mentions(text):
+    """
+    Extract all @mentions from text
+    Returns list of usernames (without @)
+    Supports multi-word usernames by checking database
+    """
+    return [user.username for user in find_mentioned_users(text)]
 
 
 def extract_hashtags(text):
@@ -87,32 +125,6 @@ def extract_hashtags(text):
     return list(set([h.lower() for h in hashtags]))  # Lowercase and remove duplicates
 
 
-def send_mention_notifications(answer, mentioned_usernames):
-    """
-    Send mention notifications to users
-    Creates Notification objects for each mentioned user
-    """
-    author = answer.user
-
-    for username in mentioned_usernames:
-        try:
-            mentioned_user = User.objects.get(username=username)
-
-            # Don't send notification if user mentions themselves
-            if mentioned_user == author:
-                continue
-
-            # Create mention notification
-            Notification.create_mention_notification(
-                recipient=mentioned_user,
-                sender=author,
-                answer=answer
-            )
-        except User.DoesNotExist:
-            # User doesn't exist, skip
-            continue
-
-
 def process_hashtags(answer=None, question=None):
     """
     Process hashtags in answer or question text
@@ -183,35 +195,30 @@ def link_hashtags_in_text(text):
 
 def build_reference_usage_counts(answer_texts=None, reference_ids=None, use_cache=True):
     """
-    Build usage counts for references by scanning citation markers in answer texts.
+    Build usage counts for references.
 
     Notes:
-    - If answer_texts is None, counts are calculated from all answers.
+    - If answer_texts is None, counts come from the AnswerReferenceCitation
+      table (one GROUP BY query); `use_cache` is kept for older callers.
     - Optional `reference_ids` limits the returned counter to those IDs.
-    - Uses cache for global counts to avoid re-scanning all answers on each request.
+    - With answer_texts, the given texts are scanned for citation markers.
     """
     requested_ids = set(reference_ids) if reference_ids is not None else None
 
-    # Global mode: use/cache full counts from DB answers
     if answer_texts is None:
-        cached_counts = cache.get(REFERENCE_USAGE_CACHE_KEY) if use_cache else None
-        if cached_counts is None:
-            counts = Counter()
-            for text in Answer.objects.values_list('answer_text', flat=True).iterator():
-                if not text:
-                    continue
-                for match in REFERENCE_CITATION_PATTERN.finditer(text):
-                    counts[int(match.group(1))] += 1
-            if use_cache:
-                cache.set(REFERENCE_USAGE_CACHE_KEY, dict(counts), REFERENCE_USAGE_CACHE_TTL)
-        else:
-            counts = Counter(cached_counts)
-
+        citations = AnswerReferenceCitation.objects.all()
+        if requested_ids is not None:
+            if not requested_ids:
+                return Counter()
+            citations = citations.filter(reference_id__in=requested_ids)
+        counts = Counter(dict(
+            citations.order_by().values('reference_id').annotate(total=Count('id')).values_list('reference_id', 'total')
+        ))
         if requested_ids is None:
             return counts
         return Counter({rid: counts.get(rid, 0) for rid in requested_ids})
 
-    # Custom iterable mode: no global cache
+    # Custom iterable mode
     counts = Counter()
     for text in answer_texts:
         if not text:
@@ -223,12 +230,37 @@ def build_reference_usage_counts(answer_texts=None, reference_ids=None, use_cach
     return counts
 
 
+def sync_answer_reference_citations(answer):
+    """Rewrite the answer's citation rows if its text cites something else now."""
+    citations = [
+        (citation['reference_id'], citation['page'][:REFERENCE_CITATION_PAGE_MAX_LENGTH])
+        for citation in extract_reference_citations(answer.answer_text)
+    ]
+    existing = list(
+        AnswerReferenceCitation.objects.filter(answer_id=answer.id)
+        .order_by('position')
+        .values_list('reference_id', 'page')
+    )
+    if existing == citations:
+        return False
+
+    with transaction.atomic():
+        AnswerReferenceCitation.objects.filter(answer_id=answer.id).delete()
+        AnswerReferenceCitation.objects.bulk_create([
+            AnswerReferenceCitation(answer_id=answer.id, reference_id=reference_id, page=page, position=position)
+            for position, (reference_id, page) in enumerate(citations)
+        ])
+    return True
+
+
 def extract_reference_citations(text, reference_id=None):
     """Return citation IDs and optional page values found in an answer."""
     expected_id = int(reference_id) if reference_id is not None else None
     citations = []
     for match in REFERENCE_CITATION_PATTERN.finditer(text or ''):
         matched_id = int(match.group('reference_id'))
+        if not is_storable_id(matched_id):
+            continue
         if expected_id is not None and matched_id != expected_id:
             continue
         citations.append({
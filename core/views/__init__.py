@@ -82,6 +82,8 @@ _ATTR_TO_MODULE = {
     'edit_poll': 'core.views.poll_views',
     'edit_program': 'core.views.radio_views',
     'edit_reference': 'core.views.definition_reference_views',
+    'export_job_download': 'core.views.export_views',
+    'export_job_status': 'core.views.export_views',
     'file_library': 'core.views.library_views',
     'file_library_delete': 'core.views.library_views',
     'file_library_list': 'core.views.library_views',
@@ -136,8 +138,10 @@ _ATTR_TO_MODULE = {
     'message_detail': 'core.views.message_views',
     'message_list': 'core.views.message_views',
     'navbar_status': 'core.views.navbar_views',
+    'navbar_status_wait': 'core.views.navbar_views',
     'notification_list': 'core.views.notification_views',
     'online_chat_messages': 'core.views.online_chat_views',
+    'online_chat_stream': 'core.views.online_chat_views',
     'pin_entry': 'core.views.vote_save_views',
     'poll_detail': 'core.views.poll_views',
     'poll_popover_content': 'core.views.poll_views',
@@ -152,6 +156,7 @@ _ATTR_TO_MODULE = {
     'question_schema_content': 'core.views.question_views',
     'question_schema_search': 'core.views.question_views',
     'radio_chat_messages': 'core.views.radio_views',
+    'radio_chat_stream': 'core.views.radio_views',
     'radio_home': 'core.views.radio_views',
     'random_question_id': 'core.views.site_views',
     'reference_search': 'core.views.search_views',
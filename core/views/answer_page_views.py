@@ -8,7 +8,6 @@ from urllib.parse import unquote
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.contenttypes.models import ContentType
-from django.core.cache import cache
 from django.db.models import Count, F, Max, Q
 from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
@@ -18,9 +17,8 @@ from ..answer_git import (
     attach_answer_revision_metadata,
     create_answer_revision,
     ensure_initial_revision,
-    render_answer_content_html,
 )
-from ..content_link_preload import preload_content_links
+from ..answer_render_store import attach_rendered_answer_html
 from ..forms import AnswerForm
 from ..models import (
     Answer,
@@ -34,13 +32,10 @@ from ..models import (
     UserProfile,
     Vote,
 )
-from ..querysets import get_active_left_frame_pin_q, get_today_questions_queryset
+from ..notification_outbox import enqueue_answer_event
+from ..querysets import TODAY_QUESTIONS_ORDERING, get_active_left_frame_pin_q, get_today_questions_queryset
 from ..services import VoteSaveService
-from ..utils import paginate_queryset
-
-
-EXPANDED_ANSWER_CACHE_SECONDS = 600
-EXPANDED_ANSWER_CACHE_VERSION = '1'
+from ..utils import paginate_queryset_by_cursor
 
 
 @require_GET
@@ -49,25 +44,14 @@ def expanded_answer_content(request, answer_id):
         Answer.objects.only('answer_text', 'updated_at'),
         id=answer_id,
     )
-    updated_token = answer.updated_at.strftime('%Y%m%d%H%M%S%f')
-    cache_key = (
-        f'expanded-answer-html:{EXPANDED_ANSWER_CACHE_VERSION}:'
-        f'{answer.id}:{updated_token}'
-    )
-    rendered_html = cache.get(cache_key)
-    if rendered_html is None:
-        with preload_content_links([answer.answer_text]):
-            rendered_html = render_answer_content_html(answer.answer_text)
-        cache.set(cache_key, rendered_html, EXPANDED_ANSWER_CACHE_SECONDS)
-
-    return JsonResponse({'html': str(rendered_html)})
+    attach_rendered_answer_html([answer])
+    return JsonResponse({'html': str(answer.rendered_html)})
 
 
 @login_required
 def add_answer(request, slug):
     from django.db import transaction
     from ..models import Definition
-    from ..utils import extract_mentions, send_mention_notifications
 
     question = get_object_or_404(Question, slug=slug)
 
@@ -91,10 +75,6 @@ def add_answer(request, slug):
                         answer=None
                     )
 
-            mentioned_usernames = extract_mentions(answer.answer_text)
-            if mentioned_usernames:
-                send_mention_notifications(answer, mentioned_usernames)
-
             Kenarda.objects.filter(user=request.user, question=question, is_sent=False).delete()
             return redirect('single_answer', slug=question.slug, answer_id=answer.id)
     else:
@@ -108,8 +88,6 @@ def add_answer(request, slug):
 
 @login_required
 def edit_answer(request, answer_id):
-    from ..utils import extract_mentions, send_mention_notifications
-
     all_questions = get_today_questions_queryset()
     answer = get_object_or_404(Answer, id=answer_id, user=request.user)
     user_child_ids = QuestionRelationship.objects.filter(
@@ -148,9 +126,7 @@ def edit_answer(request, answer_id):
             if created:
                 updated_answer = revision.answer
 
-            mentioned_usernames = extract_mentions(updated_answer.answer_text)
-            if mentioned_usernames:
-                send_mention_notifications(updated_answer, mentioned_usernames)
+            enqueue_answer_event(updated_answer, 'answer_mentions')
 
             if draft_id:
                 try:
@@ -215,7 +191,7 @@ def single_answer(request, slug, answer_id):
         except UserProfile.DoesNotExist:
             all_questions_qs = Question.objects.none()
 
-    all_questions_page = paginate_queryset(all_questions_qs, request, 'q_page', 20)
+    all_questions_page = paginate_queryset_by_cursor(all_questions_qs, request, TODAY_QUESTIONS_ORDERING, 'q_page', 20)
 
     all_answers = list(
         Answer.objects.filter(question=question).select_related('user', 'question', 'question__user')
@@ -229,6 +205,7 @@ def single_answer(request, slug, answer_id):
             question=question,
         )
         attach_answer_revision_metadata([focused_answer], current_user=request.user)
+    attach_rendered_answer_html(all_answers + [focused_answer])
 
     focused_current_revision = focused_answer.current_revision
     focused_recent_revisions = list(
@@ -9,7 +9,9 @@ from django.http import JsonResponse
 from django.shortcuts import get_object_or_404
 from django.urls import reverse
 
+from ..cursor_pagination import CursorPaginator
 from ..models import Answer, QuestionRelationship, StartingQuestion
+from ..question_tree import descendant_ids
 
 
 def _positive_int(value, default, maximum=None):
@@ -26,23 +28,7 @@ def _positive_int(value, default, maximum=None):
 
 
 def get_all_descendant_question_ids(root_question_id, user):
-    descendant_ids = set()
-    to_process = [root_question_id]
-
-    while to_process:
-        current_id = to_process.pop()
-        descendant_ids.add(current_id)
-
-        child_relationships = QuestionRelationship.objects.filter(
-            parent_id=current_id,
-            user=user
-        ).values_list('child_id', flat=True)
-
-        for child_id in child_relationships:
-            if child_id not in descendant_ids:
-                to_process.append(child_id)
-
-    return list(descendant_ids)
+    return list(descendant_ids(root_question_id, user))
 
 
 def serialize_answer_for_selector(answer):
@@ -76,7 +62,7 @@ def get_user_answers(request):
 
     user = get_object_or_404(User, username=username) if username else request.user
 
-    answers = Answer.objects.filter(user=user).select_related('question').order_by('created_at')
+    answers = Answer.objects.filter(user=user).select_related('question')
 
     if root_question_id:
         try:
@@ -98,12 +84,26 @@ def get_user_answers(request):
                 default=Value(4),
                 output_field=IntegerField(),
             )
-        ).order_by(
-            'search_rank',
-            'created_at',
-            'id',
         )
-
+        ordering = ('search_rank', 'created_at', 'id')
+    else:
+        ordering = ('created_at', 'id')
+
+    if 'cursor' in request.GET:
+        # Keyset mode: the total is only counted for the first batch.
+        cursor = request.GET.get('cursor', '').strip()
+        cursor_page = CursorPaginator(answers, ordering, page_size).page(cursor)
+        payload = {
+            'answers': [serialize_answer_for_selector(answer) for answer in cursor_page],
+            'page_size': page_size,
+            'has_more': cursor_page.has_next(),
+            'next_cursor': cursor_page.next_cursor,
+        }
+        if not cursor:
+            payload['total'] = answers.count()
+        return JsonResponse(payload)
+
+    answers = answers.order_by(*ordering)
     total = answers.count()
     start = (page - 1) * page_size
     end = start + page_size
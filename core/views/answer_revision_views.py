@@ -13,13 +13,12 @@ from django.shortcuts import get_object_or_404, redirect, render
 from django.template.loader import render_to_string
 from django.views.decorators.http import require_POST
 
+from ..answer_diff_store import attach_suggestion_diffs, load_answer_diff
 from ..answer_git import (
     accept_answer_suggestion,
     approve_revision_review,
-    build_answer_inline_diff_html,
     create_answer_suggestion,
     ensure_initial_revision,
-    get_answer_diff_stats,
     get_revision_approval_summary,
     reject_answer_suggestion,
     reject_revision_review,
@@ -28,6 +27,7 @@ from ..answer_git import (
 from ..content_limits import EDITOR_CONTENT_MAX_LENGTH
 from ..forms import AnswerSuggestionForm
 from ..models import Answer, AnswerRevision, AnswerSuggestion, Notification
+from ..unread_counters import adjust_unread
 from ..utils import paginate_queryset
 
 
@@ -48,6 +48,7 @@ def _mark_suggestion_notifications_read(user, suggestion):
         is_read=False,
     ).update(is_read=True)
     if updated:
+        adjust_unread(user.id, 'notification_count', -updated)
         return
 
     if user.id == suggestion.answer.user_id:
@@ -79,10 +80,8 @@ def _decorate_suggestion(suggestion, perspective):
         )
     else:
         suggestion.is_stale = suggestion.is_outdated_against_current()
-    suggestion.diff_stats = get_answer_diff_stats(
-        suggestion.base_revision.content,
-        suggestion.proposed_text,
-    )
+    attach_suggestion_diffs([suggestion])
+    suggestion.diff_stats = suggestion.answer_diff['stats']
     if suggestion.is_stale:
         suggestion.display_status = 'Yanıt değişti'
         suggestion.status_tone = 'stale'
@@ -164,6 +163,7 @@ def correction_inbox(request):
         page_param='page',
         per_page=12,
     )
+    attach_suggestion_diffs(suggestions_page.object_list)
     for suggestion in suggestions_page.object_list:
         _decorate_suggestion(suggestion, perspective)
 
@@ -172,11 +172,12 @@ def correction_inbox(request):
         if perspective == 'incoming'
         else ['suggestion_result']
     )
-    Notification.objects.filter(
+    updated = Notification.objects.filter(
         recipient=request.user,
         notification_type__in=notification_types,
         is_read=False,
     ).update(is_read=True)
+    adjust_unread(request.user.id, 'notification_count', -updated)
 
     return render(
         request,
@@ -232,6 +233,7 @@ def answer_git_history(request, answer_id):
         for revision in revisions
         if revision.accepted_suggestion_id
     }
+    attach_suggestion_diffs(suggestions)
     for suggestion in suggestions:
         suggestion.current_revision_id = current_revision.id
         _decorate_suggestion(suggestion, perspective)
@@ -286,18 +288,14 @@ def answer_git_history(request, answer_id):
         if selected_revision.previous_revision
         else ''
     )
-    selected_revision.inline_diff = build_answer_inline_diff_html(
-        selected_revision.previous_revision.content
-        if selected_revision.previous_revision
-        else '',
-        selected_revision.content,
-    )
-    selected_revision.diff_stats = get_answer_diff_stats(
+    selected_revision.inline_diff = load_answer_diff(
+        answer.id,
         selected_revision.previous_revision.content
         if selected_revision.previous_revision
         else '',
         selected_revision.content,
     )
+    selected_revision.diff_stats = selected_revision.inline_diff['stats']
     selected_revision.approval_summary = get_revision_approval_summary(
         selected_revision,
         current_user=request.user,
@@ -446,10 +444,7 @@ def answer_suggestion_detail(request, suggestion_id):
             'answer': suggestion.answer,
             'question': suggestion.answer.question,
             'current_revision': current_revision,
-            'inline_diff': build_answer_inline_diff_html(
-                suggestion.base_revision.content,
-                suggestion.proposed_text,
-            ),
+            'inline_diff': suggestion.answer_diff,
             'base_rendered_html': render_answer_content_html(suggestion.base_revision.content),
             'proposed_rendered_html': render_answer_content_html(suggestion.proposed_text),
             'can_review': request.user == suggestion.answer.user or request.user.is_superuser,
@@ -21,7 +21,7 @@ from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
 from django.db import transaction
-from django.db.models import Case, IntegerField, Q, Value, When
+from django.db.models import Case, Count, IntegerField, Q, Value, When
 from django.db.models.functions import Lower
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
@@ -29,9 +29,9 @@ from django.urls import reverse
 from django.utils.html import strip_tags
 from django.views.decorators.http import require_POST
 
-from ..models import Question, Answer, Definition, Reference
+from ..models import Question, Answer, AnswerReferenceCitation, Definition, Reference
 from ..forms import DefinitionForm, ReferenceForm
-from ..utils import REFERENCE_CITATION_PATTERN, build_reference_usage_counts, extract_reference_citations
+from ..utils import REFERENCE_CITATION_PATTERN, build_reference_usage_counts
 
 
 @login_required
@@ -487,35 +487,34 @@ def reference_usage_data(request, reference_id):
         Reference.objects.select_related('created_by'),
         id=reference_id,
     )
-    candidate_answers = (
-        Answer.objects.filter(
-            Q(answer_text__icontains='(kaynak') | Q(answer_text__icontains='(k')
-        )
-        .filter(answer_text__icontains=str(reference.id))
+    citations = AnswerReferenceCitation.objects.filter(reference_id=reference.id)
+    counts = citations.aggregate(
+        entries=Count('answer_id', distinct=True),
+        usages=Count('id'),
+    )
+    citing_answers = (
+        Answer.objects.filter(id__in=citations.values('answer_id'))
         .select_related('question', 'user')
         .order_by('-updated_at', '-id')
     )
-
-    entries = []
-    total_citation_count = 0
-    for answer in candidate_answers:
-        citations = extract_reference_citations(answer.answer_text, reference.id)
-        if not citations:
-            continue
-
-        pages = []
-        for citation in citations:
-            page = citation['page']
-            if page and page not in pages:
-                pages.append(page)
-
+    entries_page = Paginator(citing_answers, 8).get_page(request.GET.get('page'))
+
+    pages_by_answer = {}
+    citation_counts = {}
+    page_citations = citations.filter(
+        answer_id__in=[answer.id for answer in entries_page.object_list]
+    ).order_by('answer_id', 'position').values_list('answer_id', 'page')
+    for answer_id, page in page_citations:
+        citation_counts[answer_id] = citation_counts.get(answer_id, 0) + 1
+        pages = pages_by_answer.setdefault(answer_id, [])
+        if page and page not in pages:
+            pages.append(page)
+
+    for answer in entries_page.object_list:
         answer.reference_context = _reference_context(answer.answer_text, reference.id)
-        answer.reference_pages = pages
-        answer.reference_citation_count = len(citations)
-        total_citation_count += len(citations)
-        entries.append(answer)
+        answer.reference_pages = pages_by_answer.get(answer.id, [])
+        answer.reference_citation_count = citation_counts.get(answer.id, 0)
 
-    entries_page = Paginator(entries, 8).get_page(request.GET.get('page'))
     entry_data = [
         {
             'id': answer.id,
@@ -539,8 +538,8 @@ def reference_usage_data(request, reference_id):
             'abbreviation': reference.abbreviation or '',
         },
         'counts': {
-            'entries': len(entries),
-            'usages': total_citation_count,
+            'entries': counts['entries'],
+            'usages': counts['usages'],
         },
         'entries': entry_data,
         'pagination': {
@@ -1,31 +1,19 @@
-from functools import lru_cache
-from importlib import import_module
-
 from django.http import Http404
 from django.shortcuts import render
 
-
-@lru_cache(maxsize=1)
-def _german_course_data():
-    return import_module("core.german_course_data")
-
-
-@lru_cache(maxsize=1)
-def _german_level_test_bank():
-    return import_module("core.german_level_test_bank")
+from core import course_store
 
 
 def german_course_home(request):
-    course_data = _german_course_data()
-    test_bank = _german_level_test_bank()
+    course_index = course_store.german_course_index()
 
-    levels = course_data.get_german_course_overview()
-    total_lessons = sum(level["lesson_count"] for level in course_data.GERMAN_COURSE_LEVELS)
+    levels = course_store.get_german_course_overview()
+    total_lessons = sum(level["lesson_count"] for level in course_index["levels"])
     live_lessons = sum(level["available_lessons"] for level in levels)
     a1_live_lessons = next((level["available_lessons"] for level in levels if level["slug"] == "a1"), 0)
     a2_live_lessons = next((level["available_lessons"] for level in levels if level["slug"] == "a2"), 0)
-    a1_test_bank_size = test_bank.get_level_test_bank_size("a1")
-    a2_test_bank_size = test_bank.get_level_test_bank_size("a2")
+    a1_test_bank_size = course_store.get_german_level_test_bank_size("a1")
+    a2_test_bank_size = course_store.get_german_level_test_bank_size("a2")
     live_level_titles = [level["title"] for level in levels if level["available_lessons"]]
     live_level_summary = " + ".join(live_level_titles) if live_level_titles else "Henüz açık seviye yok"
 
@@ -41,8 +29,8 @@ def german_course_home(request):
             },
             "a1_live_lessons": a1_live_lessons,
             "a2_live_lessons": a2_live_lessons,
-            "a1_scope_matrix": course_data.A1_SCOPE_MATRIX,
-            "a2_scope_matrix": course_data.A2_SCOPE_MATRIX,
+            "a1_scope_matrix": course_index["scope_matrices"]["a1"],
+            "a2_scope_matrix": course_index["scope_matrices"]["a2"],
             "a1_test_bank_size": a1_test_bank_size,
             "a2_test_bank_size": a2_test_bank_size,
             "live_level_summary": live_level_summary,
@@ -51,18 +39,15 @@ def german_course_home(request):
 
 
 def german_lesson_detail(request, level_slug, lesson_slug):
-    course_data = _german_course_data()
-    test_bank = _german_level_test_bank()
-
-    lesson = course_data.get_german_lesson(level_slug, lesson_slug)
+    lesson = course_store.get_german_lesson(level_slug, lesson_slug)
     if not lesson:
         raise Http404("Ders bulunamadi.")
 
-    level = next((item for item in course_data.GERMAN_COURSE_LEVELS if item["slug"] == level_slug), None)
+    level = course_store.get_german_level(level_slug)
     if not level:
         raise Http404("Seviye bulunamadi.")
 
-    lesson_list = course_data.GERMAN_LESSONS.get(level_slug, [])
+    lesson_list = course_store.get_german_level_lessons(level_slug)
     current_index = next((idx for idx, item in enumerate(lesson_list) if item["slug"] == lesson_slug), None)
     previous_lesson = lesson_list[current_index - 1] if current_index not in {None, 0} else None
     next_level_lesson = (
@@ -89,20 +74,17 @@ def german_lesson_detail(request, level_slug, lesson_slug):
             "level_lessons": level_lessons,
             "previous_lesson": previous_lesson,
             "next_level_lesson": next_level_lesson,
-            "level_test_available": test_bank.get_level_test_bank_size(level_slug) > 0,
+            "level_test_available": course_store.get_german_level_test_bank_size(level_slug) > 0,
         },
     )
 
 
 def german_level_test(request, level_slug):
-    course_data = _german_course_data()
-    test_bank = _german_level_test_bank()
-
-    level = next((item for item in course_data.GERMAN_COURSE_LEVELS if item["slug"] == level_slug), None)
+    level = course_store.get_german_level(level_slug)
     if not level:
         raise Http404("Seviye bulunamadi.")
 
-    assessment = test_bank.build_german_level_test(level_slug)
+    assessment = course_store.build_german_level_test(level_slug)
     if not assessment:
         raise Http404("Seviye testi bulunamadi.")
 
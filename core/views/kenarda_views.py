@@ -21,6 +21,7 @@ from django.views.decorators.http import require_POST
 from ..answer_git import create_answer_revision
 from ..content_limits import EDITOR_CONTENT_MAX_LENGTH
 from ..models import Kenarda, Question, Answer
+from ..notification_outbox import enqueue_answer_event
 
 UNICODE_ESCAPE_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
 HEX_ESCAPE_RE = re.compile(r'\\x([0-9a-fA-F]{2})')
@@ -244,6 +245,8 @@ def kenarda_gonder(request, pk):
                 source='author_edit',
                 change_summary='Kenarda taslağından düzenleme',
             )
+            # Mention bildirimleri gönder
+            enqueue_answer_event(answer, 'answer_mentions')
         else:
             # Yeni yanıt oluştur
             answer = Answer.objects.create(
@@ -252,12 +255,6 @@ def kenarda_gonder(request, pk):
                 user=request.user
             )
 
-        # Mention bildirimleri gönder
-        from ..utils import extract_mentions, send_mention_notifications
-        mentioned_usernames = extract_mentions(answer.answer_text)
-        if mentioned_usernames:
-            send_mention_notifications(answer, mentioned_usernames)
-
         question_slug = taslak.question.slug
         answer_id = answer.id
         taslak.delete()
@@ -1,22 +1,11 @@
-from functools import lru_cache
-from importlib import import_module
-
 from django.http import Http404
 from django.shortcuts import redirect, render
 
-
-@lru_cache(maxsize=1)
-def _logic_course_data():
-    return import_module("core.logic_course_data")
-
-
-@lru_cache(maxsize=1)
-def _logic_level_test_bank():
-    return import_module("core.logic_level_test_bank")
+from core import course_store
 
 
 def logic_home(request):
-    course = _logic_course_data().get_logic_course()
+    course = course_store.get_logic_course()
     lessons = course["lessons"]
     return render(
         request,
@@ -27,13 +16,13 @@ def logic_home(request):
             "logic_lessons": lessons,
             "active_logic_lessons": course["active_lesson_count"],
             "logic_hero": course["hero"],
-            "logic_test_bank_size": _logic_level_test_bank().get_logic_level_test_bank_size(),
+            "logic_test_bank_size": course_store.get_logic_level_test_bank_size(),
         },
     )
 
 
 def logic_lesson_detail(request, lesson_slug):
-    lesson, redirect_slug = _logic_course_data().resolve_logic_lesson(lesson_slug)
+    lesson, redirect_slug = course_store.resolve_logic_lesson(lesson_slug)
     if redirect_slug:
         return redirect("logic_lesson_detail", lesson_slug=redirect_slug)
     if not lesson:
@@ -45,13 +34,13 @@ def logic_lesson_detail(request, lesson_slug):
         "core/logic_lesson_detail.html",
         {
             "lesson": lesson,
-            "logic_test_available": _logic_level_test_bank().get_logic_level_test_bank_size() > 0,
+            "logic_test_available": course_store.get_logic_level_test_bank_size() > 0,
         },
     )
 
 
 def logic_level_test(request):
-    assessment = _logic_level_test_bank().build_logic_level_test()
+    assessment = course_store.build_logic_level_test()
     if not assessment:
         raise Http404("Mantık bitirme testi bulunamadı.")
 
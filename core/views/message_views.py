@@ -12,7 +12,7 @@ Message-related views
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.core.paginator import Paginator
-from django.db.models import Q, Count
+from django.db.models import Q
 from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
 from django.urls import reverse
@@ -22,6 +22,7 @@ from django.views.decorators.cache import cache_control
 from ..models import Message, Answer
 from ..forms import MessageForm
 from ..querysets import get_today_questions_queryset
+from ..unread_counters import adjust_unread
 
 
 @login_required
@@ -69,9 +70,7 @@ def message_list(request):
     page_number = request.GET.get('message_page', 1)
     page_obj = paginator.get_page(page_number)
 
-    all_questions = get_today_questions_queryset().annotate(
-        answers_count=Count('answers')
-    )
+    all_questions = get_today_questions_queryset()
 
     # Get show_followed_only parameter for the filter icon
     show_followed_only = request.GET.get('followed', '0') == '1'
@@ -89,14 +88,16 @@ def message_detail(request, username):
     from ..models import Notification
 
     other_user = get_object_or_404(User, username=username)
-    Message.objects.filter(sender=other_user, recipient=request.user, is_read=False).update(is_read=True)
+    read_messages = Message.objects.filter(sender=other_user, recipient=request.user, is_read=False).update(is_read=True)
+    adjust_unread(request.user.id, 'message_count', -read_messages)
 
     # Mark message notifications from this user as read
-    Notification.objects.filter(
+    read_notifications = Notification.objects.filter(
         recipient=request.user,
         sender=other_user,
         is_read=False
     ).update(is_read=True)
+    adjust_unread(request.user.id, 'notification_count', -read_notifications)
 
     # Mesajları doğru şekilde sıralayın: en eski önce, en yeni sonra
     conversation_messages = Message.objects.filter(
@@ -139,7 +140,8 @@ def message_detail(request, username):
             is_read=False
         )
         # Diğer kullanıcının mesajlarını okunmuş olarak işaretlemek isteğe bağlıdır
-        Message.objects.filter(sender=other_user, recipient=request.user).update(is_read=True)
+        read_messages = Message.objects.filter(sender=other_user, recipient=request.user, is_read=False).update(is_read=True)
+        adjust_unread(request.user.id, 'message_count', -read_messages)
         return redirect('message_detail', username=username)
     all_questions = get_today_questions_queryset()
 
@@ -167,6 +169,8 @@ def view_message(request, message_id):
     if message.recipient != request.user and message.sender != request.user:
         return redirect('inbox')
     if message.recipient == request.user:
+        if not message.is_read:
+            adjust_unread(request.user.id, 'message_count', -1)
         message.is_read = True
         message.save()
     return render(request, 'core/view_message.html', {'message': message})
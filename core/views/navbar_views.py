@@ -1,42 +1,28 @@
 """Lightweight status data used by the global navigation."""
 
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
 from django.http import JsonResponse
-from django.utils import timezone
 from django.views.decorators.http import require_GET
 
-from ..models import Message, Notification, UserProfile
-from .online_chat_views import online_chat_unread_count_for_user
-
-NAVBAR_STATUS_CACHE_SECONDS = 10
+from ..unread_counters import long_poll_seconds, unread_status, unread_version, wait_for_unread_change
 
 
 @login_required
 @require_GET
 def navbar_status(request):
-    cache_key = f'navbar-status:{request.user.id}'
-    cached_status = cache.get(cache_key)
-    if cached_status is not None:
-        return JsonResponse(cached_status)
+    return JsonResponse(unread_status(request.user))
 
-    profile, _ = UserProfile.objects.get_or_create(user=request.user)
-    now = timezone.now()
 
-    status = {
-        'notification_count': Notification.objects.filter(
-            recipient=request.user,
-            is_read=False,
-        ).count(),
-        'message_count': Message.objects.filter(
-            recipient=request.user,
-            is_read=False,
-        ).count(),
-        'online_chat_count': online_chat_unread_count_for_user(
-            profile,
-            request.user,
-            now,
-        ),
-    }
-    cache.set(cache_key, status, NAVBAR_STATUS_CACHE_SECONDS)
+@login_required
+@require_GET
+def navbar_status_wait(request):
+    """
+    Long-poll variant of navbar_status: with `since`, holds the request until
+    the user's counter version changes (or NAVBAR_LONG_POLL_SECONDS pass) and
+    returns the counts together with the new version.
+    """
+    hold = long_poll_seconds()
+    version = wait_for_unread_change(request.user.id, request.GET.get('since', ''), hold)
+    status = unread_status(request.user)
+    status.update(version=version, hold=hold)
     return JsonResponse(status)
@@ -9,6 +9,7 @@ from django.views.decorators.http import require_POST
 from django.db.models import Q
 
 from ..models import Notification, QuestionFollow, AnswerFollow, Question, Answer
+from ..unread_counters import adjust_unread
 from ..utils import paginate_queryset
 
 
@@ -18,10 +19,11 @@ def notification_list(request):
     Display list of notifications for the logged-in user
     """
     # Mark all unread notifications as read when user visits the page
-    Notification.objects.filter(
+    updated = Notification.objects.filter(
         recipient=request.user,
         is_read=False
     ).update(is_read=True)
+    adjust_unread(request.user.id, 'notification_count', -updated)
 
     # Get all notifications for the current user
     notifications = Notification.objects.filter(
@@ -86,6 +88,7 @@ def mark_all_notifications_read(request):
         recipient=request.user,
         is_read=False
     ).update(is_read=True)
+    adjust_unread(request.user.id, 'notification_count', -updated)
 
     return JsonResponse({'success': True, 'count': updated})
 
@@ -1,35 +1,35 @@
 """
 Online chat views
 - online_chat_messages
+- online_chat_stream
+
+Old messages are pruned by the run_chat_housekeeping command.
 """
 
 from datetime import timedelta
 
 from django.contrib.auth.decorators import login_required
-from django.core.cache import cache
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.templatetags.static import static
 from django.utils import timezone
 
+from ..chat_fanout import (
+    channel_head,
+    for_viewer,
+    iter_chat_events,
+    messages_after,
+    online_channel,
+    recent_messages,
+    serialize_chat_message,
+)
 from ..models import OnlineChatMessage, UserProfile
+from ..unread_counters import mark_online_chat_read
 
 ONLINE_WINDOW = timedelta(minutes=5)
 CHAT_RATE_LIMIT_WINDOW = timedelta(minutes=1)
 CHAT_RATE_LIMIT_COUNT = 12
 RECENT_MESSAGES_LIMIT = 60
 MAX_CHAT_MESSAGE_LENGTH = 500
-CHAT_RETENTION_WINDOW = timedelta(days=7)
-CHAT_CLEANUP_INTERVAL = timedelta(hours=1)
-CHAT_CLEANUP_CACHE_KEY = 'online_chat_last_cleanup'
-
-
-def cleanup_old_online_chat_messages(now):
-    if cache.get(CHAT_CLEANUP_CACHE_KEY):
-        return
-    OnlineChatMessage.objects.filter(
-        created_at__lt=now - CHAT_RETENTION_WINDOW,
-    ).delete()
-    cache.set(CHAT_CLEANUP_CACHE_KEY, True, int(CHAT_CLEANUP_INTERVAL.total_seconds()))
 
 
 def online_chat_unread_count_for_user(profile, user, now):
@@ -37,6 +37,7 @@ def online_chat_unread_count_for_user(profile, user, now):
     if not last_read_at:
         UserProfile.objects.filter(pk=profile.pk).update(online_chat_last_read_at=now)
         profile.online_chat_last_read_at = now
+        mark_online_chat_read(user.id, now)
         return 0
     return OnlineChatMessage.objects.filter(
         created_at__gt=last_read_at,
@@ -55,21 +56,8 @@ def online_chat_unread_count(request):
 @login_required
 def online_chat_messages(request):
     now = timezone.now()
-    cleanup_old_online_chat_messages(now)
     profile, _ = UserProfile.objects.get_or_create(user=request.user)
 
-    def serialize_message(message):
-        profile = getattr(message.user, 'userprofile', None)
-        avatar_url = profile.photo.url if profile and profile.photo else static('imgs/default_profile.jpg')
-        return {
-            'id': message.id,
-            'body': message.body,
-            'username': message.user.username,
-            'avatar_url': avatar_url,
-            'created_at': timezone.localtime(message.created_at).strftime('%H:%M'),
-            'is_own': message.user_id == request.user.id,
-        }
-
     def serialize_online_user(profile):
         return {
             'username': profile.user.username,
@@ -98,21 +86,17 @@ def online_chat_messages(request):
             body=body,
         )
         UserProfile.objects.filter(pk=profile.pk).update(online_chat_last_read_at=now)
-        return JsonResponse({'message': serialize_message(message), 'unread_count': 0}, status=201)
+        mark_online_chat_read(request.user.id, now)
+        return JsonResponse({
+            'message': for_viewer(serialize_chat_message(message), request.user),
+            'unread_count': 0,
+        }, status=201)
 
     after = request.GET.get('after')
     if after and after.isdigit():
-        messages = (
-            OnlineChatMessage.objects.filter(id__gt=int(after))
-            .select_related('user', 'user__userprofile')
-            .order_by('created_at')
-        )
+        messages = messages_after(online_channel(), int(after))
     else:
-        messages = list(
-            OnlineChatMessage.objects.select_related('user', 'user__userprofile')
-            .order_by('-id')[:RECENT_MESSAGES_LIMIT]
-        )
-        messages.reverse()
+        messages = recent_messages(online_channel(), RECENT_MESSAGES_LIMIT)
 
     online_profiles = (
         UserProfile.objects.filter(last_seen__gte=now - ONLINE_WINDOW)
@@ -124,10 +108,27 @@ def online_chat_messages(request):
     if mark_read:
         UserProfile.objects.filter(pk=profile.pk).update(online_chat_last_read_at=now)
         profile.online_chat_last_read_at = now
+        mark_online_chat_read(request.user.id, now)
 
     return JsonResponse({
-        'messages': [serialize_message(message) for message in messages],
+        'messages': [for_viewer(message, request.user) for message in messages],
         'online_users': [serialize_online_user(profile) for profile in online_profiles],
         'online_count': online_profiles.count(),
         'unread_count': unread_count,
     })
+
+
+@login_required
+def online_chat_stream(request):
+    """Server-Sent Events with new chat messages; resumes from Last-Event-ID."""
+    channel = online_channel()
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    after = int(after) if after and after.isdigit() else channel_head(channel)
+
+    response = StreamingHttpResponse(
+        iter_chat_events(channel, after, request.user),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
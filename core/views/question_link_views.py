@@ -26,6 +26,9 @@ from ..models import (
     StartingQuestion,
     Vote,
 )
+from ..question_graph import load_user_question_graph
+from ..question_tree import descendant_ids
+from ..unread_counters import adjust_unread
 
 @login_required
 def add_existing_subquestion(request, slug):
@@ -62,7 +65,8 @@ def add_existing_subquestion(request, slug):
             return JsonResponse({'success': False, 'error': 'Bu başlık zaten seçilen başlığın alt sorusu'}, status=400)
 
         # Döngüsel bağlantı kontrolü
-        if would_create_cycle_user_based(parent_question, current_question, request.user):
+        graph = load_user_question_graph(request.user)
+        if would_create_cycle_user_based(parent_question, current_question, request.user, graph=graph):
             return JsonResponse({'success': False, 'error': 'Bu bağlantı döngüsel bir ilişki oluşturacak'}, status=400)
 
         # İki başlangıç sorusu birbirine eklenemez kontrolü
@@ -90,11 +94,8 @@ def add_existing_subquestion(request, slug):
             # Önce eski başlangıç sorusunu sil (yalnızca bu kullanıcı için)
             affected_starting_questions.delete()
             # Parent bu kullanıcı için root ise başlangıç olarak işaretle
-            parent_has_parent = QuestionRelationship.objects.filter(
-                child=parent_question,
-                user=request.user
-            ).exists()
-            if not parent_has_parent:
+            # Yeni bağlantı parent'ın kendi üst sorularını değiştirmez.
+            if not graph.parents.get(parent_question.id):
                 StartingQuestion.objects.get_or_create(
                     user=request.user,
                     question=parent_question
@@ -112,54 +113,17 @@ def add_existing_subquestion(request, slug):
 
 def would_create_cycle(parent, potential_child):
     """Check if adding potential_child as subquestion would create a cycle"""
-    visited = set()
-
-    def has_path_to(current, target):
-        """Check if there's a path from current to target following parent_questions"""
-        if current.id == target.id:
-            return True
-        if current.id in visited:
-            return False
-        visited.add(current.id)
-
-        # Check all parents of current
-        for parent_q in current.parent_questions.all():
-            if has_path_to(parent_q, target):
-                return True
-        return False
-
-    # If parent is already an ancestor of potential_child, adding this link would create a cycle
-    # Because: parent -> ... -> potential_child (already exists) + potential_child -> parent (new link) = cycle
-    return has_path_to(parent, potential_child)
+    # parent -> ... -> potential_child zaten varsa yeni bağlantı döngü kurar.
+    return parent.id in descendant_ids(potential_child.id)
 
 
-def would_create_cycle_user_based(parent, potential_child, user):
+def would_create_cycle_user_based(parent, potential_child, user, graph=None):
     """
     Kullanıcı-bazlı döngü kontrolü.
-    Kullanıcının mevcut bağlantılarında parent'tan potential_child'a bir yol varsa döngü oluşur.
+    Kullanıcının mevcut bağlantılarında potential_child'dan parent'a inen bir yol varsa döngü oluşur.
     """
-    visited = set()
-
-    def has_path_to(current, target):
-        """Kullanıcının bağlantılarında current'tan target'a yol var mı?"""
-        if current.id == target.id:
-            return True
-        if current.id in visited:
-            return False
-        visited.add(current.id)
-
-        # Kullanıcının bu sorunun parent'ları arasında kontrol et
-        parent_relationships = QuestionRelationship.objects.filter(
-            child=current,
-            user=user
-        ).select_related('parent')
-
-        for rel in parent_relationships:
-            if has_path_to(rel.parent, target):
-                return True
-        return False
-
-    return has_path_to(parent, potential_child)
+    graph = graph or load_user_question_graph(user)
+    return graph.would_create_cycle(parent.id, potential_child.id)
 
 
 @login_required
@@ -432,6 +396,8 @@ def admin_merge_question(request, slug):
             )
         if notifications_to_create:
             Notification.objects.bulk_create(notifications_to_create)
+            for notification in notifications_to_create:
+                adjust_unread(notification.recipient_id, 'notification_count', 1)
 
         # 7) Finally delete the source question
         source.delete()
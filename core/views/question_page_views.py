@@ -8,7 +8,6 @@ from collections import defaultdict
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.contenttypes.models import ContentType
-from django.core.paginator import Paginator
 from django.db import transaction
 from django.db.models import Q, Count
 from django.http import HttpResponseForbidden
@@ -17,6 +16,7 @@ from django.urls import reverse
 from django.utils.http import url_has_allowed_host_and_scheme
 
 from ..answer_git import attach_answer_revision_metadata
+from ..answer_render_store import attach_rendered_answer_html
 from ..forms import AnswerForm, QuestionForm, StartingQuestionForm
 from ..models import (
     Answer,
@@ -31,7 +31,8 @@ from ..models import (
     UserProfile,
     Vote,
 )
-from ..querysets import get_active_left_frame_pin_q, get_today_questions_queryset
+from ..querysets import TODAY_QUESTIONS_ORDERING, get_active_left_frame_pin_q, get_today_questions_queryset
+from ..utils import paginate_queryset_by_cursor
 
 UNICODE_ESCAPE_RE = re.compile(r'\\u([0-9a-fA-F]{4})')
 HEX_ESCAPE_RE = re.compile(r'\\x([0-9a-fA-F]{2})')
@@ -81,9 +82,7 @@ def question_detail(request, slug):
         except UserProfile.DoesNotExist:
             all_questions = Question.objects.none()
 
-    q_page_number = request.GET.get('q_page', 1)
-    q_paginator = Paginator(all_questions, 20)
-    all_questions_page = q_paginator.get_page(q_page_number)
+    all_questions_page = paginate_queryset_by_cursor(all_questions, request, TODAY_QUESTIONS_ORDERING, 'q_page', 20)
 
     question = get_object_or_404(Question.objects.select_related('user'), slug=slug)
 
@@ -107,10 +106,9 @@ def question_detail(request, slug):
     if keyword:
         all_answers = all_answers.filter(answer_text__icontains=keyword)
 
-    a_page_number = request.GET.get('a_page', 1)
-    a_paginator = Paginator(all_answers, 10)
-    answers_page = a_paginator.get_page(a_page_number)
+    answers_page = paginate_queryset_by_cursor(all_answers, request, ('created_at', 'id'), 'a_page', 10)
     answers_page.object_list = attach_answer_revision_metadata(list(answers_page.object_list), current_user=request.user)
+    attach_rendered_answer_html(answers_page.object_list)
 
     if request.method == 'POST':
         form = AnswerForm(request.POST)
@@ -4,23 +4,36 @@ Radio views
 - DJ program management (create, edit, delete)
 - Start/stop broadcast
 - Listen to broadcast
+- Chat (JSON polling and an event stream)
+
+Programs past their end_time are closed by the run_chat_housekeeping
+command; until then the views treat them as finished (live_programs,
+RadioProgram.is_on_air) without writing.
 """
 
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.shortcuts import render, redirect, get_object_or_404
-from django.http import JsonResponse
+from django.http import JsonResponse, StreamingHttpResponse
 from django.utils import timezone
 from django.core.exceptions import ValidationError, PermissionDenied
 from django.db.models import Q
 from django.views.decorators.http import require_http_methods
-from django.templatetags.static import static
 from datetime import timedelta
 import uuid
 import os
 
+from ..chat_fanout import (
+    channel_head,
+    for_viewer,
+    iter_chat_events,
+    messages_after,
+    radio_channel,
+    recent_messages,
+    serialize_chat_message,
+)
 from ..models import RadioProgram, UserProfile, RadioChatMessage
-from ..radio_utils import expire_live_programs
+from ..radio_utils import expire_live_programs, live_programs
 
 
 def radio_home(request):
@@ -28,14 +41,10 @@ def radio_home(request):
     Radyo ana sayfası - tüm programları listeler
     Canlı yayınlar, yaklaşan programlar ve geçmiş programlar
     """
-    expire_live_programs()
     now = timezone.now()
 
     # Canlı yayınlar
-    live_programs = RadioProgram.objects.filter(
-        is_live=True,
-        is_finished=False
-    ).select_related('dj', 'dj__userprofile').order_by('-start_time')
+    live_program_list = live_programs(now).select_related('dj', 'dj__userprofile').order_by('-start_time')
 
     # Başlamaya hazır programlar (saati geldi ama canlı değil)
     ready_programs = RadioProgram.objects.filter(
@@ -58,7 +67,7 @@ def radio_home(request):
     ).select_related('dj', 'dj__userprofile').order_by('-start_time')[:10]
 
     context = {
-        'live_programs': live_programs,
+        'live_programs': live_program_list,
         'ready_programs': ready_programs,
         'upcoming_programs': upcoming_programs,
         'past_programs': past_programs,
@@ -71,7 +80,6 @@ def program_detail(request, program_id):
     """
     Program detay sayfası - dinleme sayfası
     """
-    expire_live_programs()
     program = get_object_or_404(
         RadioProgram.objects.select_related('dj', 'dj__userprofile'),
         id=program_id
@@ -382,11 +390,10 @@ def get_agora_token(request, program_id):
     if request.method != 'GET':
         return JsonResponse({'error': 'Invalid request method'}, status=400)
 
-    expire_live_programs()
     program = get_object_or_404(RadioProgram, id=program_id)
 
     # Program canlı mı kontrol et
-    if not program.is_live:
+    if not program.is_on_air:
         return JsonResponse({'error': 'Program şu anda canlı değil.'}, status=400)
 
     # DJ mi dinleyici mi kontrol et
@@ -434,7 +441,6 @@ def update_listener_count(request, program_id):
     if request.method != 'POST':
         return JsonResponse({'error': 'Invalid request method'}, status=400)
 
-    expire_live_programs()
     program = get_object_or_404(RadioProgram, id=program_id)
 
     # Get listener count from request body
@@ -466,30 +472,14 @@ def radio_chat_messages(request, program_id):
     """
     Radyo sohbet mesajları - listeleme ve gönderme
     """
-    expire_live_programs()
     program = get_object_or_404(RadioProgram, id=program_id)
-
-    def serialize_message(message):
-        profile = getattr(message.user, 'userprofile', None)
-        if profile and profile.photo:
-            avatar_url = profile.photo.url
-        else:
-            avatar_url = static('imgs/default_profile.jpg')
-
-        return {
-            'id': message.id,
-            'body': message.body,
-            'username': message.user.username,
-            'avatar_url': avatar_url,
-            'created_at': timezone.localtime(message.created_at).strftime('%H:%M'),
-            'is_own': request.user.is_authenticated and message.user_id == request.user.id,
-        }
+    channel = radio_channel(program.id)
 
     if request.method == 'POST':
         if not request.user.is_authenticated:
             return JsonResponse({'error': 'Sohbete yazmak için giriş yapmalısın.'}, status=401)
 
-        if not program.is_live:
+        if not program.is_on_air:
             return JsonResponse({'error': 'Sohbet sadece canlı yayında aktif.'}, status=400)
 
         body = request.POST.get('body', '').strip()
@@ -512,23 +502,33 @@ def radio_chat_messages(request, program_id):
             body=body
         )
 
-        return JsonResponse({'message': serialize_message(message)}, status=201)
+        return JsonResponse({'message': for_viewer(serialize_chat_message(message), request.user)}, status=201)
 
     after = request.GET.get('after')
     if after and after.isdigit():
-        messages = (
-            RadioChatMessage.objects.filter(program=program, id__gt=int(after))
-            .select_related('user', 'user__userprofile')
-            .order_by('created_at')
-        )
+        payloads = messages_after(channel, int(after))
     else:
-        messages = list(
-            RadioChatMessage.objects.filter(program=program)
-            .select_related('user', 'user__userprofile')
-            .order_by('-id')[:50]
-        )
-        messages.reverse()
+        payloads = recent_messages(channel, 50)
 
     return JsonResponse({
-        'messages': [serialize_message(message) for message in messages]
+        'messages': [for_viewer(payload, request.user) for payload in payloads]
     })
+
+
+@require_http_methods(["GET"])
+def radio_chat_stream(request, program_id):
+    """
+    Radyo sohbeti - Server-Sent Events akışı (yeni mesajlar geldikçe)
+    """
+    program = get_object_or_404(RadioProgram, id=program_id)
+    channel = radio_channel(program.id)
+    after = request.headers.get('Last-Event-ID') or request.GET.get('after')
+    after = int(after) if after and after.isdigit() else channel_head(channel)
+
+    response = StreamingHttpResponse(
+        iter_chat_events(channel, after, request.user),
+        content_type='text/event-stream',
+    )
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
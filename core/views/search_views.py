@@ -2,25 +2,30 @@ import re
 import unicodedata
 
 from django.contrib.auth.models import User
-from django.core.paginator import EmptyPage, PageNotAnInteger, Paginator
-from django.db.models import Count
+from django.db.models import Count, Q
 from django.http import JsonResponse
 from django.shortcuts import render
 from django.urls import reverse
 
-from ..models import Answer, Question, UserProfile
+from ..cursor_pagination import CursorPaginator
+from ..models import Answer, Question, SearchDocument, UserProfile
+from ..search_index import browse_documents, search_documents
 
 
 def search_suggestions(request):
     query = request.GET.get('q', '')
-    offset = int(request.GET.get('offset', 0))
+    cursor = request.GET.get('cursor') or None
     limit = int(request.GET.get('limit', 20))
 
     suggestions = []
 
-    if offset == 0:
-        users = User.objects.filter(username__icontains=query)[:10]
-        for user in users:
+    if cursor is None:
+        user_hits, _ = search_documents(query, SearchDocument.objects.filter(kind='user'), limit=10)
+        usernames = User.objects.in_bulk([object_id for _, object_id in user_hits])
+        for _, user_id in user_hits:
+            user = usernames.get(user_id)
+            if user is None:
+                continue
             suggestions.append({
                 'type': 'user',
                 'label': '@' + user.username,
@@ -45,9 +50,15 @@ def search_suggestions(request):
                         'url': reverse('hashtag_view', args=[hashtag.name]),
                     })
 
-    questions = Question.objects.filter(
-        question_text__icontains=query
-    ).order_by('-created_at')[offset:offset + (limit * 3)]
+    question_hits, next_cursor = search_documents(
+        query,
+        SearchDocument.objects.filter(kind='question'),
+        limit=limit,
+        cursor=cursor,
+    )
+    questions = Question.objects.only('question_text', 'slug').in_bulk(
+        [object_id for _, object_id in question_hits]
+    )
 
     def normalize_search_label(value):
         normalized = unicodedata.normalize('NFKC', value or '')
@@ -56,8 +67,10 @@ def search_suggestions(request):
         return normalized
 
     seen_question_labels = set()
-    appended_question_count = 0
-    for question in questions:
+    for _, question_id in question_hits:
+        question = questions.get(question_id)
+        if question is None:
+            continue
         normalized_label = normalize_search_label(question.question_text)
         if not normalized_label or normalized_label in seen_question_labels:
             continue
@@ -67,43 +80,33 @@ def search_suggestions(request):
             'label': question.question_text,
             'url': reverse('question_detail', args=[question.slug]),
         })
-        appended_question_count += 1
-        if appended_question_count >= limit:
-            break
-
-    total_questions = Question.objects.filter(question_text__icontains=query).values('question_text').distinct().count()
-    has_more = (offset + limit) < total_questions
 
     return JsonResponse({
         'suggestions': suggestions,
-        'has_more': has_more,
-        'total': total_questions,
-        'next_offset': offset + limit if has_more else None,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
     })
 
 
 def load_more_questions(request):
-    offset = int(request.GET.get('offset', 0))
-    limit = int(request.GET.get('limit', 20))
-
-    questions = Question.objects.select_related('user').annotate(
-        answers_count=Count('answers')
-    ).order_by('-created_at')[offset:offset + limit]
+    try:
+        limit = min(max(int(request.GET.get('limit', 20)), 1), 100)
+    except ValueError:
+        limit = 20
 
-    total_questions = Question.objects.count()
-    has_more = (offset + limit) < total_questions
+    questions = Question.objects.select_related('user')
+    page = CursorPaginator(questions, ('-created_at', '-id'), limit).page(request.GET.get('cursor'))
 
     questions_data = [{
         'slug': q.slug,
         'text': q.question_text,
         'answers_count': q.answers_count,
-    } for q in questions]
+    } for q in page]
 
     return JsonResponse({
         'questions': questions_data,
-        'has_more': has_more,
-        'total': total_questions,
-        'next_offset': offset + limit if has_more else None,
+        'has_more': page.has_next(),
+        'next_cursor': page.next_cursor,
     })
 
 
@@ -115,8 +118,14 @@ def search(request):
         if query:
             from core.models import Hashtag
 
-            questions = Question.objects.filter(question_text__icontains=query)
-            users = User.objects.filter(username__icontains=query)
+            question_hits, _ = search_documents(query, SearchDocument.objects.filter(kind='question'), limit=20)
+            found_questions = Question.objects.only('question_text', 'slug').in_bulk(
+                [object_id for _, object_id in question_hits]
+            )
+            questions = [found_questions[q_id] for _, q_id in question_hits if q_id in found_questions]
+            user_hits, _ = search_documents(query, SearchDocument.objects.filter(kind='user'), limit=10)
+            found_users = User.objects.only('username').in_bulk([object_id for _, object_id in user_hits])
+            users = [found_users[u_id] for _, u_id in user_hits if u_id in found_users]
 
             hashtags = []
             if query.startswith('#'):
@@ -144,185 +153,147 @@ def search(request):
             ]
         return JsonResponse({'results': results})
 
-    q_param = request.GET.get('q', '').strip()
-    username = request.GET.get('username', '').strip()
-    date_from = request.GET.get('date_from', '').strip()
-    date_to = request.GET.get('date_to', '').strip()
-    keywords = request.GET.get('keywords', '').strip()
-    hashtag_param = request.GET.get('hashtag', '').strip()
-    followed_only = request.GET.get('followed_only', '') == '1'
-    search_in = request.GET.get('search_in', 'all')
-
-    questions = Question.objects.all()
-    answers = Answer.objects.all()
-    users_found = User.objects.none()
-
-    if q_param:
-        questions = questions.filter(question_text__icontains=q_param)
-        answers = answers.filter(answer_text__icontains=q_param)
-        users_found = User.objects.filter(username__icontains=q_param)
-
-    if username:
-        questions = questions.filter(user__username__icontains=username)
-        answers = answers.filter(user__username__icontains=username)
-    if date_from:
-        questions = questions.filter(created_at__date__gte=date_from)
-        answers = answers.filter(created_at__date__gte=date_from)
-    if date_to:
-        questions = questions.filter(created_at__date__lte=date_to)
-        answers = answers.filter(created_at__date__lte=date_to)
-    if keywords:
-        questions = questions.filter(question_text__icontains=keywords)
-        answers = answers.filter(answer_text__icontains=keywords)
-
-    if hashtag_param:
-        from core.models import Hashtag
-        try:
-            hashtag = Hashtag.objects.get(name__iexact=hashtag_param)
-            question_ids = hashtag.usages.filter(question__isnull=False).values_list('question_id', flat=True)
-            answer_ids = hashtag.usages.filter(answer__isnull=False).values_list('answer_id', flat=True)
-            questions = questions.filter(id__in=question_ids)
-            answers = answers.filter(id__in=answer_ids)
-        except Hashtag.DoesNotExist:
-            questions = Question.objects.none()
-            answers = Answer.objects.none()
-
-    if followed_only and request.user.is_authenticated:
-        try:
-            user_profile = request.user.userprofile
-            followed_user_ids = user_profile.following.values_list('user_id', flat=True)
-            questions = questions.filter(user_id__in=followed_user_ids)
-            answers = answers.filter(user_id__in=followed_user_ids)
-        except UserProfile.DoesNotExist:
-            questions = Question.objects.none()
-            answers = Answer.objects.none()
-
-    if search_in == 'question':
-        answers = Answer.objects.none()
-    elif search_in == 'answer':
-        questions = Question.objects.none()
-
-    combined_results = [
-        {"type": "question", "object": q, "created_at": q.created_at}
-        for q in questions
-    ] + [
-        {"type": "answer", "object": a, "created_at": a.created_at}
-        for a in answers
-    ]
-    combined_results.sort(key=lambda x: x['created_at'], reverse=False)
-
-    page_number = request.GET.get('page', 1)
-    paginator = Paginator(combined_results, 15)
-    try:
-        page_obj = paginator.page(page_number)
-    except (PageNotAnInteger, EmptyPage):
-        page_obj = paginator.page(1)
-
-    users_page_number = request.GET.get('users_page', 1)
-    users_paginator = Paginator(users_found.order_by('username'), 10)
-    try:
-        users_paginated = users_paginator.page(users_page_number)
-    except (PageNotAnInteger, EmptyPage):
-        users_paginated = users_paginator.page(1)
+    filters = _read_search_filters(request)
+    results_cursor = request.GET.get('cursor') or None
+    users_cursor = request.GET.get('users_cursor') or None
+
+    hits, next_cursor = _find_search_hits(request, filters, limit=15, cursor=results_cursor)
+    results = _load_search_results(hits)
+
+    users = []
+    users_next_cursor = None
+    if filters['q']:
+        user_hits, users_next_cursor = search_documents(
+            filters['q'],
+            SearchDocument.objects.filter(kind='user'),
+            limit=10,
+            cursor=users_cursor,
+        )
+        found_users = User.objects.select_related('userprofile').in_bulk(
+            [object_id for _, object_id in user_hits]
+        )
+        users = [found_users[user_id] for _, user_id in user_hits if user_id in found_users]
 
     get_params = request.GET.copy()
-    if 'page' in get_params:
-        del get_params['page']
-    if 'users_page' in get_params:
-        del get_params['users_page']
+    for key in ('cursor', 'users_cursor', 'page', 'users_page'):
+        get_params.pop(key, None)
     querystring = get_params.urlencode()
 
+    def page_url(**cursors):
+        params = get_params.copy()
+        for key, value in cursors.items():
+            if value:
+                params[key] = value
+        return '?' + params.urlencode()
+
     context = {
-        'results': page_obj,
-        'users': users_paginated,
-        'query': q_param,
-        'username': username,
-        'date_from': date_from,
-        'date_to': date_to,
-        'keywords': keywords,
-        'search_in': search_in,
-        'page_obj': page_obj,
-        'users_page_obj': users_paginated,
+        'results': results,
+        'users': users,
+        'query': filters['q'],
+        'username': filters['username'],
+        'date_from': filters['date_from'],
+        'date_to': filters['date_to'],
+        'keywords': filters['keywords'],
+        'search_in': filters['search_in'],
+        'next_results_url': page_url(cursor=next_cursor, users_cursor=users_cursor) if next_cursor else None,
+        'first_results_url': page_url(users_cursor=users_cursor) if results_cursor else None,
+        'next_users_url': page_url(cursor=results_cursor, users_cursor=users_next_cursor) if users_next_cursor else None,
+        'first_users_url': page_url(cursor=results_cursor) if users_cursor else None,
         'querystring': querystring,
         'request': request,
     }
     return render(request, 'core/search_results.html', context)
 
 
-def load_more_search_results(request):
-    q_param = request.GET.get('q', '').strip()
-    username = request.GET.get('username', '').strip()
-    date_from = request.GET.get('date_from', '').strip()
-    date_to = request.GET.get('date_to', '').strip()
-    keywords = request.GET.get('keywords', '').strip()
-    hashtag_param = request.GET.get('hashtag', '').strip()
-    followed_only = request.GET.get('followed_only', '') == '1'
-    search_in = request.GET.get('search_in', 'all')
-    offset = int(request.GET.get('offset', 0))
-    limit = int(request.GET.get('limit', 15))
+def _read_search_filters(request):
+    return {
+        'q': request.GET.get('q', '').strip(),
+        'username': request.GET.get('username', '').strip(),
+        'date_from': request.GET.get('date_from', '').strip(),
+        'date_to': request.GET.get('date_to', '').strip(),
+        'keywords': request.GET.get('keywords', '').strip(),
+        'hashtag': request.GET.get('hashtag', '').strip(),
+        'followed_only': request.GET.get('followed_only', '') == '1',
+        'search_in': request.GET.get('search_in', 'all'),
+    }
 
-    questions = Question.objects.all()
-    answers = Answer.objects.all()
-
-    if q_param:
-        questions = questions.filter(question_text__icontains=q_param)
-        answers = answers.filter(answer_text__icontains=q_param)
-
-    if username:
-        questions = questions.filter(user__username__icontains=username)
-        answers = answers.filter(user__username__icontains=username)
-    if date_from:
-        questions = questions.filter(created_at__date__gte=date_from)
-        answers = answers.filter(created_at__date__gte=date_from)
-    if date_to:
-        questions = questions.filter(created_at__date__lte=date_to)
-        answers = answers.filter(created_at__date__lte=date_to)
-    if keywords:
-        questions = questions.filter(question_text__icontains=keywords)
-        answers = answers.filter(answer_text__icontains=keywords)
-
-    if hashtag_param:
+
+def _find_search_hits(request, filters, *, limit, cursor):
+    """
+    Return `([(kind, object_id), ...], next_cursor)` for questions and answers
+    matching the advanced search filters; ranked when there is a text query,
+    oldest first otherwise.
+    """
+    if filters['search_in'] == 'question':
+        kinds = ['question']
+    elif filters['search_in'] == 'answer':
+        kinds = ['answer']
+    else:
+        kinds = ['question', 'answer']
+    documents = SearchDocument.objects.filter(kind__in=kinds)
+
+    if filters['username']:
+        documents = documents.filter(user__username__icontains=filters['username'])
+    if filters['date_from']:
+        documents = documents.filter(created_at__date__gte=filters['date_from'])
+    if filters['date_to']:
+        documents = documents.filter(created_at__date__lte=filters['date_to'])
+
+    if filters['hashtag']:
         from core.models import Hashtag
         try:
-            hashtag = Hashtag.objects.get(name__iexact=hashtag_param)
-            question_ids = hashtag.usages.filter(question__isnull=False).values_list('question_id', flat=True)
-            answer_ids = hashtag.usages.filter(answer__isnull=False).values_list('answer_id', flat=True)
-            questions = questions.filter(id__in=question_ids)
-            answers = answers.filter(id__in=answer_ids)
+            hashtag = Hashtag.objects.get(name__iexact=filters['hashtag'])
         except Hashtag.DoesNotExist:
-            questions = Question.objects.none()
-            answers = Answer.objects.none()
-
-    if followed_only and request.user.is_authenticated:
+            return [], None
+        question_ids = hashtag.usages.filter(question__isnull=False).values_list('question_id', flat=True)
+        answer_ids = hashtag.usages.filter(answer__isnull=False).values_list('answer_id', flat=True)
+        documents = documents.filter(
+            Q(kind='question', object_id__in=question_ids) | Q(kind='answer', object_id__in=answer_ids)
+        )
+
+    if filters['followed_only'] and request.user.is_authenticated:
         try:
             user_profile = request.user.userprofile
-            followed_user_ids = user_profile.following.values_list('user_id', flat=True)
-            questions = questions.filter(user_id__in=followed_user_ids)
-            answers = answers.filter(user_id__in=followed_user_ids)
         except UserProfile.DoesNotExist:
-            questions = Question.objects.none()
-            answers = Answer.objects.none()
-
-    if search_in == 'question':
-        answers = Answer.objects.none()
-    elif search_in == 'answer':
-        questions = Question.objects.none()
-
-    combined_results = [
-        {"type": "question", "object": q, "created_at": q.created_at}
-        for q in questions
-    ] + [
-        {"type": "answer", "object": a, "created_at": a.created_at}
-        for a in answers
-    ]
-    combined_results.sort(key=lambda x: x['created_at'], reverse=False)
-
-    total_results = len(combined_results)
-    paginated_results = combined_results[offset:offset + limit]
-    has_more = (offset + limit) < total_results
+            return [], None
+        followed_user_ids = user_profile.following.values_list('user_id', flat=True)
+        documents = documents.filter(user_id__in=followed_user_ids)
+
+    text_query = ' '.join(part for part in (filters['q'], filters['keywords']) if part)
+    if text_query:
+        return search_documents(text_query, documents, limit=limit, cursor=cursor)
+    return browse_documents(documents, limit=limit, cursor=cursor)
+
+
+def _load_search_results(hits):
+    question_ids = [object_id for kind, object_id in hits if kind == 'question']
+    answer_ids = [object_id for kind, object_id in hits if kind == 'answer']
+    objects = {
+        'question': Question.objects.select_related('user').in_bulk(question_ids) if question_ids else {},
+        'answer': Answer.objects.select_related('user', 'question').in_bulk(answer_ids) if answer_ids else {},
+    }
+
+    results = []
+    for kind, object_id in hits:
+        obj = objects[kind].get(object_id)
+        if obj is None:
+            continue
+        results.append({"type": kind, "object": obj, "created_at": obj.created_at})
+    return results
+
+
+def load_more_search_results(request):
+    filters = _read_search_filters(request)
+    limit = int(request.GET.get('limit', 15))
+    hits, next_cursor = _find_search_hits(
+        request,
+        filters,
+        limit=limit,
+        cursor=request.GET.get('cursor') or None,
+    )
 
     results_data = []
-    for item in paginated_results:
+    for item in _load_search_results(hits):
         if item['type'] == 'question':
             q = item['object']
             results_data.append({
@@ -347,9 +318,8 @@ def load_more_search_results(request):
 
     return JsonResponse({
         'results': results_data,
-        'has_more': has_more,
-        'total': total_results,
-        'next_offset': offset + limit if has_more else None,
+        'has_more': next_cursor is not None,
+        'next_cursor': next_cursor,
     })
 
 
@@ -2,32 +2,38 @@
 
 import random
 import re
-from collections import Counter
 from datetime import timedelta
-from itertools import chain
 
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.models import User
+from django.contrib.contenttypes.models import ContentType
 from django.core.cache import cache
 from django.db.models import Q, Count, Max, F
-from django.db.models.functions import TruncWeek, TruncMonth
 from django.http import JsonResponse
 from django.shortcuts import render
-from django.utils.safestring import mark_safe
 from django.views.decorators.http import require_POST
 from django.utils.timezone import now
 
-from ..answer_git import attach_answer_revision_metadata, render_answer_content_html
-from ..content_link_preload import preload_content_links
-from ..models import Answer, DailyVisitor, Question, QuestionRelationship, Reference, StartingQuestion, UserProfile, VisitSession, Vote
-from ..querysets import get_active_left_frame_pin_q, get_today_questions_queryset
+from ..answer_git import attach_answer_revision_metadata
+from ..answer_render_store import attach_rendered_answer_html
+from ..models import (
+    Answer,
+    ContentSaveCount,
+    DailyVisitor,
+    DailyVisitorCount,
+    Question,
+    QuestionRelationship,
+    Reference,
+    SiteWordCount,
+    StartingQuestion,
+    UserEntryStats,
+    UserProfile,
+    VisitSession,
+)
+from ..querysets import TODAY_QUESTIONS_ORDERING, get_active_left_frame_pin_q, get_today_questions_queryset
 from ..services import VoteSaveService
-from ..templatetags.custom_tags import truncate_math_safe
-from ..utils import build_reference_usage_counts, paginate_queryset
+from ..site_statistics import COUNTER_KEYS, load_site_totals
+from ..utils import paginate_queryset, paginate_queryset_by_cursor
 
-WORD_PATTERN = re.compile(r'\b\w+\b', re.UNICODE)
-HOMEPAGE_ANSWER_CACHE_SECONDS = 120
-HOMEPAGE_ANSWER_CACHE_VERSION = '3'
 RECENT_ANSWER_IDS_CACHE_KEY = 'homepage:recent-answer-ids:v1'
 RECENT_ANSWER_IDS_CACHE_SECONDS = 30
 
@@ -35,46 +41,14 @@ RECENT_ANSWER_IDS_CACHE_SECONDS = 30
 def get_today_questions_page(request, per_page=25):
     """Helper for paginating today's questions."""
     queryset = get_today_questions_queryset()
-    return paginate_queryset(queryset, request, 'page', per_page)
+    return paginate_queryset_by_cursor(queryset, request, TODAY_QUESTIONS_ORDERING, 'page', per_page)
 
 
 def _attach_homepage_answer_content(answers):
-    render_items = []
-    cache_keys = []
+    attach_rendered_answer_html(answers)
     for answer in answers:
-        is_truncated = len(answer.answer_text or '') > 1000
-        source_text = (
-            truncate_math_safe(answer.answer_text, 1000)
-            if is_truncated
-            else (answer.answer_text or '')
-        )
-        updated_token = answer.updated_at.strftime('%Y%m%d%H%M%S%f')
-        cache_key = (
-            f'homepage:answer-html:{HOMEPAGE_ANSWER_CACHE_VERSION}:'
-            f'{answer.id}:{updated_token}:{int(is_truncated)}'
-        )
-        answer.card_content_is_truncated = is_truncated
-        render_items.append((answer, source_text, cache_key))
-        cache_keys.append(cache_key)
-
-    cached_content = cache.get_many(cache_keys)
-    missing_items = []
-    for answer, source_text, cache_key in render_items:
-        if cache_key in cached_content:
-            answer.card_rendered_html = mark_safe(cached_content[cache_key])
-        else:
-            missing_items.append((answer, source_text, cache_key))
-
-    if not missing_items:
-        return
-
-    new_cache_entries = {}
-    with preload_content_links(source_text for _, source_text, _ in missing_items):
-        for answer, source_text, cache_key in missing_items:
-            rendered_html = render_answer_content_html(source_text)
-            answer.card_rendered_html = mark_safe(rendered_html)
-            new_cache_entries[cache_key] = rendered_html
-    cache.set_many(new_cache_entries, HOMEPAGE_ANSWER_CACHE_SECONDS)
+        answer.card_content_is_truncated = answer.rendered_is_truncated
+        answer.card_rendered_html = answer.rendered_summary_html
 
 
 def user_homepage(request):
@@ -95,7 +69,7 @@ def user_homepage(request):
         except UserProfile.DoesNotExist:
             all_questions_qs = Question.objects.none()
 
-    all_questions = paginate_queryset(all_questions_qs, request, 'page', 20)
+    all_questions = paginate_queryset_by_cursor(all_questions_qs, request, TODAY_QUESTIONS_ORDERING, 'page', 20)
 
     candidate_answer_ids = cache.get(RECENT_ANSWER_IDS_CACHE_KEY)
     if candidate_answer_ids is None:
@@ -167,6 +141,24 @@ def user_homepage(request):
     return render(request, 'core/user_homepage.html', context)
 
 
+def _top_saved(model, limit=5):
+    """Most saved objects of `model`, read from ContentSaveCount."""
+    content_type = ContentType.objects.get_for_model(model)
+    rows = list(
+        ContentSaveCount.objects.filter(content_type=content_type, count__gt=0)
+        .order_by('-count', 'object_id')
+        .values_list('object_id', 'count')[:limit]
+    )
+    found = model.objects.in_bulk([object_id for object_id, _ in rows])
+    items = []
+    for object_id, count in rows:
+        item = found.get(object_id)
+        if item is not None:
+            item.save_count = count
+            items.append(item)
+    return items
+
+
 @login_required
 def site_statistics(request):
     today = now().date()
@@ -204,38 +196,31 @@ def site_statistics(request):
     if selected_visitor_group not in {'day', 'week', 'month'}:
         selected_visitor_group = 'day'
 
-    visitor_qs = DailyVisitor.objects.all()
+    totals = load_site_totals(today)
+    statistics_built = totals is not None
+    if not statistics_built:
+        totals = dict.fromkeys(COUNTER_KEYS, 0)
+
     selected_days = visitor_range_days[selected_visitor_range]
+    visitor_days = DailyVisitorCount.objects.filter(unique_visitors__gt=0)
     if selected_days:
-        start_date = today - timedelta(days=selected_days - 1)
-        visitor_qs = visitor_qs.filter(date__gte=start_date)
-
-    visitor_labels = []
-    visitor_values = []
-    if selected_visitor_group == 'day':
-        visitor_rows = visitor_qs.values('date').annotate(unique_visitors=Count('visitor_hash')).order_by('date')
-        for row in visitor_rows:
-            visitor_labels.append(row['date'].strftime('%d.%m.%Y'))
-            visitor_values.append(row['unique_visitors'])
-    elif selected_visitor_group == 'week':
-        visitor_rows = visitor_qs.annotate(period=TruncWeek('date')).values('period').annotate(
-            unique_visitors=Count('visitor_hash')
-        ).order_by('period')
-        for row in visitor_rows:
-            period = row['period']
-            period_date = period.date() if hasattr(period, 'date') else period
-            iso = period_date.isocalendar()
-            visitor_labels.append(f"{iso.year}-W{iso.week:02d}")
-            visitor_values.append(row['unique_visitors'])
-    else:
-        visitor_rows = visitor_qs.annotate(period=TruncMonth('date')).values('period').annotate(
-            unique_visitors=Count('visitor_hash')
-        ).order_by('period')
-        for row in visitor_rows:
-            period = row['period']
-            period_date = period.date() if hasattr(period, 'date') else period
-            visitor_labels.append(period_date.strftime('%Y-%m'))
-            visitor_values.append(row['unique_visitors'])
+        visitor_days = visitor_days.filter(date__gte=today - timedelta(days=selected_days - 1))
+    visitor_rows = list(visitor_days.values_list('date', 'unique_visitors'))
+    if today_unique_visitors:
+        visitor_rows.append((today, today_unique_visitors))
+
+    visitor_buckets = {}
+    for day, unique_visitors in visitor_rows:
+        if selected_visitor_group == 'day':
+            label = day.strftime('%d.%m.%Y')
+        elif selected_visitor_group == 'week':
+            iso = day.isocalendar()
+            label = f"{iso.year}-W{iso.week:02d}"
+        else:
+            label = day.strftime('%Y-%m')
+        visitor_buckets[label] = visitor_buckets.get(label, 0) + unique_visitors
+    visitor_labels = list(visitor_buckets)
+    visitor_values = list(visitor_buckets.values())
 
     visitor_chart_data = {
         'labels': visitor_labels,
@@ -244,37 +229,23 @@ def site_statistics(request):
     visitor_total_unique = sum(visitor_values)
     visitor_peak_unique = max(visitor_values) if visitor_values else 0
 
-    user_count = User.objects.filter(Q(questions__isnull=False) | Q(answers__isnull=False)).distinct().count()
-    total_questions = Question.objects.count()
-    total_answers = Answer.objects.count()
-    total_likes = Vote.objects.filter(value=1).count()
-    total_dislikes = Vote.objects.filter(value=-1).count()
-
-    top_question_users = User.objects.annotate(question_count=Count('questions')).order_by('-question_count')[:5]
-    top_answer_users = User.objects.annotate(answer_count=Count('answers')).order_by('-answer_count')[:5]
-    top_liked_questions = Question.objects.annotate(like_count=F('upvotes')).order_by('-like_count')[:5]
-    top_liked_answers = Answer.objects.annotate(like_count=F('upvotes')).order_by('-like_count')[:5]
-    top_saved_questions = Question.objects.annotate(save_count=Count('saveditem')).order_by('-save_count')[:5]
-    top_saved_answers = Answer.objects.annotate(save_count=Count('saveditem')).order_by('-save_count')[:5]
-
-    question_texts = list(Question.objects.values_list('question_text', flat=True))
-    answer_texts = list(Answer.objects.values_list('answer_text', flat=True))
-
-    all_texts = []
-    word_counts = Counter()
-    total_words = 0
-    total_characters = 0
-
-    for text in chain(question_texts, answer_texts):
-        all_texts.append(text)
-        if not text:
-            continue
-        total_characters += len(text)
-        words = WORD_PATTERN.findall(text.lower())
-        total_words += len(words)
-        word_counts.update(words)
-
-    reference_usage_counts = build_reference_usage_counts(answer_texts=answer_texts, use_cache=False)
+    user_count = UserEntryStats.objects.filter(Q(question_count__gt=0) | Q(answer_count__gt=0)).count()
+    total_questions = totals['questions']
+    total_answers = totals['answers']
+    total_likes = totals['likes']
+    total_dislikes = totals['dislikes']
+
+    entry_stats = UserEntryStats.objects.select_related('user')
+    top_question_users = entry_stats.filter(question_count__gt=0).order_by('-question_count', 'user_id')[:5]
+    top_answer_users = entry_stats.filter(answer_count__gt=0).order_by('-answer_count', 'user_id')[:5]
+    top_liked_questions = Question.objects.annotate(like_count=F('upvotes')).order_by('-upvotes')[:5]
+    top_liked_answers = (
+        Answer.objects.select_related('question', 'user')
+        .annotate(like_count=F('upvotes'))
+        .order_by('-upvotes')[:5]
+    )
+    top_saved_questions = _top_saved(Question)
+    top_saved_answers = _top_saved(Answer)
 
     exclude_words_input = request.GET.get('exclude_words', '')
     if exclude_words_input:
@@ -283,8 +254,11 @@ def site_statistics(request):
     else:
         exclude_words = set()
 
-    filtered_word_counts = Counter({word: count for word, count in word_counts.items() if word not in exclude_words})
-    top_words = filtered_word_counts.most_common(10)
+    top_words = list(
+        SiteWordCount.objects.filter(count__gt=0).exclude(word__in=exclude_words)
+        .order_by('-count', 'word')
+        .values_list('word', 'count')[:10]
+    )
 
     search_word = request.GET.get('search_word', '').strip().lower()
     search_word_count = None
@@ -292,20 +266,20 @@ def site_statistics(request):
         if search_word in exclude_words:
             search_word_count = 0
         else:
-            search_word_count = word_counts.get(search_word, 0)
-
-    all_references = list(Reference.objects.all())
-    for ref in all_references:
-        ref.usage_count = reference_usage_counts.get(ref.id, 0)
+            search_word_count = (
+                SiteWordCount.objects.filter(word=search_word).values_list('count', flat=True).first() or 0
+            )
 
-    all_references.sort(key=lambda ref: (ref.usage_count, ref.id), reverse=True)
-    top_references = paginate_queryset(all_references, request, 'reference_page', 20)
+    references = Reference.objects.annotate(usage_count=Count('citations')).order_by('-usage_count', '-id')
+    top_references = paginate_queryset(references, request, 'reference_page', 20)
 
-    total_entries = len(all_texts)
+    total_words = totals['words']
+    total_characters = totals['characters']
+    total_entries = total_questions + total_answers
     avg_words_per_entry = round(total_words / total_entries, 2) if total_entries else 0
     avg_chars_per_entry = round(total_characters / total_entries, 2) if total_entries else 0
     avg_entries_per_user = round(total_entries / user_count, 2) if user_count else 0
-    total_references_count = Reference.objects.count()
+    total_references_count = top_references.paginator.count
 
     context = {
         'active_tab': active_tab,
@@ -342,6 +316,7 @@ def site_statistics(request):
         'avg_words_per_entry': avg_words_per_entry,
         'avg_chars_per_entry': avg_chars_per_entry,
         'avg_entries_per_user': avg_entries_per_user,
+        'statistics_built': statistics_built,
     }
     return render(request, 'core/site_statistics.html', context)
 
@@ -367,7 +342,6 @@ def shuffle_questions(request):
     selected_ids = random.sample(all_ids, sample_size)
     questions = (
         Question.objects.filter(id__in=selected_ids)
-        .annotate(answers_count=Count('answers'))
         .values('id', 'slug', 'question_text', 'answers_count')
     )
     questions = list(questions)
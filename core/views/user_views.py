@@ -16,8 +16,8 @@ User-related views
 
 import re
 import colorsys
-from collections import Counter
 
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
@@ -35,8 +35,10 @@ from ..models import (
     SavedItem, PinnedEntry, Definition, Reference,
     AnswerRevision,
 )
+from ..answer_render_store import attach_rendered_answer_html
+from ..user_word_stats import get_user_text_stats, top_user_words, user_word_count
 from ..forms import ProfilePhotoForm
-from ..utils import build_reference_usage_counts
+from ..utils import build_reference_usage_counts, paginate_queryset_by_cursor
 
 
 def _redirect_profile_login(request):
@@ -136,6 +138,7 @@ def user_profile(request, username):
             request.user.is_authenticated
             and (request.user == profile_user or request.user.is_superuser)
         ),
+        'export_in_background': settings.EXPORT_IN_BACKGROUND,
     }
 
     # Profil fotoğrafı kontrolü - güvenli bir şekilde
@@ -169,13 +172,11 @@ def user_profile(request, username):
 
     # Sadece ilgili sekmenin contextini doldur
     if active_tab == 'girdiler':
-        answers_list = Answer.objects.filter(user=profile_user).select_related('question', 'user').order_by('-created_at')
-        answer_paginator = Paginator(answers_list, 10)
-        answer_page = request.GET.get('answer_page', 1)
-        try:
-            context['answers'] = answer_paginator.page(answer_page)
-        except (PageNotAnInteger, EmptyPage):
-            context['answers'] = answer_paginator.page(1)
+        answers_list = Answer.objects.filter(user=profile_user).select_related('question', 'user')
+        context['answers'] = paginate_queryset_by_cursor(
+            answers_list, request, ('-created_at', '-id'), 'answer_page', 10
+        )
+        attach_rendered_answer_html(context['answers'].object_list)
 
     elif active_tab == 'revizyonlar':
         revision_qs = AnswerRevision.objects.filter(
@@ -292,44 +293,21 @@ def user_profile(request, username):
             context['saved_items_page'] = saved_paginator.page(s_page)
         except (PageNotAnInteger, EmptyPage):
             context['saved_items_page'] = saved_paginator.page(1)
+        attach_rendered_answer_html([
+            item['object'] for item in context['saved_items_page'].object_list
+            if item['type'] == 'answer'
+        ])
 
     elif active_tab in ['istatistikler', 'kelimeler']:
         questions_list = Question.objects.filter(user=profile_user)
         answers_list = Answer.objects.filter(user=profile_user)
-        question_texts = list(questions_list.values_list('question_text', flat=True))
-        answer_texts = list(answers_list.values_list('answer_text', flat=True))
-
-        # Clean text from markdown references and citations
-        def clean_text_for_word_count(text):
-            if not text:
-                return ''
-            # Remove markdown links but keep the link text: [text](url) -> text (must be FIRST)
-            text = re.sub(r'\[([^\]]+)\]\([^\)]+\)', r'\1', text)
-            # Remove bibliography citations: (kaynak:ID[, sayfa:NUM]) and short form (k:ID[ s:NUM])
-            text = re.sub(r'\((?:kaynak|k):\d+(?:(?:,\s*sayfa:[^\)]+)|(?:\s*s:[^\)]+))?\)', '', text)
-            # Remove footnote references: [^ref], [1], [2], etc.
-            text = re.sub(r'\[\^[^\]]+\]', '', text)  # [^1], [^ref], etc.
-            text = re.sub(r'\[\d+\]', '', text)  # [1], [2], [3], etc.
-            # Remove (bkz: ...) references
-            text = re.sub(r'\(bkz:\s*[^\)]+\)', '', text)
-            # Remove (def: ...) references
-            text = re.sub(r'\(def:\s*[^\)]+\)', '', text)
-            # Remove HTML tags
-            text = re.sub(r'<[^>]+>', '', text)
-            return text
-
-        # Clean all texts
-        cleaned_question_texts = [clean_text_for_word_count(q) for q in question_texts if q]
-        cleaned_answer_texts = [clean_text_for_word_count(a) for a in answer_texts if a]
-        all_entries = cleaned_question_texts + cleaned_answer_texts
-
-        total_words = sum(len(re.findall(r'\b\w+\b', entry)) for entry in all_entries)
-        total_chars = sum(len(entry.replace(" ", "")) for entry in all_entries)
-        # Entry = Answer (yanıt). Sorular sadece başlık, ayrı entry değil.
-        total_entries = len(cleaned_answer_texts)
+
+        # Kelime sayıları ve toplamlar yazma anında güncellenen tablolardan okunur.
+        text_stats = get_user_text_stats(profile_user)
+        total_words = text_stats.total_words
+        total_chars = text_stats.total_chars
+        total_entries = text_stats.total_entries
         avg_words_per_entry = total_words / total_entries if total_entries else 0
-        all_texts_joined = (' '.join(cleaned_question_texts) + ' ' + ' '.join(cleaned_answer_texts)).lower()
-        words = re.findall(r'\b\w+\b', all_texts_joined)
 
         # Profildeki çıkarılmış kelimeleri yükle (kalıcı)
         profile_excluded_words = user_profile.excluded_words if user_profile.excluded_words else ''
@@ -347,10 +325,10 @@ def user_profile(request, username):
         # Tek kelime ekleme (eski mantık)
         exclude_word = request.GET.get('exclude_word', '').strip().lower()
 
-        total_upvotes = ((questions_list.aggregate(total=Sum('upvotes'))['total'] or 0) +
-                 (answers_list.aggregate(total=Sum('upvotes'))['total'] or 0))
-        total_downvotes = ((questions_list.aggregate(total=Sum('downvotes'))['total'] or 0) +
-                   (answers_list.aggregate(total=Sum('downvotes'))['total'] or 0))
+        question_votes = questions_list.aggregate(up=Sum('upvotes'), down=Sum('downvotes'))
+        answer_votes = answers_list.aggregate(up=Sum('upvotes'), down=Sum('downvotes'))
+        total_upvotes = (question_votes['up'] or 0) + (answer_votes['up'] or 0)
+        total_downvotes = (question_votes['down'] or 0) + (answer_votes['down'] or 0)
         if exclude_word:
             exclude_words_set.add(exclude_word)
 
@@ -366,13 +344,11 @@ def user_profile(request, username):
 
         exclude_words_list = sorted(list(exclude_words_set))
         exclude_words_str = ', '.join(exclude_words_list)
-        filtered_words = [word for word in words if word not in exclude_words_set]
-        word_counts = Counter(filtered_words)
-        top_words = word_counts.most_common(20)
+        top_words = top_user_words(profile_user, exclude_words_set, limit=20)
         search_word = request.GET.get('search_word', '').strip().lower()
         search_word_count = None
         if search_word:
-            search_word_count = word_counts.get(search_word, 0)
+            search_word_count = 0 if search_word in exclude_words_set else user_word_count(profile_user, search_word)
 
         content_type_question = ContentType.objects.get_for_model(Question)
         content_type_answer = ContentType.objects.get_for_model(Answer)
@@ -643,15 +619,8 @@ def get_user_color(user_id):
 
 
 def get_top_words(user):
-    answers = Answer.objects.filter(user=user)
-    questions = Question.objects.filter(user=user)
-
-    text = ' '.join([a.answer_text for a in answers] + [q.question_text for q in questions])
-    words = re.findall(r'\w+', text.lower())
-    word_counts = Counter(words)
-    top_words = word_counts.most_common(10)
-
-    return top_words
+    get_user_text_stats(user)
+    return top_user_words(user, limit=10)
 
 
 def get_invitation_tree(user):
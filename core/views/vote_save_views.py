@@ -11,11 +11,13 @@ from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.models import User
 from django.contrib.contenttypes.models import ContentType
+from django.db import transaction
 from django.http import JsonResponse
 from django.shortcuts import redirect, get_object_or_404
 from django.urls import reverse
 
 from ..models import Vote, SavedCollection, SavedCollectionItem, SavedItem, PinnedEntry, Answer, Notification
+from ..vote_counts import apply_vote_change
 
 
 def vote(request):
@@ -59,31 +61,29 @@ def vote(request):
         except (ValueError, TypeError):
             return JsonResponse({'error': 'Invalid vote value format'}, status=400)
 
-        # Get or create the vote
-        vote_obj, created = Vote.objects.get_or_create(
-            user=request.user,
-            content_type=content_type_obj,
-            object_id=object_id,
-            defaults={'value': value}
-        )
-        if not created:
-            if vote_obj.value == value:
-                # Remove the vote if it's the same
-                vote_obj.delete()
-                value = 0
-            else:
-                # Update the vote value
-                vote_obj.value = value
-                vote_obj.save()
-
-        # Recalculate total upvotes and downvotes
-        upvotes = Vote.objects.filter(content_type=content_type_obj, object_id=object_id, value=1).count()
-        downvotes = Vote.objects.filter(content_type=content_type_obj, object_id=object_id, value=-1).count()
-
-        # Update the object's vote counts
-        obj.upvotes = upvotes
-        obj.downvotes = downvotes
-        obj.save()
+        # Lock the user's vote row and move the stored counters with F();
+        # the voted object is never saved, so its post_save signals stay quiet.
+        with transaction.atomic():
+            vote_obj, created = Vote.objects.select_for_update().get_or_create(
+                user=request.user,
+                content_type=content_type_obj,
+                object_id=object_id,
+                defaults={'value': value}
+            )
+            old_value = 0
+            if not created:
+                old_value = vote_obj.value
+                if vote_obj.value == value:
+                    # Remove the vote if it's the same
+                    vote_obj.delete()
+                    value = 0
+                else:
+                    # Update the vote value
+                    vote_obj.value = value
+                    vote_obj.save(update_fields=['value'])
+            apply_vote_change(model_class, object_id, old_value, value)
+
+        upvotes, downvotes = model_class.objects.filter(pk=object_id).values_list('upvotes', 'downvotes').get()
 
         # Notify answer owner on vote (only when vote is set, not removed)
         try:
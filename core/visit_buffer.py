@@ -0,0 +1,211 @@
+"""
+Write-behind buffer for LastSeenMiddleware (VISIT_TRACKING_BUFFERED).
+
+Requests only record events in process memory; `flush()` writes them in a
+handful of bulk statements. Nothing is written on the request path: a daemon
+thread per process (started from CoreConfig.ready) flushes once
+VISIT_BUFFER_FLUSH_SECONDS have passed or VISIT_BUFFER_MAX_EVENTS events are
+waiting, and whatever is left is flushed when the process exits.
+
+`request_drain()` (the drain_visit_buffer command) asks every process to
+flush within a second. It goes through the cache, so it reaches other
+server processes only with a shared cache (SHARED_CACHE).
+
+Which visit a request belongs to is decided from the cache instead of a
+VisitSession lookup: the active token of a visit is remembered for the
+inactivity window, both by token and by daily visitor hash.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Case, DateTimeField, Value, When
+from django.utils import timezone
+
+from .models import DailyVisitor, UserProfile, VisitSession
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_FLUSH_SECONDS = 5
+DEFAULT_MAX_EVENTS = 200
+FLUSHER_STEP_SECONDS = 1.0
+DRAIN_REQUEST_KEY = "visit-buffer:drain-requested-at"
+
+
+def request_drain():
+    """Ask the flusher of every process to write its buffered events now."""
+    cache.set(DRAIN_REQUEST_KEY, time.time(), 60 * 60)
+
+
+class VisitBuffer:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._reset()
+        self._last_flush = time.monotonic()
+        self._last_flush_at = time.time()
+        self._wake = threading.Event()
+        self._background = False
+        self._thread = None
+
+    def _reset(self):
+        self.last_seen = {}        # user_id -> datetime
+        self.daily_visitors = set()  # (date, visitor_hash)
+        self.new_visits = {}       # visit_token -> VisitSession (unsaved)
+        self.touched_visits = {}   # visit_token -> user_id or None
+        self.event_count = 0
+
+    def record_last_seen(self, user_id, seen_at):
+        with self._lock:
+            self.last_seen[user_id] = seen_at
+            self.event_count += 1
+        self._event_recorded()
+
+    def record_daily_visitor(self, day, visitor_hash):
+        with self._lock:
+            self.daily_visitors.add((day, visitor_hash))
+            self.event_count += 1
+        self._event_recorded()
+
+    def record_new_visit(self, visit_token, day, visitor_hash, user_id):
+        with self._lock:
+            self.new_visits[visit_token] = VisitSession(
+                visit_token=visit_token,
+                date=day,
+                visitor_hash=visitor_hash,
+                user_id=user_id,
+            )
+            self.event_count += 1
+        self._event_recorded()
+
+    def record_visit_touch(self, visit_token, user_id):
+        with self._lock:
+            new_visit = self.new_visits.get(visit_token)
+            if new_visit is not None:
+                new_visit.user_id = user_id or new_visit.user_id
+            else:
+                self.touched_visits[visit_token] = user_id or self.touched_visits.get(visit_token)
+            self.event_count += 1
+        self._event_recorded()
+
+    @staticmethod
+    def _max_events():
+        return getattr(settings, "VISIT_BUFFER_MAX_EVENTS", DEFAULT_MAX_EVENTS)
+
+    def _event_recorded(self):
+        if self._background:
+            self._ensure_flusher()
+            if self.event_count >= self._max_events():
+                self._wake.set()
+
+    def start_background_flush(self):
+        """Flush from a daemon thread of this process (and of forked children)."""
+        self._background = True
+        self._ensure_flusher()
+
+    def _ensure_flusher(self):
+        # A thread started before a fork does not exist in the child.
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="visit-buffer", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(FLUSHER_STEP_SECONDS)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush_if_due()
+            except Exception:
+                logger.exception("Visit buffer flush failed")
+            finally:
+                close_old_connections()
+
+    def flush_if_due(self):
+        flush_seconds = getattr(settings, "VISIT_BUFFER_FLUSH_SECONDS", DEFAULT_FLUSH_SECONDS)
+        if self.event_count >= self._max_events() or time.monotonic() - self._last_flush >= flush_seconds:
+            return self.flush()
+        drain_requested_at = cache.get(DRAIN_REQUEST_KEY)
+        if drain_requested_at is not None and drain_requested_at >= self._last_flush_at:
+            return self.flush()
+        return 0
+
+    def flush(self):
+        """Write every buffered event; returns the number of events written."""
+        with self._lock:
+            last_seen = self.last_seen
+            daily_visitors = self.daily_visitors
+            new_visits = self.new_visits
+            touched_visits = self.touched_visits
+            event_count = self.event_count
+            self._reset()
+            self._last_flush = time.monotonic()
+            self._last_flush_at = time.time()
+
+        if not event_count:
+            return 0
+        try:
+            self._write(last_seen, daily_visitors, new_visits, touched_visits)
+        except DatabaseError:
+            # Analytics rows are best-effort, like the unbuffered path.
+            logger.warning("Dropped %s buffered visit events", event_count, exc_info=True)
+            return 0
+        return event_count
+
+    @staticmethod
+    def _write(last_seen, daily_visitors, new_visits, touched_visits):
+        if last_seen:
+            UserProfile.objects.filter(user_id__in=last_seen).update(
+                last_seen=Case(
+                    *[When(user_id=user_id, then=Value(seen_at)) for user_id, seen_at in last_seen.items()],
+                    output_field=DateTimeField(),
+                )
+            )
+            existing = set(UserProfile.objects.filter(user_id__in=last_seen).values_list("user_id", flat=True))
+            UserProfile.objects.bulk_create(
+                [UserProfile(user_id=user_id, last_seen=seen_at)
+                 for user_id, seen_at in last_seen.items() if user_id not in existing],
+                ignore_conflicts=True,
+            )
+
+        if daily_visitors:
+            DailyVisitor.objects.bulk_create(
+                [DailyVisitor(date=day, visitor_hash=visitor_hash) for day, visitor_hash in daily_visitors],
+                ignore_conflicts=True,
+            )
+
+        if new_visits:
+            VisitSession.objects.bulk_create(new_visits.values(), ignore_conflicts=True)
+
+        if touched_visits:
+            # auto_now does not apply to update(), so last_seen_at is set here.
+            VisitSession.objects.filter(visit_token__in=touched_visits).update(last_seen_at=timezone.now())
+            by_user = {}
+            for visit_token, user_id in touched_visits.items():
+                if user_id:
+                    by_user.setdefault(user_id, []).append(visit_token)
+            for user_id, visit_tokens in by_user.items():
+                VisitSession.objects.filter(visit_token__in=visit_tokens).exclude(user_id=user_id).update(user_id=user_id)
+
+
+visit_buffer = VisitBuffer()
+
+
+def _flush_at_exit():
+    try:
+        visit_buffer.flush()
+    except Exception:
+        pass
+
+
+atexit.register(_flush_at_exit)
@@ -0,0 +1,57 @@
+"""
+Stored upvotes/downvotes on voted objects (Question, Answer).
+
+A vote moves the counters with one `F()` UPDATE, so no COUNT(*) runs and no
+save signals of the voted object fire. `reconcile_vote_counts` recounts
+every object from Vote with one GROUP BY and fixes rows that drifted.
+"""
+
+from django.contrib.contenttypes.models import ContentType
+from django.db.models import Count, F, Q
+
+from .models import Answer, Question, Vote
+
+
+VOTED_MODELS = (Question, Answer)
+
+
+def apply_vote_change(model_class, object_id, old_value, new_value):
+    """Move the counters of one object from `old_value` to `new_value` (each -1, 0 or 1)."""
+    changes = {}
+    up_delta = (new_value == 1) - (old_value == 1)
+    down_delta = (new_value == -1) - (old_value == -1)
+    if up_delta:
+        changes['upvotes'] = F('upvotes') + up_delta
+    if down_delta:
+        changes['downvotes'] = F('downvotes') + down_delta
+    if changes:
+        model_class.objects.filter(pk=object_id).update(**changes)
+
+
+def reconcile_vote_counts(dry_run=False):
+    """Recount upvotes/downvotes from Vote; returns `{model label: fixed rows}`."""
+    content_types = ContentType.objects.get_for_models(*VOTED_MODELS)
+    model_by_type_id = {content_type.id: model for model, content_type in content_types.items()}
+
+    tallies = {model: {} for model in VOTED_MODELS}
+    rows = (
+        Vote.objects.filter(content_type_id__in=model_by_type_id)
+        .values_list('content_type_id', 'object_id')
+        .annotate(up=Count('id', filter=Q(value=1)), down=Count('id', filter=Q(value=-1)))
+        .order_by()
+    )
+    for content_type_id, object_id, up, down in rows:
+        tallies[model_by_type_id[content_type_id]][object_id] = (up, down)
+
+    fixed = {}
+    for model, counts in tallies.items():
+        stale = []
+        for obj in model.objects.only('id', 'upvotes', 'downvotes').iterator(chunk_size=500):
+            up, down = counts.get(obj.id, (0, 0))
+            if (obj.upvotes, obj.downvotes) != (up, down):
+                obj.upvotes, obj.downvotes = up, down
+                stale.append(obj)
+        if stale and not dry_run:
+            model.objects.bulk_update(stale, ['upvotes', 'downvotes'], batch_size=500)
+        fixed[model._meta.label] = len(stale)
+    return fixed
@@ -27,6 +27,63 @@ else:
 STATIC_ASSET_VERSION = os.environ.get('STATIC_ASSET_VERSION', '10')
 GOOGLE_ANALYTICS_ID = os.environ.get('GOOGLE_ANALYTICS_ID', 'G-7JSG99BCHT').strip()
 
+# Visitor / last-seen tracking: buffer the writes in memory and flush them in
+# batches (see core/visit_buffer.py) instead of writing on each page view.
+VISIT_TRACKING_BUFFERED = str(os.environ.get('VISIT_TRACKING_BUFFERED', '')).lower() in ('1', 'true', 'yes', 'on')
+VISIT_BUFFER_FLUSH_SECONDS = int(os.environ.get('VISIT_BUFFER_FLUSH_SECONDS', '5'))
+VISIT_BUFFER_MAX_EVENTS = int(os.environ.get('VISIT_BUFFER_MAX_EVENTS', '200'))
+
+# Answer notification fan-out (see core/notification_outbox.py): "inline" after
+# commit, "thread" in a background worker, or "queue" for the
+# drain_notification_outbox command.
+NOTIFICATION_FANOUT = os.environ.get('NOTIFICATION_FANOUT', 'inline').strip().lower()
+
+# Cache. With REDIS_URL all workers share one Redis cache; without it each
+# process has its own in-memory cache and cannot see what the others write.
+# Modules that keep numbers in the cache and move them on writes (unread
+# counters, chat heads, question graphs) only hold them for a few seconds
+# unless SHARED_CACHE is on.
+REDIS_URL = os.environ.get('REDIS_URL', '').strip()
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+SHARED_CACHE = bool(REDIS_URL)
+
+# Navbar unread counters (see core/unread_counters.py): seconds a
+# /navbar/status/wait/ request is held open waiting for a change. A held
+# request occupies a sync worker for the whole time, so the default is 0
+# (plain polling). Only raise it when the app runs on threaded or async
+# workers, e.g. `gunicorn --worker-class gthread --threads 8` or an ASGI server.
+NAVBAR_LONG_POLL_SECONDS = int(os.environ.get('NAVBAR_LONG_POLL_SECONDS', '0'))
+
+# Online/radio chat event streams (see core/chat_fanout.py): seconds one
+# stream stays open before the browser reconnects. Same worker trade-off as
+# above, so the default is 0: every stream returns what is new and the
+# browser re-polls. Raise it only on gthread or ASGI workers.
+CHAT_STREAM_SECONDS = int(os.environ.get('CHAT_STREAM_SECONDS', '0'))
+
+# DOCX/PDF/paper entry exports (see core/export_jobs.py): when on, downloads
+# are queued and built by `manage.py run_export_worker`. Jobs stay pending
+# without that worker, so the default builds the file in the request.
+EXPORT_IN_BACKGROUND = str(os.environ.get('EXPORT_IN_BACKGROUND', '')).lower() in ('1', 'true', 'yes', 'on')
+
+# German and logic course content compiled by `manage.py compile_course_data`
+# (see core/course_store.py). Without a current compile the pages build it
+# from the Python data modules. COURSE_DATA_WARMUP loads all of it at startup
+# instead of on first use.
+COURSE_DATA_DIR = os.environ.get('COURSE_DATA_DIR', str(BASE_DIR / 'course_data'))
+COURSE_DATA_WARMUP = str(os.environ.get('COURSE_DATA_WARMUP', '')).lower() in ('1', 'true', 'yes', 'on')
+
 # Hardcoded ALLOWED_HOSTS to ensure all domains are always included
 ALLOWED_HOSTS = [
     '127.0.0.1',
@@ -100,7 +100,7 @@ function getCookie(name) {
  */
 let lastSearchResults = [];
 let currentSearchQuery = '';
-let currentSearchOffset = 0;
+let currentSearchCursor = null;
 let hasMoreResults = false;
 let isLoadingMore = false;
 let searchTimeout = null; // Debounce için
@@ -130,11 +130,11 @@ document.addEventListener('DOMContentLoaded', function() {
 
     function loadSearchResults(isLoadMore = false) {
         const q = currentSearchQuery;
-        const offset = isLoadMore ? currentSearchOffset : 0;
+        const cursor = isLoadMore ? currentSearchCursor : null;
         const requestToken = ++activeSearchRequestToken;
 
         if (!isLoadMore) {
-            currentSearchOffset = 0;
+            currentSearchCursor = null;
             lastSearchResults = [];
             seenSearchKeys.clear();
             searchResults.innerHTML = '';
@@ -142,7 +142,7 @@ document.addEventListener('DOMContentLoaded', function() {
 
         isLoadingMore = true;
 
-        fetch('/search_suggestions/?q=' + encodeURIComponent(q) + '&offset=' + offset + '&limit=20', {
+        fetch('/search_suggestions/?q=' + encodeURIComponent(q) + (cursor ? '&cursor=' + encodeURIComponent(cursor) : '') + '&limit=20', {
             headers: {
                 'X-Requested-With': 'XMLHttpRequest'
             }
@@ -208,7 +208,7 @@ document.addEventListener('DOMContentLoaded', function() {
             let loadMoreBtn = document.getElementById('load-more-search-btn');
 
             if (hasMoreResults) {
-                currentSearchOffset = data.next_offset;
+                currentSearchCursor = data.next_cursor;
 
                 if (!loadMoreBtn) {
                     loadMoreBtn = document.createElement('button');
@@ -278,7 +278,7 @@ document.addEventListener('DOMContentLoaded', function() {
             // Önceki sonuçları temizle
             searchResults.innerHTML = '';
             lastSearchResults = [];
-            currentSearchOffset = 0;
+            currentSearchCursor = null;
 
             // 300ms bekle, sonra arama yap (debounce)
             searchTimeout = setTimeout(function() {
@@ -287,7 +287,7 @@ document.addEventListener('DOMContentLoaded', function() {
         } else {
             searchResults.style.display = 'none';
             lastSearchResults = [];
-            currentSearchOffset = 0;
+            currentSearchCursor = null;
             seenSearchKeys.clear();
         }
     });
@@ -389,9 +389,12 @@ document.addEventListener('DOMContentLoaded', function() {
 
     /**
      * Keep all navbar counters in one request so a single-worker deployment
-     * does not queue three simultaneous polling requests.
+     * does not queue three simultaneous polling requests. The server holds
+     * the request until a counter changes (when long-polling is enabled), so
+     * the next request is sent as soon as one returns.
      */
     let navbarStatusRequestInFlight = false;
+    let navbarStatusVersion = '';
 
     function updateBadge(id, count) {
         const badge = document.getElementById(id);
@@ -412,7 +415,11 @@ document.addEventListener('DOMContentLoaded', function() {
         }
 
         navbarStatusRequestInFlight = true;
-        fetch('/navbar/status/', {
+        let longPoll = false;
+        const url = navbarStatusVersion
+            ? '/navbar/status/wait/?since=' + encodeURIComponent(navbarStatusVersion)
+            : '/navbar/status/wait/';
+        fetch(url, {
             headers: {
                 'X-Requested-With': 'XMLHttpRequest'
             }
@@ -427,6 +434,8 @@ document.addEventListener('DOMContentLoaded', function() {
             .then(data => {
                 if (!data) return;
 
+                navbarStatusVersion = data.version || '';
+                longPoll = Number(data.hold || 0) > 0;
                 updateBadge('notification-badge', data.notification_count);
                 updateBadge('message-badge', data.message_count);
                 if (typeof window.hafifAyaklarSetOnlineChatUnreadCount === 'function') {
@@ -438,6 +447,9 @@ document.addEventListener('DOMContentLoaded', function() {
             })
             .finally(() => {
                 navbarStatusRequestInFlight = false;
+                if (longPoll && !document.hidden) {
+                    setTimeout(updateNavbarStatus, 1000);
+                }
             });
     }
 
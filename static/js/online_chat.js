@@ -22,6 +22,7 @@ document.addEventListener('DOMContentLoaded', function () {
         lastMessageId: Number(localStorage.getItem(lastMessageIdKey) || 0) || null,
         unreadCount: Number(localStorage.getItem(unreadCountKey) || 0) || 0,
         pollTimer: null,
+        stream: null,
         panelOpen: false,
         loading: false,
     };
@@ -186,6 +187,47 @@ document.addEventListener('DOMContentLoaded', function () {
         }
     }
 
+    function openStream() {
+        closeStream();
+        if (typeof EventSource === 'undefined') {
+            state.pollTimer = window.setInterval(function () {
+                fetchChat(true, true);
+            }, 5000);
+            return;
+        }
+
+        // New messages arrive on one held connection; EventSource reconnects
+        // by itself and resumes after the last event id. An empty chat still
+        // sends after=0, or each reconnect would start from the channel head.
+        state.stream = new EventSource(`/online-chat/stream/?after=${state.lastMessageId || 0}`);
+        state.stream.onmessage = function (event) {
+            let message;
+            try {
+                message = JSON.parse(event.data);
+            } catch (error) {
+                return;
+            }
+            if (state.lastMessageId && message.id <= state.lastMessageId) {
+                return;
+            }
+            messagesEl.querySelectorAll('.online-chat-empty').forEach(function (node) {
+                node.remove();
+            });
+            setMessages([message], true);
+        };
+    }
+
+    function closeStream() {
+        if (state.stream) {
+            state.stream.close();
+            state.stream = null;
+        }
+        if (state.pollTimer) {
+            window.clearInterval(state.pollTimer);
+            state.pollTimer = null;
+        }
+    }
+
     async function submitMessage(event) {
         event.preventDefault();
         const body = inputEl.value.trim();
@@ -230,23 +272,20 @@ document.addEventListener('DOMContentLoaded', function () {
         document.body.classList.add('online-chat-open');
         localStorage.setItem(panelStateKey, '1');
         setUnreadCount(0);
-        fetchChat(false);
-        if (state.pollTimer) {
-            window.clearInterval(state.pollTimer);
-        }
-        state.pollTimer = window.setInterval(function () {
-            fetchChat(true, true);
-        }, 5000);
+        fetchChat(false).then(openStream);
     });
 
     panelEl.addEventListener('hidden.bs.offcanvas', function () {
         state.panelOpen = false;
         document.body.classList.remove('online-chat-open');
         localStorage.removeItem(panelStateKey);
-        if (state.pollTimer) {
-            window.clearInterval(state.pollTimer);
-            state.pollTimer = null;
-        }
+        closeStream();
+        // Streamed messages were seen; record that once instead of per poll.
+        fetch(buildMessagesUrl({ append: true, markRead: true }), {
+            headers: {
+                'X-Requested-With': 'XMLHttpRequest'
+            }
+        }).catch(function () {});
     });
 
     formEl.addEventListener('submit', submitMessage);